@@ -0,0 +1,203 @@
+"""
+Camada analítica: mantém as tabelas de fatos da migração 0008 (Fato_Produto, Fato_Status e
+Fato_Carregamento) e define os relatórios gerenciais que leem delas.
+
+Os relatórios agregam um ano ou mais de entregas. Lidos das tabelas de fatos (columnstore no
+SQL Server), varrem só as colunas usadas, comprimidas, e não disputam bloqueios com os
+operadores nas tabelas quentes.
+
+A atualização é incremental: para cada fato, Carga_Analitica guarda a marca d'água (até quando os
+dados já foram copiados) e cada execução copia só as linhas alteradas entre a marca e agora menos
+MARGEM segundos, em uma transação por fato. A margem deixa de fora as transações ainda abertas,
+cujas linhas já têm data mas não foram confirmadas; transações mais longas que a margem podem
+ficar sem cópia até a próxima carga completa (--completa). A primeira carga de cada fato é completa
+e inclui as tabelas de arquivo.
+
+Uso:
+    python analitico.py [--completa]
+"""
+import os
+import sys
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+import db_connection
+
+MARGEM = int(os.getenv('ANALITICO_MARGEM', '60')) # segundos
+INICIO = datetime(1900, 1, 1) # Marca d'água da carga completa
+
+# Cada intervalo (?, ?] é (marca d'água anterior, nova marca). Remover e reinserir as linhas
+# alteradas evita MERGE em tabela columnstore; hot e arquivo vão no mesmo comando para um produto
+# arquivado durante a carga não ser lido duas vezes.
+SQL_PRODUTOS_REMOVER = """
+DELETE FROM Fato_Produto WHERE ID_Produto IN (
+    SELECT ID_Produto FROM Produto_A_Ser_Entregue WHERE Data_Atualizacao > ? AND Data_Atualizacao <= ?
+    UNION ALL
+    SELECT ID_Produto FROM Produto_A_Ser_Entregue_Arquivo WHERE Data_Arquivamento > ? AND Data_Arquivamento <= ?
+);
+"""
+SQL_PRODUTOS_INSERIR = """
+INSERT INTO Fato_Produto (ID_Produto, Peso, Status_Entrega, Tipo_Produto, Data_Chegada_CD, Data_Prevista_Entrega, Data_Ultimo_Status, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, Arquivado)
+SELECT ID_Produto, Peso, Status_Entrega, Tipo_Produto, Data_Chegada_CD, Data_Prevista_Entrega, Data_Ultimo_Status, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, 0
+FROM Produto_A_Ser_Entregue WHERE Data_Atualizacao > ? AND Data_Atualizacao <= ?
+UNION ALL
+SELECT ID_Produto, Peso, Status_Entrega, Tipo_Produto, Data_Chegada_CD, Data_Prevista_Entrega, Data_Ultimo_Status, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, 1
+FROM Produto_A_Ser_Entregue_Arquivo WHERE Data_Arquivamento > ? AND Data_Arquivamento <= ?;
+"""
+# Eventos são só inseridos (Historico_Status é somente inserção): basta copiar os do intervalo.
+SQL_STATUS_INSERIR = """
+INSERT INTO Fato_Status (ID_Evento, ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Evento, ID_Produto, Status_Entrega, Data_Evento FROM Historico_Status WHERE Data_Evento > ? AND Data_Evento <= ?
+UNION ALL
+SELECT ID_Evento, ID_Produto, Status_Entrega, Data_Evento FROM Historico_Status_Arquivo WHERE Data_Evento > ? AND Data_Evento <= ?;
+"""
+# Data_Atualizacao do cabeçalho muda a cada item incluído ou removido (triggers da migração 0007).
+SQL_CARREGAMENTOS_REMOVER = """
+DELETE FROM Fato_Carregamento WHERE ID_Carregamento_Evento IN (
+    SELECT ID_Carregamento_Evento FROM Carregamento_Evento WHERE Data_Atualizacao > ? AND Data_Atualizacao <= ?
+);
+"""
+SQL_CARREGAMENTOS_INSERIR = """
+INSERT INTO Fato_Carregamento (ID_Carregamento_Evento, Placa_Veiculo, Tipo_Veiculo, Carga_Suportada, Data_Carregamento, Peso_Total, Quantidade_Itens)
+SELECT E.ID_Carregamento_Evento, E.Placa_Veiculo, V.Tipo, V.Carga_Suportada, E.Data_Carregamento, E.Peso_Total, E.Quantidade_Itens
+FROM Carregamento_Evento E
+JOIN Veiculo V ON V.Placa_Veiculo = E.Placa_Veiculo
+WHERE E.Data_Atualizacao > ? AND E.Data_Atualizacao <= ?;
+"""
+
+# Fato -> comandos da carga, cada um com a quantidade de intervalos (?, ?] que recebe.
+FATOS = {
+    'Fato_Produto': [(SQL_PRODUTOS_REMOVER, 2), (SQL_PRODUTOS_INSERIR, 2)],
+    'Fato_Status': [(SQL_STATUS_INSERIR, 2)],
+    'Fato_Carregamento': [(SQL_CARREGAMENTOS_REMOVER, 1), (SQL_CARREGAMENTOS_INSERIR, 1)],
+}
+
+# Relatórios gerenciais: título, cabeçalhos, larguras das colunas e consulta (parâmetro: data inicial).
+# Agrupam por YEAR/MONTH em vez de FORMAT, que no SQL Server é avaliado linha a linha. Os fatos
+# guardam os códigos dos domínios (dominios.py); os nomes vêm das tabelas Dominio_* só no resultado.
+RELATORIOS = [
+    ("Entregas por Mês",
+     ["Ano", "Mês", "Entregas", "No Prazo", "% No Prazo", "Peso (kg)"], [6, 5, 10, 10, 12, 14],
+     """
+     SELECT YEAR(Data_Ultimo_Status) AS Ano, MONTH(Data_Ultimo_Status) AS Mes, COUNT(*) AS Entregas,
+            SUM(CASE WHEN CAST(Data_Ultimo_Status AS DATE) <= Data_Prevista_Entrega THEN 1 ELSE 0 END) AS No_Prazo,
+            SUM(CASE WHEN CAST(Data_Ultimo_Status AS DATE) <= Data_Prevista_Entrega THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS Percentual,
+            SUM(Peso) AS Peso
+     FROM Fato_Produto
+     WHERE Status_Entrega = 4 /* Entregue */ AND Data_Ultimo_Status >= ?
+     GROUP BY YEAR(Data_Ultimo_Status), MONTH(Data_Ultimo_Status)
+     ORDER BY Ano, Mes;
+     """),
+    ("Desempenho dos Motoristas",
+     ["Cód.", "Motorista", "Entregas", "No Prazo", "% No Prazo", "Peso (kg)"], [6, 25, 10, 10, 12, 14],
+     """
+     SELECT D.Codigo_Funcionario_Motorista, P.Nome, D.Entregas, D.No_Prazo, D.No_Prazo * 100.0 / D.Entregas, D.Peso
+     FROM (
+         SELECT Codigo_Funcionario_Motorista, COUNT(*) AS Entregas, SUM(Peso) AS Peso,
+                SUM(CASE WHEN CAST(Data_Ultimo_Status AS DATE) <= Data_Prevista_Entrega THEN 1 ELSE 0 END) AS No_Prazo
+         FROM Fato_Produto
+         WHERE Status_Entrega = 4 /* Entregue */ AND Codigo_Funcionario_Motorista IS NOT NULL AND Data_Ultimo_Status >= ?
+         GROUP BY Codigo_Funcionario_Motorista
+     ) D
+     LEFT JOIN Pessoa P ON P.Codigo_Pessoa = D.Codigo_Funcionario_Motorista
+     ORDER BY D.Entregas DESC;
+     """),
+    ("Ocupação dos Veículos",
+     ["Placa", "Tipo", "Carregamentos", "Itens", "Peso (kg)", "Ocupação Média %"], [10, 12, 15, 10, 14, 18],
+     """
+     SELECT F.Placa_Veiculo, T.Nome, COUNT(*), SUM(F.Quantidade_Itens), SUM(F.Peso_Total),
+            AVG(F.Peso_Total * 100.0 / F.Carga_Suportada)
+     FROM Fato_Carregamento F
+     JOIN Dominio_Tipo_Veiculo T ON T.Codigo = F.Tipo_Veiculo
+     WHERE F.Data_Carregamento >= ?
+     GROUP BY F.Placa_Veiculo, T.Nome
+     ORDER BY F.Placa_Veiculo;
+     """),
+    ("Movimentação de Status por Mês",
+     ["Ano", "Mês", "Status", "Eventos", "Produtos"], [6, 5, 20, 10, 10],
+     """
+     SELECT YEAR(F.Data_Evento) AS Ano, MONTH(F.Data_Evento) AS Mes, S.Nome, COUNT(*), COUNT(DISTINCT F.ID_Produto)
+     FROM Fato_Status F
+     JOIN Dominio_Status_Entrega S ON S.Codigo = F.Status_Entrega
+     WHERE F.Data_Evento >= ?
+     GROUP BY YEAR(F.Data_Evento), MONTH(F.Data_Evento), F.Status_Entrega, S.Nome
+     ORDER BY Ano, Mes, F.Status_Entrega;
+     """),
+]
+
+def _agora_servidor(tx):
+    """Data/hora do banco (as colunas de data são gravadas com GETDATE(), não com o relógio local)."""
+    agora = tx.fetchone("SELECT GETDATE();")[0]
+    return datetime.fromisoformat(agora) if isinstance(agora, str) else agora # No SQLite vem como texto
+
+def atualizar_fato(conn, fato, completa=False):
+    """
+    Copia para `fato` as linhas alteradas desde a última carga, em uma única transação.
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        fato (str): Nome da tabela de fatos (chave de FATOS).
+        completa (bool): Se True, apaga o fato e recarrega tudo (tabelas quentes e de arquivo).
+
+    Returns:
+        datetime: A nova marca d'água.
+    """
+    with db_connection.transaction(conn) as tx:
+        # UPDLOCK na marca d'água: duas cargas simultâneas do mesmo fato copiariam o mesmo intervalo.
+        anterior = tx.fetchone("SELECT Ultima_Carga FROM Carga_Analitica WITH (UPDLOCK) WHERE Fato = ?;", (fato,))[0]
+        if completa or anterior is None:
+            tx.execute(f"TRUNCATE TABLE {fato};") # Desaloca os rowgroups em vez de marcar linha a linha
+            anterior = INICIO
+        limite = _agora_servidor(tx) - timedelta(seconds=MARGEM)
+        if limite <= anterior:
+            return anterior
+        for sql, intervalos in FATOS[fato]:
+            tx.execute(sql, (anterior, limite) * intervalos)
+        tx.execute("UPDATE Carga_Analitica SET Ultima_Carga = ? WHERE Fato = ?;", (limite, fato))
+    return limite
+
+def atualizar(conn, completa=False):
+    """
+    Atualiza todos os fatos, cada um em sua transação.
+
+    Returns:
+        bool: True se todos foram atualizados. Um fato que falhar mantém a marca d'água anterior
+        e é recopiado na próxima execução.
+    """
+    sucesso = True
+    for fato in FATOS:
+        try:
+            limite = atualizar_fato(conn, fato, completa)
+            logging.info(f"{fato} atualizado até {limite:%d/%m/%Y %H:%M:%S}.")
+        except db_connection.obter_backend().Error as e:
+            logging.error(f"Falha ao atualizar {fato} (nada foi alterado nele): {e}")
+            sucesso = False
+    return sucesso
+
+def dados_ate(conn):
+    """
+    Returns:
+        datetime: Marca d'água mais antiga entre os fatos (os relatórios incluem os dados até ela), ou None se nunca carregados.
+    """
+    resultado = db_connection.execute_query(conn, "SELECT MIN(Ultima_Carga), COUNT(Ultima_Carga), COUNT(*) FROM Carga_Analitica;", fetch_results=True)
+    if not resultado or resultado[0][1] < resultado[0][2]:
+        return None
+    ate = resultado[0][0]
+    return datetime.fromisoformat(ate) if isinstance(ate, str) else ate
+
+def main(argumentos):
+    parser = argparse.ArgumentParser(description="Atualiza as tabelas de fatos dos relatórios gerenciais.")
+    parser.add_argument('--completa', action='store_true', help="apaga os fatos e recarrega tudo")
+    opcoes = parser.parse_args(argumentos)
+
+    conexao = db_connection.conectar_banco()
+    if not conexao:
+        return 1
+    try:
+        return 0 if atualizar(conexao, opcoes.completa) else 1
+    finally:
+        db_connection.desconectar_banco(conexao)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,138 @@
+"""
+Job de arquivamento: move os produtos finalizados ('Entregue' ou 'Cancelado') sem mudança de status
+há mais de N dias das tabelas quentes para as tabelas *_Arquivo (migração 0005), junto com o
+rastreamento, o histórico de status e os itens de carregamento de cada produto.
+
+Cada lote é movido em uma transação própria (o produto sai inteiro ou não sai) e tem menos de
+5000 produtos: acima de ~5000 bloqueios em um comando o SQL Server escala para um bloqueio da
+tabela inteira, o que travaria a aplicação. Lotes pequenos e transações curtas deixam o job rodar
+com o sistema no ar; a pausa entre lotes dá espaço para a carga normal. Linhas bloqueadas por
+outras transações são puladas (READPAST) e ficam para a próxima execução.
+
+O rastreamento de pedidos do menu do cliente consulta o arquivo quando o código não está nas
+tabelas quentes.
+
+Uso:
+    python arquivamento.py [--dias N] [--lote N] [--max-lotes N] [--pausa SEGUNDOS]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+import db_connection
+
+# Produtos finalizados há mais de ARQUIVO_DIAS dias são arquivados, ARQUIVO_LOTE por transação
+ARQUIVO_DIAS = int(os.getenv('ARQUIVO_DIAS', '90'))
+ARQUIVO_LOTE = int(os.getenv('ARQUIVO_LOTE', '1000'))
+ARQUIVO_PAUSA = float(os.getenv('ARQUIVO_PAUSA', '0.5')) # segundos entre lotes
+LOTE_MAXIMO = 4999 # Abaixo do limite de escalonamento de bloqueios do SQL Server
+
+# Os mais antigos primeiro, pelo índice filtrado IX_Produto_Finalizados (migração 0006).
+# UPDLOCK segura as linhas escolhidas até o fim do lote; READPAST pula as que outra transação está alterando.
+SQL_SELECIONAR_LOTE = """
+SELECT ID_Produto, ID_Rastreamento
+FROM Produto_A_Ser_Entregue WITH (UPDLOCK, READPAST)
+WHERE Status_Entrega IN (4, 5) /* Entregue, Cancelado */ AND Data_Ultimo_Status < ?
+ORDER BY Data_Ultimo_Status
+OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY;
+"""
+
+SQL_ARQUIVAR_RASTREAMENTO = """
+INSERT INTO Dados_Rastreamento_Arquivo (ID_Rastreamento, Codigo_Rastreamento, Nome_Destinatario, CPF_Destinatario, ID_Endereco, Cidade, Estado, Telefone_Destinatario)
+SELECT ID_Rastreamento, Codigo_Rastreamento, Nome_Destinatario, CPF_Destinatario, ID_Endereco, Cidade, Estado, Telefone_Destinatario
+FROM Dados_Rastreamento WHERE ID_Rastreamento = ?;
+"""
+SQL_ARQUIVAR_PRODUTO = """
+INSERT INTO Produto_A_Ser_Entregue_Arquivo (ID_Produto, Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Data_Ultimo_Status)
+SELECT ID_Produto, Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Data_Ultimo_Status
+FROM Produto_A_Ser_Entregue WHERE ID_Produto = ?;
+"""
+SQL_ARQUIVAR_HISTORICO = """
+INSERT INTO Historico_Status_Arquivo (ID_Evento, ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Evento, ID_Produto, Status_Entrega, Data_Evento FROM Historico_Status WHERE ID_Produto = ?;
+"""
+SQL_ARQUIVAR_CARREGAMENTO = """
+INSERT INTO Carregamento_Arquivo (ID_Carregamento, ID_Carregamento_Evento, ID_Produto)
+SELECT ID_Carregamento, ID_Carregamento_Evento, ID_Produto FROM Carregamento WHERE ID_Produto = ?;
+"""
+
+def arquivar_lote(conn, limite, tamanho_lote):
+    """
+    Move um lote de produtos finalizados antes de `limite` para o arquivo, em uma única transação.
+
+    Returns:
+        int: Quantidade de produtos arquivados (0 se não há mais nada a arquivar).
+    """
+    with db_connection.transaction(conn) as tx:
+        lote = tx.fetchall(SQL_SELECIONAR_LOTE, (limite, tamanho_lote))
+        if not lote:
+            return 0
+        produtos = [(id_produto,) for id_produto, _ in lote]
+        rastreamentos = [(id_rastreamento,) for _, id_rastreamento in lote]
+        # Copia para o arquivo e remove das tabelas quentes (filhas antes das mães, por causa das FKs)
+        tx.executemany(SQL_ARQUIVAR_RASTREAMENTO, rastreamentos)
+        tx.executemany(SQL_ARQUIVAR_PRODUTO, produtos)
+        tx.executemany(SQL_ARQUIVAR_HISTORICO, produtos)
+        tx.executemany(SQL_ARQUIVAR_CARREGAMENTO, produtos)
+        tx.executemany("DELETE FROM Historico_Status WHERE ID_Produto = ?", produtos)
+        tx.executemany("DELETE FROM Carregamento WHERE ID_Produto = ?", produtos)
+        tx.executemany("DELETE FROM Produto_A_Ser_Entregue WHERE ID_Produto = ?", produtos)
+        tx.executemany("DELETE FROM Dados_Rastreamento WHERE ID_Rastreamento = ?", rastreamentos)
+    return len(lote)
+
+def arquivar(conn, dias=ARQUIVO_DIAS, tamanho_lote=ARQUIVO_LOTE, max_lotes=None, pausa=ARQUIVO_PAUSA):
+    """
+    Arquiva, lote a lote, os produtos finalizados há mais de `dias` dias.
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        dias (int): Idade mínima (desde a última mudança de status) para arquivar.
+        tamanho_lote (int): Produtos por transação (limitado a LOTE_MAXIMO).
+        max_lotes (int, optional): Para depois desta quantidade de lotes (None = até acabar).
+        pausa (float): Segundos de espera entre lotes.
+
+    Returns:
+        int: Total de produtos arquivados. Lotes já confirmados permanecem arquivados se um lote falhar.
+    """
+    limite = datetime.now() - timedelta(days=dias)
+    tamanho_lote = max(1, min(tamanho_lote, LOTE_MAXIMO))
+    total = lotes = 0
+    while max_lotes is None or lotes < max_lotes:
+        try:
+            movidos = arquivar_lote(conn, limite, tamanho_lote)
+        except db_connection.obter_backend().Error as e:
+            logging.error(f"Falha ao arquivar lote (nenhum produto do lote foi movido): {e}")
+            break
+        if not movidos:
+            break
+        total += movidos
+        lotes += 1
+        logging.info(f"Lote {lotes}: {movidos} produto(s) arquivado(s) (total: {total}).")
+        if movidos < tamanho_lote:
+            break
+        time.sleep(pausa)
+    logging.info(f"Arquivamento concluído: {total} produto(s) finalizados antes de {limite:%d/%m/%Y} movidos para o arquivo.")
+    return total
+
+def main(argumentos):
+    parser = argparse.ArgumentParser(description="Move produtos finalizados antigos para as tabelas de arquivo.")
+    parser.add_argument('--dias', type=int, default=ARQUIVO_DIAS, help=f"idade mínima em dias (padrão: {ARQUIVO_DIAS})")
+    parser.add_argument('--lote', type=int, default=ARQUIVO_LOTE, help=f"produtos por transação, até {LOTE_MAXIMO} (padrão: {ARQUIVO_LOTE})")
+    parser.add_argument('--max-lotes', type=int, default=None, help="para depois de N lotes")
+    parser.add_argument('--pausa', type=float, default=ARQUIVO_PAUSA, help=f"segundos entre lotes (padrão: {ARQUIVO_PAUSA})")
+    opcoes = parser.parse_args(argumentos)
+
+    conexao = db_connection.conectar_banco()
+    if not conexao:
+        return 1
+    try:
+        arquivar(conexao, opcoes.dias, opcoes.lote, opcoes.max_lotes, opcoes.pausa)
+        return 0
+    finally:
+        db_connection.desconectar_banco(conexao)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,20 @@
 import os
-import pyodbc
+import re
+import time
+import sqlite3
+import threading
 import logging
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+try:
+    import pyodbc
+except ImportError: # O backend SQLite funciona sem o driver ODBC instalado
+    pyodbc = None
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -12,21 +26,486 @@ DATABASE = os.getenv('DB_DATABASE', 'TrabalhoDeBD-SRL')
 USERNAME = os.getenv('DB_USERNAME', 'Vitoria')
 PASSWORD = os.getenv('DB_PASSWORD', 'SenhaDificil123')
 
+# Parâmetros do pool de conexões (várias sessões de operador por host)
+POOL_MIN = int(os.getenv('DB_POOL_MIN', '1'))
+POOL_MAX = int(os.getenv('DB_POOL_MAX', '5'))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30')) # segundos aguardando uma conexão livre
+POOL_VALIDAR_APOS = float(os.getenv('DB_POOL_VALIDAR_APOS', '30')) # segundos ociosa antes de testar a conexão
+
+# SQLSTATEs que indicam que a sessão caiu e a conexão não pode ser reaproveitada
+SQLSTATES_CONEXAO_PERDIDA = ('08S01', '08003', '08001', '08007', 'HYT00', 'HYT01')
+
+# Backend de banco: 'sqlserver' (padrão, Azure SQL via pyodbc) ou 'sqlite' (local/offline, para testes e benchmarks)
+BACKEND = os.getenv('DB_BACKEND', 'sqlserver').lower()
+SQLITE_PATH = os.getenv('DB_SQLITE_PATH', 'trabalho_bd.sqlite3')
+# Migrações do esquema (NNNN_nome.up.sql / .down.sql); ver migracoes.py
+MIGRACOES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Métricas de consultas: comandos acima deste tempo total (ms) vão para o log de consultas lentas
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '200'))
+
+# Cursores (comandos preparados) mantidos por conexão, reaproveitados quando o mesmo SQL é executado de novo
+STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '64'))
+
 def criar_string_conexao():
     """Cria a string de conexão para o banco de dados SQL Server."""
     driver = "{ODBC Driver 18 for SQL Server}" # Certifique-se de que este driver está instalado
     return f'DRIVER={driver};SERVER={SERVER};DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD}'
 
+def listar_migracoes(diretorio=MIGRACOES_DIR):
+    """
+    Lista as migrações do diretório em ordem de versão. Cada migração tem NNNN_nome.up.sql,
+    NNNN_nome.down.sql e, opcionalmente, variantes NNNN_nome.sqlite.up.sql / .sqlite.down.sql
+    usadas no lugar da tradução automática do T-SQL quando o backend é SQLite.
+
+    Returns:
+        list: Dicionários com versao (int), nome e os caminhos 'up', 'down', 'sqlite_up' e 'sqlite_down' (ou None).
+    """
+    migracoes = {}
+    for arquivo in sorted(os.listdir(diretorio)) if os.path.isdir(diretorio) else []:
+        m = re.match(r'(\d{4})_(\w+?)(\.sqlite)?\.(up|down)\.sql$', arquivo)
+        if not m:
+            continue
+        versao = int(m.group(1))
+        migracao = migracoes.setdefault(versao, {'versao': versao, 'nome': m.group(2), 'up': None,
+                                                 'down': None, 'sqlite_up': None, 'sqlite_down': None})
+        chave = ('sqlite_' if m.group(3) else '') + m.group(4)
+        migracao[chave] = os.path.join(diretorio, arquivo)
+    return [migracoes[versao] for versao in sorted(migracoes)]
+
+def ler_esquema_sql(diretorio=MIGRACOES_DIR):
+    """Texto T-SQL de todas as migrações 'up', em ordem (o esquema completo, para análise estática)."""
+    partes = []
+    for migracao in listar_migracoes(diretorio):
+        if migracao['up']:
+            with open(migracao['up'], encoding='utf-8') as arquivo:
+                partes.append(arquivo.read())
+    return '\n'.join(partes)
+
+# ------------------- TIPOS DE PARÂMETROS ----------------------
+# O pyodbc envia str como NVARCHAR com o tamanho do valor. Contra colunas VARCHAR isso força
+# conversão implícita (scan em vez de seek) e gera um plano em cache para cada tamanho.
+# O mapa de tipos abaixo vem das migrações do esquema e permite declarar cada parâmetro com o tipo e o
+# tamanho da coluna com que ele é comparado ou na qual é gravado.
+
+@lru_cache(maxsize=None)
+def carregar_mapa_colunas(diretorio=MIGRACOES_DIR):
+    """
+    Lê os CREATE TABLE e ALTER TABLE ... ADD/ALTER COLUMN das migrações e monta o mapa de tipos das colunas.
+
+    Returns:
+        dict: {tabela: {coluna: (tipo, tamanho)}}, com nomes em minúsculas; tamanho é None
+              para tipos sem tamanho (INT, DATE, ...) e -1 para MAX.
+    """
+    try:
+        texto = re.sub(r'--[^\n]*', '', ler_esquema_sql(diretorio))
+    except OSError as e:
+        logging.warning(f"Não foi possível ler o mapa de tipos das migrações em {diretorio}: {e}")
+        return {}
+    mapa = {}
+    comandos = (r'CREATE\s+TABLE\s+(?:\[?\w+\]?\.)?\[?(\w+)\]?\s*\((.*?)\)\s*;'
+                r'|ALTER\s+TABLE\s+(?:\[?\w+\]?\.)?\[?(\w+)\]?\s+ADD\s+(.*?);'
+                r'|ALTER\s+TABLE\s+(?:\[?\w+\]?\.)?\[?(\w+)\]?\s+DROP\s+COLUMN\s+(.*?);'
+                r'|ALTER\s+TABLE\s+(?:\[?\w+\]?\.)?\[?(\w+)\]?\s+ALTER\s+COLUMN\s+(.*?);'
+                r'|DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:\[?\w+\]?\.)?\[?(\w+)\]?')
+    for m in re.finditer(comandos, texto, re.IGNORECASE | re.DOTALL):
+        criada, definicoes, alterada, adicionadas, reduzida, removidas, convertida, nova_definicao, apagada = m.groups()
+        if criada:
+            mapa[criada.lower()] = dict(filter(None, map(_definicao_coluna, definicoes.split('\n'))))
+        elif alterada:
+            mapa.setdefault(alterada.lower(), {}).update(filter(None, map(_definicao_coluna, adicionadas.split('\n'))))
+        elif convertida:
+            definicao = _definicao_coluna(nova_definicao)
+            if definicao:
+                mapa.setdefault(convertida.lower(), {}).update([definicao])
+        elif reduzida:
+            for coluna in removidas.split(','):
+                mapa.get(reduzida.lower(), {}).pop(coluna.strip(' []\n').lower(), None)
+        elif apagada:
+            mapa.pop(apagada.lower(), None)
+    return mapa
+
+def _definicao_coluna(definicao):
+    """
+    (coluna, (tipo, tamanho)) de uma linha de definição de coluna, ou None se a linha for uma restrição.
+    Colunas calculadas (`col AS CAST(... AS VARCHAR(20))`) têm o tipo do CAST final.
+    """
+    m = re.match(r'\s*\[?(\w+)\]?\s+([A-Za-z]+)\s*(?:\(\s*(\d+|MAX)\s*(?:,\s*\d+\s*)?\))?', definicao)
+    if not m or m.group(1).upper() in ('FOREIGN', 'PRIMARY', 'CONSTRAINT', 'UNIQUE', 'CHECK', 'INDEX', 'COLUMN'):
+        return None
+    tipo, tamanho = m.group(2).upper(), m.group(3)
+    if tipo == 'AS':
+        cast = re.search(r'\bAS\s+([A-Za-z]+)\s*(?:\(\s*(\d+|MAX)\s*\))?\s*\)\s*(?:PERSISTED)?[\s,]*$', definicao, re.IGNORECASE)
+        if not cast:
+            return None
+        tipo, tamanho = cast.group(1).upper(), cast.group(2)
+    return m.group(1).lower(), (tipo, -1 if tamanho and tamanho.upper() == 'MAX' else int(tamanho) if tamanho else None)
+
+def _tipo_da_coluna(coluna, tabelas, mapa):
+    """Procura a coluna nas tabelas do comando; se não achar, aceita um tipo único no esquema todo."""
+    coluna = coluna.lower()
+    for tabela in tabelas:
+        if coluna in mapa.get(tabela, {}):
+            return mapa[tabela][coluna]
+    tipos = {colunas[coluna] for colunas in mapa.values() if coluna in colunas}
+    return tipos.pop() if len(tipos) == 1 else None
+
+@lru_cache(maxsize=2048)
+def tipos_parametros(sql):
+    """
+    Descobre, para cada '?' do comando, o tipo da coluna associada (ou None se não for possível):
+    comparações (`col = ?`, `col LIKE ?`, `col IN (?, ?)`), `SET col = ?` e listas de
+    colunas de INSERT ... VALUES.
+
+    Returns:
+        tuple: Um (tipo, tamanho) ou None por parâmetro, na ordem em que aparecem.
+    """
+    mapa = carregar_mapa_colunas()
+    sem_literais = re.sub(r"N?'(?:[^']|'')*'", "''", sql)
+    tabelas = [t.lower() for t in re.findall(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(?:\[?\w+\]?\.)?\[?(\w+)',
+                                             sem_literais, re.IGNORECASE)]
+    posicoes = [m.start() for m in re.finditer(r'\?', sem_literais)]
+    colunas = [None] * len(posicoes)
+
+    insert = re.search(r'\bINSERT\s+INTO\s+[\w\[\].]+\s*\(([^)]*)\)\s*(?:OUTPUT\b.*?)?\bVALUES\s*', sem_literais,
+                       re.IGNORECASE | re.DOTALL)
+    if insert:
+        nomes = [c.strip(' []\n\t') for c in insert.group(1).split(',')]
+        # Percorre as tuplas de VALUES respeitando parênteses internos (ex: GETDATE())
+        profundidade, indice, inicio_item = 0, 0, None
+        for posicao in range(insert.end(), len(sem_literais)):
+            caractere = sem_literais[posicao]
+            if caractere == ';' and profundidade == 0:
+                break
+            if caractere in ',)' and profundidade == 1:
+                item = sem_literais[inicio_item:posicao]
+                if item.strip() == '?' and indice < len(nomes):
+                    colunas[posicoes.index(inicio_item + item.index('?'))] = nomes[indice]
+                indice, inicio_item = indice + 1, posicao + 1
+            if caractere == '(':
+                profundidade += 1
+                if profundidade == 1:
+                    indice, inicio_item = 0, posicao + 1
+            elif caractere == ')':
+                profundidade -= 1
+
+    for i, posicao in enumerate(posicoes):
+        if colunas[i]:
+            continue
+        anterior = sem_literais[:posicao]
+        m = (re.search(r'([\w\]]+)\s*(?:=|<>|!=|<=|>=|<|>|\bLIKE)\s*$', anterior, re.IGNORECASE)
+             or re.search(r'([\w\]]+)\s+(?:NOT\s+)?IN\s*\((?:\s*\?\s*,)*\s*$', anterior, re.IGNORECASE))
+        if m:
+            colunas[i] = m.group(1).strip('[]')
+
+    return tuple(_tipo_da_coluna(c, tabelas, mapa) if c else None for c in colunas)
+
+# ------------------- BACKENDS ----------------------
+# Cada backend sabe abrir conexões, traduzir o SQL da aplicação para o seu dialeto
+# e obter IDs gerados. O restante do módulo só conversa com o backend ativo (_backend).
+
+class _DriverAusenteError(Exception):
+    """pyodbc não está instalado, então o backend SQL Server não pode conectar."""
+
+
+class SqlServerBackend:
+    """Backend padrão: Azure SQL / SQL Server via pyodbc e 'ODBC Driver 18 for SQL Server'."""
+
+    nome = 'sqlserver'
+    Error = pyodbc.Error if pyodbc else _DriverAusenteError
+    max_linhas_por_values = 1000
+    max_parametros_por_comando = 2000 # O limite real é 2100; deixamos folga
+    # (tabela, coluna, tabela referenciada, coluna referenciada, ação no DELETE, FK) de todas as FKs
+    sql_chaves_estrangeiras = """
+    SELECT OBJECT_NAME(fk.parent_object_id), COL_NAME(fkc.parent_object_id, fkc.parent_column_id),
+           OBJECT_NAME(fk.referenced_object_id), COL_NAME(fkc.referenced_object_id, fkc.referenced_column_id),
+           fk.delete_referential_action_desc, fk.name
+    FROM sys.foreign_keys fk
+    JOIN sys.foreign_key_columns fkc ON fkc.constraint_object_id = fk.object_id
+    ORDER BY fk.name, fkc.constraint_column_id;
+    """
+
+    def descricao(self):
+        return f"SERVER={SERVER}, DATABASE={DATABASE}, UID={USERNAME}"
+
+    def connect(self):
+        if pyodbc is None:
+            raise _DriverAusenteError("O pacote pyodbc não está instalado (necessário para DB_BACKEND=sqlserver).")
+        return pyodbc.connect(criar_string_conexao())
+
+    def translate(self, sql):
+        return sql # O SQL da aplicação já é escrito em T-SQL
+
+    def is_connection_error(self, erro):
+        sqlstate = str(erro.args[0]) if erro.args else ''
+        return sqlstate in SQLSTATES_CONEXAO_PERDIDA
+
+    def _tamanho_parametro(self, tipo, valor, lote=False):
+        """(SQL_VARCHAR/SQL_CHAR, tamanho, 0) para texto destinado a coluna VARCHAR/CHAR; None nos demais casos."""
+        if not tipo or tipo[0] not in ('VARCHAR', 'CHAR') or tipo[1] is None:
+            return None
+        if not lote and not (valor is None or isinstance(valor, str)):
+            return None
+        tamanho = 0 if tipo[1] == -1 else tipo[1] # 0 = VARCHAR(MAX) no pyodbc
+        if tamanho and isinstance(valor, str) and len(valor) > tamanho:
+            return None # Deixa o servidor acusar o truncamento, como antes
+        return (pyodbc.SQL_VARCHAR if tipo[0] == 'VARCHAR' else pyodbc.SQL_CHAR, tamanho, 0)
+
+    def set_param_types(self, cursor, sql, params=None):
+        """
+        Declara o tipo e o tamanho dos parâmetros de texto conforme as colunas do esquema
+        (VARCHAR(n) em vez de NVARCHAR do tamanho do valor). Assim o SQL Server faz seek
+        no índice sem conversão implícita e reaproveita um único plano para o comando.
+        """
+        tamanhos = None
+        if params:
+            tipos = tipos_parametros(sql)
+            if len(tipos) == len(params) and any(tipos):
+                tamanhos = [self._tamanho_parametro(tipo, valor) for tipo, valor in zip(tipos, params)]
+        cursor.setinputsizes(tamanhos if tamanhos and any(tamanhos) else None) # None limpa o que o cursor tinha
+
+    def prepare_executemany(self, cursor, sql):
+        cursor.fast_executemany = True
+        tipos = tipos_parametros(sql)
+        tamanhos = [self._tamanho_parametro(tipo, None, lote=True) for tipo in tipos]
+        cursor.setinputsizes(tamanhos if any(tamanhos) else None)
+
+    def insert_and_get_id(self, cursor, insert_sql, params=None):
+        """
+        Envia o INSERT e a leitura de SCOPE_IDENTITY() no mesmo lote, para que
+        o ID gerado volte na mesma ida ao servidor. SCOPE_IDENTITY() (ao contrário de
+        @@IDENTITY) ignora identidades geradas por triggers. O NOCOUNT é desligado de novo
+        antes do SELECT final: a opção vale para a sessão, que volta ao pool e seria herdada
+        pelos próximos comandos (que passariam a ver rowcount -1).
+        """
+        sql = (
+            f"SET NOCOUNT ON; {insert_sql.strip().rstrip(';')}; "
+            "DECLARE @id INT = CAST(SCOPE_IDENTITY() AS INT); SET NOCOUNT OFF; SELECT @id;"
+        )
+        self.set_param_types(cursor, insert_sql, params)
+        if params:
+            cursor.execute(sql, params)
+        else:
+            cursor.execute(sql)
+        # Avança até o primeiro conjunto de resultados (pula contagens de linhas do lote)
+        while cursor.description is None:
+            if not cursor.nextset():
+                return None
+        result = cursor.fetchone()
+        return int(result[0]) if result and result[0] is not None else None
+
+    def insert_many_and_get_ids(self, cursor, table, columns, rows, id_column):
+        """
+        INSERT de várias linhas que devolve todos os IDs gerados.
+        OUTPUT ... INTO uma variável de tabela continua válido em tabelas com triggers
+        (o OUTPUT direto para o cliente não é permitido nesse caso).
+        """
+        marcadores = "(" + ", ".join("?" for _ in columns) + ")"
+        sql = (
+            "SET NOCOUNT ON; DECLARE @ids TABLE (id INT); "
+            f"INSERT INTO {table} ({', '.join(columns)}) OUTPUT INSERTED.{id_column} INTO @ids "
+            f"VALUES {', '.join(marcadores for _ in rows)}; "
+            "SET NOCOUNT OFF; SELECT id FROM @ids ORDER BY id;" # ver insert_and_get_id
+        )
+        valores = [valor for linha in rows for valor in linha]
+        self.set_param_types(cursor, sql, valores)
+        cursor.execute(sql, valores)
+        while cursor.description is None and cursor.nextset():
+            pass
+        return [int(r[0]) for r in cursor.fetchall()]
+
+
+def _formato_strftime(formato_net):
+    """Converte um formato de data do FORMAT() do T-SQL (ex: 'dd/MM/yyyy HH:mm') para strftime."""
+    tokens = {'yyyy': '%Y', 'MM': '%m', 'dd': '%d', 'HH': '%H', 'mm': '%M', 'ss': '%S'}
+    return re.sub(r'yyyy|MM|dd|HH|mm|ss', lambda m: tokens[m.group(0)], formato_net)
+
+# Regras de reescrita do T-SQL usado pela aplicação para o dialeto do SQLite
+_REGRAS_SQLITE = [
+    (re.compile(r"FORMAT\(\s*([\w.]+)\s*,\s*'([^']*)'\s*\)", re.IGNORECASE),
+     lambda m: f"strftime('{_formato_strftime(m.group(2))}', {m.group(1)})"),
+    (re.compile(r"GETDATE\(\)", re.IGNORECASE), "CURRENT_TIMESTAMP"),
+    (re.compile(r"@@IDENTITY|SCOPE_IDENTITY\(\)", re.IGNORECASE), "last_insert_rowid()"),
+    # Partes de data dos relatórios (agrupar por YEAR/MONTH evita o FORMAT linha a linha no SQL Server)
+    (re.compile(r"\b(YEAR|MONTH)\(\s*([\w.]+)\s*\)", re.IGNORECASE),
+     lambda m: f"CAST(strftime('{'%Y' if m.group(1).upper() == 'YEAR' else '%m'}', {m.group(2)}) AS INTEGER)"),
+    (re.compile(r"CAST\(\s*([\w.]+)\s+AS\s+DATE\s*\)", re.IGNORECASE), r"date(\1)"),
+    # Parâmetro comparado com coluna DATETIME (no SQL Server, arredonda como a coluna); no SQLite, o texto gravado
+    (re.compile(r"CAST\(\s*\?\s+AS\s+DATETIME\s*\)", re.IGNORECASE), "?"),
+    (re.compile(r"^\s*TRUNCATE\s+TABLE\b", re.IGNORECASE), "DELETE FROM"),
+    # Dicas de bloqueio de tabela (o SQLite bloqueia o banco inteiro na escrita)
+    (re.compile(r"\s+WITH\s*\(\s*(?:UPDLOCK|READPAST|ROWLOCK|HOLDLOCK|NOLOCK)(?:\s*,\s*(?:UPDLOCK|READPAST|ROWLOCK|HOLDLOCK|NOLOCK))*\s*\)",
+                re.IGNORECASE), ""),
+    # LIMIT <deslocamento>, <quantidade> mantém a ordem dos parâmetros do OFFSET ... FETCH
+    (re.compile(r"OFFSET\s+(\?|\d+)\s+ROWS\s+FETCH\s+(?:NEXT|FIRST)\s+(\?|\d+)\s+ROWS\s+ONLY", re.IGNORECASE), r"LIMIT \1, \2"),
+]
+
+@lru_cache(maxsize=1024)
+def traduzir_sql_sqlite(sql):
+    """Reescreve um comando T-SQL da aplicação para SQLite (resultado em cache por texto SQL)."""
+    for padrao, substituicao in _REGRAS_SQLITE:
+        sql = padrao.sub(substituicao, sql)
+    return sql
+
+def traduzir_script_sqlite(script):
+    """
+    Traduz um script DDL do SQL Server (como as migrações) para SQLite: remove comentários,
+    separadores GO, PRINT e blocos dinâmicos, converte IDENTITY para AUTOINCREMENT e
+    reduz CREATE/DROP INDEX ao que o SQLite aceita.
+    """
+    sem_comentarios = re.sub(r'--[^\n]*', '', script)
+    sem_comentarios = re.sub(r'^\s*GO\s*$', '', sem_comentarios, flags=re.IGNORECASE | re.MULTILINE)
+    comandos = []
+    # Separa por ';' fora de literais (o bloco dinâmico de FKs tem ';' dentro de strings).
+    for comando in re.findall(r"(?:'[^']*'|[^';])+", sem_comentarios):
+        comando = comando.strip()
+        if not comando or re.match(r'(DECLARE|SELECT\s+@|EXEC|PRINT|USE)\b', comando, re.IGNORECASE):
+            continue
+        comando = re.sub(r'\b(BIG)?INT\s+IDENTITY\s*\(\s*1\s*,\s*1\s*\)\s+PRIMARY\s+KEY',
+                         'INTEGER PRIMARY KEY AUTOINCREMENT', comando, flags=re.IGNORECASE)
+        # Índices: o SQLite não tem (NON)CLUSTERED, colunas INCLUDE nem opções WITH (...); filtros WHERE são mantidos
+        comando = re.sub(r'\b(?:NON)?CLUSTERED\s+', '', comando, flags=re.IGNORECASE)
+        comando = re.sub(r'\s*\bINCLUDE\s*\([^)]*\)', '', comando, flags=re.IGNORECASE)
+        comando = re.sub(r'\s*\bWITH\s*\([^)]*\)', '', comando, flags=re.IGNORECASE)
+        comando = re.sub(r'^(DROP\s+INDEX\s+(?:IF\s+EXISTS\s+)?\w+)\s+ON\s+\w+', r'\1', comando, flags=re.IGNORECASE)
+        # O SQL Server usa collation case-insensitive por padrão; o SQLite não.
+        comando = re.sub(r'\b(N?(?:VAR)?CHAR\s*\(\s*(?:\d+|MAX)\s*\))', r'\1 COLLATE NOCASE',
+                         comando, flags=re.IGNORECASE)
+        comandos.append(traduzir_sql_sqlite(comando) + ';')
+    return '\n'.join(comandos)
+
+def _registrar_tipos_sqlite():
+    """Faz o sqlite3 devolver date/datetime/Decimal como o pyodbc, para o app funcionar sem mudanças."""
+    sqlite3.register_adapter(Decimal, str)
+    sqlite3.register_adapter(date, lambda d: d.isoformat())
+    sqlite3.register_adapter(datetime, lambda d: d.isoformat(' '))
+    sqlite3.register_converter('DATE', lambda b: date.fromisoformat(b.decode()))
+    sqlite3.register_converter('DATETIME', lambda b: datetime.fromisoformat(b.decode()))
+    sqlite3.register_converter('DECIMAL', lambda b: Decimal(b.decode()))
+
+
+class SqliteBackend:
+    """
+    Backend local em SQLite, para rodar a aplicação offline (testes, benchmarks e profiling).
+    Na primeira conexão, aplica as migrações pendentes (com auto_migrar=True, o padrão).
+    Para um banco em memória compartilhado pelo pool use, por exemplo,
+    DB_SQLITE_PATH='file:trabalho_bd?mode=memory&cache=shared'.
+    """
+
+    nome = 'sqlite'
+    Error = sqlite3.Error
+    max_linhas_por_values = 1000
+    max_parametros_por_comando = 32000
+    # Mesmas colunas do SQL Server; sem coluna referenciada explícita, a FK aponta para a PK da tabela
+    sql_chaves_estrangeiras = """
+    SELECT m.name, f."from", f."table",
+           COALESCE(f."to", (SELECT p.name FROM pragma_table_info(f."table") p WHERE p.pk = f.seq + 1)),
+           f.on_delete, m.name || '#' || f.id
+    FROM sqlite_master m
+    JOIN pragma_foreign_key_list(m.name) f
+    WHERE m.type = 'table'
+    ORDER BY m.name, f.id, f.seq;
+    """
+
+    def __init__(self, caminho=None, auto_migrar=True):
+        self.caminho = caminho or SQLITE_PATH
+        self.auto_migrar = auto_migrar
+        self._esquema_pronto = False
+        self._esquema_lock = threading.Lock()
+        _registrar_tipos_sqlite()
+
+    def descricao(self):
+        return f"SQLITE={self.caminho}"
+
+    def connect(self):
+        conexao = sqlite3.connect(self.caminho, detect_types=sqlite3.PARSE_DECLTYPES, timeout=30,
+                                  check_same_thread=False, uri=self.caminho.startswith('file:'))
+        conexao.execute("PRAGMA foreign_keys = ON")
+        self._garantir_esquema(conexao)
+        return conexao
+
+    def _garantir_esquema(self, conexao):
+        with self._esquema_lock:
+            if self._esquema_pronto or not self.auto_migrar:
+                return
+            import migracoes # Importado aqui: migracoes depende deste módulo
+            tabelas = {linha[0] for linha in conexao.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if 'Endereco' in tabelas and 'Versao_Esquema' not in tabelas:
+                migracoes.baseline(conexao, 1, backend=self) # Banco criado antes das migrações (pelo script.sql)
+            migracoes.migrar(conexao, backend=self)
+            self._esquema_pronto = True
+
+    def translate(self, sql):
+        return traduzir_sql_sqlite(sql)
+
+    def is_connection_error(self, erro):
+        return False # Não há sessão de rede para cair
+
+    def set_param_types(self, cursor, sql, params=None):
+        pass # O SQLite não tem tipos declarados de parâmetro
+
+    def prepare_executemany(self, cursor, sql):
+        pass # executemany do sqlite3 já reutiliza o comando preparado
+
+    def insert_and_get_id(self, cursor, insert_sql, params=None):
+        if params:
+            cursor.execute(self.translate(insert_sql), params)
+        else:
+            cursor.execute(self.translate(insert_sql))
+        return cursor.lastrowid
+
+    def insert_many_and_get_ids(self, cursor, table, columns, rows, id_column):
+        marcadores = "(" + ", ".join("?" for _ in columns) + ")"
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join(marcadores for _ in rows)} "
+               f"RETURNING {id_column}")
+        cursor.execute(sql, [valor for linha in rows for valor in linha])
+        return sorted(int(r[0]) for r in cursor.fetchall())
+
+
+def _criar_backend(nome, **opcoes):
+    if nome == 'sqlserver':
+        return SqlServerBackend(**opcoes)
+    if nome == 'sqlite':
+        return SqliteBackend(**opcoes)
+    raise ValueError(f"Backend de banco desconhecido: '{nome}'. Use 'sqlserver' ou 'sqlite'.")
+
+_backend = _criar_backend(BACKEND)
+
+def configurar_backend(nome, **opcoes):
+    """
+    Troca o backend ativo (ex: configurar_backend('sqlite', caminho='bench.sqlite3')).
+    Deve ser chamado antes de criar pools/conexões.
+
+    Returns:
+        O backend configurado.
+    """
+    global _backend
+    _backend = _criar_backend(nome, **opcoes)
+    logging.info(f"Backend de banco configurado: {_backend.nome} ({_backend.descricao()})")
+    return _backend
+
+def obter_backend():
+    """Retorna o backend de banco ativo."""
+    return _backend
+
+def _executar(cursor, sql, params=None):
+    """Executa um comando no cursor, traduzido para o dialeto do backend ativo."""
+    _backend.set_param_types(cursor, sql, params)
+    sql = _backend.translate(sql)
+    if params:
+        cursor.execute(sql, params)
+    else:
+        cursor.execute(sql)
+
 def conectar_banco():
     """Estabelece uma conexão com o banco de dados e retorna o objeto de conexão."""
-    connection_string = criar_string_conexao()
-    logging.info(f"Tentando conectar com: SERVER={SERVER}, DATABASE={DATABASE}, UID={USERNAME}")
+    logging.info(f"Tentando conectar com: {_backend.descricao()}")
     try:
-        conn = pyodbc.connect(connection_string)
+        conn = _backend.connect()
         logging.info("Conexão bem-sucedida!")
         return conn
-    except pyodbc.Error as ex:
-        sqlstate = ex.args[0]
+    except _backend.Error as ex:
+        sqlstate = ex.args[0] if ex.args else ''
         logging.error(f"Erro ao conectar ao banco de dados: {sqlstate}")
         logging.error(ex)
         if '08001' in str(sqlstate):
@@ -38,21 +517,493 @@ def conectar_banco():
             logging.error("Você pode precisar instalar o driver ODBC para SQL Server da Microsoft.")
         return None
 
+def _abrir_conexao():
+    """Abre uma nova conexão física com o banco ativo. Lança o erro do backend em caso de falha."""
+    return _backend.connect()
+
 def desconectar_banco(conexao):
     """Fecha a conexão com o banco de dados, se estiver ativa."""
     if conexao:
         try:
+            _fechar_cache_comandos(conexao)
             conexao.close()
             logging.info("Conexão fechada com sucesso.")
-        except pyodbc.Error as e:
+        except _backend.Error as e:
             logging.error(f"Erro ao fechar a conexão: {e}")
 
+class PoolEsgotadoError(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo limite de checkout."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexões thread-safe.
+
+    Mantém entre `min_size` e `max_size` conexões abertas, evitando o custo do
+    handshake TLS + login a cada operação. Conexões ociosas há mais de
+    `validar_apos` segundos são testadas no empréstimo e substituídas se estiverem mortas.
+    """
+
+    def __init__(self, min_size=POOL_MIN, max_size=POOL_MAX, timeout=POOL_TIMEOUT,
+                 validar_apos=POOL_VALIDAR_APOS, connect=_abrir_conexao):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Tamanhos de pool inválidos: exige 0 <= min_size <= max_size e max_size >= 1.")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.validar_apos = validar_apos
+        self._connect = connect
+        self._livres = deque() # (conexao, instante em que foi devolvida)
+        self._emprestadas = set()
+        self._invalidas = set()
+        self._total = 0
+        self._fechado = False
+        self._cond = threading.Condition()
+
+        for _ in range(min_size):
+            self._livres.append((self._connect(), time.monotonic()))
+            self._total += 1
+
+    def _conexao_viva(self, conexao):
+        """Executa uma consulta trivial para confirmar que a sessão ainda está ativa."""
+        cursor = None
+        try:
+            cursor = conexao.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            return True
+        except _backend.Error:
+            return False
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except _backend.Error:
+                    pass
+
+    def _descartar(self, conexao):
+        try:
+            _fechar_cache_comandos(conexao)
+            conexao.close()
+        except _backend.Error:
+            pass
+
+    def acquire(self, timeout=None):
+        """
+        Empresta uma conexão do pool.
+
+        Args:
+            timeout (float, optional): Segundos para aguardar uma conexão livre. Defaults to self.timeout.
+
+        Returns:
+            Conexão do backend ativo pronta para uso.
+
+        Raises:
+            PoolEsgotadoError: Se nenhuma conexão ficar livre dentro do tempo limite.
+            Erro do backend: Se for necessário abrir uma nova conexão e isso falhar.
+        """
+        limite = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            with self._cond:
+                while True:
+                    if self._fechado:
+                        raise PoolEsgotadoError("O pool de conexões foi fechado.")
+                    if self._livres:
+                        conexao, devolvida_em = self._livres.pop() # LIFO: reaproveita a conexão mais "quente"
+                        self._emprestadas.add(conexao)
+                        break
+                    if self._total < self.max_size:
+                        self._total += 1 # Reserva a vaga antes de conectar fora do lock
+                        conexao, devolvida_em = None, None
+                        break
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        raise PoolEsgotadoError(f"Nenhuma conexão livre após {self.timeout}s (máximo: {self.max_size}).")
+                    self._cond.wait(restante)
+
+            if conexao is None:
+                try:
+                    conexao = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._emprestadas.add(conexao)
+                return conexao
+
+            if time.monotonic() - devolvida_em < self.validar_apos or self._conexao_viva(conexao):
+                return conexao
+
+            # Conexão morta: descarta e tenta de novo (abrirá uma substituta se houver vaga)
+            logging.warning("Conexão do pool inativa detectada. Substituindo por uma nova.")
+            self._descartar(conexao)
+            with self._cond:
+                self._emprestadas.discard(conexao)
+                self._total -= 1
+                self._cond.notify()
+
+    def release(self, conexao, discard=False):
+        """Devolve uma conexão ao pool. Se `discard` for True (ou ela foi invalidada), ela é fechada."""
+        with self._cond:
+            self._emprestadas.discard(conexao)
+            discard = discard or conexao in self._invalidas or self._fechado
+            self._invalidas.discard(conexao)
+            if not discard:
+                try:
+                    conexao.rollback() # Não deixa transação pendente para o próximo usuário
+                except _backend.Error:
+                    discard = True
+            if discard:
+                self._total -= 1
+            else:
+                self._livres.append((conexao, time.monotonic()))
+            self._cond.notify()
+        if discard:
+            self._descartar(conexao)
+            logging.info("Conexão descartada do pool.")
+
+    def invalidate(self, conexao):
+        """Marca uma conexão emprestada para ser fechada (em vez de reaproveitada) na devolução."""
+        with self._cond:
+            if conexao in self._emprestadas:
+                self._invalidas.add(conexao)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager que empresta uma conexão e a devolve ao final do bloco."""
+        conexao = self.acquire(timeout)
+        try:
+            yield conexao
+        except _backend.Error as e:
+            if _erro_de_conexao(e):
+                self.invalidate(conexao)
+            raise
+        finally:
+            self.release(conexao)
+
+    def close(self):
+        """Fecha as conexões livres; as emprestadas são fechadas quando forem devolvidas."""
+        with self._cond:
+            self._fechado = True
+            livres = [c for c, _ in self._livres]
+            self._livres.clear()
+            self._total -= len(livres)
+            self._cond.notify_all()
+        for conexao in livres:
+            self._descartar(conexao)
+
+
+def _erro_de_conexao(erro):
+    """Indica se o erro do banco significa que a sessão com o servidor foi perdida."""
+    return _backend.is_connection_error(erro)
+
+def criar_pool(min_size=POOL_MIN, max_size=POOL_MAX, timeout=POOL_TIMEOUT):
+    """
+    Cria o pool de conexões da aplicação.
+
+    Returns:
+        ConnectionPool or None: O pool criado, ou None se as conexões iniciais falharem.
+    """
+    logging.info(f"Criando pool de conexões (min={min_size}, max={max_size}) para {_backend.descricao()}")
+    try:
+        pool = ConnectionPool(min_size=min_size, max_size=max_size, timeout=timeout)
+        logging.info("Pool de conexões criado com sucesso!")
+        return pool
+    except _backend.Error as ex:
+        logging.error(f"Erro ao criar o pool de conexões: {ex}")
+        return None
+
+def fechar_pool(pool):
+    """Fecha o pool de conexões, se existir."""
+    if pool:
+        pool.close()
+        logging.info("Pool de conexões fechado.")
+
+@contextmanager
+def _usar_conexao(conn):
+    """
+    Resolve o argumento `conn` das funções de consulta: se for um ConnectionPool,
+    empresta uma conexão durante o bloco; se for uma conexão, usa-a diretamente.
+    """
+    if isinstance(conn, ConnectionPool):
+        with conn.connection() as conexao:
+            yield conexao
+    else:
+        yield conn
+
+def _tratar_erro_conexao(conn, conexao, erro):
+    """Se o erro indica sessão perdida, garante que a conexão não volte ao pool."""
+    if isinstance(conn, ConnectionPool) and _erro_de_conexao(erro):
+        conn.invalidate(conexao)
+
+# ------------------- MÉTRICAS DE CONSULTAS ----------------------
+# Toda chamada deste módulo é cronometrada por fase (execute, fetch, commit). Os tempos são
+# agregados por comando normalizado (literais viram '?', espaços são colapsados), em
+# histogramas de faixas fixas, e comandos acima de SLOW_QUERY_MS vão para o logger 'db_connection.lentas'.
+
+FAIXAS_HISTOGRAMA_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_log_consultas_lentas = logging.getLogger('db_connection.lentas')
+_metricas = {}
+_metricas_lock = threading.Lock()
+
+@lru_cache(maxsize=2048)
+def normalizar_sql(sql):
+    """
+    Reduz um comando SQL à sua "forma": literais de texto e números viram '?',
+    listas IN (?, ?, ...) e VALUES (...), (...) repetidos são colapsados e espaços são unificados.
+    Comandos que diferem apenas nos valores caem na mesma entrada das métricas.
+    """
+    forma = re.sub(r"N?'(?:[^']|'')*'", '?', sql)
+    forma = re.sub(r'(?<![\w@#])-?\d+(?:\.\d+)?\b', '?', forma)
+    forma = re.sub(r'\s+', ' ', forma).strip().rstrip(';')
+    forma = re.sub(r'\(\s*\?(?:\s*,\s*\?)+\s*\)', '(?, ...)', forma)
+    forma = re.sub(r'(\(\?, \.\.\.\))(?:\s*,\s*\(\?, \.\.\.\))+', r'\1, ...', forma)
+    return forma
+
+def _redigir_parametros(params):
+    """Descreve os parâmetros sem expor valores (ex: CPF, senha): apenas tipo e tamanho."""
+    if not params:
+        return '()'
+    descricoes = []
+    for valor in params:
+        if valor is None:
+            descricoes.append('NULL')
+        elif isinstance(valor, (str, bytes)):
+            descricoes.append(f"<{type(valor).__name__}:{len(valor)}>")
+        else:
+            descricoes.append(f"<{type(valor).__name__}>")
+    return '(' + ', '.join(descricoes) + ')'
+
+
+class EstatisticaConsulta:
+    """Tempos acumulados de um comando normalizado."""
+
+    __slots__ = ('sql', 'chamadas', 'erros', 'linhas', 'total_ms', 'max_ms', 'fases_ms', 'histograma')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.chamadas = 0
+        self.erros = 0
+        self.linhas = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.fases_ms = {'execute': 0.0, 'fetch': 0.0, 'commit': 0.0}
+        self.histograma = [0] * (len(FAIXAS_HISTOGRAMA_MS) + 1) # Última faixa: acima do maior limite
+
+    def registrar(self, fases_ms, total_ms, linhas, erro):
+        self.chamadas += 1
+        self.erros += erro
+        self.linhas += linhas
+        self.total_ms += total_ms
+        self.max_ms = max(self.max_ms, total_ms)
+        for fase, ms in fases_ms.items():
+            self.fases_ms[fase] = self.fases_ms.get(fase, 0.0) + ms
+        self.histograma[bisect_left(FAIXAS_HISTOGRAMA_MS, total_ms)] += 1
+
+    def percentil(self, p):
+        """Estimativa do percentil `p` (0-100) pelo limite superior da faixa do histograma."""
+        alvo = self.chamadas * p / 100
+        acumulado = 0
+        for indice, quantidade in enumerate(self.histograma):
+            acumulado += quantidade
+            if quantidade and acumulado >= alvo:
+                return FAIXAS_HISTOGRAMA_MS[indice] if indice < len(FAIXAS_HISTOGRAMA_MS) else self.max_ms
+        return 0.0
+
+    @property
+    def media_ms(self):
+        return self.total_ms / self.chamadas if self.chamadas else 0.0
+
+
+class _Medicao:
+    """Cronômetro de uma chamada: acumula o tempo de cada fase e registra tudo ao finalizar."""
+
+    __slots__ = ('sql', 'params', 'fases_ms', 'linhas', 'erro')
+
+    def __init__(self, sql, params=None):
+        self.sql = sql
+        self.params = params
+        self.fases_ms = {}
+        self.linhas = 0
+        self.erro = False
+
+    @contextmanager
+    def fase(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases_ms[nome] = self.fases_ms.get(nome, 0.0) + (time.perf_counter() - inicio) * 1000
+
+    def finalizar(self):
+        if not self.fases_ms:
+            return # Não chegou a falar com o banco (ex: pool esgotado)
+        total_ms = sum(self.fases_ms.values())
+        forma = normalizar_sql(self.sql)
+        with _metricas_lock:
+            estatistica = _metricas.get(forma)
+            if estatistica is None:
+                estatistica = _metricas[forma] = EstatisticaConsulta(forma)
+            estatistica.registrar(self.fases_ms, total_ms, self.linhas, self.erro)
+        if total_ms >= SLOW_QUERY_MS:
+            fases = ', '.join(f"{fase}={ms:.1f}ms" for fase, ms in self.fases_ms.items())
+            _log_consultas_lentas.warning(
+                f"Consulta lenta ({total_ms:.1f} ms; {fases}; linhas={self.linhas}): "
+                f"{forma[:300]} | params={_redigir_parametros(self.params)}"
+            )
+
+def obter_metricas(top_n=None, ordenar_por='total_ms'):
+    """
+    Retorna as estatísticas por comando normalizado, da mais cara para a mais barata.
+
+    Args:
+        top_n (int, optional): Quantidade máxima de comandos retornados. Defaults to None (todos).
+        ordenar_por (str): Atributo de EstatisticaConsulta usado na ordenação ('total_ms', 'max_ms', 'chamadas', ...).
+
+    Returns:
+        list: Lista de EstatisticaConsulta.
+    """
+    with _metricas_lock:
+        estatisticas = list(_metricas.values())
+    estatisticas.sort(key=lambda e: getattr(e, ordenar_por), reverse=True)
+    return estatisticas[:top_n] if top_n else estatisticas
+
+def resetar_metricas():
+    """Descarta todas as métricas acumuladas."""
+    with _metricas_lock:
+        _metricas.clear()
+
+def imprimir_metricas(top_n=10, ordenar_por='total_ms'):
+    """Imprime os `top_n` comandos com maior tempo total, com tempos por fase e percentis."""
+    estatisticas = obter_metricas(top_n, ordenar_por)
+    print(f"\n--- Top {top_n} Comandos SQL por Tempo Total (limite de consulta lenta: {SLOW_QUERY_MS:.0f} ms) ---")
+    if not estatisticas:
+        print("Nenhuma consulta registrada ainda.")
+        return
+    print(f"{'Chamadas':<9}{'Erros':<6}{'Total(ms)':<11}{'Média':<9}{'p95':<8}{'Máx':<9}{'Exec':<10}{'Fetch':<10}{'Commit':<10}SQL")
+    print("-" * 130)
+    for e in estatisticas:
+        print(f"{e.chamadas:<9}{e.erros:<6}{e.total_ms:<11.1f}{e.media_ms:<9.1f}{e.percentil(95):<8.0f}{e.max_ms:<9.1f}"
+              f"{e.fases_ms['execute']:<10.1f}{e.fases_ms['fetch']:<10.1f}{e.fases_ms['commit']:<10.1f}{e.sql[:120]}")
+    cache = estatisticas_cache_comandos()
+    print(f"\nCache de comandos: {cache['acertos']} acertos, {cache['faltas']} faltas "
+          f"(taxa {cache['taxa_acerto']:.0%}), {cache['despejos']} despejos, "
+          f"{cache['cursores_em_cache']} cursores em {cache['conexoes']} conexão(ões).")
+
+# ------------------- CACHE DE COMANDOS ----------------------
+# Cada conexão guarda um cursor por texto SQL (LRU). Reexecutar o mesmo texto no mesmo cursor
+# permite ao pyodbc reaproveitar o comando já preparado (SQLPrepare só na primeira vez) e
+# poupa a criação de um cursor novo a cada chamada. Só são guardados cursores cujos resultados
+# são lidos até o fim (execute_query), para não deixar a conexão ocupada com resultados pendentes.
+
+class CacheComandos:
+    """Cursores de uma conexão, indexados pelo texto SQL, com descarte do menos usado (LRU)."""
+
+    def __init__(self, conexao, tamanho=STATEMENT_CACHE_SIZE):
+        self.conexao = conexao
+        self.tamanho = tamanho
+        self._cursores = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+        self.despejos = 0
+
+    def cursor(self, sql):
+        """Retorna o cursor associado a `sql`, criando (e despejando o mais antigo) se necessário."""
+        cursor = self._cursores.get(sql)
+        if cursor is not None:
+            self._cursores.move_to_end(sql)
+            self.acertos += 1
+            return cursor
+        self.faltas += 1
+        cursor = self.conexao.cursor()
+        if self.tamanho > 0:
+            self._cursores[sql] = cursor
+            if len(self._cursores) > self.tamanho:
+                _, antigo = self._cursores.popitem(last=False)
+                self.despejos += 1
+                self._fechar_cursor(antigo)
+        return cursor
+
+    def liberar(self, sql, cursor):
+        """Devolve o cursor após o uso: fica no cache se estiver nele, senão é fechado."""
+        if self._cursores.get(sql) is not cursor:
+            self._fechar_cursor(cursor)
+
+    def descartar(self, sql, cursor):
+        """Remove e fecha o cursor de `sql` (usado após erro, quando seu estado é incerto)."""
+        if self._cursores.get(sql) is cursor:
+            del self._cursores[sql]
+        self._fechar_cursor(cursor)
+
+    def fechar(self):
+        for cursor in self._cursores.values():
+            self._fechar_cursor(cursor)
+        self._cursores.clear()
+
+    @staticmethod
+    def _fechar_cursor(cursor):
+        try:
+            cursor.close()
+        except _backend.Error:
+            pass
+
+    def __len__(self):
+        return len(self._cursores)
+
+
+# A chave é a própria conexão, não id(conexão): a entrada mantém a conexão viva, então outra conexão
+# não pode herdar os cursores de uma já coletada por reuso do id. (WeakKeyDictionary não serve:
+# conexões do sqlite3 e do pyodbc não aceitam referências fracas.) A entrada sai em _fechar_cache_comandos.
+_caches_comandos = {} # conexão -> CacheComandos
+_caches_lock = threading.Lock()
+_caches_encerrados = {'acertos': 0, 'faltas': 0, 'despejos': 0} # Contadores de caches de conexões já fechadas
+
+def _cache_comandos(conexao):
+    """Retorna o cache de comandos da conexão (a conexão está emprestada só para quem chama)."""
+    with _caches_lock:
+        cache = _caches_comandos.get(conexao)
+        if cache is None:
+            cache = _caches_comandos[conexao] = CacheComandos(conexao)
+    return cache
+
+def _fechar_cache_comandos(conexao):
+    """Fecha os cursores em cache de uma conexão que está sendo fechada."""
+    with _caches_lock:
+        cache = _caches_comandos.pop(conexao, None)
+        if cache is not None:
+            for contador in _caches_encerrados:
+                _caches_encerrados[contador] += getattr(cache, contador)
+    if cache is not None:
+        cache.fechar()
+
+def estatisticas_cache_comandos():
+    """
+    Retorna os contadores do cache de comandos somados entre todas as conexões.
+
+    Returns:
+        dict: acertos, faltas, despejos, taxa_acerto (0-1), cursores_em_cache e conexoes.
+    """
+    with _caches_lock:
+        caches = list(_caches_comandos.values())
+        totais = dict(_caches_encerrados)
+    for cache in caches:
+        for contador in totais:
+            totais[contador] += getattr(cache, contador)
+    consultas = totais['acertos'] + totais['faltas']
+    totais['taxa_acerto'] = totais['acertos'] / consultas if consultas else 0.0
+    totais['cursores_em_cache'] = sum(len(cache) for cache in caches)
+    totais['conexoes'] = len(caches)
+    return totais
+
 def execute_query(conn, sql, params=None, fetch_results=False):
     """
     Executa uma consulta SQL (INSERT, UPDATE, DELETE) ou SELECT opcionalmente.
 
     Args:
-        conn: Objeto de conexão pyodbc.
+        conn: Objeto de conexão do banco ou ConnectionPool (uma conexão é emprestada durante a chamada).
         sql (str): A string da consulta SQL.
         params (tuple, optional): Parâmetros para a consulta, para prevenir SQL Injection. Defaults to None.
         fetch_results (bool): Se True, retorna os resultados da consulta (para SELECT). Defaults to False.
@@ -64,77 +1015,612 @@ def execute_query(conn, sql, params=None, fetch_results=False):
         logging.error("Conexão com o banco de dados não está ativa.")
         return None
 
+    medicao = _Medicao(sql, params)
     try:
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(sql, params)
-        else:
-            cursor.execute(sql)
+        with _usar_conexao(conn) as conexao:
+            cache = _cache_comandos(conexao)
+            cursor = None
+            try:
+                cursor = cache.cursor(sql)
+                with medicao.fase('execute'):
+                    _executar(cursor, sql, params)
 
-        if fetch_results:
-            results = cursor.fetchall()
-            return results
-        else:
-            conn.commit() # Confirma as alterações para INSERT, UPDATE, DELETE
-            logging.info(f"Consulta executada com sucesso: {sql[:100]}...")
-            return True
-    except pyodbc.Error as e:
-        conn.rollback() # Reverte as alterações em caso de erro
-        logging.error(f"Erro ao executar a consulta SQL: {e}")
+                if fetch_results:
+                    with medicao.fase('fetch'):
+                        results = cursor.fetchall()
+                    medicao.linhas = len(results)
+                    return results
+                else:
+                    medicao.linhas = max(cursor.rowcount, 0)
+                    if cursor.description is not None: # Resultado não lido: não guarda o cursor ocupado
+                        cache.descartar(sql, cursor)
+                        cursor = None
+                    with medicao.fase('commit'):
+                        conexao.commit() # Confirma as alterações para INSERT, UPDATE, DELETE
+                    logging.info(f"Consulta executada com sucesso: {sql[:100]}...")
+                    return True
+            except _backend.Error as e:
+                medicao.erro = True
+                if cursor:
+                    cache.descartar(sql, cursor)
+                    cursor = None
+                _tratar_erro_conexao(conn, conexao, e)
+                try:
+                    conexao.rollback() # Reverte as alterações em caso de erro
+                except _backend.Error:
+                    pass
+                logging.error(f"Erro ao executar a consulta SQL: {e}")
+                return None
+            finally:
+                if cursor:
+                    cache.liberar(sql, cursor)
+                medicao.finalizar()
+    except (_backend.Error, PoolEsgotadoError) as e:
+        logging.error(f"Não foi possível obter uma conexão do pool: {e}")
         return None
-    finally:
-        if cursor:
-            cursor.close()
 
 def execute_insert_and_get_last_id(conn, insert_sql, params=None):
     """
-    Executa uma consulta INSERT e retorna o ID da última linha inserida
-    usando @@IDENTITY na mesma transação/escopo.
-    
+    Executa uma consulta INSERT e retorna o ID gerado, em uma única ida ao servidor
+    (no SQL Server, o INSERT e o SELECT SCOPE_IDENTITY() são enviados no mesmo lote).
+
     Args:
-        conn: Objeto de conexão pyodbc.
-        insert_sql (str): A string da consulta INSERT.
+        conn: Objeto de conexão do banco ou ConnectionPool (uma conexão é emprestada durante a chamada).
+        insert_sql (str): A string da consulta INSERT (uma única linha).
         params (tuple, optional): Parâmetros para a consulta. Defaults to None.
 
     Returns:
-        int or None: O ID da última linha inserida se bem-sucedido, caso contrário None.
+        int or None: O ID da linha inserida se bem-sucedido, caso contrário None.
     """
     if not conn:
         logging.error("Conexão com o banco de dados não está ativa para inserir e obter ID.")
         return None
 
+    medicao = _Medicao(insert_sql, params)
     try:
-        cursor = conn.cursor()
-        
-        # 1. Executa o INSERT
-        if params:
-            cursor.execute(insert_sql, params)
-        else:
-            cursor.execute(insert_sql)
-        
-        # 2. Imediatamente após o INSERT, executa o SELECT @@IDENTITY
-        # @@IDENTITY retorna o último valor de identidade gerado na sessão atual em qualquer tabela.
-        cursor.execute("SELECT @@IDENTITY;")
-        
-        # 3. Pega o resultado
-        result = cursor.fetchone() 
-        
-        new_id = None
-        if result and result[0] is not None:
-            new_id = int(result[0])
-            conn.commit() # Comita a transação APENAS se o ID foi recuperado com sucesso
-            logging.info(f"INSERT bem-sucedido e ID gerado (@@IDENTITY): {new_id}")
-            return new_id
-        else:
-            conn.rollback() # Reverte se não conseguiu o ID (indicando problema no INSERT ou recuperação)
-            logging.warning("INSERT bem-sucedido, mas @@IDENTITY retornou NULL ou não foi possível recuperar. Revertendo transação.")
-            return None
-    except pyodbc.Error as e:
-        conn.rollback() # Reverte em caso de erro
-        logging.error(f"Erro ao executar INSERT e obter ID: {e}")
+        with _usar_conexao(conn) as conexao:
+            cursor = None
+            try:
+                cursor = conexao.cursor()
+                with medicao.fase('execute'):
+                    new_id = _backend.insert_and_get_id(cursor, insert_sql, params)
+                if new_id is not None:
+                    medicao.linhas = 1
+                    with medicao.fase('commit'):
+                        conexao.commit() # Comita a transação APENAS se o ID foi recuperado com sucesso
+                    logging.info(f"INSERT bem-sucedido e ID gerado (SCOPE_IDENTITY): {new_id}")
+                    return new_id
+                else:
+                    conexao.rollback() # Reverte se não conseguiu o ID (indicando problema no INSERT ou recuperação)
+                    logging.warning("INSERT executado, mas SCOPE_IDENTITY() retornou NULL. Revertendo transação.")
+                    return None
+            except _backend.Error as e:
+                medicao.erro = True
+                _tratar_erro_conexao(conn, conexao, e)
+                try:
+                    conexao.rollback() # Reverte em caso de erro
+                except _backend.Error:
+                    pass
+                logging.error(f"Erro ao executar INSERT e obter ID: {e}")
+                return None
+            finally:
+                if cursor:
+                    cursor.close()
+                medicao.finalizar()
+    except (_backend.Error, PoolEsgotadoError) as e:
+        logging.error(f"Não foi possível obter uma conexão do pool: {e}")
         return None
-    finally:
-        if cursor:
+
+STREAM_ARRAYSIZE = int(os.getenv('DB_STREAM_ARRAYSIZE', '500'))
+
+def stream_query(conn, sql, params=None, arraysize=STREAM_ARRAYSIZE):
+    """
+    Executa um SELECT e entrega as linhas aos poucos, em blocos de `fetchmany(arraysize)`,
+    em vez de carregar todo o resultado na memória com fetchall().
+
+    O cursor (e, se `conn` for um pool, a conexão emprestada) fica aberto apenas
+    enquanto o gerador é consumido, e é fechado ao final da iteração, em caso de
+    erro ou quando o gerador é descartado antes do fim.
+
+    Ao contrário de execute_query, erros não viram um resultado vazio: uma listagem que
+    falha no meio não pode parecer uma listagem que terminou.
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        sql (str): A consulta SELECT.
+        params (tuple, optional): Parâmetros para a consulta. Defaults to None.
+        arraysize (int): Quantidade de linhas buscadas por ida ao servidor. Defaults to STREAM_ARRAYSIZE.
+
+    Yields:
+        Cada linha do resultado.
+
+    Raises:
+        ValueError: Se `conn` não for uma conexão ativa.
+        PoolEsgotadoError: Se nenhuma conexão do pool ficar livre.
+        Erro do backend: Se a consulta ou a leitura das linhas falhar (já registrado no log).
+    """
+    if not conn:
+        raise ValueError("Conexão com o banco de dados não está ativa.")
+
+    medicao = _Medicao(sql, params)
+    with _usar_conexao(conn) as conexao:
+        cursor = None
+        try:
+            cursor = conexao.cursor()
+            cursor.arraysize = arraysize
+            with medicao.fase('execute'):
+                _executar(cursor, sql, params)
+
+            while True:
+                with medicao.fase('fetch'): # Só o tempo no banco; o consumo das linhas não entra
+                    rows = cursor.fetchmany(arraysize)
+                if not rows:
+                    break
+                medicao.linhas += len(rows)
+                yield from rows
+        except _backend.Error as e:
+            medicao.erro = True
+            _tratar_erro_conexao(conn, conexao, e)
+            logging.error(f"Erro ao executar a consulta SQL em streaming: {e}")
+            raise
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except _backend.Error:
+                    pass
+            medicao.finalizar()
+
+def fetch_keyset_page(conn, sql, order_by, page_size, filters=(), params=(), anchor=None, backward=False):
+    """
+    Busca uma página de um SELECT por keyset (seek method): em vez de OFFSET, a página seguinte
+    começa logo depois das chaves da última linha exibida (WHERE chave > ?), o que o banco resolve
+    com um seek no índice da ordenação, em qualquer profundidade da lista.
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        sql (str): SELECT ... FROM ... JOIN ..., sem WHERE nem ORDER BY.
+        order_by (list): Chaves da ordenação como (expressão, posição no SELECT, descendente), com um
+                         quarto elemento opcional para o marcador do parâmetro (padrão '?'; ex:
+                         'CAST(? AS DATETIME)'). A combinação das chaves deve ser única (termine pela PK).
+        page_size (int): Linhas por página.
+        filters (list): Condições adicionais (combinadas com AND), com '?' para os valores.
+        params (tuple): Valores dos '?' de `filters`, na ordem.
+        anchor (tuple): Linha de referência: a última da página atual (próxima página) ou a primeira
+                        (página anterior, com `backward`). None = primeira página.
+        backward (bool): Se True, busca a página anterior à âncora.
+
+    Returns:
+        tuple or None: (linhas na ordem de exibição, há mais linhas na direção buscada), ou None em caso de erro.
+    """
+    condicoes, valores = list(filters), list(params)
+    if anchor is not None:
+        chaves = [(expressao, anchor[posicao], descendente != backward, resto[0] if resto else '?')
+                  for expressao, posicao, descendente, *resto in order_by]
+        # Primeira chave sozinha (>= / <=) para o seek; depois o desempate exato pelas demais chaves.
+        expressao, valor, decrescente, marcador = chaves[0]
+        condicoes.append(f"{expressao} {'<=' if decrescente else '>='} {marcador}")
+        valores.append(valor)
+        alternativas = []
+        for i, (expressao, valor, decrescente, marcador) in enumerate(chaves):
+            iguais = [f"{e} = {m}" for e, _, _, m in chaves[:i]]
+            alternativas.append("(" + " AND ".join(iguais + [f"{expressao} {'<' if decrescente else '>'} {marcador}"]) + ")")
+            valores.extend([v for _, v, _, _ in chaves[:i]] + [valor])
+        condicoes.append("(" + " OR ".join(alternativas) + ")")
+    ordem = ", ".join(f"{expressao} {'DESC' if descendente != backward else 'ASC'}" for expressao, _, descendente, *_ in order_by)
+    sql_pagina = sql.strip().rstrip(';')
+    if condicoes:
+        sql_pagina += "\nWHERE " + " AND ".join(f"({c})" for c in condicoes)
+    sql_pagina += f"\nORDER BY {ordem}\nOFFSET 0 ROWS FETCH NEXT ? ROWS ONLY;"
+    linhas = execute_query(conn, sql_pagina, tuple(valores) + (page_size + 1,), fetch_results=True)
+    if linhas is None:
+        return None
+    mais = len(linhas) > page_size
+    linhas = list(linhas[:page_size])
+    if backward:
+        linhas.reverse()
+    return linhas, mais
+
+def execute_insert_many_and_get_ids(conn, table, columns, rows, id_column):
+    """
+    Insere várias linhas e retorna os IDs gerados, usando INSERT multi-linhas com
+    OUTPUT INSERTED (RETURNING no SQLite): uma ida ao servidor por bloco de até
+    1000 linhas e um único commit ao final (tudo ou nada).
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        table (str): Nome da tabela de destino.
+        columns (list): Nomes das colunas inseridas, na ordem dos valores de cada linha.
+        rows (list): Lista de tuplas com os valores de cada linha.
+        id_column (str): Coluna IDENTITY cujo valor gerado deve ser retornado.
+
+    Returns:
+        list or None: IDs gerados em ordem crescente (a mesma ordem de geração), ou None em caso de erro.
+    """
+    if not conn:
+        logging.error("Conexão com o banco de dados não está ativa para inserir e obter IDs.")
+        return None
+    rows = list(rows)
+    if not rows:
+        return []
+
+    linhas_por_bloco = max(1, min(_backend.max_linhas_por_values, _backend.max_parametros_por_comando // len(columns)))
+    medicao = _Medicao(f"INSERT INTO {table} ({', '.join(columns)}) VALUES (...) -- múltiplas linhas")
+    try:
+        with _usar_conexao(conn) as conexao:
+            cursor = None
+            try:
+                cursor = conexao.cursor()
+                new_ids = []
+                for inicio in range(0, len(rows), linhas_por_bloco):
+                    bloco = rows[inicio:inicio + linhas_por_bloco]
+                    with medicao.fase('execute'):
+                        new_ids.extend(_backend.insert_many_and_get_ids(cursor, table, columns, bloco, id_column))
+                medicao.linhas = len(new_ids)
+
+                if len(new_ids) != len(rows):
+                    conexao.rollback()
+                    logging.warning(f"INSERT múltiplo em {table} retornou {len(new_ids)} IDs para {len(rows)} linhas. Revertendo transação.")
+                    return None
+                with medicao.fase('commit'):
+                    conexao.commit()
+                logging.info(f"INSERT múltiplo em {table} bem-sucedido: {len(new_ids)} linha(s).")
+                return new_ids
+            except _backend.Error as e:
+                medicao.erro = True
+                _tratar_erro_conexao(conn, conexao, e)
+                try:
+                    conexao.rollback()
+                except _backend.Error:
+                    pass
+                logging.error(f"Erro ao executar INSERT múltiplo em {table}: {e}")
+                return None
+            finally:
+                if cursor:
+                    cursor.close()
+                medicao.finalizar()
+    except (_backend.Error, PoolEsgotadoError) as e:
+        logging.error(f"Não foi possível obter uma conexão do pool: {e}")
+        return None
+
+def execute_many(conn, sql, rows, chunk_size=500):
+    """
+    Executa o mesmo comando (INSERT/UPDATE/DELETE) para várias linhas usando
+    executemany (com `fast_executemany` do pyodbc no SQL Server): cada bloco de `chunk_size` linhas vai ao servidor
+    em uma única ida e recebe um único commit.
+
+    Se um bloco falhar, ele é revertido e suas linhas são reexecutadas uma a uma,
+    para que as válidas sejam gravadas e as inválidas reportadas individualmente.
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        sql (str): Comando parametrizado a ser executado para cada linha.
+        rows (iterable): Tuplas de parâmetros, uma por linha.
+        chunk_size (int): Quantidade de linhas por bloco/commit. Defaults to 500.
+
+    Returns:
+        list or None: Lista de falhas `(indice, linha, mensagem_de_erro)` (vazia se tudo foi gravado),
+                      ou None se não foi possível obter uma conexão.
+    """
+    if not conn:
+        logging.error("Conexão com o banco de dados não está ativa para execução em lote.")
+        return None
+    rows = list(rows)
+    falhas = []
+    if not rows:
+        return falhas
+
+    medicao = _Medicao(sql)
+    try:
+        with _usar_conexao(conn) as conexao:
+            cursor = None
+            confirmadas_ate = 0 # Linhas antes deste índice já foram confirmadas (commit)
+            try:
+                cursor = conexao.cursor()
+                for inicio in range(0, len(rows), chunk_size):
+                    bloco = rows[inicio:inicio + chunk_size]
+                    try:
+                        with medicao.fase('execute'):
+                            _backend.prepare_executemany(cursor, sql) # A cada bloco: a reexecução linha a linha muda os tipos
+                            cursor.executemany(_backend.translate(sql), bloco)
+                        with medicao.fase('commit'):
+                            conexao.commit()
+                        confirmadas_ate = inicio + len(bloco)
+                        continue
+                    except _backend.Error as e:
+                        if _erro_de_conexao(e):
+                            raise
+                        conexao.rollback()
+                        logging.warning(f"Bloco de {len(bloco)} linha(s) falhou ({e}). Reexecutando linha a linha.")
+
+                    for deslocamento, linha in enumerate(bloco):
+                        try:
+                            with medicao.fase('execute'):
+                                _executar(cursor, sql, linha)
+                        except _backend.Error as e:
+                            if _erro_de_conexao(e):
+                                raise
+                            falhas.append((inicio + deslocamento, linha, str(e)))
+                    with medicao.fase('commit'):
+                        conexao.commit()
+                    confirmadas_ate = inicio + len(bloco)
+
+                medicao.linhas = len(rows) - len(falhas)
+                medicao.erro = bool(falhas)
+                logging.info(f"Execução em lote concluída: {len(rows) - len(falhas)} de {len(rows)} linha(s) gravadas: {sql[:100]}...")
+                return falhas
+            except _backend.Error as e:
+                medicao.erro = True
+                _tratar_erro_conexao(conn, conexao, e)
+                try:
+                    conexao.rollback()
+                except _backend.Error:
+                    pass
+                logging.error(f"Erro ao executar comando em lote: {e}")
+                # Blocos já confirmados permanecem gravados; o restante é reportado como falha.
+                falhas = [f for f in falhas if f[0] < confirmadas_ate]
+                falhas.extend((i, rows[i], str(e)) for i in range(confirmadas_ate, len(rows)))
+                return falhas
+            finally:
+                if cursor:
+                    cursor.close()
+                medicao.finalizar()
+    except (_backend.Error, PoolEsgotadoError) as e:
+        logging.error(f"Não foi possível obter uma conexão do pool: {e}")
+        return None
+
+# ------------------- DEPENDÊNCIAS (FKs) ----------------------
+# O grafo de FKs é lido do catálogo do banco uma vez por backend e fica em memória; a verificação de
+# dependências de uma linha conta todas as tabelas que a referenciam em um único SELECT.
+
+_grafos_dependencias = {} # descrição do backend -> {tabela referenciada: [FKs]}
+_grafos_lock = threading.Lock()
+
+def carregar_dependencias(conn):
+    """
+    Lê (uma vez por backend) as chaves estrangeiras do banco: sys.foreign_keys no SQL Server,
+    pragma_foreign_key_list no SQLite.
+
+    Returns:
+        dict or None: {tabela referenciada (minúsculas): [(tabela, colunas, colunas referenciadas, bloqueia)]},
+                      onde `bloqueia` é False para FKs com ON DELETE CASCADE/SET NULL/SET DEFAULT;
+                      None se o catálogo não pôde ser lido (nada é guardado em cache).
+    """
+    grafo = _grafo_em_cache()
+    if grafo is not None:
+        return grafo
+    linhas = execute_query(conn, _backend.sql_chaves_estrangeiras, fetch_results=True)
+    return None if linhas is None else _guardar_grafo(linhas)
+
+def _grafo_em_cache():
+    with _grafos_lock:
+        return _grafos_dependencias.get((_backend.nome, _backend.descricao()))
+
+def _guardar_grafo(linhas):
+    """Monta o grafo a partir das linhas de `sql_chaves_estrangeiras` e o guarda em cache."""
+    fks = {} # nome da FK -> [tabela, colunas, referenciada, colunas referenciadas, ação]
+    for tabela, coluna, referenciada, coluna_referenciada, acao, nome in linhas:
+        fk = fks.setdefault(nome, [tabela, [], referenciada, [], acao])
+        fk[1].append(coluna)
+        fk[3].append(coluna_referenciada)
+    grafo = {}
+    for tabela, colunas, referenciada, colunas_referenciadas, acao in fks.values():
+        bloqueia = (acao or 'NO ACTION').replace('_', ' ').upper() in ('NO ACTION', 'RESTRICT')
+        grafo.setdefault(referenciada.lower(), []).append((tabela, tuple(colunas), tuple(colunas_referenciadas), bloqueia))
+    with _grafos_lock:
+        _grafos_dependencias[(_backend.nome, _backend.descricao())] = grafo
+    return grafo
+
+def limpar_cache_dependencias():
+    """Descarta o grafo de FKs em cache (ex: depois de aplicar migrações com o processo em execução)."""
+    with _grafos_lock:
+        _grafos_dependencias.clear()
+
+def _consulta_dependencias(grafo, table, key, ignore):
+    """(FKs verificadas, SELECT com um COUNT(*) por FK, parâmetros); o SELECT é None se não há FK a verificar."""
+    valores = {coluna.lower(): valor for coluna, valor in key.items()}
+    ignoradas = {t.lower() for t in ignore}
+    fks, contagens, params = [], [], []
+    for tabela, colunas, colunas_referenciadas, bloqueia in grafo.get(table.lower(), []):
+        if not bloqueia or tabela.lower() in ignoradas:
+            continue
+        if not all(c.lower() in valores for c in colunas_referenciadas):
+            logging.warning(f"FK de {tabela} ({', '.join(colunas)}) não verificada: faltam {', '.join(colunas_referenciadas)} na chave.")
+            continue
+        condicao = " AND ".join(f"{c} = ?" for c in colunas)
+        contagens.append(f"(SELECT COUNT(*) FROM {tabela} WHERE {condicao})")
+        params.extend(valores[c.lower()] for c in colunas_referenciadas)
+        fks.append((tabela, colunas))
+    return fks, ("SELECT " + ", ".join(contagens) if fks else None), tuple(params)
+
+def _com_linhas(fks, contagens):
+    return [(tabela, colunas, quantidade) for (tabela, colunas), quantidade in zip(fks, contagens) if quantidade]
+
+def contar_dependencias(conn, table, key, ignore=()):
+    """
+    Conta, em uma única consulta, as linhas que referenciam uma linha por FK e impediriam o seu DELETE.
+    Dentro de uma transação, use Transaction.contar_dependencias (enxerga o que ela já alterou).
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        table (str): Tabela da linha (ex: 'Pessoa').
+        key (dict): Valores da linha nas colunas referenciadas (ex: {'Codigo_Pessoa': 7}).
+        ignore (iterable): Tabelas que o próprio fluxo de exclusão limpa antes (ex: 'Historico_Status').
+
+    Returns:
+        list or None: [(tabela, colunas, quantidade)] só das FKs com linhas, na ordem do catálogo;
+                      None em caso de erro.
+    """
+    grafo = carregar_dependencias(conn)
+    if grafo is None:
+        return None
+    fks, sql, params = _consulta_dependencias(grafo, table, key, ignore)
+    if sql is None:
+        return []
+    resultado = execute_query(conn, sql, params, fetch_results=True)
+    return None if resultado is None else _com_linhas(fks, resultado[0])
+
+class ConflitoVersaoError(Exception):
+    """O UPDATE otimista não encontrou a linha na versão lida: outra sessão a alterou ou removeu antes."""
+
+
+class Transaction:
+    """
+    Unidade de trabalho aberta por `transaction(conn)`: todos os comandos usam a
+    mesma conexão e o mesmo cursor, e só há um commit, ao final do bloco `with`.
+    """
+
+    def __init__(self, conexao, cursor):
+        self.connection = conexao
+        self.cursor = cursor
+
+    @contextmanager
+    def _medir(self, sql, params):
+        medicao = _Medicao(sql, params)
+        try:
+            yield medicao
+        except _backend.Error:
+            medicao.erro = True
+            raise
+        finally:
+            medicao.finalizar()
+
+    def execute(self, sql, params=None):
+        """Executa um comando (INSERT, UPDATE, DELETE) e retorna o número de linhas afetadas."""
+        with self._medir(sql, params) as medicao:
+            with medicao.fase('execute'):
+                _executar(self.cursor, sql, params)
+            medicao.linhas = max(self.cursor.rowcount, 0)
+        return self.cursor.rowcount
+
+    def fetchone(self, sql, params=None):
+        """Executa um SELECT e retorna a primeira linha (ou None)."""
+        with self._medir(sql, params) as medicao:
+            with medicao.fase('execute'):
+                _executar(self.cursor, sql, params)
+            with medicao.fase('fetch'):
+                linha = self.cursor.fetchone()
+            medicao.linhas = int(linha is not None)
+        return linha
+
+    def fetchall(self, sql, params=None):
+        """Executa um SELECT e retorna todas as linhas."""
+        with self._medir(sql, params) as medicao:
+            with medicao.fase('execute'):
+                _executar(self.cursor, sql, params)
+            with medicao.fase('fetch'):
+                linhas = self.cursor.fetchall()
+            medicao.linhas = len(linhas)
+        return linhas
+
+    def insert_and_get_id(self, insert_sql, params=None):
+        """Executa um INSERT e retorna o ID gerado (SCOPE_IDENTITY) na mesma ida ao servidor."""
+        with self._medir(insert_sql, params) as medicao:
+            with medicao.fase('execute'):
+                new_id = _backend.insert_and_get_id(self.cursor, insert_sql, params)
+            medicao.linhas = int(new_id is not None)
+        return new_id
+
+    def compare_and_swap(self, sql, params):
+        """
+        Executa um UPDATE otimista (`... WHERE <chave> = ? AND Versao_Linha = ?`), com a versão lida
+        antes de o usuário editar os valores.
+
+        Raises:
+            ConflitoVersaoError: Se o UPDATE não alterou exatamente uma linha (0, ou -1 quando o
+                                 driver não informa a contagem). Quem chamou deve deixar a exceção
+                                 sair do bloco `with` (a transação é revertida) e recarregar a linha.
+        """
+        if self.execute(sql, params) != 1:
+            raise ConflitoVersaoError("A linha foi alterada ou removida por outra sessão desde a leitura.")
+
+    def contar_dependencias(self, table, key, ignore=()):
+        """
+        Como a função contar_dependencias, mas na conexão da transação: a contagem já enxerga as
+        linhas que a transação removeu. Erros são lançados (e revertem a transação), em vez de None.
+        """
+        grafo = _grafo_em_cache()
+        if grafo is None:
+            grafo = _guardar_grafo(self.fetchall(_backend.sql_chaves_estrangeiras))
+        fks, sql, params = _consulta_dependencias(grafo, table, key, ignore)
+        return _com_linhas(fks, self.fetchone(sql, params)) if sql else []
+
+    def insert_many_and_get_ids(self, table, columns, rows, id_column):
+        """
+        Como execute_insert_many_and_get_ids (INSERT multi-linhas em blocos), mas sem commit:
+        as linhas entram ou saem junto com a transação. Retorna os IDs gerados em ordem crescente.
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        linhas_por_bloco = max(1, min(_backend.max_linhas_por_values, _backend.max_parametros_por_comando // len(columns)))
+        new_ids = []
+        with self._medir(f"INSERT INTO {table} ({', '.join(columns)}) VALUES (...) -- múltiplas linhas", None) as medicao:
+            with medicao.fase('execute'):
+                for inicio in range(0, len(rows), linhas_por_bloco):
+                    new_ids.extend(_backend.insert_many_and_get_ids(self.cursor, table, columns, rows[inicio:inicio + linhas_por_bloco], id_column))
+            medicao.linhas = len(new_ids)
+        if len(new_ids) != len(rows):
+            raise _backend.Error(f"INSERT múltiplo em {table} retornou {len(new_ids)} IDs para {len(rows)} linhas.")
+        return new_ids
+
+    def executemany(self, sql, rows):
+        """
+        Executa o mesmo comando para várias linhas em uma ida ao servidor (fast_executemany no SQL Server).
+        Diferente de execute_many, não há commit por bloco: as linhas entram ou saem junto com a transação.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self._medir(sql, None) as medicao:
+            with medicao.fase('execute'):
+                _backend.prepare_executemany(self.cursor, sql)
+                self.cursor.executemany(_backend.translate(sql), rows)
+            medicao.linhas = len(rows)
+        return len(rows)
+
+@contextmanager
+def transaction(conn):
+    """
+    Context manager de transação envolvendo vários comandos.
+
+    Uso:
+        with db_connection.transaction(conn) as tx:
+            id_endereco = tx.insert_and_get_id(sql_endereco, params_endereco)
+            tx.execute(sql_pessoa, (..., id_endereco))
+
+    Se o bloco terminar normalmente, é feito um único commit. Qualquer exceção (inclusive
+    KeyboardInterrupt, comum no terminal) provoca rollback de todos os comandos e é relançada
+    para quem chamou: sem isso, uma conexão direta (fora do pool) ficaria com a transação
+    aberta, e o próximo commit nela gravaria os comandos interrompidos.
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool (a mesma conexão é usada durante todo o bloco).
+
+    Yields:
+        Transaction: Objeto para executar os comandos da transação.
+    """
+    if not conn:
+        raise _backend.Error("Conexão com o banco de dados não está ativa.")
+
+    with _usar_conexao(conn) as conexao:
+        cursor = conexao.cursor()
+        try:
+            yield Transaction(conexao, cursor)
+            medicao = _Medicao("COMMIT -- transaction()")
+            with medicao.fase('commit'):
+                conexao.commit()
+            medicao.finalizar()
+        except BaseException as e:
+            if isinstance(e, _backend.Error):
+                _tratar_erro_conexao(conn, conexao, e)
+                logging.error(f"Erro na transação, revertendo: {e}")
+            try:
+                conexao.rollback()
+            except _backend.Error:
+                pass
+            raise
+        finally:
             cursor.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+"""
+Domínios codificados do esquema (migração 0010).
+
+Status de entrega, tipo de produto, tipo e status de veículo, cargo e tipo de usuário são
+gravados como códigos TINYINT, com FK para as tabelas Dominio_* (código + nome). Cada domínio é
+um IntEnum: o membro é o próprio código (vai direto como parâmetro SQL e compara como inteiro) e
+`nome` é o texto exibido ao usuário e guardado na tabela de domínio.
+
+validar() confere, uma vez na inicialização do app, que os enums e as tabelas do banco têm os
+mesmos códigos e nomes.
+
+Uso:
+    status = StatusEntrega(linha[0])                # código lido do banco -> membro
+    print(status.nome)                              # 'Em Processamento'
+    StatusEntrega.por_nome('entregue')              # StatusEntrega.ENTREGUE
+    execute_query(conn, "... WHERE Status_Entrega = ?", (StatusEntrega.ENTREGUE,))
+"""
+import logging
+from enum import IntEnum
+
+import db_connection
+
+class Dominio(IntEnum):
+    """Base dos domínios: membro = código, com o nome de exibição em `nome`."""
+
+    def __new__(cls, codigo, nome):
+        membro = int.__new__(cls, codigo)
+        membro._value_ = codigo
+        membro.nome = nome
+        return membro
+
+    def __str__(self):
+        return self.nome
+
+    @classmethod
+    def por_nome(cls, nome):
+        """Membro pelo nome (sem diferenciar maiúsculas). Levanta ValueError se não existir."""
+        for membro in cls:
+            if membro.nome.lower() == nome.strip().lower():
+                return membro
+        raise ValueError(f"'{nome}' não é um valor de {cls.__name__}.")
+
+    @classmethod
+    def nomes(cls):
+        return [membro.nome for membro in cls]
+
+
+class StatusEntrega(Dominio):
+    EM_PROCESSAMENTO = 1, 'Em Processamento'
+    AGUARDANDO_COLETA = 2, 'Aguardando Coleta'
+    EM_TRANSITO = 3, 'Em Transito'
+    ENTREGUE = 4, 'Entregue'
+    CANCELADO = 5, 'Cancelado'
+    FALHA_NA_ENTREGA = 6, 'Falha na Entrega'
+
+class TipoProduto(Dominio):
+    FRAGIL = 1, 'Fragil'
+    PERECIVEL = 2, 'Perecivel'
+    COMUM = 3, 'Comum'
+
+class TipoVeiculo(Dominio):
+    CARRO = 1, 'Carro'
+    MOTO = 2, 'Moto'
+    VAN = 3, 'Van'
+    CAMINHAO = 4, 'Caminhão'
+
+class StatusVeiculo(Dominio):
+    DISPONIVEL = 1, 'Disponivel'
+    INDISPONIVEL = 2, 'Indisponivel'
+
+class Cargo(Dominio):
+    MOTORISTA = 1, 'Motorista'
+    AUXILIAR_DE_LOGISTICA = 2, 'Auxiliar de Logistica'
+    ATENDENTE = 3, 'Atendente'
+    GERENTE = 4, 'Gerente'
+    ADMIN = 5, 'Admin'
+
+class TipoUsuario(Dominio):
+    CLIENTE = 1, 'Cliente'
+    MOTORISTA = 2, 'Motorista'
+    AUXILIAR_DE_LOGISTICA = 3, 'Auxiliar de Logistica'
+    ATENDENTE = 4, 'Atendente'
+    GERENTE = 5, 'Gerente'
+    ADMIN = 6, 'Admin'
+
+# Cargos que trabalham em uma sede (os demais: motorista tem veículo, admin não tem nenhum)
+CARGOS_DE_SEDE = (Cargo.AUXILIAR_DE_LOGISTICA, Cargo.ATENDENTE, Cargo.GERENTE)
+
+# Domínio -> tabela do banco com os mesmos códigos e nomes
+TABELAS = {
+    StatusEntrega: 'Dominio_Status_Entrega',
+    TipoProduto: 'Dominio_Tipo_Produto',
+    TipoVeiculo: 'Dominio_Tipo_Veiculo',
+    StatusVeiculo: 'Dominio_Status_Veiculo',
+    Cargo: 'Dominio_Cargo',
+    TipoUsuario: 'Dominio_Tipo_Usuario',
+}
+
+def validar(conn):
+    """
+    Compara cada enum com a sua tabela Dominio_* (chamada uma vez, na inicialização).
+
+    Returns:
+        bool: True se todos os códigos e nomes coincidem; as diferenças são registradas no log.
+    """
+    valido = True
+    for dominio, tabela in TABELAS.items():
+        linhas = db_connection.execute_query(conn, f"SELECT Codigo, Nome FROM {tabela} ORDER BY Codigo;", fetch_results=True)
+        if linhas is None:
+            logging.error(f"Não foi possível ler a tabela de domínio {tabela}.")
+            return False
+        no_banco = {int(codigo): nome for codigo, nome in linhas}
+        no_codigo = {int(membro): membro.nome for membro in dominio}
+        if no_banco != no_codigo:
+            logging.error(f"{dominio.__name__} difere de {tabela}: no código {no_codigo}, no banco {no_banco}.")
+            valido = False
+    return valido
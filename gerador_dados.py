@@ -0,0 +1,461 @@
+"""
+Gerador de dados sintéticos para testes de desempenho: popula o esquema com endereços, sedes,
+veículos, pessoas, clientes (PF com CPF válido e PJ com CNPJ válido), funcionários, produtos com
+rastreamento e histórico de status, e carregamentos, em volumes de produção (dezenas de milhões
+de produtos).
+
+Tudo é gravado pelo caminho de carga em lote (INSERT multi-linhas e executemany), em uma
+transação por lote: um lote de produtos entra inteiro (rastreamento, produto, histórico e
+carregamentos) ou não entra. Só os códigos das linhas já geradas ficam em memória, em arrays
+compactos; nomes, documentos e telefones são derivados do número da pessoa quando precisam ser
+copiados para o rastreamento.
+
+Os produtos chegam ao CD em ordem ao longo dos últimos --dias dias antes de --data-final (IDs
+crescentes acompanham as datas, como em produção) e avançam pelos status até essa data: os mais
+antigos estão entregues, os mais novos ainda em processamento. Produtos que saíram para entrega
+são distribuídos em carregamentos do veículo do motorista, sem passar da Carga_Suportada.
+
+A mesma semente com os mesmos parâmetros (inclusive --data-final e --lote) gera os mesmos dados;
+num banco vazio, também os mesmos IDs. Placas, documentos e códigos de rastreamento dependem da
+semente: para acrescentar dados a um banco já gerado, use outra semente.
+
+Uso:
+    python gerador_dados.py [--produtos N] [--clientes N] [--motoristas N] [--sedes N]
+                            [--semente N] [--lote N] [--dias N] [--data-final AAAA-MM-DD]
+"""
+import os
+import sys
+import math
+import time
+import random
+import logging
+import argparse
+import unicodedata
+from array import array
+from datetime import datetime, date, timedelta
+
+import db_connection
+import dominios
+from dominios import StatusEntrega, TipoProduto, TipoVeiculo, StatusVeiculo, Cargo
+
+GERADOR_SEMENTE = int(os.getenv('GERADOR_SEMENTE', '42'))
+GERADOR_LOTE = int(os.getenv('GERADOR_LOTE', '5000')) # linhas por transação
+GERADOR_DIAS = int(os.getenv('GERADOR_DIAS', '365')) # período de chegada dos produtos
+
+# (Cidade, UF, DDD, faixa dos 5 primeiros dígitos do CEP)
+CIDADES = [
+    ('São Paulo', 'SP', 11, (1000, 5999)),
+    ('Campinas', 'SP', 19, (13000, 13139)),
+    ('Rio de Janeiro', 'RJ', 21, (20000, 23799)),
+    ('Belo Horizonte', 'MG', 31, (30000, 31999)),
+    ('Curitiba', 'PR', 41, (80000, 82999)),
+    ('Porto Alegre', 'RS', 51, (90000, 91999)),
+    ('Florianópolis', 'SC', 48, (88000, 88099)),
+    ('Salvador', 'BA', 71, (40000, 42599)),
+    ('Recife', 'PE', 81, (50000, 52999)),
+    ('Fortaleza', 'CE', 85, (60000, 61599)),
+    ('Brasília', 'DF', 61, (70000, 72799)),
+    ('Goiânia', 'GO', 62, (74000, 74899)),
+    ('Manaus', 'AM', 92, (69000, 69099)),
+    ('Belém', 'PA', 91, (66000, 66999)),
+]
+NOMES = ['Ana', 'Maria', 'Juliana', 'Fernanda', 'Beatriz', 'Camila', 'Larissa', 'Patrícia', 'Aline', 'Bruna',
+         'João', 'José', 'Carlos', 'Pedro', 'Lucas', 'Gabriel', 'Rafael', 'Marcos', 'Paulo', 'Felipe',
+         'Mariana', 'Letícia', 'Renata', 'Vanessa', 'Tiago', 'Rodrigo', 'André', 'Bruno', 'Diego', 'Eduardo']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+              'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa',
+              'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques', 'Machado', 'Mendes', 'Freitas']
+RAMOS = ['Comércio', 'Distribuidora', 'Indústria', 'Atacado', 'Importadora', 'Farmácia', 'Papelaria', 'Eletrônicos']
+SUFIXOS_EMPRESA = ['Ltda', 'S.A.', 'ME', 'EIRELI']
+BAIRROS = ['Centro', 'Jardim América', 'Vila Nova', 'Boa Vista', 'Santa Cruz', 'São José', 'Industrial', 'Bela Vista']
+RUAS = ['Rua das Flores', 'Avenida Brasil', 'Rua Sete de Setembro', 'Rua XV de Novembro', 'Avenida Paulista',
+        'Rua Tiradentes', 'Rua Dom Pedro II', 'Avenida Getúlio Vargas', 'Rua São Paulo', 'Rua da Paz']
+
+# (tipo, peso na escolha, faixa de Carga_Suportada em kg)
+TIPOS_VEICULO = [
+    (TipoVeiculo.MOTO, 25, (25, 40)),
+    (TipoVeiculo.CARRO, 30, (300, 500)),
+    (TipoVeiculo.VAN, 35, (1000, 1800)),
+    (TipoVeiculo.CAMINHAO, 10, (5000, 12000)),
+]
+PESO_MAXIMO_PRODUTO = 20.0 # kg: cabe em qualquer veículo
+TIPOS_PRODUTO = [TipoProduto.COMUM, TipoProduto.FRAGIL, TipoProduto.PERECIVEL]
+PESOS_TIPO_PRODUTO = [70, 20, 10]
+FUNCIONARIOS_POR_SEDE = [(Cargo.GERENTE, 'Administrativo', 1), (Cargo.ATENDENTE, 'Atendimento', 2),
+                         (Cargo.AUXILIAR_DE_LOGISTICA, 'Logistica', 4)]
+
+SQL_INSERIR_CLIENTE = "INSERT INTO Cliente (Codigo_Pessoa, Tipo_Cliente, CPF, Data_Nascimento, CNPJ, Nome_Empresa) VALUES (?, ?, ?, ?, ?, ?);"
+SQL_INSERIR_FUNCIONARIO = "INSERT INTO Funcionario (Codigo_Funcionario, CPF, Departamento, Cargo, Placa_Veiculo, ID_Sede) VALUES (?, ?, ?, ?, ?, ?);"
+SQL_INSERIR_VEICULO = "INSERT INTO Veiculo (Placa_Veiculo, Carga_Suportada, Tipo, Status) VALUES (?, ?, ?, ?);"
+SQL_INSERIR_HISTORICO = "INSERT INTO Historico_Status (ID_Produto, Status_Entrega, Data_Evento) VALUES (?, ?, ?);"
+COLUNAS_ENDERECO = ['CEP', 'Estado', 'Cidade', 'Bairro', 'Rua', 'Numero', 'Complemento']
+COLUNAS_PESSOA = ['Nome', 'RG', 'Telefone', 'Email', 'ID_Endereco']
+COLUNAS_RASTREAMENTO = ['Codigo_Rastreamento', 'Nome_Destinatario', 'CPF_Destinatario', 'ID_Endereco', 'Cidade', 'Estado', 'Telefone_Destinatario']
+COLUNAS_PRODUTO = ['Peso', 'Status_Entrega', 'Data_Chegada_CD', 'Data_Prevista_Entrega', 'Tipo_Produto', 'ID_Remetente',
+                   'ID_Destinatario', 'Codigo_Funcionario_Motorista', 'ID_Rastreamento', 'Data_Ultimo_Status',
+                   'Data_Atualizacao']
+
+def digitos_cpf(base):
+    """CPF formatado (000.000.000-00) a partir dos 9 primeiros dígitos, com os dígitos verificadores."""
+    digitos = [int(d) for d in f"{base:09d}"]
+    for tamanho in (9, 10):
+        soma = sum(d * peso for d, peso in zip(digitos, range(tamanho + 1, 1, -1)))
+        digitos.append(0 if soma % 11 < 2 else 11 - soma % 11)
+    texto = ''.join(map(str, digitos))
+    return f"{texto[:3]}.{texto[3:6]}.{texto[6:9]}-{texto[9:]}"
+
+def digitos_cnpj(base, filial=1):
+    """CNPJ formatado (00.000.000/0000-00) a partir da raiz de 8 dígitos e da filial, com os dígitos verificadores."""
+    digitos = [int(d) for d in f"{base:08d}{filial:04d}"]
+    for pesos in ([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]):
+        soma = sum(d * peso for d, peso in zip(digitos, pesos))
+        digitos.append(0 if soma % 11 < 2 else 11 - soma % 11)
+    texto = ''.join(map(str, digitos))
+    return f"{texto[:2]}.{texto[2:5]}.{texto[5:8]}/{texto[8:12]}-{texto[12:]}"
+
+def _sem_acentos(texto):
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+
+def _lotes(total, tamanho):
+    """Intervalos [inicio, fim) de até `tamanho` itens cobrindo 0..total."""
+    for inicio in range(0, total, tamanho):
+        yield inicio, min(inicio + tamanho, total)
+
+class GeradorDados:
+    """
+    Estado de uma geração: o gerador pseudoaleatório da semente e os códigos das linhas já gravadas.
+
+    Cada pessoa tem um número sequencial (clientes primeiro, depois funcionários). Nome, RG,
+    telefone, e-mail e documentos são funções desse número, embaralhado por permutações da semente:
+    podem ser recalculados sem guardá-los, e CPF, CNPJ, RG e telefone não se repetem entre as pessoas geradas.
+    """
+
+    def __init__(self, conn, semente=GERADOR_SEMENTE, tamanho_lote=GERADOR_LOTE, data_final=None, dias=GERADOR_DIAS):
+        self.conn = conn
+        self.semente = semente
+        self.rng = random.Random(semente)
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.fim = datetime.combine(data_final or date.today(), datetime.min.time())
+        self.inicio = self.fim - timedelta(days=max(1, dias))
+        self._multiplicadores = {}
+        self._pessoas = 0
+        # Clientes: código da pessoa, endereço, índice em CIDADES e PJ (1) ou PF (0)
+        self.clientes = array('i')
+        self.enderecos_clientes = array('i')
+        self.cidades_clientes = array('H')
+        self.clientes_pj = array('b')
+        self.sedes = array('i')
+        self.motoristas = [] # (Codigo_Funcionario, Placa_Veiculo, Carga_Suportada)
+        self._ultimo_carregamento = {} # Placa -> última Data_Carregamento gerada
+
+    # --- Atributos derivados do número da pessoa ---
+
+    def _permutar(self, numero, modulo, atributo=''):
+        """Bijeção de [0, modulo) sorteada pela semente (uma por atributo): números distintos dão resultados distintos."""
+        chave = (modulo, atributo)
+        if chave not in self._multiplicadores:
+            escolha = random.Random(f"{self.semente}-{modulo}-{atributo}")
+            multiplicador = escolha.randrange(modulo // 3, modulo)
+            while math.gcd(multiplicador, modulo) != 1:
+                multiplicador += 1
+            self._multiplicadores[chave] = (multiplicador, escolha.randrange(modulo))
+        multiplicador, deslocamento = self._multiplicadores[chave]
+        return (numero * multiplicador + deslocamento) % modulo
+
+    def _nome(self, numero):
+        x = self._permutar(numero, len(NOMES) * len(SOBRENOMES) ** 2)
+        return f"{NOMES[x % len(NOMES)]} {SOBRENOMES[x // len(NOMES) % len(SOBRENOMES)]} {SOBRENOMES[x // len(NOMES) // len(SOBRENOMES)]}"
+
+    def _nome_empresa(self, numero):
+        x = self._permutar(numero, len(SOBRENOMES) * len(RAMOS) * len(SUFIXOS_EMPRESA))
+        return f"{SOBRENOMES[x % len(SOBRENOMES)]} {RAMOS[x // len(SOBRENOMES) % len(RAMOS)]} {SUFIXOS_EMPRESA[x // len(SOBRENOMES) // len(RAMOS)]}"
+
+    def _cpf(self, numero):
+        return digitos_cpf(self._permutar(numero, 10 ** 9))
+
+    def _cnpj(self, numero):
+        return digitos_cnpj(self._permutar(numero, 10 ** 8))
+
+    def _telefone(self, numero, cidade):
+        return f"({CIDADES[cidade][2]}) 9{self._permutar(numero, 10 ** 8, 'telefone'):08d}"
+
+    def _pessoa(self, numero, cidade, pj=False):
+        """Linha de Pessoa (sem o ID_Endereco) da pessoa número `numero`."""
+        nome = self._nome_empresa(numero) if pj else self._nome(numero)
+        email = f"{_sem_acentos(nome.split()[0]).lower()}.{numero}@exemplo.com.br"
+        return [nome, None if pj else f"{self._permutar(numero, 10 ** 9, 'rg'):09d}", self._telefone(numero, cidade), email]
+
+    # --- Linhas sorteadas ---
+
+    def _endereco(self):
+        """Sorteia um endereço: (índice em CIDADES, linha de Endereco)."""
+        cidade = self.rng.randrange(len(CIDADES))
+        nome, uf, _, (cep_min, cep_max) = CIDADES[cidade]
+        cep = f"{self.rng.randint(cep_min, cep_max):05d}-{self.rng.randrange(1000):03d}"
+        complemento = f"Apto {self.rng.randint(1, 300)}" if self.rng.random() < 0.3 else None
+        return cidade, (cep, uf, nome, self.rng.choice(BAIRROS), self.rng.choice(RUAS), str(self.rng.randint(1, 3000)), complemento)
+
+    def _inserir_pessoas(self, tx, quantidade, pj=None):
+        """
+        Grava `quantidade` pessoas, cada uma com o seu endereço.
+
+        Returns:
+            tuple: (números das pessoas, códigos gerados, IDs dos endereços, índices das cidades).
+        """
+        enderecos = [self._endereco() for _ in range(quantidade)]
+        ids_endereco = tx.insert_many_and_get_ids('Endereco', COLUNAS_ENDERECO, [linha for _, linha in enderecos], 'ID_Endereco')
+        numeros = range(self._pessoas, self._pessoas + quantidade)
+        self._pessoas += quantidade
+        linhas = [self._pessoa(numero, cidade, pj[i] if pj else False) + [id_endereco]
+                  for i, (numero, (cidade, _), id_endereco) in enumerate(zip(numeros, enderecos, ids_endereco))]
+        codigos = tx.insert_many_and_get_ids('Pessoa', COLUNAS_PESSOA, linhas, 'Codigo_Pessoa')
+        return numeros, codigos, ids_endereco, [cidade for cidade, _ in enderecos]
+
+    # --- Etapas ---
+
+    def gerar_sedes(self, quantidade):
+        with db_connection.transaction(self.conn) as tx:
+            enderecos = [self._endereco() for _ in range(quantidade)]
+            ids_endereco = tx.insert_many_and_get_ids('Endereco', COLUNAS_ENDERECO, [linha for _, linha in enderecos], 'ID_Endereco')
+            linhas = [(self.rng.randint(1, 3), id_endereco, f"({CIDADES[cidade][2]}) 3{self.rng.randrange(10 ** 7):07d}")
+                      for (cidade, _), id_endereco in zip(enderecos, ids_endereco)]
+            self.sedes.extend(tx.insert_many_and_get_ids('Sede', ['Tipo', 'ID_Endereco', 'Telefone'], linhas, 'ID_Sede'))
+        logging.info(f"{quantidade} sede(s) gerada(s).")
+
+    def gerar_clientes(self, quantidade):
+        """Clientes PF (80%) e PJ (20%), em uma transação por lote."""
+        for inicio, fim in _lotes(quantidade, self.tamanho_lote):
+            pj = [self.rng.random() < 0.2 for _ in range(fim - inicio)]
+            nascimentos = [None if e_pj else (self.fim - timedelta(days=self.rng.randint(18 * 365, 80 * 365))).date() for e_pj in pj]
+            with db_connection.transaction(self.conn) as tx:
+                numeros, codigos, ids_endereco, cidades = self._inserir_pessoas(tx, fim - inicio, pj)
+                tx.executemany(SQL_INSERIR_CLIENTE, [
+                    (codigo, 'PJ', None, None, self._cnpj(numero), self._nome_empresa(numero)) if e_pj
+                    else (codigo, 'PF', self._cpf(numero), nascimento, None, None)
+                    for numero, codigo, e_pj, nascimento in zip(numeros, codigos, pj, nascimentos)
+                ])
+            self.clientes.extend(codigos)
+            self.enderecos_clientes.extend(ids_endereco)
+            self.cidades_clientes.extend(cidades)
+            self.clientes_pj.extend(int(e_pj) for e_pj in pj)
+            logging.info(f"Clientes: {fim} de {quantidade}.")
+
+    def _placa(self, numero):
+        """Placa no padrão Mercosul (AAA0A00), única para cada número."""
+        x = self._permutar(numero, 26 ** 4 * 10 ** 3)
+        letras = [chr(ord('A') + x // 26 ** i % 26) for i in range(4)]
+        digitos = x // 26 ** 4
+        return f"{letras[0]}{letras[1]}{letras[2]}{digitos // 100}{letras[3]}{digitos % 100:02d}"
+
+    def gerar_motoristas(self, quantidade):
+        """Um veículo para cada motorista, mais 10% de reserva sem motorista."""
+        veiculos = []
+        tipos = [tipo for tipo, _, _ in TIPOS_VEICULO]
+        for numero in range(quantidade + max(1, quantidade // 10)):
+            tipo = self.rng.choices(range(len(TIPOS_VEICULO)), weights=[peso for _, peso, _ in TIPOS_VEICULO])[0]
+            carga_min, carga_max = TIPOS_VEICULO[tipo][2]
+            status = StatusVeiculo.DISPONIVEL if self.rng.random() < 0.9 else StatusVeiculo.INDISPONIVEL
+            veiculos.append((self._placa(numero), float(self.rng.randint(carga_min, carga_max)), tipos[tipo], status))
+        for inicio, fim in _lotes(quantidade, self.tamanho_lote):
+            with db_connection.transaction(self.conn) as tx:
+                tx.executemany(SQL_INSERIR_VEICULO, veiculos[inicio:fim] if fim < quantidade else veiculos[inicio:])
+                numeros, codigos, _, _ = self._inserir_pessoas(tx, fim - inicio)
+                tx.executemany(SQL_INSERIR_FUNCIONARIO, [
+                    (codigo, self._cpf(numero), 'Entregas', Cargo.MOTORISTA, placa, None)
+                    for numero, codigo, (placa, _, _, _) in zip(numeros, codigos, veiculos[inicio:fim])
+                ])
+            self.motoristas.extend((codigo, placa, carga) for codigo, (placa, carga, _, _) in zip(codigos, veiculos[inicio:fim]))
+        logging.info(f"{quantidade} motorista(s) e {len(veiculos)} veículo(s) gerados.")
+
+    def gerar_funcionarios_de_sede(self):
+        """Gerente, atendentes e auxiliares de logística para cada sede."""
+        cargos = [(id_sede, cargo, departamento) for id_sede in self.sedes
+                  for cargo, departamento, por_sede in FUNCIONARIOS_POR_SEDE for _ in range(por_sede)]
+        for inicio, fim in _lotes(len(cargos), self.tamanho_lote):
+            with db_connection.transaction(self.conn) as tx:
+                numeros, codigos, _, _ = self._inserir_pessoas(tx, fim - inicio)
+                tx.executemany(SQL_INSERIR_FUNCIONARIO, [
+                    (codigo, self._cpf(numero), departamento, cargo, None, id_sede)
+                    for numero, codigo, (id_sede, cargo, departamento) in zip(numeros, codigos, cargos[inicio:fim])
+                ])
+        logging.info(f"{len(cargos)} funcionário(s) de sede gerados.")
+
+    def _linha_do_tempo(self, chegada):
+        """Eventos (status, data) de um produto que chegou ao CD em `chegada`, até a data final."""
+        horas = lambda minimo, maximo: timedelta(seconds=self.rng.randint(minimo * 3600, maximo * 3600))
+        eventos = [(StatusEntrega.EM_PROCESSAMENTO, chegada)]
+        data = chegada + horas(2, 24)
+        eventos.append((StatusEntrega.AGUARDANDO_COLETA, data))
+        if self.rng.random() < 0.02:
+            eventos.append((StatusEntrega.CANCELADO, data + horas(1, 48)))
+        else:
+            data += horas(4, 48)
+            eventos.append((StatusEntrega.EM_TRANSITO, data))
+            final = StatusEntrega.FALHA_NA_ENTREGA if self.rng.random() < 0.03 else StatusEntrega.ENTREGUE
+            eventos.append((final, data + horas(2, 96)))
+        return [evento for evento in eventos if evento[1] < self.fim]
+
+    def _data_carregamento(self, placa, data):
+        """Data do carregamento, adiantada o necessário para ser única no veículo (UQ_Carregamento_Evento)."""
+        ultima = self._ultimo_carregamento.get(placa)
+        if ultima is not None and data <= ultima:
+            data = ultima + timedelta(seconds=1)
+        self._ultimo_carregamento[placa] = data
+        return data
+
+    def _carregamentos(self, saidas):
+        """
+        Agrupa os produtos que saíram para entrega em carregamentos do veículo de cada motorista,
+        na ordem de saída, sem passar da Carga_Suportada.
+
+        Args:
+            saidas (dict): Índice do motorista -> lista de (data de saída, índice do produto no lote, peso).
+
+        Returns:
+            list: (Placa_Veiculo, Data_Carregamento, índices dos produtos no lote) de cada carregamento.
+        """
+        carregamentos = []
+        for motorista in sorted(saidas):
+            _, placa, carga = self.motoristas[motorista]
+            itens, peso_total = [], 0.0
+            for data, indice, peso in sorted(saidas[motorista]):
+                if itens and peso_total + peso > carga:
+                    carregamentos.append((placa, self._data_carregamento(placa, data_inicio), itens))
+                    itens, peso_total = [], 0.0
+                if not itens:
+                    data_inicio = data
+                itens.append(indice)
+                peso_total += peso
+            if itens:
+                carregamentos.append((placa, self._data_carregamento(placa, data_inicio), itens))
+        return carregamentos
+
+    def gerar_produtos(self, quantidade):
+        """
+        Produtos com rastreamento, histórico de status e carregamentos, em uma transação por lote.
+        Remetente e destinatário são clientes; o rastreamento copia os dados do destinatário.
+        """
+        passo = (self.fim - self.inicio).total_seconds() / max(1, quantidade)
+        total_clientes = len(self.clientes)
+        inicio_execucao = time.perf_counter()
+        for inicio, fim in _lotes(quantidade, self.tamanho_lote):
+            rastreamentos, produtos, eventos, saidas = [], [], [], {}
+            for indice, k in enumerate(range(inicio, fim)):
+                remetente = self.rng.randrange(total_clientes)
+                destinatario = self.rng.randrange(total_clientes - 1)
+                if destinatario >= remetente:
+                    destinatario += 1
+                chegada = self.inicio + timedelta(seconds=int(k * passo) + self.rng.randrange(max(1, int(passo))))
+                linha_do_tempo = self._linha_do_tempo(chegada)
+                peso = min(PESO_MAXIMO_PRODUTO, round(0.1 + self.rng.expovariate(1 / 2.5), 2))
+                tipo = self.rng.choices(TIPOS_PRODUTO, weights=PESOS_TIPO_PRODUTO)[0]
+                motorista = None
+                saida = next((data for status, data in linha_do_tempo if status == StatusEntrega.EM_TRANSITO), None)
+                if saida is not None:
+                    motorista = self.rng.randrange(len(self.motoristas))
+                    saidas.setdefault(motorista, []).append((saida, indice, peso))
+
+                cidade = self.cidades_clientes[destinatario]
+                pj = self.clientes_pj[destinatario]
+                rastreamentos.append((
+                    f"GEN{self.semente}-{k:010d}",
+                    self._nome_empresa(destinatario) if pj else self._nome(destinatario),
+                    None if pj else self._cpf(destinatario),
+                    self.enderecos_clientes[destinatario], CIDADES[cidade][0], CIDADES[cidade][1],
+                    self._telefone(destinatario, cidade),
+                ))
+                status_atual, data_status = linha_do_tempo[-1]
+                produtos.append([
+                    peso, status_atual, chegada.date(), (chegada + timedelta(days=self.rng.randint(3, 10))).date(), tipo,
+                    self.clientes[remetente], self.clientes[destinatario],
+                    self.motoristas[motorista][0] if motorista is not None else None, None, data_status, None,
+                ])
+                eventos.append(linha_do_tempo)
+
+            with db_connection.transaction(self.conn) as tx:
+                ids_rastreamento = tx.insert_many_and_get_ids('Dados_Rastreamento', COLUNAS_RASTREAMENTO, rastreamentos, 'ID_Rastreamento')
+                # Data_Atualizacao é o relógio do banco na gravação, como o GETDATE() do app: é por ela
+                # que a carga analítica (analitico.py) encontra os produtos novos.
+                gravado_em = tx.fetchone("SELECT GETDATE();")[0]
+                for produto, id_rastreamento in zip(produtos, ids_rastreamento):
+                    produto[8], produto[10] = id_rastreamento, gravado_em
+                ids_produto = tx.insert_many_and_get_ids('Produto_A_Ser_Entregue', COLUNAS_PRODUTO, produtos, 'ID_Produto')
+                tx.executemany(SQL_INSERIR_HISTORICO, [(id_produto, status, data)
+                                                       for id_produto, linha_do_tempo in zip(ids_produto, eventos)
+                                                       for status, data in linha_do_tempo])
+                carregamentos = self._carregamentos(saidas)
+                ids_evento = tx.insert_many_and_get_ids('Carregamento_Evento', ['Placa_Veiculo', 'Data_Carregamento'],
+                                                        [(placa, data) for placa, data, _ in carregamentos], 'ID_Carregamento_Evento')
+                # Itens em INSERT multi-linhas: os triggers de totais e capacidade rodam uma vez por bloco, não por item.
+                tx.insert_many_and_get_ids('Carregamento', ['ID_Carregamento_Evento', 'ID_Produto'],
+                                           [(id_evento, ids_produto[indice])
+                                            for id_evento, (_, _, itens) in zip(ids_evento, carregamentos) for indice in itens],
+                                           'ID_Carregamento')
+            decorrido = time.perf_counter() - inicio_execucao
+            logging.info(f"Produtos: {fim} de {quantidade} ({fim / decorrido:.0f}/s).")
+
+    def gerar(self, produtos, clientes, motoristas, sedes):
+        """Gera todas as tabelas, na ordem das dependências."""
+        self.gerar_sedes(sedes)
+        self.gerar_clientes(clientes)
+        self.gerar_motoristas(motoristas)
+        self.gerar_funcionarios_de_sede()
+        self.gerar_produtos(produtos)
+
+def gerar(conn, produtos, clientes=None, motoristas=None, sedes=None, semente=GERADOR_SEMENTE,
+          tamanho_lote=GERADOR_LOTE, data_final=None, dias=GERADOR_DIAS):
+    """
+    Popula o banco com dados sintéticos.
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        produtos (int): Quantidade de produtos (com rastreamento, histórico e carregamentos).
+        clientes (int, optional): Quantidade de clientes (padrão: um para cada 10 produtos).
+        motoristas (int, optional): Quantidade de motoristas, cada um com um veículo (padrão: um para cada 5000 produtos).
+        sedes (int, optional): Quantidade de sedes, cada uma com 7 funcionários (padrão: uma para cada 200 mil produtos).
+        semente (int): Semente do gerador pseudoaleatório.
+        tamanho_lote (int): Linhas por transação.
+        data_final (date, optional): Data até a qual os produtos avançam de status (padrão: hoje).
+        dias (int): Período, antes de `data_final`, em que os produtos chegam ao CD.
+
+    Returns:
+        bool: True se tudo foi gerado. Lotes já confirmados permanecem gravados se um lote falhar.
+    """
+    clientes = max(2, clientes if clientes is not None else produtos // 10)
+    motoristas = max(1, motoristas if motoristas is not None else produtos // 5000)
+    sedes = max(1, sedes if sedes is not None else produtos // 200000)
+    if not dominios.validar(conn):
+        logging.error("Os domínios do código não correspondem às tabelas Dominio_* do banco. Nada foi gerado.")
+        return False
+    gerador = GeradorDados(conn, semente, tamanho_lote, data_final, dias)
+    try:
+        gerador.gerar(produtos, clientes, motoristas, sedes)
+    except db_connection.obter_backend().Error as e:
+        logging.error(f"Falha ao gerar dados (o lote em andamento foi revertido): {e}")
+        return False
+    logging.info(f"Geração concluída: {sedes} sede(s), {clientes} cliente(s), {motoristas} motorista(s), {produtos} produto(s) (semente {semente}).")
+    return True
+
+def main(argumentos):
+    parser = argparse.ArgumentParser(description="Popula o banco com dados sintéticos para testes de desempenho.")
+    parser.add_argument('--produtos', type=int, default=10000, help="quantidade de produtos (padrão: 10000)")
+    parser.add_argument('--clientes', type=int, default=None, help="quantidade de clientes (padrão: produtos / 10)")
+    parser.add_argument('--motoristas', type=int, default=None, help="quantidade de motoristas, com um veículo cada (padrão: produtos / 5000)")
+    parser.add_argument('--sedes', type=int, default=None, help="quantidade de sedes (padrão: produtos / 200000)")
+    parser.add_argument('--semente', type=int, default=GERADOR_SEMENTE, help=f"semente do gerador (padrão: {GERADOR_SEMENTE})")
+    parser.add_argument('--lote', type=int, default=GERADOR_LOTE, help=f"linhas por transação (padrão: {GERADOR_LOTE})")
+    parser.add_argument('--dias', type=int, default=GERADOR_DIAS, help=f"período de chegada dos produtos, em dias (padrão: {GERADOR_DIAS})")
+    parser.add_argument('--data-final', type=date.fromisoformat, default=None, help="data até a qual os produtos avançam de status (padrão: hoje)")
+    opcoes = parser.parse_args(argumentos)
+
+    conexao = db_connection.conectar_banco()
+    if not conexao:
+        return 1
+    try:
+        return 0 if gerar(conexao, opcoes.produtos, opcoes.clientes, opcoes.motoristas, opcoes.sedes,
+                          opcoes.semente, opcoes.lote, opcoes.data_final, opcoes.dias) else 1
+    finally:
+        db_connection.desconectar_banco(conexao)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
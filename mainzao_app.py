@@ -1,11 +1,19 @@
 import sys
 import hashlib
+import functools
 import getpass
 import os
-from datetime import datetime, date
+import re
+from datetime import datetime, date, timedelta
+from decimal import Decimal
 import db_connection # Seu arquivo db_connection.py
+import analitico
+import dominios
+from dominios import StatusEntrega, TipoProduto, TipoVeiculo, StatusVeiculo, Cargo, TipoUsuario
 
 # ------------------- UTILS ----------------------
+LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', '20')) # Linhas por página nas listagens
+PERSON_PICKER_LIMIT = int(os.getenv('PERSON_PICKER_LIMIT', '10')) # Sugestões por busca no seletor de pessoas
 def hash_password(password):
     """Gera o hash SHA256 de uma senha."""
     return hashlib.sha256(password.encode()).hexdigest()
@@ -71,6 +79,7 @@ def get_valid_input(prompt, input_type=str, optional=False, choices=None):
     """
     Solicita uma entrada do usuário, valida o tipo e se é opcional.
     Se `choices` for fornecido, valida se a entrada está na lista de escolhas.
+    Se `input_type` for um domínio (ex: StatusEntrega), aceita o nome e devolve o membro.
     """
     while True:
         user_input = input(prompt).strip()
@@ -87,6 +96,8 @@ def get_valid_input(prompt, input_type=str, optional=False, choices=None):
                 val = float(user_input)
             elif input_type == date:
                 val = datetime.strptime(user_input, '%Y-%m-%d').date()
+            elif isinstance(input_type, type) and issubclass(input_type, dominios.Dominio):
+                val = input_type.por_nome(user_input)
             else: # str
                 val = str(user_input)
 
@@ -102,9 +113,149 @@ def get_valid_input(prompt, input_type=str, optional=False, choices=None):
         except ValueError:
             if input_type == date:
                 print("Formato de data inválido. Use AAAA-MM-DD.")
+            elif isinstance(input_type, type) and issubclass(input_type, dominios.Dominio):
+                print(f"Opção inválida. Escolhas válidas: {', '.join(input_type.nomes())}")
             else:
                 print(f"Entrada inválida. Esperado um {'número inteiro' if input_type == int else 'número decimal' if input_type == float else 'texto'}.")
 
+def get_domain_update(label, domain, current):
+    """
+    Pede o novo valor de um domínio (ex: Cargo) numa tela de atualização, mostrando o atual.
+    Enter mantém o valor atual; um nome inválido também, com aviso.
+    """
+    user_input = input(f"{label} [{current}] ({', '.join(domain.nomes())}): ").strip()
+    if not user_input:
+        return current
+    try:
+        return domain.por_nome(user_input)
+    except ValueError:
+        print(f"{label} inválido. Mantendo anterior.")
+        return current
+
+def get_domain_set(label, domain):
+    """
+    Pede um ou mais valores de um domínio separados por vírgula (ex: filtro de status).
+    Enter devolve a lista vazia (sem filtro); um nome inválido pede de novo.
+    """
+    while True:
+        user_input = input(f"{label} ({', '.join(domain.nomes())}; separe por vírgula, Enter para todos): ").strip()
+        if not user_input:
+            return []
+        try:
+            return [domain.por_nome(nome.strip()) for nome in user_input.split(',') if nome.strip()]
+        except ValueError:
+            print(f"Opção inválida. Escolhas válidas: {', '.join(domain.nomes())}")
+
+class RegistroNaoEncontrado(Exception):
+    """
+    Lançada dentro de um bloco db_connection.transaction quando o DELETE principal não encontra a linha
+    (removida por outra sessão): sair do bloco com exceção reverte os comandos já executados nele.
+    """
+
+def report_update_conflict(entity):
+    """
+    Avisa que o registro mudou entre a leitura e a gravação (Versao_Linha diferente): nada foi gravado.
+    A tela de atualização é reaberta com os valores atuais.
+    """
+    print(f"\nAtenção: {entity} foi alterado por outro usuário enquanto você editava. Nada foi gravado.")
+    print("Os valores atuais foram recarregados: revise e informe as alterações novamente.")
+
+def _com_retentativa(update):
+    """
+    Decorador dos fluxos update_*_terminal: em conflito de versão, o fluxo avisa o usuário e retorna
+    a tupla de argumentos (a chave já escolhida) com que deve ser reaberto; a linha é então relida e
+    a edição repetida em laço, sem pedir a chave de novo nem empilhar chamadas recursivas.
+    """
+    @functools.wraps(update)
+    def repetir(conn, *args, **kwargs):
+        retentativa = update(conn, *args, **kwargs)
+        while retentativa is not None:
+            retentativa = update(conn, *retentativa)
+    return repetir
+
+def check_delete_dependencies(conn, entity, table, key, ignore=()):
+    """
+    Verifica, em uma única consulta, se alguma tabela ainda referencia a linha a ser deletada
+    (db_connection.contar_dependencias, a partir das FKs do banco) e lista o que a referencia.
+
+    Returns:
+        bool: True se nada impede a exclusão.
+    """
+    dependencies = db_connection.contar_dependencias(conn, table, key, ignore)
+    if dependencies is None:
+        print("Erro ao verificar as dependências. Exclusão cancelada.")
+        return False
+    if dependencies:
+        print(f"Erro: Não é possível deletar. {entity} ainda está referenciado(a) em:")
+        for ref_table, columns, count in dependencies:
+            print(f"  - {ref_table} ({', '.join(columns)}): {count} registro(s)")
+        return False
+    return True
+
+def paginate_terminal(conn, sql, order_by, headers, col_widths, format_row=None, filters=(), params=(),
+                      empty_message="Nenhum registro encontrado."):
+    """
+    Exibe uma consulta página a página, com navegação para a próxima e a anterior. Cada página é
+    buscada por keyset (db_connection.fetch_keyset_page): só as linhas exibidas saem do banco, em
+    qualquer ponto da lista. Se tudo cabe em uma página, não há pergunta de navegação.
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        sql (str): SELECT ... FROM ... JOIN ..., sem WHERE nem ORDER BY.
+        order_by (list): Chaves da ordenação, como em fetch_keyset_page.
+        headers (list): Títulos das colunas exibidas.
+        col_widths (list): Largura de cada coluna exibida.
+        format_row (callable, optional): Converte uma linha do SELECT nos valores exibidos.
+        filters (list): Condições do WHERE, com '?' para os valores em `params`.
+        empty_message (str): Mensagem quando a consulta não retorna nenhuma linha.
+
+    Returns:
+        bool: True se alguma linha foi exibida.
+    """
+    header_format = "".join([f"{{:<{w}}}" for w in col_widths])
+    page_size = LIST_PAGE_SIZE
+    anchor, backward, page = None, False, 1
+    while True:
+        result = db_connection.fetch_keyset_page(conn, sql, order_by, page_size, filters, params, anchor, backward)
+        if result is None:
+            print("Erro ao buscar os registros.")
+            return False
+        rows, more = result
+        if not rows:
+            if anchor is None:
+                print(empty_message)
+                return False
+            print("Nenhum registro nesta direção (a lista mudou). Voltando ao início.")
+            anchor, backward, page = None, False, 1
+            continue
+
+        print(header_format.format(*headers))
+        print("-" * sum(col_widths))
+        for row in rows:
+            values = format_row(row) if format_row else row
+            print(header_format.format(*[str(x) if x is not None else "" for x in values]))
+
+        has_next = more or backward
+        has_previous = more if backward else anchor is not None
+        if not (has_next or has_previous):
+            return True
+        print(f"\nPágina {page} (até {page_size} registros por página)")
+        options = (["[P] Próxima"] if has_next else []) + (["[A] Anterior"] if has_previous else []) + ["[T] Tamanho da página", "Enter para sair"]
+        choice = input(", ".join(options) + ": ").strip().upper()
+        if choice == 'P' and has_next:
+            anchor, backward, page = rows[-1], False, page + 1
+        elif choice == 'A' and has_previous:
+            anchor, backward, page = rows[0], True, page - 1
+        elif choice == 'T':
+            new_size = input(f"Registros por página [{page_size}]: ").strip()
+            if new_size.isdigit() and int(new_size) > 0:
+                page_size = int(new_size)
+                anchor, backward, page = None, False, 1 # Recomeça do início com o novo tamanho
+            else:
+                print("Tamanho inválido. Mantendo o anterior.")
+        else:
+            return True
+
 # --- Lógicas de CRUD para as Entidades (Administrador) ---
 
 # Gerenciar Pessoas (Conforme já implementado e levemente ajustado)
@@ -137,34 +288,19 @@ def add_person_terminal(conn, return_id=False):
     number = get_valid_input("Número: ")
     complement = get_valid_input("Complemento (opcional): ", optional=True)
 
+    sql_insert_address = "INSERT INTO Endereco (CEP, Estado, Cidade, Bairro, Rua, Numero, Complemento) VALUES (?, ?, ?, ?, ?, ?, ?);"
+    address_params = (cep, state, city, neighborhood, street, number, complement)
+    sql_insert_person = "INSERT INTO Pessoa (Nome, RG, Telefone, Email, ID_Endereco) VALUES (?, ?, ?, ?, ?);"
     try:
-        sql_insert_address = "INSERT INTO Endereco (CEP, Estado, Cidade, Bairro, Rua, Numero, Complemento) VALUES (?, ?, ?, ?, ?, ?, ?);"
-        address_params = (cep, state, city, neighborhood, street, number, complement)
-        new_address_id = db_connection.execute_insert_and_get_last_id(conn, sql_insert_address, address_params)
-
-        if new_address_id is not None:
-            sql_insert_person = "INSERT INTO Pessoa (Nome, RG, Telefone, Email, ID_Endereco) VALUES (?, ?, ?, ?, ?);"
-            person_params = (name, rg, phone, email, new_address_id)
-            
-            if return_id: # Se a função foi chamada para retornar o ID da pessoa criada
-                new_person_id = db_connection.execute_insert_and_get_last_id(conn, sql_insert_person, person_params)
-                if new_person_id:
-                    print("Pessoa e Endereço adicionados com sucesso!")
-                    return new_person_id
-                else:
-                    print("Erro: Falha ao adicionar pessoa ou recuperar seu ID.")
-                    # Rollback do endereço seria ideal aqui em um cenário transacional mais complexo
-                    return None
-            else: # Comportamento padrão
-                result_person_insert = db_connection.execute_query(conn, sql_insert_person, person_params)
-                if result_person_insert:
-                    print("Pessoa e Endereço adicionados com sucesso!")
-                else:
-                    print("Erro: Falha ao adicionar pessoa.")
-        else:
-            print("Erro: Falha ao adicionar endereço ou recuperar seu ID.")
+        # Endereço e Pessoa na mesma transação: ou os dois são gravados, ou nenhum (sem endereço órfão).
+        with db_connection.transaction(conn) as tx:
+            new_address_id = tx.insert_and_get_id(sql_insert_address, address_params)
+            new_person_id = tx.insert_and_get_id(sql_insert_person, (name, rg, phone, email, new_address_id))
+        print("Pessoa e Endereço adicionados com sucesso!")
+        if return_id: # Se a função foi chamada para retornar o ID da pessoa criada
+            return new_person_id
     except Exception as e:
-        print(f"Erro inesperado ao adicionar pessoa: {e}")
+        print(f"Erro: Falha ao adicionar pessoa e endereço. Nenhum dado foi gravado. ({e})")
     return None # Para o caso de return_id=False ou falha
 
 def list_people_terminal(conn):
@@ -174,29 +310,113 @@ def list_people_terminal(conn):
            E.CEP, E.Rua, E.Numero, E.Bairro, E.Cidade, E.Estado
     FROM Pessoa P
     INNER JOIN Endereco E ON P.ID_Endereco = E.ID_Endereco
-    ORDER BY P.Nome;
     """
-    people_data = db_connection.execute_query(conn, sql, fetch_results=True)
+    headers = ["Cód.", "Nome", "RG", "Telefone", "Email", "CEP", "Rua", "Nº", "Bairro", "Cidade", "UF"]
+    col_widths = [5, 25, 12, 15, 25, 10, 20, 8, 15, 15, 5]
+    # Por nome (IX_Pessoa_Nome), com o código como desempate entre homônimos
+    paginate_terminal(conn, sql, [("P.Nome", 1, False), ("P.Codigo_Pessoa", 0, False)], headers, col_widths,
+                      empty_message="Nenhuma pessoa encontrada.")
+
+# Busca por prefixo: cada LIKE 'x%' é uma busca no índice da coluna (IX_Pessoa_Nome e os da 0015),
+# e só as primeiras PERSON_PICKER_LIMIT pessoas em ordem de nome voltam do banco.
+SQL_BUSCAR_PESSOA = """
+    SELECT P.Codigo_Pessoa, P.Nome, COALESCE(C.CPF, C.CNPJ, P.RG) AS Documento, P.Telefone,
+           E.Cidade, E.Estado, P.ID_Endereco
+    FROM Pessoa P
+    INNER JOIN Endereco E ON P.ID_Endereco = E.ID_Endereco
+    LEFT JOIN Cliente C ON P.Codigo_Pessoa = C.Codigo_Pessoa
+    WHERE {condicao}
+    ORDER BY P.Nome, P.Codigo_Pessoa
+    OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY;
+"""
+# Documento e telefone são comparados só pelos dígitos (colunas *_Digitos da 0015): '123456' e
+# '123.456' encontram o CPF gravado como '123.456.789-00'.
+BUSCA_PESSOA_POR_DOCUMENTO = """P.Codigo_Pessoa IN (
+        SELECT Codigo_Pessoa FROM Pessoa WHERE RG_Digitos LIKE ?
+        UNION SELECT Codigo_Pessoa FROM Pessoa WHERE Telefone_Digitos LIKE ?
+        UNION SELECT Codigo_Pessoa FROM Cliente WHERE CPF_Digitos LIKE ?
+        UNION SELECT Codigo_Pessoa FROM Cliente WHERE CNPJ_Digitos LIKE ?)"""
+
+def search_people(conn, term, clients_only=False):
+    """
+    Busca as pessoas cujo nome, ou documento/telefone (se o termo não tem letras), começa com `term`.
 
-    if people_data:
-        headers = ["Cód.", "Nome", "RG", "Telefone", "Email", "CEP", "Rua", "Nº", "Bairro", "Cidade", "UF"]
-        col_widths = [5, 25, 12, 15, 25, 10, 20, 8, 15, 15, 5]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        term (str): Início do nome, ou do RG, CPF, CNPJ ou telefone (com ou sem pontuação).
+        clients_only (bool): Se True, só pessoas cadastradas como Cliente.
+
+    Returns:
+        list: Até PERSON_PICKER_LIMIT linhas (Código, Nome, Documento, Telefone, Cidade, UF, ID_Endereco),
+              ou None em caso de erro.
+    """
+    if any(ch.isalpha() for ch in term):
+        pattern = re.sub(r"([\\%_\[])", r"\\\1", term) + '%' # Curingas digitados valem como texto
+        condition, params = "P.Nome LIKE ? ESCAPE '\\'", [pattern]
+    else:
+        condition, params = BUSCA_PESSOA_POR_DOCUMENTO, [re.sub(r'\D', '', term) + '%'] * 4
+    if clients_only:
+        condition += " AND C.Codigo_Pessoa IS NOT NULL"
+    return db_connection.execute_query(conn, SQL_BUSCAR_PESSOA.format(condicao=condition),
+                                       tuple(params) + (PERSON_PICKER_LIMIT,), fetch_results=True)
+
+def pick_person_terminal(conn, label, clients_only=False):
+    """
+    Seletor de pessoa por busca incremental: a cada termo digitado mostra as primeiras pessoas que
+    começam com ele, e o termo pode ser refinado até a pessoa aparecer. Substitui listar todas as
+    pessoas para achar um código.
+
+    Args:
+        conn: Objeto de conexão do banco ou ConnectionPool.
+        label (str): O papel da pessoa na tela (ex: "Remetente").
+        clients_only (bool): Se True, só oferece pessoas cadastradas como Cliente.
+
+    Returns:
+        tuple: A linha escolhida (Código, Nome, Documento, Telefone, Cidade, UF, ID_Endereco), ou None se cancelado.
+    """
+    headers = ["Nº", "Cód.", "Nome", "Documento", "Telefone", "Cidade", "UF"]
+    col_widths = [4, 7, 30, 20, 16, 18, 4]
+    header_format = "".join([f"{{:<{w}}}" for w in col_widths])
+    matches = []
+    while True:
+        if matches:
+            prompt = f"{label}: número da lista para escolher, novo texto para refinar ou Enter para cancelar: "
+        else:
+            prompt = f"{label}: início do nome, documento ou telefone (Enter para cancelar): "
+        term = input(prompt).strip()
+        if not term:
+            return None
+        if matches and term.isdigit() and 1 <= int(term) <= len(matches):
+            return matches[int(term) - 1]
+        if not any(ch.isalpha() for ch in term) and len(re.sub(r'\D', '', term)) < 3:
+            print("Para buscar por documento ou telefone, digite ao menos 3 dígitos.")
+            continue
+
+        found = search_people(conn, term, clients_only)
+        if found is None:
+            print("Erro ao buscar pessoas.")
+            return None
+        if not found:
+            print(f"Nenhuma {'pessoa cliente' if clients_only else 'pessoa'} começa com '{term}'.")
+            continue
+        matches = found
         print(header_format.format(*headers))
         print("-" * sum(col_widths))
-        for person in people_data:
-            person_formatted = [str(x) if x is not None else "" for x in person]
-            print(header_format.format(*person_formatted))
-    else:
-        print("Nenhuma pessoa encontrada.")
+        for i, person in enumerate(matches, 1):
+            print(header_format.format(str(i), *[str(x) if x is not None else "" for x in person[:6]]))
+        if len(matches) == PERSON_PICKER_LIMIT:
+            print(f"(Mostrando as {PERSON_PICKER_LIMIT} primeiras; refine a busca se a pessoa não aparecer.)")
 
-def update_person_terminal(conn):
+@_com_retentativa
+def update_person_terminal(conn, person_id=None):
     print("\n--- Atualizar Pessoa ---")
-    person_id = get_valid_input("Digite o Código Pessoa a ser atualizada: ", int)
+    if person_id is None:
+        person_id = get_valid_input("Digite o Código Pessoa a ser atualizada: ", int)
     if person_id is None: return
 
     sql_get_person = """
-    SELECT P.Nome, P.RG, P.Telefone, P.Email, E.ID_Endereco, E.CEP, E.Estado, E.Cidade, E.Bairro, E.Rua, E.Numero, E.Complemento
+    SELECT P.Nome, P.RG, P.Telefone, P.Email, E.ID_Endereco, E.CEP, E.Estado, E.Cidade, E.Bairro, E.Rua, E.Numero, E.Complemento,
+           P.Versao_Linha, E.Versao_Linha
     FROM Pessoa P INNER JOIN Endereco E ON P.ID_Endereco = E.ID_Endereco
     WHERE P.Codigo_Pessoa = ?;
     """
@@ -222,13 +442,18 @@ def update_person_terminal(conn):
     new_number = input(f"Número [{p_data[10]}]: ").strip() or p_data[10]
     new_complement = input(f"Complemento [{p_data[11] or ''}]: ").strip() or p_data[11]
 
+    # Só grava se nenhuma das duas linhas mudou desde a leitura (concorrência otimista, sem bloqueio durante a digitação).
     try:
-        sql_update_address = "UPDATE Endereco SET CEP=?, Estado=?, Cidade=?, Bairro=?, Rua=?, Numero=?, Complemento=? WHERE ID_Endereco=?;"
-        db_connection.execute_query(conn, sql_update_address, (new_cep, new_state, new_city, new_neighborhood, new_street, new_number, new_complement, address_id))
+        with db_connection.transaction(conn) as tx:
+            sql_update_address = "UPDATE Endereco SET CEP=?, Estado=?, Cidade=?, Bairro=?, Rua=?, Numero=?, Complemento=? WHERE ID_Endereco=? AND Versao_Linha=?;"
+            tx.compare_and_swap(sql_update_address, (new_cep, new_state, new_city, new_neighborhood, new_street, new_number, new_complement, address_id, p_data[13]))
 
-        sql_update_person = "UPDATE Pessoa SET Nome=?, RG=?, Telefone=?, Email=? WHERE Codigo_Pessoa=?;"
-        db_connection.execute_query(conn, sql_update_person, (new_name, new_rg, new_phone, new_email, person_id))
+            sql_update_person = "UPDATE Pessoa SET Nome=?, RG=?, Telefone=?, Email=? WHERE Codigo_Pessoa=? AND Versao_Linha=?;"
+            tx.compare_and_swap(sql_update_person, (new_name, new_rg, new_phone, new_email, person_id, p_data[12]))
         print("Pessoa e Endereço atualizados com sucesso!")
+    except db_connection.ConflitoVersaoError:
+        report_update_conflict("A pessoa (ou o seu endereço)")
+        return (person_id,)
     except Exception as e:
         print(f"Erro inesperado ao atualizar pessoa: {e}")
 
@@ -238,18 +463,9 @@ def delete_person_terminal(conn):
     if person_id is None: return
 
     # Verificar dependências antes de deletar
-    # (Usuário, Cliente, Funcionário, Produto_A_Ser_Entregue como remetente/destinatário)
-    dependencies = {
-        "Usuario": "SELECT 1 FROM Usuario WHERE Codigo_Pessoa = ?",
-        "Cliente": "SELECT 1 FROM Cliente WHERE Codigo_Pessoa = ?",
-        "Funcionario": "SELECT 1 FROM Funcionario WHERE Codigo_Funcionario = ?", # Codigo_Funcionario é o mesmo que Codigo_Pessoa
-        "Produto (Remetente)": "SELECT 1 FROM Produto_A_Ser_Entregue WHERE ID_Remetente = ?",
-        "Produto (Destinatário)": "SELECT 1 FROM Produto_A_Ser_Entregue WHERE ID_Destinatario = ?"
-    }
-    for table, sql_check in dependencies.items():
-        if db_connection.execute_query(conn, sql_check, (person_id,), fetch_results=True):
-            print(f"Erro: Não é possível deletar. Pessoa está referenciada na tabela {table}.")
-            return
+    # (Usuário, Cliente, Funcionário, Produto_A_Ser_Entregue como remetente/destinatário, ...)
+    if not check_delete_dependencies(conn, "Pessoa", "Pessoa", {"Codigo_Pessoa": person_id}):
+        return
 
     # Obter ID_Endereco para deletar o endereço também
     address_id_data = db_connection.execute_query(conn, "SELECT ID_Endereco FROM Pessoa WHERE Codigo_Pessoa = ?", (person_id,), fetch_results=True)
@@ -259,29 +475,28 @@ def delete_person_terminal(conn):
         print("Exclusão cancelada.")
         return
 
+    address_outcome = "Aviso: Pessoa deletada, mas não foi possível encontrar/deletar o endereço associado."
     try:
-        # Deletar Pessoa (ON DELETE CASCADE cuidaria disso no DB se configurado, mas fazemos manualmente)
-        if db_connection.execute_query(conn, "DELETE FROM Pessoa WHERE Codigo_Pessoa = ?", (person_id,)):
-            print("Pessoa deletada.")
+        # Pessoa e (se não estiver em uso) seu endereço são removidos na mesma transação.
+        with db_connection.transaction(conn) as tx:
+            if tx.execute("DELETE FROM Pessoa WHERE Codigo_Pessoa = ?", (person_id,)) == 0:
+                raise RegistroNaoEncontrado
             if address_id_data:
                 address_id = address_id_data[0][0]
-                # Verificar se o endereço é usado por outra Pessoa ou Sede antes de deletar
-                sql_check_addr_pessoa = "SELECT 1 FROM Pessoa WHERE ID_Endereco = ? AND Codigo_Pessoa != ?" # Exclui a pessoa que acabamos de deletar
-                sql_check_addr_sede = "SELECT 1 FROM Sede WHERE ID_Endereco = ?"
-                if not db_connection.execute_query(conn, sql_check_addr_pessoa, (address_id, person_id), fetch_results=True) and \
-                   not db_connection.execute_query(conn, sql_check_addr_sede, (address_id,), fetch_results=True):
-                    if db_connection.execute_query(conn, "DELETE FROM Endereco WHERE ID_Endereco = ?", (address_id,)):
-                        print("Endereço associado deletado com sucesso.")
-                    else:
-                        print("Aviso: Pessoa deletada, mas falha ao deletar endereço (pode ainda estar em uso ou erro).")
+                # O endereço só sai se nada mais o referencia (outra Pessoa, Sede, Dados_Rastreamento...);
+                # a contagem roda na transação, já sem a pessoa removida acima.
+                if not tx.contar_dependencias("Endereco", {"ID_Endereco": address_id}):
+                    tx.execute("DELETE FROM Endereco WHERE ID_Endereco = ?", (address_id,))
+                    address_outcome = "Endereço associado deletado com sucesso."
                 else:
-                    print("Aviso: Pessoa deletada, mas o endereço não foi removido pois está em uso por outra entidade.")
-            else:
-                print("Aviso: Pessoa deletada, mas não foi possível encontrar/deletar o endereço associado.")
-        else:
-            print("Erro: Falha ao deletar pessoa.")
+                    address_outcome = "Aviso: Pessoa deletada, mas o endereço não foi removido pois está em uso por outra entidade."
+        # Só depois do commit: se algo falhou, nada foi gravado e nada disso é anunciado
+        print("Pessoa deletada.")
+        print(address_outcome)
+    except RegistroNaoEncontrado:
+        print("Erro: Pessoa não encontrada. Nenhuma alteração foi gravada.")
     except Exception as e:
-        print(f"Erro inesperado ao deletar pessoa: {e}")
+        print(f"Erro inesperado ao deletar pessoa. Nenhuma alteração foi gravada. ({e})")
 
 # Gerenciar Usuários (Conforme já implementado e levemente ajustado)
 def manage_users_terminal(conn):
@@ -317,12 +532,11 @@ def add_user_terminal(conn):
         print("Erro: Já existe um usuário associado a este Código Pessoa.")
         return
 
-    valid_user_types = ['Cliente', 'Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin']
-    user_type = get_valid_input(f"Tipo de Usuário ({', '.join(valid_user_types)}): ", choices=valid_user_types)
+    user_type = get_valid_input(f"Tipo de Usuário ({', '.join(TipoUsuario.nomes())}): ", TipoUsuario)
     if user_type is None: return
 
     # Lógica para garantir consistência com tabelas Cliente/Funcionario
-    if user_type == 'Cliente':
+    if user_type == TipoUsuario.CLIENTE:
         if not db_connection.execute_query(conn, "SELECT 1 FROM Cliente WHERE Codigo_Pessoa = ?", (person_code,), fetch_results=True):
             print(f"Atenção: Esta pessoa (Cód: {person_code}) não está cadastrada como Cliente.")
             if input("Deseja cadastrá-la como Cliente agora? (s/n): ").lower() == 's':
@@ -335,7 +549,7 @@ def add_user_terminal(conn):
             else:
                 print("Criação de usuário cancelada. Pessoa não é um Cliente.")
                 return
-    elif user_type in ['Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin']:
+    else: # Motorista, Auxiliar de Logistica, Atendente, Gerente, Admin
         if not db_connection.execute_query(conn, "SELECT 1 FROM Funcionario WHERE Codigo_Funcionario = ?", (person_code,), fetch_results=True):
             print(f"Atenção: Esta pessoa (Cód: {person_code}) não está cadastrada como Funcionário.")
             if input("Deseja cadastrá-la como Funcionário agora? (s/n): ").lower() == 's':
@@ -346,9 +560,10 @@ def add_user_terminal(conn):
                 return
         # Adicionalmente, verificar se o Cargo do funcionário corresponde ao Tipo_Usuario
         func_data = db_connection.execute_query(conn, "SELECT Cargo FROM Funcionario WHERE Codigo_Funcionario = ?", (person_code,), fetch_results=True)
-        if func_data and func_data[0][0].replace(" ", "") != user_type.replace(" ", ""): # Compara ignorando espaços
-            if not (func_data[0][0] == 'Gerente' and user_type == 'Admin'): # Permitir que um Gerente seja Admin
-                 print(f"Aviso: O cargo do funcionário ({func_data[0][0]}) não corresponde exatamente ao tipo de usuário ({user_type}).")
+        cargo = Cargo(func_data[0][0]) if func_data else None
+        if cargo and cargo.nome != user_type.nome: # Cargo e tipo de usuário têm os mesmos nomes, com códigos diferentes
+            if not (cargo == Cargo.GERENTE and user_type == TipoUsuario.ADMIN): # Permitir que um Gerente seja Admin
+                 print(f"Aviso: O cargo do funcionário ({cargo}) não corresponde exatamente ao tipo de usuário ({user_type}).")
                  if input("Continuar mesmo assim? (s/n): ").lower() != 's':
                      return
 
@@ -362,30 +577,26 @@ def add_user_terminal(conn):
 
 def list_users_terminal(conn):
     print("\n--- Lista de Usuários ---")
-    sql = "SELECT U.Login, U.Codigo_Pessoa, P.Nome, U.Tipo_Usuario FROM Usuario U JOIN Pessoa P ON U.Codigo_Pessoa = P.Codigo_Pessoa ORDER BY U.Login"
-    users = db_connection.execute_query(conn, sql, fetch_results=True)
-    if users:
-        headers = ["Login", "Cód. Pessoa", "Nome Pessoa", "Tipo Usuário"]
-        col_widths = [20, 12, 30, 25]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
-        print(header_format.format(*headers))
-        print("-" * sum(col_widths))
-        for user in users:
-            print(header_format.format(*user))
-    else:
-        print("Nenhum usuário encontrado.")
-
-def update_user_terminal(conn):
+    sql = "SELECT U.Login, U.Codigo_Pessoa, P.Nome, U.Tipo_Usuario FROM Usuario U JOIN Pessoa P ON U.Codigo_Pessoa = P.Codigo_Pessoa"
+    headers = ["Login", "Cód. Pessoa", "Nome Pessoa", "Tipo Usuário"]
+    col_widths = [20, 12, 30, 25]
+    paginate_terminal(conn, sql, [("U.Login", 0, False)], headers, col_widths,
+                      lambda u: (u[0], u[1], u[2], TipoUsuario(u[3])), empty_message="Nenhum usuário encontrado.")
+
+@_com_retentativa
+def update_user_terminal(conn, login_to_update=None):
     print("\n--- Atualizar Usuário ---")
-    login_to_update = get_valid_input("Digite o Login do usuário a ser atualizado: ")
+    if login_to_update is None:
+        login_to_update = get_valid_input("Digite o Login do usuário a ser atualizado: ")
     if login_to_update is None: return
 
-    user_data = db_connection.execute_query(conn, "SELECT Senha_Hash, Codigo_Pessoa, Tipo_Usuario FROM Usuario WHERE Login = ?", (login_to_update,), fetch_results=True)
+    user_data = db_connection.execute_query(conn, "SELECT Senha_Hash, Codigo_Pessoa, Tipo_Usuario, Versao_Linha FROM Usuario WHERE Login = ?", (login_to_update,), fetch_results=True)
     if not user_data:
         print("Usuário não encontrado.")
         return
 
-    _, current_person_code, current_user_type = user_data[0]
+    _, current_person_code, current_user_type, row_version = user_data[0]
+    current_user_type = TipoUsuario(current_user_type)
 
     print(f"\nAtualizando usuário: {login_to_update}")
     print(f"Código Pessoa atual: {current_person_code}, Tipo atual: {current_user_type}")
@@ -402,16 +613,21 @@ def update_user_terminal(conn):
 
     if new_password:
         hashed_password = hash_password(new_password)
-        sql = "UPDATE Usuario SET Senha_Hash = ? WHERE Login = ?"
-        params = (hashed_password, login_to_update)
+        sql = "UPDATE Usuario SET Senha_Hash = ? WHERE Login = ? AND Versao_Linha = ?"
+        params = (hashed_password, login_to_update, row_version)
     else: # Nenhuma alteração se apenas a senha não foi mudada
         print("Nenhuma alteração na senha. Nada a atualizar.")
         return
 
-    if db_connection.execute_query(conn, sql, params):
+    try:
+        with db_connection.transaction(conn) as tx:
+            tx.compare_and_swap(sql, params)
         print("Usuário atualizado com sucesso!")
-    else:
-        print("Erro: Falha ao atualizar usuário.")
+    except db_connection.ConflitoVersaoError:
+        report_update_conflict("O usuário")
+        return (login_to_update,)
+    except Exception as e:
+        print(f"Erro: Falha ao atualizar usuário. ({e})")
 
 def delete_user_terminal(conn):
     print("\n--- Deletar Usuário ---")
@@ -495,32 +711,24 @@ def list_clients_terminal(conn):
            C.CNPJ, C.Nome_Empresa
     FROM Cliente C
     INNER JOIN Pessoa P ON C.Codigo_Pessoa = P.Codigo_Pessoa
-    ORDER BY P.Nome;
     """
-    clients_data = db_connection.execute_query(conn, sql, fetch_results=True)
-    if clients_data:
-        headers = ["Cód. Pessoa", "Nome", "Tipo", "CPF", "Data Nasc.", "CNPJ", "Nome Empresa"]
-        col_widths = [12, 25, 8, 15, 12, 20, 30]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
-        print(header_format.format(*headers))
-        print("-" * sum(col_widths))
-        for client in clients_data:
-            client_formatted = [str(x) if x is not None else "" for x in client]
-            print(header_format.format(*client_formatted))
-    else:
-        print("Nenhum cliente encontrado.")
+    headers = ["Cód. Pessoa", "Nome", "Tipo", "CPF", "Data Nasc.", "CNPJ", "Nome Empresa"]
+    col_widths = [12, 25, 8, 15, 12, 20, 30]
+    paginate_terminal(conn, sql, [("P.Nome", 1, False), ("C.Codigo_Pessoa", 0, False)], headers, col_widths,
+                      empty_message="Nenhum cliente encontrado.")
 
-def update_client_terminal(conn, person_code_logged_in=None):
+@_com_retentativa
+def update_client_terminal(conn, person_code_logged_in=None, person_code=None):
     print("\n--- Atualizar Cliente ---")
     if person_code_logged_in:
         person_code = person_code_logged_in
         print(f"Atualizando seus dados de cliente (Código Pessoa: {person_code}).")
-    else:
+    elif person_code is None:
         person_code = get_valid_input("Digite o Código Pessoa do cliente a ser atualizado: ", int)
         if person_code is None: return
 
     sql_get_client = """
-    SELECT P.Nome, C.Tipo_Cliente, C.CPF, C.Data_Nascimento, C.CNPJ, C.Nome_Empresa
+    SELECT P.Nome, C.Tipo_Cliente, C.CPF, C.Data_Nascimento, C.CNPJ, C.Nome_Empresa, C.Versao_Linha
     FROM Cliente C INNER JOIN Pessoa P ON C.Codigo_Pessoa = P.Codigo_Pessoa
     WHERE C.Codigo_Pessoa = ?;
     """
@@ -554,11 +762,16 @@ def update_client_terminal(conn, person_code_logged_in=None):
         new_company_name = input(f"Nome da Empresa [{c_data[5] or ''}]: ").strip() or c_data[5]
         new_cpf, new_dob = None, None
 
-    sql_update = "UPDATE Cliente SET Tipo_Cliente=?, CPF=?, Data_Nascimento=?, CNPJ=?, Nome_Empresa=? WHERE Codigo_Pessoa=?;"
-    if db_connection.execute_query(conn, sql_update, (new_client_type, new_cpf, new_dob, new_cnpj, new_company_name, person_code)):
+    sql_update = "UPDATE Cliente SET Tipo_Cliente=?, CPF=?, Data_Nascimento=?, CNPJ=?, Nome_Empresa=? WHERE Codigo_Pessoa=? AND Versao_Linha=?;"
+    try:
+        with db_connection.transaction(conn) as tx:
+            tx.compare_and_swap(sql_update, (new_client_type, new_cpf, new_dob, new_cnpj, new_company_name, person_code, c_data[6]))
         print("Cliente atualizado com sucesso!")
-    else:
-        print("Erro: Falha ao atualizar cliente. Verifique os dados e as constraints (CHK_Cliente_PF_PJ).")
+    except db_connection.ConflitoVersaoError:
+        report_update_conflict("O cliente")
+        return (person_code_logged_in, person_code)
+    except Exception as e:
+        print(f"Erro: Falha ao atualizar cliente. Verifique os dados e as constraints (CHK_Cliente_PF_PJ). ({e})")
 
 def delete_client_terminal(conn):
     print("\n--- Deletar Cliente ---")
@@ -569,7 +782,7 @@ def delete_client_terminal(conn):
     if db_connection.execute_query(conn, "SELECT 1 FROM Produto_A_Ser_Entregue WHERE ID_Remetente = ? OR ID_Destinatario = ?", (person_code, person_code), fetch_results=True):
         print("Erro: Cliente está associado a produtos. Não pode ser deletado.")
         return
-    if db_connection.execute_query(conn, "SELECT 1 FROM Usuario WHERE Codigo_Pessoa = ? AND Tipo_Usuario = 'Cliente'", (person_code,), fetch_results=True):
+    if db_connection.execute_query(conn, "SELECT 1 FROM Usuario WHERE Codigo_Pessoa = ? AND Tipo_Usuario = ?", (person_code, TipoUsuario.CLIENTE), fetch_results=True):
         print("Erro: Cliente possui um usuário associado. Delete o usuário primeiro ou altere seu tipo.")
         return
     
@@ -622,12 +835,11 @@ def add_employee_terminal(conn):
     
     departamento = get_valid_input("Departamento (ex: Entregas, Atendimento, Administrativo): ")
     
-    cargos_validos = ['Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin']
-    cargo = get_valid_input(f"Cargo ({', '.join(cargos_validos)}): ", choices=cargos_validos)
+    cargo = get_valid_input(f"Cargo ({', '.join(Cargo.nomes())}): ", Cargo)
     if cargo is None: return
 
     placa_veiculo, id_sede = None, None
-    if cargo == 'Motorista':
+    if cargo == Cargo.MOTORISTA:
         list_available_vehicles(conn) # Mostrar veículos disponíveis
         placa_veiculo = get_valid_input("Placa do Veículo (de um veículo existente e disponível): ")
         # Validar se a placa existe e está disponível
@@ -635,10 +847,10 @@ def add_employee_terminal(conn):
         if not vehicle_data:
             print("Erro: Veículo não encontrado.")
             return
-        # if vehicle_data[0][0] == 'Indisponivel':
+        # if vehicle_data[0][0] == StatusVeiculo.INDISPONIVEL:
         #     print("Erro: Veículo está indisponível.") # Motorista pode ser associado a um veículo mesmo que temporariamente indisponível. Status do veículo é gerenciado à parte.
         #     return
-    elif cargo in ['Auxiliar de Logistica', 'Atendente', 'Gerente']:
+    elif cargo in dominios.CARGOS_DE_SEDE:
         list_headquarters_terminal(conn, simple_list=True) # Mostrar sedes
         id_sede = get_valid_input("ID da Sede: ", int)
         if not db_connection.execute_query(conn, "SELECT 1 FROM Sede WHERE ID_Sede = ?", (id_sede,), fetch_results=True):
@@ -665,28 +877,21 @@ def list_employees_terminal(conn):
     INNER JOIN Pessoa P ON F.Codigo_Funcionario = P.Codigo_Pessoa
     LEFT JOIN Sede S ON F.ID_Sede = S.ID_Sede
     LEFT JOIN Endereco E ON S.ID_Endereco = E.ID_Endereco
-    ORDER BY P.Nome;
     """
-    employees = db_connection.execute_query(conn, sql, fetch_results=True)
-    if employees:
-        headers = ["Cód. Func", "Nome", "CPF", "Depto", "Cargo", "Placa Veíc.", "ID Sede", "Tipo Sede", "Cidade Sede"]
-        col_widths = [10, 25, 15, 20, 20, 12, 8, 10, 15]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
-        print(header_format.format(*headers))
-        print("-" * sum(col_widths))
-        for emp in employees:
-            emp_formatted = [str(x) if x is not None else "" for x in emp]
-            print(header_format.format(*emp_formatted))
-    else:
-        print("Nenhum funcionário encontrado.")
+    headers = ["Cód. Func", "Nome", "CPF", "Depto", "Cargo", "Placa Veíc.", "ID Sede", "Tipo Sede", "Cidade Sede"]
+    col_widths = [10, 25, 15, 20, 20, 12, 8, 10, 15]
+    paginate_terminal(conn, sql, [("P.Nome", 1, False), ("F.Codigo_Funcionario", 0, False)], headers, col_widths,
+                      lambda emp: emp[:4] + (Cargo(emp[4]),) + tuple(emp[5:]), empty_message="Nenhum funcionário encontrado.")
 
-def update_employee_terminal(conn):
+@_com_retentativa
+def update_employee_terminal(conn, person_code=None):
     print("\n--- Atualizar Funcionário ---")
-    person_code = get_valid_input("Digite o Código do Funcionário (que é o Código Pessoa) a ser atualizado: ", int)
+    if person_code is None:
+        person_code = get_valid_input("Digite o Código do Funcionário (que é o Código Pessoa) a ser atualizado: ", int)
     if person_code is None: return
 
     sql_get_emp = """
-    SELECT P.Nome, F.CPF, F.Departamento, F.Cargo, F.Placa_Veiculo, F.ID_Sede
+    SELECT P.Nome, F.CPF, F.Departamento, F.Cargo, F.Placa_Veiculo, F.ID_Sede, F.Versao_Linha
     FROM Funcionario F INNER JOIN Pessoa P ON F.Codigo_Funcionario = P.Codigo_Pessoa
     WHERE F.Codigo_Funcionario = ?;
     """
@@ -695,7 +900,8 @@ def update_employee_terminal(conn):
         print("Funcionário não encontrado.")
         return
 
-    e_data = current_data[0]
+    e_data = list(current_data[0])
+    e_data[3] = Cargo(e_data[3])
     print(f"\nAtualizando funcionário: {e_data[0]} (Cód: {person_code})")
     print("Deixe em branco para manter o valor atual.")
 
@@ -706,14 +912,10 @@ def update_employee_terminal(conn):
         
     new_departamento = input(f"Departamento [{e_data[2]}]: ").strip() or e_data[2]
     
-    cargos_validos = ['Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin']
-    new_cargo = input(f"Cargo [{e_data[3]}] ({', '.join(cargos_validos)}): ").strip() or e_data[3]
-    if new_cargo not in cargos_validos:
-        print("Cargo inválido. Mantendo cargo anterior.")
-        new_cargo = e_data[3]
+    new_cargo = get_domain_update("Cargo", Cargo, e_data[3])
 
     new_placa_veiculo, new_id_sede = e_data[4], e_data[5]
-    if new_cargo == 'Motorista':
+    if new_cargo == Cargo.MOTORISTA:
         list_available_vehicles(conn)
         new_placa_veiculo_input = input(f"Placa do Veículo [{e_data[4] or ''}]: ").strip()
         if new_placa_veiculo_input: # Só atualiza se algo for digitado
@@ -722,7 +924,7 @@ def update_employee_terminal(conn):
             else:
                 print("Placa de veículo inválida. Mantendo anterior (ou nenhuma).")
         new_id_sede = None # Motorista não tem sede diretamente na tabela Funcionario
-    elif new_cargo in ['Auxiliar de Logistica', 'Atendente', 'Gerente']:
+    elif new_cargo in dominios.CARGOS_DE_SEDE:
         list_headquarters_terminal(conn, simple_list=True)
         new_id_sede_input = input(f"ID da Sede [{e_data[5] or ''}]: ").strip()
         if new_id_sede_input:
@@ -739,12 +941,17 @@ def update_employee_terminal(conn):
         new_placa_veiculo, new_id_sede = None, None
 
 
-    sql_update = "UPDATE Funcionario SET CPF=?, Departamento=?, Cargo=?, Placa_Veiculo=?, ID_Sede=? WHERE Codigo_Funcionario=?;"
-    params = (new_cpf, new_departamento, new_cargo, new_placa_veiculo, new_id_sede, person_code)
-    if db_connection.execute_query(conn, sql_update, params):
+    sql_update = "UPDATE Funcionario SET CPF=?, Departamento=?, Cargo=?, Placa_Veiculo=?, ID_Sede=? WHERE Codigo_Funcionario=? AND Versao_Linha=?;"
+    params = (new_cpf, new_departamento, new_cargo, new_placa_veiculo, new_id_sede, person_code, e_data[6])
+    try:
+        with db_connection.transaction(conn) as tx:
+            tx.compare_and_swap(sql_update, params)
         print("Funcionário atualizado com sucesso!")
-    else:
-        print("Erro: Falha ao atualizar funcionário. Verifique os dados e as constraints (CHK_Funcionario_Cargo).")
+    except db_connection.ConflitoVersaoError:
+        report_update_conflict("O funcionário")
+        return (person_code,)
+    except Exception as e:
+        print(f"Erro: Falha ao atualizar funcionário. Verifique os dados e as constraints (CHK_Funcionario_Cargo). ({e})")
 
 def delete_employee_terminal(conn):
     print("\n--- Deletar Funcionário ---")
@@ -755,7 +962,7 @@ def delete_employee_terminal(conn):
     if db_connection.execute_query(conn, "SELECT 1 FROM Produto_A_Ser_Entregue WHERE Codigo_Funcionario_Motorista = ?", (person_code,), fetch_results=True):
         print("Erro: Funcionário é motorista de produtos. Não pode ser deletado.")
         return
-    if db_connection.execute_query(conn, "SELECT 1 FROM Usuario WHERE Codigo_Pessoa = ? AND Tipo_Usuario != 'Cliente'", (person_code,), fetch_results=True):
+    if db_connection.execute_query(conn, "SELECT 1 FROM Usuario WHERE Codigo_Pessoa = ? AND Tipo_Usuario != ?", (person_code, TipoUsuario.CLIENTE), fetch_results=True):
         print("Erro: Funcionário possui um usuário associado. Delete o usuário primeiro ou altere seu tipo.")
         return
         
@@ -794,10 +1001,8 @@ def add_vehicle_terminal(conn):
         return
     
     carga_suportada = get_valid_input("Carga Suportada (kg): ", float)
-    tipos_validos = ['Carro', 'Moto', 'Van', 'Caminhão']
-    tipo = get_valid_input(f"Tipo ({', '.join(tipos_validos)}): ", choices=tipos_validos)
-    status_validos = ['Disponivel', 'Indisponivel'] # 'Em Manutenção', 'Em Rota' poderiam ser outros status
-    status = get_valid_input(f"Status Inicial ({', '.join(status_validos)}): ", choices=status_validos)
+    tipo = get_valid_input(f"Tipo ({', '.join(TipoVeiculo.nomes())}): ", TipoVeiculo)
+    status = get_valid_input(f"Status Inicial ({', '.join(StatusVeiculo.nomes())}): ", StatusVeiculo) # 'Em Manutenção', 'Em Rota' poderiam ser outros status
 
     sql = "INSERT INTO Veiculo (Placa_Veiculo, Carga_Suportada, Tipo, Status) VALUES (?, ?, ?, ?);"
     if db_connection.execute_query(conn, sql, (placa, carga_suportada, tipo, status)):
@@ -808,69 +1013,59 @@ def add_vehicle_terminal(conn):
 def list_available_vehicles(conn):
     """Lista veículos disponíveis para atribuição a motoristas ou carregamentos."""
     print("\n--- Veículos Disponíveis ---")
-    sql = "SELECT Placa_Veiculo, Tipo, Carga_Suportada FROM Veiculo WHERE Status = 'Disponivel' ORDER BY Placa_Veiculo;"
-    vehicles = db_connection.execute_query(conn, sql, fetch_results=True)
+    sql = "SELECT Placa_Veiculo, Tipo, Carga_Suportada FROM Veiculo WHERE Status = ? ORDER BY Placa_Veiculo;"
+    vehicles = db_connection.execute_query(conn, sql, (StatusVeiculo.DISPONIVEL,), fetch_results=True)
     if vehicles:
         headers = ["Placa", "Tipo", "Carga (kg)"]
         col_widths = [10, 15, 10]
         header_format = "".join([f"{{:<{w}}}" for w in col_widths])
         print(header_format.format(*headers))
         print("-" * sum(col_widths))
-        for v in vehicles:
-            print(header_format.format(*v))
+        for placa, tipo, carga in vehicles:
+            print(header_format.format(placa, str(TipoVeiculo(tipo)), carga))
     else:
         print("Nenhum veículo disponível encontrado.")
 
 def list_vehicles_terminal(conn):
     print("\n--- Lista de Veículos ---")
-    sql = "SELECT Placa_Veiculo, Carga_Suportada, Tipo, Status FROM Veiculo ORDER BY Placa_Veiculo;"
-    vehicles = db_connection.execute_query(conn, sql, fetch_results=True)
-    if vehicles:
-        headers = ["Placa", "Carga (kg)", "Tipo", "Status"]
-        col_widths = [10, 12, 15, 15]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
-        print(header_format.format(*headers))
-        print("-" * sum(col_widths))
-        for v in vehicles:
-            v_formatted = [str(x) if x is not None else "" for x in v]
-            print(header_format.format(*v_formatted))
-    else:
-        print("Nenhum veículo encontrado.")
-
-def update_vehicle_terminal(conn):
+    sql = "SELECT Placa_Veiculo, Carga_Suportada, Tipo, Status FROM Veiculo"
+    headers = ["Placa", "Carga (kg)", "Tipo", "Status"]
+    col_widths = [10, 12, 15, 15]
+    paginate_terminal(conn, sql, [("Placa_Veiculo", 0, False)], headers, col_widths,
+                      lambda v: (v[0], v[1], TipoVeiculo(v[2]), StatusVeiculo(v[3])), empty_message="Nenhum veículo encontrado.")
+
+@_com_retentativa
+def update_vehicle_terminal(conn, placa=None):
     print("\n--- Atualizar Veículo ---")
-    placa = get_valid_input("Digite a Placa do veículo a ser atualizado: ", str.upper)
+    if placa is None:
+        placa = get_valid_input("Digite a Placa do veículo a ser atualizado: ", str.upper)
     if placa is None: return
 
-    current_data = db_connection.execute_query(conn, "SELECT Carga_Suportada, Tipo, Status FROM Veiculo WHERE Placa_Veiculo = ?", (placa,), fetch_results=True)
+    current_data = db_connection.execute_query(conn, "SELECT Carga_Suportada, Tipo, Status, Versao_Linha FROM Veiculo WHERE Placa_Veiculo = ?", (placa,), fetch_results=True)
     if not current_data:
         print("Veículo não encontrado.")
         return
     
-    v_data = current_data[0]
+    v_data = (current_data[0][0], TipoVeiculo(current_data[0][1]), StatusVeiculo(current_data[0][2]))
     print(f"Atualizando veículo: {placa}")
     print("Deixe em branco para manter o valor atual.")
 
     new_carga = input(f"Carga Suportada (kg) [{v_data[0]}]: ").strip()
     new_carga = float(new_carga) if new_carga else v_data[0]
 
-    tipos_validos = ['Carro', 'Moto', 'Van', 'Caminhão']
-    new_tipo = input(f"Tipo [{v_data[1]}] ({', '.join(tipos_validos)}): ").strip() or v_data[1]
-    if new_tipo not in tipos_validos:
-        print("Tipo inválido. Mantendo anterior.")
-        new_tipo = v_data[1]
-
-    status_validos = ['Disponivel', 'Indisponivel']
-    new_status = input(f"Status [{v_data[2]}] ({', '.join(status_validos)}): ").strip() or v_data[2]
-    if new_status not in status_validos:
-        print("Status inválido. Mantendo anterior.")
-        new_status = v_data[2]
+    new_tipo = get_domain_update("Tipo", TipoVeiculo, v_data[1])
+    new_status = get_domain_update("Status", StatusVeiculo, v_data[2])
 
-    sql = "UPDATE Veiculo SET Carga_Suportada=?, Tipo=?, Status=? WHERE Placa_Veiculo=?;"
-    if db_connection.execute_query(conn, sql, (new_carga, new_tipo, new_status, placa)):
+    sql = "UPDATE Veiculo SET Carga_Suportada=?, Tipo=?, Status=? WHERE Placa_Veiculo=? AND Versao_Linha=?;"
+    try:
+        with db_connection.transaction(conn) as tx:
+            tx.compare_and_swap(sql, (new_carga, new_tipo, new_status, placa, current_data[0][3]))
         print("Veículo atualizado com sucesso!")
-    else:
-        print("Erro: Falha ao atualizar veículo.")
+    except db_connection.ConflitoVersaoError:
+        report_update_conflict("O veículo")
+        return (placa,)
+    except Exception as e:
+        print(f"Erro: Falha ao atualizar veículo. ({e})")
 
 def delete_vehicle_terminal(conn):
     print("\n--- Deletar Veículo ---")
@@ -878,11 +1073,7 @@ def delete_vehicle_terminal(conn):
     if placa is None: return
 
     # Verificar dependências (Funcionario, Carregamento)
-    if db_connection.execute_query(conn, "SELECT 1 FROM Funcionario WHERE Placa_Veiculo = ?", (placa,), fetch_results=True):
-        print("Erro: Veículo está associado a um funcionário (Motorista). Desvincule-o primeiro.")
-        return
-    if db_connection.execute_query(conn, "SELECT 1 FROM Carregamento WHERE Placa_Veiculo = ?", (placa,), fetch_results=True):
-        print("Erro: Veículo possui carregamentos associados. Não pode ser deletado.")
+    if not check_delete_dependencies(conn, "Veículo", "Veiculo", {"Placa_Veiculo": placa}):
         return
 
     if not db_connection.execute_query(conn, "SELECT 1 FROM Veiculo WHERE Placa_Veiculo = ?", (placa,), fetch_results=True):
@@ -931,28 +1122,17 @@ def add_headquarters_terminal(conn):
     numero = get_valid_input("Número: ")
     complemento = get_valid_input("Complemento (opcional): ", optional=True)
 
+    sql_insert_address = "INSERT INTO Endereco (CEP, Estado, Cidade, Bairro, Rua, Numero, Complemento) VALUES (?, ?, ?, ?, ?, ?, ?);"
+    address_params = (cep, estado, cidade, bairro, rua, numero, complemento)
+    sql_insert_sede = "INSERT INTO Sede (Tipo, ID_Endereco, Telefone) VALUES (?, ?, ?);"
     try:
-        sql_insert_address = "INSERT INTO Endereco (CEP, Estado, Cidade, Bairro, Rua, Numero, Complemento) VALUES (?, ?, ?, ?, ?, ?, ?);"
-        address_params = (cep, estado, cidade, bairro, rua, numero, complemento)
-        new_address_id = db_connection.execute_insert_and_get_last_id(conn, sql_insert_address, address_params)
-
-        if new_address_id is not None:
-            # Verificar se o endereço já está em uso por outra sede
-            if db_connection.execute_query(conn, "SELECT 1 FROM Sede WHERE ID_Endereco = ?", (new_address_id,), fetch_results=True):
-                print("Erro: Este endereço já está cadastrado para outra sede.")
-                # Idealmente, deletar o endereço recém-criado se não for usado.
-                return
-
-            sql_insert_sede = "INSERT INTO Sede (Tipo, ID_Endereco, Telefone) VALUES (?, ?, ?);"
-            sede_params = (tipo_id, new_address_id, telefone)
-            if db_connection.execute_query(conn, sql_insert_sede, sede_params):
-                print("Sede e Endereço adicionados com sucesso!")
-            else:
-                print("Erro: Falha ao adicionar sede.")
-        else:
-            print("Erro: Falha ao adicionar endereço para a sede.")
+        # O endereço é criado junto com a sede, então ele nunca está em uso por outra sede.
+        with db_connection.transaction(conn) as tx:
+            new_address_id = tx.insert_and_get_id(sql_insert_address, address_params)
+            tx.execute(sql_insert_sede, (tipo_id, new_address_id, telefone))
+        print("Sede e Endereço adicionados com sucesso!")
     except Exception as e:
-        print(f"Erro inesperado ao adicionar sede: {e}")
+        print(f"Erro: Falha ao adicionar sede e endereço. Nenhum dado foi gravado. ({e})")
 
 def list_headquarters_terminal(conn, simple_list=False):
     print("\n--- Lista de Sedes ---")
@@ -967,35 +1147,27 @@ def list_headquarters_terminal(conn, simple_list=False):
            S.Telefone, E.Rua, E.Numero, E.Bairro, E.Cidade, E.Estado, E.CEP
     FROM Sede S
     INNER JOIN Endereco E ON S.ID_Endereco = E.ID_Endereco
-    ORDER BY S.ID_Sede;
     """
-    sedes = db_connection.execute_query(conn, sql, fetch_results=True)
-    if sedes:
-        if simple_list:
-            print("{:<5} {:<15} {:<20}".format("ID", "Tipo", "Cidade"))
-            print("-" * 40)
-            for s in sedes:
-                print("{:<5} {:<15} {:<20}".format(s[0], s[1], s[6])) # ID, Tipo, Cidade
-            return
+    order_by = [("S.ID_Sede", 0, False)]
+    if simple_list:
+        paginate_terminal(conn, sql, order_by, ["ID", "Tipo", "Cidade"], [6, 16, 20],
+                          lambda s: (s[0], s[1], s[6]), empty_message="Nenhuma sede encontrada.") # ID, Tipo, Cidade
+        return
 
-        headers = ["ID Sede", "Tipo", "Telefone", "Rua", "Nº", "Bairro", "Cidade", "UF", "CEP"]
-        col_widths = [8, 15, 15, 20, 8, 15, 15, 5, 10]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
-        print(header_format.format(*headers))
-        print("-" * sum(col_widths))
-        for s in sedes:
-            s_formatted = [str(x) if x is not None else "" for x in s]
-            print(header_format.format(*s_formatted))
-    else:
-        print("Nenhuma sede encontrada.")
+    headers = ["ID Sede", "Tipo", "Telefone", "Rua", "Nº", "Bairro", "Cidade", "UF", "CEP"]
+    col_widths = [8, 15, 15, 20, 8, 15, 15, 5, 10]
+    paginate_terminal(conn, sql, order_by, headers, col_widths, empty_message="Nenhuma sede encontrada.")
 
-def update_headquarters_terminal(conn):
+@_com_retentativa
+def update_headquarters_terminal(conn, sede_id=None):
     print("\n--- Atualizar Sede ---")
-    sede_id = get_valid_input("Digite o ID da Sede a ser atualizada: ", int)
+    if sede_id is None:
+        sede_id = get_valid_input("Digite o ID da Sede a ser atualizada: ", int)
     if sede_id is None: return
 
     sql_get_sede = """
-    SELECT S.Tipo, S.Telefone, E.ID_Endereco, E.CEP, E.Estado, E.Cidade, E.Bairro, E.Rua, E.Numero, E.Complemento
+    SELECT S.Tipo, S.Telefone, E.ID_Endereco, E.CEP, E.Estado, E.Cidade, E.Bairro, E.Rua, E.Numero, E.Complemento,
+           S.Versao_Linha, E.Versao_Linha
     FROM Sede S INNER JOIN Endereco E ON S.ID_Endereco = E.ID_Endereco
     WHERE S.ID_Sede = ?;
     """
@@ -1027,12 +1199,16 @@ def update_headquarters_terminal(conn):
     new_complement = input(f"Complemento [{s_data[9] or ''}]: ").strip() or s_data[9]
 
     try:
-        sql_update_address = "UPDATE Endereco SET CEP=?, Estado=?, Cidade=?, Bairro=?, Rua=?, Numero=?, Complemento=? WHERE ID_Endereco=?;"
-        db_connection.execute_query(conn, sql_update_address, (new_cep, new_state, new_city, new_neighborhood, new_street, new_number, new_complement, address_id))
+        with db_connection.transaction(conn) as tx:
+            sql_update_address = "UPDATE Endereco SET CEP=?, Estado=?, Cidade=?, Bairro=?, Rua=?, Numero=?, Complemento=? WHERE ID_Endereco=? AND Versao_Linha=?;"
+            tx.compare_and_swap(sql_update_address, (new_cep, new_state, new_city, new_neighborhood, new_street, new_number, new_complement, address_id, s_data[11]))
 
-        sql_update_sede = "UPDATE Sede SET Tipo=?, Telefone=? WHERE ID_Sede=?;"
-        db_connection.execute_query(conn, sql_update_sede, (new_tipo_id, new_telefone, sede_id))
+            sql_update_sede = "UPDATE Sede SET Tipo=?, Telefone=? WHERE ID_Sede=? AND Versao_Linha=?;"
+            tx.compare_and_swap(sql_update_sede, (new_tipo_id, new_telefone, sede_id, s_data[10]))
         print("Sede e Endereço atualizados com sucesso!")
+    except db_connection.ConflitoVersaoError:
+        report_update_conflict("A sede (ou o seu endereço)")
+        return (sede_id,)
     except Exception as e:
         print(f"Erro inesperado ao atualizar sede: {e}")
 
@@ -1042,8 +1218,7 @@ def delete_headquarters_terminal(conn):
     if sede_id is None: return
 
     # Verificar dependências (Funcionario)
-    if db_connection.execute_query(conn, "SELECT 1 FROM Funcionario WHERE ID_Sede = ?", (sede_id,), fetch_results=True):
-        print("Erro: Sede está associada a funcionários. Desvincule-os primeiro.")
+    if not check_delete_dependencies(conn, "Sede", "Sede", {"ID_Sede": sede_id}):
         return
 
     address_id_data = db_connection.execute_query(conn, "SELECT ID_Endereco FROM Sede WHERE ID_Sede = ?", (sede_id,), fetch_results=True)
@@ -1057,41 +1232,49 @@ def delete_headquarters_terminal(conn):
         return
 
     try:
-        if db_connection.execute_query(conn, "DELETE FROM Sede WHERE ID_Sede = ?", (sede_id,)):
-            print("Sede deletada.")
+        with db_connection.transaction(conn) as tx:
+            if tx.execute("DELETE FROM Sede WHERE ID_Sede = ?", (sede_id,)) == 0:
+                raise RegistroNaoEncontrado
             address_id = address_id_data[0][0]
-            # Verificar se o endereço é usado por alguma Pessoa antes de deletar
-            if not db_connection.execute_query(conn, "SELECT 1 FROM Pessoa WHERE ID_Endereco = ?", (address_id,), fetch_results=True):
-                if db_connection.execute_query(conn, "DELETE FROM Endereco WHERE ID_Endereco = ?", (address_id,)):
-                    print("Endereço associado à sede deletado com sucesso.")
-                else:
-                    print("Aviso: Sede deletada, mas falha ao deletar endereço.")
+            # O endereço só sai se nada mais o referencia (Pessoa, Dados_Rastreamento...)
+            if not tx.contar_dependencias("Endereco", {"ID_Endereco": address_id}):
+                tx.execute("DELETE FROM Endereco WHERE ID_Endereco = ?", (address_id,))
+                address_outcome = "Endereço associado à sede deletado com sucesso."
             else:
-                print("Aviso: Sede deletada, mas o endereço não foi removido pois está em uso por Pessoas.")
-        else:
-            print("Erro: Falha ao deletar sede.")
+                address_outcome = "Aviso: Sede deletada, mas o endereço não foi removido pois está em uso por outra entidade."
+        # Só depois do commit, como em delete_person_terminal
+        print("Sede deletada.")
+        print(address_outcome)
+    except RegistroNaoEncontrado:
+        print("Erro: Sede não encontrada. Nenhuma alteração foi gravada.")
     except Exception as e:
-        print(f"Erro inesperado ao deletar sede: {e}")
+        print(f"Erro inesperado ao deletar sede. Nenhuma alteração foi gravada. ({e})")
 
 # --- Gerenciar Produtos a Serem Entregues ---
 def manage_products_terminal(conn):
-    options = ["Adicionar Produto", "Listar Produtos", "Atualizar Produto", "Deletar Produto"]
+    options = ["Adicionar Produto", "Listar Produtos", "Buscar Produtos (filtros)", "Atualizar Produto", "Deletar Produto"]
     while True:
         clear_screen()
         choice = display_menu("Gerenciar Produtos a Serem Entregues", options)
         if choice == 1: add_product_terminal(conn)
         elif choice == 2: list_products_terminal(conn)
-        elif choice == 3: update_product_terminal(conn)
-        elif choice == 4: delete_product_terminal(conn)
+        elif choice == 3: search_products_terminal(conn)
+        elif choice == 4: update_product_terminal(conn)
+        elif choice == 5: delete_product_terminal(conn)
         elif choice == 0: break
         press_enter_to_continue()
 
+# Todo evento copia o status e a data gravados na linha do produto, na mesma transação da alteração.
+SQL_REGISTRAR_STATUS = """
+INSERT INTO Historico_Status (ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Produto, Status_Entrega, Data_Ultimo_Status FROM Produto_A_Ser_Entregue WHERE ID_Produto = ?;
+"""
+
 def add_product_terminal(conn):
     print("\n--- Adicionar Novo Produto a Ser Entregue ---")
     peso = get_valid_input("Peso do produto (kg): ", float)
     
-    status_entrega_validos = ['Em Processamento', 'Aguardando Coleta', 'Em Transito', 'Entregue', 'Cancelado', 'Falha na Entrega']
-    status_entrega = get_valid_input(f"Status Inicial ({', '.join(status_entrega_validos)}): ", choices=status_entrega_validos)
+    status_entrega = get_valid_input(f"Status Inicial ({', '.join(StatusEntrega.nomes())}): ", StatusEntrega)
     
     data_chegada_cd_str = get_valid_input("Data de Chegada no Centro de Distribuição (AAAA-MM-DD): ")
     try:
@@ -1108,19 +1291,24 @@ def add_product_terminal(conn):
         except ValueError:
             print("Data prevista inválida. Deixando em branco.")
 
-    tipos_produto_validos = ['Fragil', 'Perecivel', 'Comum']
-    tipo_produto = get_valid_input(f"Tipo de Produto ({', '.join(tipos_produto_validos)}): ", choices=tipos_produto_validos)
+    tipo_produto = get_valid_input(f"Tipo de Produto ({', '.join(TipoProduto.nomes())}): ", TipoProduto)
 
     print("\n--- Remetente ---")
-    list_people_terminal(conn) # Ajuda a escolher
-    id_remetente = get_valid_input("Código Pessoa do Remetente (deve ser um Cliente existente): ", int)
+    remetente = pick_person_terminal(conn, "Remetente", clients_only=True)
+    if remetente is None:
+        print("Operação cancelada.")
+        return
+    id_remetente = remetente[0]
     if not db_connection.execute_query(conn, "SELECT 1 FROM Cliente WHERE Codigo_Pessoa = ?", (id_remetente,), fetch_results=True):
         print("Erro: Remetente não encontrado como Cliente.")
         return
 
     print("\n--- Destinatário ---")
-    list_people_terminal(conn) # Ajuda a escolher
-    id_destinatario = get_valid_input("Código Pessoa do Destinatário (Pessoa existente): ", int)
+    destinatario = pick_person_terminal(conn, "Destinatário")
+    if destinatario is None:
+        print("Operação cancelada.")
+        return
+    id_destinatario = destinatario[0]
     dest_pessoa_data = db_connection.execute_query(conn, "SELECT P.Nome, P.ID_Endereco, P.Telefone, C.CPF FROM Pessoa P LEFT JOIN Cliente C ON P.Codigo_Pessoa = C.Codigo_Pessoa WHERE P.Codigo_Pessoa = ?", (id_destinatario,), fetch_results=True)
     if not dest_pessoa_data:
         print("Erro: Destinatário (Pessoa) não encontrado.")
@@ -1157,55 +1345,47 @@ def add_product_terminal(conn):
         sql_motoristas = """
         SELECT F.Codigo_Funcionario, P.Nome 
         FROM Funcionario F JOIN Pessoa P ON F.Codigo_Funcionario = P.Codigo_Pessoa
-        WHERE F.Cargo = 'Motorista'
+        WHERE F.Cargo = ?
         ORDER BY P.Nome;
         """
-        motoristas = db_connection.execute_query(conn, sql_motoristas, fetch_results=True)
+        motoristas = db_connection.execute_query(conn, sql_motoristas, (Cargo.MOTORISTA,), fetch_results=True)
         if motoristas:
             print("\n--- Motoristas Disponíveis ---")
             for m_cod, m_nome in motoristas:
                 print(f"{m_cod} - {m_nome}")
             cod_motorista = get_valid_input("Código do Motorista (opcional): ", int, optional=True)
-            if cod_motorista and not db_connection.execute_query(conn, "SELECT 1 FROM Funcionario WHERE Codigo_Funcionario = ? AND Cargo = 'Motorista'", (cod_motorista,), fetch_results=True):
+            if cod_motorista and not db_connection.execute_query(conn, "SELECT 1 FROM Funcionario WHERE Codigo_Funcionario = ? AND Cargo = ?", (cod_motorista, Cargo.MOTORISTA), fetch_results=True):
                 print("Motorista inválido. Deixando sem motorista.")
                 cod_motorista = None
         else:
             print("Nenhum motorista cadastrado.")
 
+    sql_insert_rastreamento = """
+    INSERT INTO Dados_Rastreamento (Codigo_Rastreamento, Nome_Destinatario, CPF_Destinatario, ID_Endereco, Cidade, Estado, Telefone_Destinatario)
+    VALUES (?, ?, ?, ?, ?, ?, ?);
+    """
+    params_rastreamento = (cod_rastreamento, dr_nome_dest, dr_cpf_dest, dr_id_endereco, dr_cidade, dr_estado, dr_telefone_dest)
+    sql_insert_produto = """
+    INSERT INTO Produto_A_Ser_Entregue 
+    (Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Data_Ultimo_Status, Data_Atualizacao)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE(), GETDATE());
+    """
     try:
-        # 1. Inserir Dados_Rastreamento
-        sql_insert_rastreamento = """
-        INSERT INTO Dados_Rastreamento (Codigo_Rastreamento, Nome_Destinatario, CPF_Destinatario, ID_Endereco, Cidade, Estado, Telefone_Destinatario)
-        VALUES (?, ?, ?, ?, ?, ?, ?);
-        """
-        params_rastreamento = (cod_rastreamento, dr_nome_dest, dr_cpf_dest, dr_id_endereco, dr_cidade, dr_estado, dr_telefone_dest)
-        new_rastreamento_id = db_connection.execute_insert_and_get_last_id(conn, sql_insert_rastreamento, params_rastreamento)
-
-        if new_rastreamento_id:
+        # Dados_Rastreamento, Produto e o primeiro evento de status na mesma transação (sem rastreamento órfão se o produto falhar).
+        with db_connection.transaction(conn) as tx:
+            # 1. Inserir Dados_Rastreamento
+            new_rastreamento_id = tx.insert_and_get_id(sql_insert_rastreamento, params_rastreamento)
             # 2. Inserir Produto_A_Ser_Entregue
-            sql_insert_produto = """
-            INSERT INTO Produto_A_Ser_Entregue 
-            (Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
-            """
             params_produto = (peso, status_entrega, data_chegada_cd, data_prevista_entrega, tipo_produto, 
                               id_remetente, id_destinatario, cod_motorista, new_rastreamento_id)
-            
-            if db_connection.execute_query(conn, sql_insert_produto, params_produto):
-                print(f"Produto adicionado com sucesso! Código de Rastreamento: {cod_rastreamento}")
-            else:
-                print("Erro: Falha ao adicionar produto.")
-                # Idealmente, deletar o Dados_Rastreamento recém-criado.
-        else:
-            print("Erro: Falha ao criar dados de rastreamento.")
-
+            new_product_id = tx.insert_and_get_id(sql_insert_produto, params_produto)
+            # 3. Registrar o status inicial no histórico
+            tx.execute(SQL_REGISTRAR_STATUS, (new_product_id,))
+        print(f"Produto adicionado com sucesso! Código de Rastreamento: {cod_rastreamento}")
     except Exception as e:
-        print(f"Erro inesperado ao adicionar produto: {e}")
+        print(f"Erro: Falha ao adicionar produto. Nenhum dado foi gravado. ({e})")
 
-def list_products_terminal(conn, for_client_person_code=None):
-    print("\n--- Lista de Produtos a Serem Entregues ---")
-    
-    base_sql = """
+SQL_LISTAR_PRODUTOS = """
     SELECT 
         PROD.ID_Produto, PROD.Peso, PROD.Status_Entrega, PROD.Tipo_Produto,
         FORMAT(PROD.Data_Chegada_CD, 'dd/MM/yyyy') AS Data_Chegada_CD, 
@@ -1219,38 +1399,109 @@ def list_products_terminal(conn, for_client_person_code=None):
     LEFT JOIN Funcionario FMOT ON PROD.Codigo_Funcionario_Motorista = FMOT.Codigo_Funcionario
     LEFT JOIN Pessoa MOT ON FMOT.Codigo_Funcionario = MOT.Codigo_Pessoa
     """
-    params = []
-    if for_client_person_code:
-        base_sql += " WHERE PROD.ID_Remetente = ? OR PROD.ID_Destinatario = ?"
-        params.extend([for_client_person_code, for_client_person_code])
-    
-    base_sql += " ORDER BY PROD.ID_Produto DESC;"
 
-    products = db_connection.execute_query(conn, base_sql, tuple(params) if params else None, fetch_results=True)
+# A contagem só junta o rastreamento (para os filtros de código e cidade); sem filtro nele, o
+# SQL Server elimina a junção pela FK confiável.
+SQL_CONTAR_PRODUTOS = """
+    SELECT COUNT(*)
+    FROM Produto_A_Ser_Entregue PROD
+    INNER JOIN Dados_Rastreamento DR ON PROD.ID_Rastreamento = DR.ID_Rastreamento
+    """
 
-    if products:
-        headers = ["ID Prod", "Peso(kg)", "Status", "Tipo Prod", "Chegada CD", "Prev. Entrega", "Remetente", "Destinatário (Rastr.)", "Cód. Rastr.", "Motorista"]
-        col_widths = [8, 8, 18, 12, 12, 15, 20, 20, 20, 20]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
-        print(header_format.format(*headers))
-        print("-" * sum(col_widths))
-        for p in products:
-            p_formatted = [str(x) if x is not None else "" for x in (p[0], p[1], p[2], p[3], p[4], p[5], p[6], p[8], p[9], p[10])] # Ajuste nos índices para pegar Destinatario_Rastr
-            print(header_format.format(*p_formatted))
-    else:
-        if for_client_person_code:
-            print("Nenhum produto encontrado para você (como remetente ou destinatário).")
+def get_product_filters():
+    """
+    Pergunta os filtros da busca de produtos; Enter deixa o filtro de fora. Cada filtro vira uma
+    condição parametrizada sobre uma coluna indexada (ou de baixa cardinalidade, como o tipo).
+
+    Returns:
+        tuple: (filtros, parâmetros) no formato de paginate_terminal.
+    """
+    filters, params = [], []
+    statuses = get_domain_set("Status", StatusEntrega)
+    if statuses:
+        filters.append(f"PROD.Status_Entrega IN ({', '.join('?' * len(statuses))})")
+        params.extend(statuses)
+    product_type = get_valid_input(f"Tipo do produto ({', '.join(TipoProduto.nomes())}, Enter para todos): ", TipoProduto, optional=True)
+    if product_type is not None:
+        filters.append("PROD.Tipo_Produto = ?")
+        params.append(product_type)
+
+    # Intervalos de data (AAAA-MM-DD), com qualquer um dos extremos opcional
+    for column, label in (("PROD.Data_Chegada_CD", "chegada no CD"), ("PROD.Data_Prevista_Entrega", "entrega prevista")):
+        start = get_valid_input(f"Data de {label} a partir de (AAAA-MM-DD, opcional): ", date, optional=True)
+        end = get_valid_input(f"Data de {label} até (AAAA-MM-DD, opcional): ", date, optional=True)
+        if start is not None:
+            filters.append(f"{column} >= ?")
+            params.append(start)
+        if end is not None:
+            filters.append(f"{column} <= ?")
+            params.append(end)
+
+    for column, label in (("PROD.Codigo_Funcionario_Motorista", "Código do motorista"),
+                          ("PROD.ID_Remetente", "Código Pessoa do remetente"),
+                          ("PROD.ID_Destinatario", "Código Pessoa do destinatário")):
+        value = get_valid_input(f"{label} (opcional): ", int, optional=True)
+        if value is not None:
+            filters.append(f"{column} = ?")
+            params.append(value)
+
+    # Cidade e UF de entrega ficam na própria linha do rastreamento (IX_Rastreamento_Cidade)
+    state = get_valid_input("UF de entrega (opcional): ", optional=True)
+    if state:
+        filters.append("DR.Estado = ?")
+        params.append(state.upper())
+    city = get_valid_input("Cidade de entrega (opcional): ", optional=True)
+    if city:
+        filters.append("DR.Cidade = ?")
+        params.append(city)
+
+    # Prefixo do código: LIKE 'X%' usa o índice único do código; curingas digitados valem como texto
+    tracking_prefix = get_valid_input("Início do código de rastreamento (opcional): ", optional=True)
+    if tracking_prefix:
+        filters.append("DR.Codigo_Rastreamento LIKE ? ESCAPE '\\'")
+        params.append(re.sub(r"([\\%_\[])", r"\\\1", tracking_prefix) + '%')
+    return filters, params
+
+def search_products_terminal(conn):
+    print("\n--- Buscar Produtos ---")
+    print("Informe os filtros desejados (Enter para ignorar cada um).")
+    filters, params = get_product_filters()
+    mode = input("[L] Listar os produtos / [C] Só contar [L]: ").strip().upper()
+    if mode == 'C':
+        sql = SQL_CONTAR_PRODUTOS + (" WHERE " + " AND ".join(f"({f})" for f in filters) if filters else "")
+        result = db_connection.execute_query(conn, sql, tuple(params), fetch_results=True)
+        if result is None:
+            print("Erro ao contar os produtos.")
         else:
-            print("Nenhum produto encontrado.")
+            print(f"Produtos encontrados: {result[0][0]}")
+        return
+    list_products_terminal(conn, filters=filters, params=params)
+
+def list_products_terminal(conn, for_client_person_code=None, filters=(), params=()):
+    print("\n--- Lista de Produtos a Serem Entregues ---")
+    filters, params = list(filters), list(params)
+    empty_message = "Nenhum produto encontrado."
+    if for_client_person_code:
+        filters.append("PROD.ID_Remetente = ? OR PROD.ID_Destinatario = ?")
+        params.extend([for_client_person_code, for_client_person_code])
+        empty_message = "Nenhum produto encontrado para você (como remetente ou destinatário)."
 
-def update_product_terminal(conn):
+    headers = ["ID Prod", "Peso(kg)", "Status", "Tipo Prod", "Chegada CD", "Prev. Entrega", "Remetente", "Destinatário (Rastr.)", "Cód. Rastr.", "Motorista"]
+    col_widths = [8, 8, 18, 12, 12, 15, 20, 20, 20, 20]
+    paginate_terminal(conn, SQL_LISTAR_PRODUTOS, [("PROD.ID_Produto", 0, True)], headers, col_widths,
+                      lambda p: (p[0], p[1], StatusEntrega(p[2]), TipoProduto(p[3]), p[4], p[5], p[6], p[8], p[9], p[10]), # Ajuste nos índices para pegar Destinatario_Rastr
+                      filters, params, empty_message)
+
+@_com_retentativa
+def update_product_terminal(conn, product_id=None):
     print("\n--- Atualizar Produto a Ser Entregue ---")
-    product_id = get_valid_input("Digite o ID do Produto a ser atualizado: ", int)
+    if product_id is None:
+        product_id = get_valid_input("Digite o ID do Produto a ser atualizado: ", int)
     if product_id is None: return
 
     sql_get_prod = """
     SELECT Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, 
-           ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento
+           ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Versao_Linha
     FROM Produto_A_Ser_Entregue WHERE ID_Produto = ?;
     """
     current_data = db_connection.execute_query(conn, sql_get_prod, (product_id,), fetch_results=True)
@@ -1258,18 +1509,15 @@ def update_product_terminal(conn):
         print("Produto não encontrado.")
         return
     
-    p_data = current_data[0]
+    p_data = list(current_data[0])
+    p_data[1], p_data[4] = StatusEntrega(p_data[1]), TipoProduto(p_data[4])
     print(f"Atualizando Produto ID: {product_id}")
     print("Deixe em branco para manter o valor atual.")
 
     new_peso = input(f"Peso (kg) [{p_data[0]}]: ").strip()
     new_peso = float(new_peso) if new_peso else p_data[0]
 
-    status_entrega_validos = ['Em Processamento', 'Aguardando Coleta', 'Em Transito', 'Entregue', 'Cancelado', 'Falha na Entrega']
-    new_status = input(f"Status [{p_data[1]}] ({', '.join(status_entrega_validos)}): ").strip() or p_data[1]
-    if new_status not in status_entrega_validos:
-        print("Status inválido. Mantendo anterior.")
-        new_status = p_data[1]
+    new_status = get_domain_update("Status", StatusEntrega, p_data[1])
 
     new_data_chegada_cd_str = input(f"Data Chegada CD [{p_data[2]}] (AAAA-MM-DD): ").strip()
     new_data_chegada_cd = datetime.strptime(new_data_chegada_cd_str, '%Y-%m-%d').date() if new_data_chegada_cd_str else p_data[2]
@@ -1277,11 +1525,7 @@ def update_product_terminal(conn):
     new_data_prev_ent_str = input(f"Data Prev. Entrega [{p_data[3] or ''}] (AAAA-MM-DD): ").strip()
     new_data_prev_ent = datetime.strptime(new_data_prev_ent_str, '%Y-%m-%d').date() if new_data_prev_ent_str else p_data[3]
 
-    tipos_produto_validos = ['Fragil', 'Perecivel', 'Comum']
-    new_tipo_prod = input(f"Tipo Produto [{p_data[4]}] ({', '.join(tipos_produto_validos)}): ").strip() or p_data[4]
-    if new_tipo_prod not in tipos_produto_validos:
-        print("Tipo de produto inválido. Mantendo anterior.")
-        new_tipo_prod = p_data[4]
+    new_tipo_prod = get_domain_update("Tipo Produto", TipoProduto, p_data[4])
 
     # Remetente e Destinatário geralmente não são alterados após a criação.
     # Se necessário, seria uma lógica mais complexa ou cancelamento/recriação.
@@ -1289,8 +1533,8 @@ def update_product_terminal(conn):
     new_id_remetente, new_id_destinatario = p_data[5], p_data[6]
 
     # Motorista
-    sql_motoristas = "SELECT F.Codigo_Funcionario, P.Nome FROM Funcionario F JOIN Pessoa P ON F.Codigo_Funcionario = P.Codigo_Pessoa WHERE F.Cargo = 'Motorista' ORDER BY P.Nome;"
-    motoristas = db_connection.execute_query(conn, sql_motoristas, fetch_results=True)
+    sql_motoristas = "SELECT F.Codigo_Funcionario, P.Nome FROM Funcionario F JOIN Pessoa P ON F.Codigo_Funcionario = P.Codigo_Pessoa WHERE F.Cargo = ? ORDER BY P.Nome;"
+    motoristas = db_connection.execute_query(conn, sql_motoristas, (Cargo.MOTORISTA,), fetch_results=True)
     if motoristas:
         print("\n--- Motoristas Disponíveis ---")
         for m_cod, m_nome in motoristas: print(f"{m_cod} - {m_nome}")
@@ -1301,7 +1545,7 @@ def update_product_terminal(conn):
             val = int(new_cod_motorista_str)
             if val == 0:
                 new_cod_motorista = None
-            elif db_connection.execute_query(conn, "SELECT 1 FROM Funcionario WHERE Codigo_Funcionario = ? AND Cargo = 'Motorista'", (val,), fetch_results=True):
+            elif db_connection.execute_query(conn, "SELECT 1 FROM Funcionario WHERE Codigo_Funcionario = ? AND Cargo = ?", (val, Cargo.MOTORISTA), fetch_results=True):
                 new_cod_motorista = val
             else:
                 print("Motorista inválido. Mantendo anterior.")
@@ -1318,23 +1562,33 @@ def update_product_terminal(conn):
 
     sql_update_prod = """
     UPDATE Produto_A_Ser_Entregue 
-    SET Peso=?, Status_Entrega=?, Data_Chegada_CD=?, Data_Prevista_Entrega=?, Tipo_Produto=?, Codigo_Funcionario_Motorista=?
-    WHERE ID_Produto=?;
+    SET Peso=?, Status_Entrega=?, Data_Chegada_CD=?, Data_Prevista_Entrega=?, Tipo_Produto=?, Codigo_Funcionario_Motorista=?,
+        Data_Ultimo_Status = CASE WHEN Status_Entrega = ? THEN Data_Ultimo_Status ELSE GETDATE() END,
+        Data_Atualizacao = GETDATE() /* Marca o produto para a próxima carga analítica */
+    WHERE ID_Produto=? AND Versao_Linha=?;
     """
-    params = (new_peso, new_status, new_data_chegada_cd, new_data_prev_ent, new_tipo_prod, new_cod_motorista, product_id)
-    if db_connection.execute_query(conn, sql_update_prod, params):
+    params = (new_peso, new_status, new_data_chegada_cd, new_data_prev_ent, new_tipo_prod, new_cod_motorista, new_status, product_id, p_data[9])
+    try:
+        # A mudança de status e o seu evento no histórico são gravados juntos.
+        with db_connection.transaction(conn) as tx:
+            tx.compare_and_swap(sql_update_prod, params)
+            if new_status != p_data[1]:
+                tx.execute(SQL_REGISTRAR_STATUS, (product_id,))
         print("Produto atualizado com sucesso!")
-    else:
-        print("Erro: Falha ao atualizar produto.")
+    except db_connection.ConflitoVersaoError:
+        report_update_conflict("O produto")
+        return (product_id,)
+    except Exception as e:
+        print(f"Erro: Falha ao atualizar produto. Nenhuma alteração foi gravada. ({e})")
 
 def delete_product_terminal(conn):
     print("\n--- Deletar Produto a Ser Entregue ---")
     product_id = get_valid_input("Digite o ID do Produto a ser deletado: ", int)
     if product_id is None: return
 
-    # Verificar dependências (Carregamento)
-    if db_connection.execute_query(conn, "SELECT 1 FROM Carregamento WHERE ID_Produto = ?", (product_id,), fetch_results=True):
-        print("Erro: Produto está associado a um carregamento. Remova-o do carregamento primeiro.")
+    # Verificar dependências (Carregamento); o histórico de status é removido junto com o produto
+    if not check_delete_dependencies(conn, "Produto", "Produto_A_Ser_Entregue", {"ID_Produto": product_id},
+                                     ignore=("Historico_Status",)):
         return
 
     prod_data = db_connection.execute_query(conn, "SELECT ID_Rastreamento, Status_Entrega FROM Produto_A_Ser_Entregue WHERE ID_Produto = ?", (product_id,), fetch_results=True)
@@ -1343,9 +1597,9 @@ def delete_product_terminal(conn):
         return
     
     id_rastreamento = prod_data[0][0]
-    status_atual = prod_data[0][1]
+    status_atual = StatusEntrega(prod_data[0][1])
 
-    if status_atual not in ['Cancelado', 'Em Processamento']: # Regra de negócio exemplo
+    if status_atual not in (StatusEntrega.CANCELADO, StatusEntrega.EM_PROCESSAMENTO): # Regra de negócio exemplo
         print(f"Aviso: O produto está com status '{status_atual}'. A exclusão pode não ser permitida dependendo das regras de negócio.")
         if input("Continuar com a exclusão? (s/n): ").lower() != 's':
             print("Exclusão cancelada.")
@@ -1357,21 +1611,19 @@ def delete_product_terminal(conn):
         return
 
     try:
-        # 1. Deletar da tabela Carregamento (se houver constraint, ou se quiser limpar)
-        # db_connection.execute_query(conn, "DELETE FROM Carregamento WHERE ID_Produto = ?", (product_id,))
-        
-        # 2. Deletar Produto
-        if db_connection.execute_query(conn, "DELETE FROM Produto_A_Ser_Entregue WHERE ID_Produto = ?", (product_id,)):
-            print("Produto deletado.")
-            # 3. Deletar Dados_Rastreamento associados
-            if db_connection.execute_query(conn, "DELETE FROM Dados_Rastreamento WHERE ID_Rastreamento = ?", (id_rastreamento,)):
-                print("Dados de rastreamento associados deletados com sucesso.")
-            else:
-                print("Aviso: Produto deletado, mas falha ao deletar dados de rastreamento.")
-        else:
-            print("Erro: Falha ao deletar produto.")
+        # Histórico, Produto, Dados_Rastreamento e as cópias analíticas são removidos na mesma transação.
+        with db_connection.transaction(conn) as tx:
+            tx.execute("DELETE FROM Fato_Status WHERE ID_Produto = ?", (product_id,))
+            tx.execute("DELETE FROM Fato_Produto WHERE ID_Produto = ?", (product_id,))
+            tx.execute("DELETE FROM Historico_Status WHERE ID_Produto = ?", (product_id,))
+            if tx.execute("DELETE FROM Produto_A_Ser_Entregue WHERE ID_Produto = ?", (product_id,)) == 0:
+                raise RegistroNaoEncontrado # Desfaz os DELETEs de histórico e fatos acima
+            tx.execute("DELETE FROM Dados_Rastreamento WHERE ID_Rastreamento = ?", (id_rastreamento,))
+        print("Produto e dados de rastreamento associados deletados com sucesso.")
+    except RegistroNaoEncontrado:
+        print("Erro: Produto não encontrado. Nenhuma alteração foi gravada.")
     except Exception as e:
-        print(f"Erro inesperado ao deletar produto: {e}")
+        print(f"Erro: Falha ao deletar produto. Nenhuma alteração foi gravada. ({e})")
 
 # --- Gerenciar Dados de Rastreamento (CRUD mais para fins administrativos) ---
 def manage_tracking_terminal(conn):
@@ -1399,9 +1651,13 @@ def add_tracking_data_terminal(conn):
     cpf_dest = get_valid_input("CPF do Destinatário (opcional): ", optional=True)
     
     print("\n--- Endereço de Entrega (para o rastreamento) ---")
-    list_people_terminal(conn) # Mostrar pessoas para ajudar a encontrar um endereço existente
-    print("Você pode selecionar um ID de Endereço existente ou cadastrar um novo.")
-    id_endereco = get_valid_input("ID do Endereço de entrega (de um endereço já cadastrado): ", int)
+    print("Busque uma pessoa para usar o endereço dela, ou Enter para informar o ID de um endereço já cadastrado.")
+    pessoa_endereco = pick_person_terminal(conn, "Pessoa do endereço")
+    if pessoa_endereco:
+        id_endereco = pessoa_endereco[6]
+        print(f"Endereço de {pessoa_endereco[1]}: ID {id_endereco} ({pessoa_endereco[4]}/{pessoa_endereco[5]}).")
+    else:
+        id_endereco = get_valid_input("ID do Endereço de entrega (de um endereço já cadastrado): ", int)
     addr_data = db_connection.execute_query(conn, "SELECT Cidade, Estado FROM Endereco WHERE ID_Endereco = ?", (id_endereco,), fetch_results=True)
     if not addr_data:
         print("Erro: ID de Endereço não encontrado. Cadastre o endereço primeiro.")
@@ -1429,28 +1685,21 @@ def list_tracking_data_terminal(conn):
     FROM Dados_Rastreamento DR
     INNER JOIN Endereco E ON DR.ID_Endereco = E.ID_Endereco
     LEFT JOIN Produto_A_Ser_Entregue P ON DR.ID_Rastreamento = P.ID_Rastreamento /* Para ver se está associado */
-    ORDER BY DR.ID_Rastreamento DESC;
     """
-    tracking_data = db_connection.execute_query(conn, sql, fetch_results=True)
-    if tracking_data:
-        headers = ["ID Rastr.", "Cód. Rastr.", "Nome Dest.", "CPF Dest.", "ID End.", "Rua Entrega", "Nº", "Cidade Entr.", "UF", "Tel. Dest.", "ID Produto Assoc."]
-        col_widths = [10, 18, 20, 15, 8, 20, 8, 15, 5, 15, 15]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
-        print(header_format.format(*headers))
-        print("-" * sum(col_widths))
-        for td in tracking_data:
-            td_formatted = [str(x) if x is not None else "" for x in td]
-            print(header_format.format(*td_formatted))
-    else:
-        print("Nenhum dado de rastreamento encontrado.")
+    headers = ["ID Rastr.", "Cód. Rastr.", "Nome Dest.", "CPF Dest.", "ID End.", "Rua Entrega", "Nº", "Cidade Entr.", "UF", "Tel. Dest.", "ID Produto Assoc."]
+    col_widths = [10, 18, 20, 15, 8, 20, 8, 15, 5, 15, 15]
+    paginate_terminal(conn, sql, [("DR.ID_Rastreamento", 0, True)], headers, col_widths,
+                      empty_message="Nenhum dado de rastreamento encontrado.")
 
-def update_tracking_data_terminal(conn):
+@_com_retentativa
+def update_tracking_data_terminal(conn, tracking_id=None):
     print("\n--- Atualizar Dados de Rastreamento ---")
-    tracking_id = get_valid_input("Digite o ID de Rastreamento a ser atualizado: ", int)
+    if tracking_id is None:
+        tracking_id = get_valid_input("Digite o ID de Rastreamento a ser atualizado: ", int)
     if tracking_id is None: return
 
     sql_get_track = """
-    SELECT Codigo_Rastreamento, Nome_Destinatario, CPF_Destinatario, ID_Endereco, Cidade, Estado, Telefone_Destinatario
+    SELECT Codigo_Rastreamento, Nome_Destinatario, CPF_Destinatario, ID_Endereco, Cidade, Estado, Telefone_Destinatario, Versao_Linha
     FROM Dados_Rastreamento WHERE ID_Rastreamento = ?;
     """
     current_data = db_connection.execute_query(conn, sql_get_track, (tracking_id,), fetch_results=True)
@@ -1489,13 +1738,18 @@ def update_tracking_data_terminal(conn):
     sql_update_track = """
     UPDATE Dados_Rastreamento 
     SET Codigo_Rastreamento=?, Nome_Destinatario=?, CPF_Destinatario=?, ID_Endereco=?, Cidade=?, Estado=?, Telefone_Destinatario=?
-    WHERE ID_Rastreamento=?;
+    WHERE ID_Rastreamento=? AND Versao_Linha=?;
     """
-    params = (new_cod_rastr, new_nome_dest, new_cpf_dest, new_id_endereco, new_cidade, new_estado, new_tel_dest, tracking_id)
-    if db_connection.execute_query(conn, sql_update_track, params):
+    params = (new_cod_rastr, new_nome_dest, new_cpf_dest, new_id_endereco, new_cidade, new_estado, new_tel_dest, tracking_id, t_data[7])
+    try:
+        with db_connection.transaction(conn) as tx:
+            tx.compare_and_swap(sql_update_track, params)
         print("Dados de rastreamento atualizados com sucesso!")
-    else:
-        print("Erro: Falha ao atualizar dados de rastreamento.")
+    except db_connection.ConflitoVersaoError:
+        report_update_conflict("O rastreamento")
+        return (tracking_id,)
+    except Exception as e:
+        print(f"Erro: Falha ao atualizar dados de rastreamento. ({e})")
 
 def delete_tracking_data_terminal(conn):
     print("\n--- Deletar Dados de Rastreamento ---")
@@ -1537,229 +1791,236 @@ def manage_shipments_terminal(conn):
         press_enter_to_continue()
 
 def add_shipment_terminal(conn):
-    print("\n--- Adicionar Novo Carregamento ---")
-    list_available_vehicles(conn)
-    placa_veiculo = get_valid_input("Placa do Veículo para o carregamento: ", str.upper)
-    vehicle_data = db_connection.execute_query(conn, "SELECT Carga_Suportada, Status FROM Veiculo WHERE Placa_Veiculo = ?", (placa_veiculo,), fetch_results=True)
-    if not vehicle_data:
-        print("Erro: Veículo não encontrado.")
-        return
-    carga_max_veiculo, status_veiculo = vehicle_data[0]
-    # if status_veiculo == 'Indisponivel':
-    #     print(f"Aviso: Veículo {placa_veiculo} está atualmente Indisponível.")
-        # if input("Continuar mesmo assim? (s/n):").lower() != 's': return
-
-    data_carregamento_str = get_valid_input("Data do Carregamento (AAAA-MM-DD HH:MM, opcional, Enter para agora): ", optional=True)
-    data_carregamento = datetime.now()
-    if data_carregamento_str:
-        try:
-            data_carregamento = datetime.strptime(data_carregamento_str, '%Y-%m-%d %H:%M')
-        except ValueError:
-            print("Formato de data/hora inválido. Usando data/hora atual.")
+    print("\n--- Adicionar Carregamento ---")
+    id_evento = get_valid_input("ID de um carregamento existente para completar (Enter para criar um novo): ", int, optional=True)
+    if id_evento:
+        # O peso atual vem pronto do cabeçalho (mantido pelo banco), já com o que outras sessões carregaram.
+        sql_evento = """
+        SELECT E.Placa_Veiculo, E.Data_Carregamento, E.Peso_Total, V.Carga_Suportada
+        FROM Carregamento_Evento E JOIN Veiculo V ON E.Placa_Veiculo = V.Placa_Veiculo
+        WHERE E.ID_Carregamento_Evento = ?;
+        """
+        evento = db_connection.execute_query(conn, sql_evento, (id_evento,), fetch_results=True)
+        if not evento:
+            print("Erro: Carregamento não encontrado.")
+            return
+        placa_veiculo, data_carregamento, peso_total_carregamento, carga_max_veiculo = evento[0]
+    else:
+        list_available_vehicles(conn)
+        placa_veiculo = get_valid_input("Placa do Veículo para o carregamento: ", str.upper)
+        vehicle_data = db_connection.execute_query(conn, "SELECT Carga_Suportada, Status FROM Veiculo WHERE Placa_Veiculo = ?", (placa_veiculo,), fetch_results=True)
+        if not vehicle_data:
+            print("Erro: Veículo não encontrado.")
+            return
+        carga_max_veiculo, status_veiculo = vehicle_data[0]
+        # if status_veiculo == StatusVeiculo.INDISPONIVEL:
+        #     print(f"Aviso: Veículo {placa_veiculo} está atualmente Indisponível.")
+            # if input("Continuar mesmo assim? (s/n):").lower() != 's': return
+
+        data_carregamento_str = get_valid_input("Data do Carregamento (AAAA-MM-DD HH:MM, opcional, Enter para agora): ", optional=True)
+        data_carregamento = datetime.now()
+        if data_carregamento_str:
+            try:
+                data_carregamento = datetime.strptime(data_carregamento_str, '%Y-%m-%d %H:%M')
+            except ValueError:
+                print("Formato de data/hora inválido. Usando data/hora atual.")
+        peso_total_carregamento = Decimal('0') # Peso e Carga_Suportada chegam do banco como Decimal
 
     produtos_no_carregamento = []
-    peso_total_carregamento = 0.0
+    versoes_lidas = {} # ID_Produto -> Versao_Linha no momento em que a lista foi lida
+
+    # Produtos que podem ser adicionados (ex: status 'Em Processamento' ou 'Aguardando Coleta').
+    # A consulta roda uma única vez: o resultado vira um índice em memória por ID, do qual cada produto
+    # escolhido é retirado localmente. A versão da linha lida aqui é conferida de novo na gravação.
+    # Os status ficam como literais (não parâmetros) para o otimizador usar o índice filtrado IX_Produto_Pendentes.
+    sql_produtos_disponiveis = """
+    SELECT ID_Produto, Peso, Status_Entrega, Tipo_Produto, DR.Codigo_Rastreamento, P.Versao_Linha
+    FROM Produto_A_Ser_Entregue P
+    JOIN Dados_Rastreamento DR ON P.ID_Rastreamento = DR.ID_Rastreamento
+    WHERE P.Status_Entrega IN (1, 2) /* Em Processamento, Aguardando Coleta */
+      AND P.ID_Produto NOT IN (SELECT ID_Produto FROM Carregamento WHERE ID_Carregamento_Evento = ?) /* Já está neste carregamento */
+    ORDER BY P.ID_Produto;
+    """
+    candidatos = {linha[0]: linha for linha in db_connection.execute_query(conn, sql_produtos_disponiveis, (id_evento or 0,), fetch_results=True) or []}
 
+    headers = ["ID Prod", "Peso(kg)", "Status", "Tipo", "Cód. Rastr."]
+    col_widths = [8, 10, 18, 12, 20]
+    header_format = "".join([f"{{:<{w}}}" for w in col_widths])
+    mostrar_lista = True
     while True:
-        print("\n--- Adicionar Produto ao Carregamento ---")
-        print(f"Veículo: {placa_veiculo}, Carga Máx: {carga_max_veiculo}kg, Peso Atual: {peso_total_carregamento:.2f}kg")
-        
-        # Listar produtos que podem ser adicionados (ex: status 'Em Processamento' ou 'Aguardando Coleta')
-        sql_produtos_disponiveis = """
-        SELECT ID_Produto, Peso, Status_Entrega, Tipo_Produto, DR.Codigo_Rastreamento
-        FROM Produto_A_Ser_Entregue P
-        JOIN Dados_Rastreamento DR ON P.ID_Rastreamento = DR.ID_Rastreamento
-        WHERE P.Status_Entrega IN ('Em Processamento', 'Aguardando Coleta')
-          AND P.ID_Produto NOT IN (SELECT ID_Produto FROM Carregamento WHERE Placa_Veiculo = ? AND Data_Carregamento = ?) /* Evitar adicionar o mesmo produto duas vezes no mesmo carregamento */
-          AND P.ID_Produto NOT IN ({}) /* Evitar adicionar produtos já selecionados para este carregamento */
-        ORDER BY P.ID_Produto;
-        """.format(','.join(map(str, produtos_no_carregamento)) if produtos_no_carregamento else '0') # Placeholder se lista vazia
-
-        # print(sql_produtos_disponiveis) # Debug
-        # print(placa_veiculo, data_carregamento) # Debug
-
-        available_products = db_connection.execute_query(conn, sql_produtos_disponiveis, (placa_veiculo, data_carregamento), fetch_results=True)
-        
-        if not available_products:
+        if not candidatos:
             print("Nenhum produto disponível para adicionar (ou todos já foram selecionados).")
             if not produtos_no_carregamento: # Se nenhum produto foi adicionado ainda, cancela
                 return
-            break 
-        
-        print("\nProdutos disponíveis para este carregamento:")
-        headers = ["ID Prod", "Peso(kg)", "Status", "Tipo", "Cód. Rastr."]
-        col_widths = [8, 10, 18, 12, 20]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
-        print(header_format.format(*headers))
-        print("-" * sum(col_widths))
-        prod_dict = {}
-        for p_id, p_peso, p_status, p_tipo, p_rastr in available_products:
-            prod_dict[p_id] = {'peso': p_peso, 'status': p_status, 'tipo': p_tipo, 'rastr': p_rastr}
-            print(header_format.format(p_id, p_peso, p_status, p_tipo, p_rastr))
+            break
 
-        id_produto_str = input("Digite o ID do Produto para adicionar (ou 0 para finalizar): ").strip()
-        if not id_produto_str.isdigit():
+        if mostrar_lista:
+            print("\n--- Adicionar Produto ao Carregamento ---")
+            print(f"Veículo: {placa_veiculo}, Carga Máx: {carga_max_veiculo}kg, Peso Atual: {peso_total_carregamento:.2f}kg")
+            print("\nProdutos disponíveis para este carregamento:")
+            print(header_format.format(*headers))
+            print("-" * sum(col_widths))
+            for p_id, p_peso, p_status, p_tipo, p_rastr, _ in candidatos.values():
+                print(header_format.format(p_id, p_peso, str(StatusEntrega(p_status)), str(TipoProduto(p_tipo)), p_rastr))
+            mostrar_lista = False
+
+        id_produto_str = input("ID(s) do Produto para adicionar, separados por espaço ('L' para listar de novo, 0 para finalizar): ").strip()
+        if id_produto_str.upper() == 'L':
+            mostrar_lista = True
+            continue
+        ids_digitados = id_produto_str.replace(',', ' ').split()
+        if not ids_digitados or not all(i.isdigit() for i in ids_digitados):
             print("ID inválido.")
             continue
-        id_produto = int(id_produto_str)
 
-        if id_produto == 0:
+        if ids_digitados == ['0']:
             if not produtos_no_carregamento:
                 print("Nenhum produto adicionado ao carregamento.")
                 return
             break
-        
-        if id_produto not in prod_dict:
-            print("Produto não disponível ou ID inválido.")
-            continue
-        
-        produto_selecionado = prod_dict[id_produto]
-        if peso_total_carregamento + produto_selecionado['peso'] > carga_max_veiculo:
-            print(f"Erro: Adicionar este produto ({produto_selecionado['peso']}kg) excederia a carga suportada do veículo ({carga_max_veiculo}kg).")
-            print(f"Espaço restante: {carga_max_veiculo - peso_total_carregamento:.2f}kg")
-            continue
-        
-        # Adicionar à lista e atualizar peso
-        produtos_no_carregamento.append(id_produto)
-        peso_total_carregamento += produto_selecionado['peso']
-        print(f"Produto ID {id_produto} adicionado. Peso total atual: {peso_total_carregamento:.2f}kg")
+
+        for id_produto in map(int, ids_digitados):
+            produto_selecionado = candidatos.get(id_produto)
+            if produto_selecionado is None:
+                print(f"Produto {id_produto} não disponível ou ID inválido.")
+                continue
+            peso_produto = produto_selecionado[1]
+            if peso_total_carregamento + peso_produto > carga_max_veiculo:
+                print(f"Erro: Adicionar o produto {id_produto} ({peso_produto}kg) excederia a carga suportada do veículo ({carga_max_veiculo}kg).")
+                print(f"Espaço restante: {carga_max_veiculo - peso_total_carregamento:.2f}kg")
+                continue
+
+            # Adicionar à lista e atualizar peso
+            produtos_no_carregamento.append(id_produto)
+            versoes_lidas[id_produto] = produto_selecionado[5]
+            del candidatos[id_produto]
+            peso_total_carregamento += peso_produto
+            print(f"Produto ID {id_produto} adicionado. Peso total atual: {peso_total_carregamento:.2f}kg")
 
     if not produtos_no_carregamento:
         print("Nenhum produto selecionado para o carregamento.")
         return
 
+    # Cabeçalho e itens na mesma transação: ou o carregamento é gravado inteiro, ou nada é.
+    # Peso_Total e Quantidade_Itens são mantidos por triggers, que também recusam os itens se a carga
+    # do veículo for excedida (inclusive por itens que outra sessão gravou enquanto este foi montado).
+    sql_insert_evento = "INSERT INTO Carregamento_Evento (Placa_Veiculo, Data_Carregamento) VALUES (?, ?);"
+    sql_insert_carreg = "INSERT INTO Carregamento (ID_Carregamento_Evento, ID_Produto) VALUES (?, ?);"
     try:
-        # Inserir cada produto no carregamento
-        # O ID_Carregamento é auto-incremental, então cada linha na tabela Carregamento
-        # representa um item de um carregamento específico (identificado por Placa_Veiculo e Data_Carregamento).
-        # O script SQL original tem ID_Carregamento como PK, e uma constraint UNIQUE (Placa_Veiculo, ID_Produto, Data_Carregamento).
-        # Isso significa que um produto só pode estar uma vez em um "evento de carregamento" específico.
-        
-        num_sucessos = 0
-        for prod_id in produtos_no_carregamento:
-            sql_insert_carreg = "INSERT INTO Carregamento (Placa_Veiculo, ID_Produto, Data_Carregamento) VALUES (?, ?, ?);"
-            if db_connection.execute_query(conn, sql_insert_carreg, (placa_veiculo, prod_id, data_carregamento)):
-                num_sucessos += 1
-                # Opcional: Atualizar status do produto para 'Em Transito' ou similar
-                # db_connection.execute_query(conn, "UPDATE Produto_A_Ser_Entregue SET Status_Entrega = 'Em Transito' WHERE ID_Produto = ?", (prod_id,))
-            else:
-                print(f"Aviso: Falha ao adicionar produto ID {prod_id} ao carregamento (pode já existir para esta data/veículo).")
-        
-        if num_sucessos > 0:
-            print(f"{num_sucessos} produto(s) registrados no carregamento para o veículo {placa_veiculo} em {data_carregamento.strftime('%d/%m/%Y %H:%M')}.")
-            # Opcional: Atualizar status do veículo para 'Indisponivel' ou 'Em Rota'
-            # db_connection.execute_query(conn, "UPDATE Veiculo SET Status = 'Indisponivel' WHERE Placa_Veiculo = ?", (placa_veiculo,))
-        else:
-            print("Nenhum produto foi efetivamente adicionado ao carregamento.")
-
+        with db_connection.transaction(conn) as tx:
+            # A lista foi lida uma vez só: antes de gravar, confere (em blocos de IN) se cada produto
+            # escolhido continua com a versão lida, e recusa os que outra sessão alterou ou removeu.
+            # UPDLOCK, HOLDLOCK mantém as linhas conferidas travadas até o commit, para que nenhuma
+            # mude entre a conferência e a inclusão dos itens.
+            tamanho_bloco = db_connection.obter_backend().max_parametros_por_comando
+            versoes_atuais = {}
+            for inicio in range(0, len(produtos_no_carregamento), tamanho_bloco):
+                bloco = produtos_no_carregamento[inicio:inicio + tamanho_bloco]
+                sql_versoes = (f"SELECT ID_Produto, Versao_Linha FROM Produto_A_Ser_Entregue WITH (UPDLOCK, HOLDLOCK) "
+                               f"WHERE ID_Produto IN ({', '.join('?' * len(bloco))});")
+                versoes_atuais.update(tx.fetchall(sql_versoes, bloco))
+            alterados = {p for p in produtos_no_carregamento if versoes_atuais.get(p) != versoes_lidas[p]}
+            if alterados:
+                print(f"Aviso: {len(alterados)} produto(s) foram alterados ou removidos desde que a lista foi lida e ficaram de fora: {', '.join(map(str, sorted(alterados)))}")
+                produtos_no_carregamento = [p for p in produtos_no_carregamento if p not in alterados]
+                if not produtos_no_carregamento:
+                    print("Nenhum produto restante para o carregamento. Nada foi gravado.")
+                    return
+            if not id_evento:
+                id_evento = tx.insert_and_get_id(sql_insert_evento, (placa_veiculo, data_carregamento))
+            # Todos os itens vão em lote (fast_executemany), em uma única ida ao servidor.
+            tx.executemany(sql_insert_carreg, [(id_evento, prod_id) for prod_id in produtos_no_carregamento])
+        _, _, quantidade, peso_total = get_shipment_header(conn, id_evento)
+        print(f"Carregamento ID {id_evento}: {len(produtos_no_carregamento)} produto(s) registrados no veículo {placa_veiculo} em {data_carregamento.strftime('%d/%m/%Y %H:%M')}.")
+        print(f"Total do carregamento: {quantidade} produto(s), {peso_total:.2f}kg de {carga_max_veiculo}kg.")
+        # Opcional: Atualizar status dos produtos para 'Em Transito' ou similar
+        # Opcional: Atualizar status do veículo para 'Indisponivel' ou 'Em Rota'
     except Exception as e:
-        print(f"Erro inesperado ao adicionar carregamento: {e}")
+        print(f"Erro: Falha ao registrar o carregamento. Nenhum dado foi gravado. ({e})")
 
 def list_shipments_terminal(conn):
-    print("\n--- Lista de Carregamentos (Agrupados por Veículo e Data) ---")
-    # Agrupa para mostrar "eventos" de carregamento
+    print("\n--- Lista de Carregamentos ---")
+    # Os totais vêm prontos do cabeçalho: não há agrupamento dos itens a cada listagem.
     sql = """
-    SELECT 
-        C.Placa_Veiculo, 
-        FORMAT(C.Data_Carregamento, 'dd/MM/yyyy HH:mm') AS DataHora_Carregamento,
-        COUNT(C.ID_Produto) AS Quantidade_Produtos,
-        SUM(P.Peso) AS Peso_Total_Estimado_kg,
-        V.Tipo AS Tipo_Veiculo,
-        GROUP_CONCAT(P.ID_Produto) AS IDs_Produtos /* SQLite specific, SQL Server uses STRING_AGG */
-        /* Para SQL Server: STRING_AGG(CAST(P.ID_Produto AS VARCHAR(10)), ', ') WITHIN GROUP (ORDER BY P.ID_Produto) AS IDs_Produtos */
-    FROM Carregamento C
-    JOIN Produto_A_Ser_Entregue P ON C.ID_Produto = P.ID_Produto
-    JOIN Veiculo V ON C.Placa_Veiculo = V.Placa_Veiculo
-    GROUP BY C.Placa_Veiculo, C.Data_Carregamento, V.Tipo
-    ORDER BY C.Data_Carregamento DESC, C.Placa_Veiculo;
-    """
-    # Nota: GROUP_CONCAT é do SQLite. Para SQL Server, seria STRING_AGG.
-    # Como o pyodbc pode estar conectado a diferentes bancos, a query pode precisar de ajuste.
-    # Para simplificar a exibição no terminal sem STRING_AGG, vamos listar individualmente ou buscar detalhes.
-
-    # Query simplificada para listar todos os registros de Carregamento:
-    sql_simple = """
-    SELECT C.ID_Carregamento, C.Placa_Veiculo, FORMAT(C.Data_Carregamento, 'dd/MM/yyyy HH:mm') AS DataHora,
-           C.ID_Produto, P.Tipo_Produto, P.Peso, DR.Codigo_Rastreamento
-    FROM Carregamento C
-    JOIN Produto_A_Ser_Entregue P ON C.ID_Produto = P.ID_Produto
-    JOIN Dados_Rastreamento DR ON P.ID_Rastreamento = DR.ID_Rastreamento
-    ORDER BY C.Data_Carregamento DESC, C.Placa_Veiculo, C.ID_Carregamento;
+    SELECT E.ID_Carregamento_Evento, E.Placa_Veiculo, V.Tipo AS Tipo_Veiculo,
+           FORMAT(E.Data_Carregamento, 'dd/MM/yyyy HH:mm') AS DataHora,
+           E.Quantidade_Itens, E.Peso_Total, E.Data_Carregamento
+    FROM Carregamento_Evento E
+    JOIN Veiculo V ON E.Placa_Veiculo = V.Placa_Veiculo
     """
-    shipments = db_connection.execute_query(conn, sql_simple, fetch_results=True)
-
-    if shipments:
-        print("Cada linha representa um produto em um carregamento.")
-        headers = ["ID Carreg.", "Placa Veíc.", "Data/Hora Carreg.", "ID Prod.", "Tipo Prod.", "Peso Prod.", "Cód. Rastr."]
-        col_widths = [10, 12, 18, 8, 15, 10, 20]
-        header_format = "".join([f"{{:<{w}}}" for w in col_widths])
-        print(header_format.format(*headers))
-        print("-" * sum(col_widths))
-        for s in shipments:
-            s_formatted = [str(x) if x is not None else "" for x in s]
-            print(header_format.format(*s_formatted))
-        print("\nUse 'Detalhes do Carregamento' para ver agrupado.")
-    else:
-        print("Nenhum carregamento encontrado.")
-
-def shipment_details_terminal(conn):
+    headers = ["ID Carreg.", "Placa Veíc.", "Tipo Veíc.", "Data/Hora Carreg.", "Qtd. Itens", "Peso Total(kg)"]
+    col_widths = [12, 12, 12, 20, 12, 15]
+    # A data crua (última coluna) é a chave da página; a formatada é só para exibição (IX_Carregamento_Evento_Data)
+    order_by = [("E.Data_Carregamento", 6, True, "CAST(? AS DATETIME)"), ("E.ID_Carregamento_Evento", 0, True)]
+    if paginate_terminal(conn, sql, order_by, headers, col_widths,
+                         lambda s: (s[0], s[1], TipoVeiculo(s[2])) + tuple(s[3:6]), empty_message="Nenhum carregamento encontrado."):
+        print("\nUse 'Detalhes do Carregamento' para ver os produtos de um carregamento.")
+
+def get_shipment_header(conn, id_evento):
+    """Busca o cabeçalho do carregamento pela PK: (Placa_Veiculo, Data_Carregamento, Quantidade_Itens, Peso_Total) ou None."""
+    sql = "SELECT Placa_Veiculo, Data_Carregamento, Quantidade_Itens, Peso_Total FROM Carregamento_Evento WHERE ID_Carregamento_Evento = ?"
+    header = db_connection.execute_query(conn, sql, (id_evento,), fetch_results=True)
+    return header[0] if header else None
+
+def shipment_details_terminal(conn, id_evento=None):
     print("\n--- Detalhes do Carregamento ---")
-    placa = get_valid_input("Placa do Veículo: ", str.upper)
-    data_carreg_str = get_valid_input("Data do Carregamento (AAAA-MM-DD HH:MM): ")
-    try:
-        data_carreg = datetime.strptime(data_carreg_str, '%Y-%m-%d %H:%M')
-    except ValueError:
-        print("Formato de data/hora inválido.")
-        return
+    if id_evento is None:
+        id_evento = get_valid_input("ID do Carregamento: ", int)
+    header = get_shipment_header(conn, id_evento)
+    if not header:
+        print("Carregamento não encontrado.")
+        return False
+    placa, data_carreg, quantidade, peso_total = header
 
     sql_details = """
     SELECT C.ID_Carregamento, C.ID_Produto, P.Tipo_Produto, P.Peso, P.Status_Entrega, DR.Codigo_Rastreamento
     FROM Carregamento C
     JOIN Produto_A_Ser_Entregue P ON C.ID_Produto = P.ID_Produto
     JOIN Dados_Rastreamento DR ON P.ID_Rastreamento = DR.ID_Rastreamento
-    WHERE C.Placa_Veiculo = ? AND C.Data_Carregamento = ?
+    WHERE C.ID_Carregamento_Evento = ?
     ORDER BY C.ID_Produto;
     """
-    details = db_connection.execute_query(conn, sql_details, (placa, data_carreg), fetch_results=True)
+    details = db_connection.execute_query(conn, sql_details, (id_evento,), fetch_results=True)
 
+    print(f"\nCarregamento ID {id_evento} - Veículo: {placa}, Data: {data_carreg.strftime('%d/%m/%Y %H:%M')}")
     if details:
-        print(f"\nDetalhes do Carregamento - Veículo: {placa}, Data: {data_carreg.strftime('%d/%m/%Y %H:%M')}")
         headers = ["ID Carreg. (Item)", "ID Prod.", "Tipo Prod.", "Peso Prod.", "Status Prod.", "Cód. Rastr."]
         col_widths = [18, 8, 15, 10, 18, 20]
         header_format = "".join([f"{{:<{w}}}" for w in col_widths])
         print(header_format.format(*headers))
         print("-" * sum(col_widths))
-        total_peso = 0
         for d_id_carr, d_id_prod, d_tipo, d_peso, d_status, d_rastr in details:
-            print(header_format.format(d_id_carr, d_id_prod, d_tipo, d_peso, d_status, d_rastr))
-            total_peso += d_peso
+            print(header_format.format(d_id_carr, d_id_prod, str(TipoProduto(d_tipo)), d_peso, str(StatusEntrega(d_status)), d_rastr))
         print("-" * sum(col_widths))
-        print(f"Total de Produtos: {len(details)}, Peso Total Estimado: {total_peso:.2f} kg")
     else:
-        print("Nenhum detalhe encontrado para este veículo e data de carregamento.")
+        print("Este carregamento não tem produtos.")
+    if len(details or []) < quantidade:
+        print(f"({quantidade - len(details or [])} produto(s) deste carregamento já foram arquivados.)")
+    print(f"Total de Produtos: {quantidade}, Peso Total: {peso_total:.2f} kg")
+    return True
 
 def remove_product_from_shipment_terminal(conn):
     print("\n--- Remover Produto do Carregamento ---")
-    # Para remover, precisamos do ID_Carregamento específico do item,
-    # ou da combinação Placa, Data E ID_Produto.
-    # A tabela Carregamento tem ID_Carregamento como PK.
-    
-    list_shipments_terminal(conn) # Mostra todos os itens para ajudar a escolher
+    id_evento = get_valid_input("ID do Carregamento: ", int)
+    if not shipment_details_terminal(conn, id_evento): # Mostra os itens para ajudar a escolher
+        return
     id_carregamento_item = get_valid_input("Digite o ID do Item de Carregamento a ser removido (da lista acima): ", int)
     if id_carregamento_item is None: return
 
-    item_data = db_connection.execute_query(conn, "SELECT Placa_Veiculo, ID_Produto, Data_Carregamento FROM Carregamento WHERE ID_Carregamento = ?", (id_carregamento_item,), fetch_results=True)
+    sql_item = "SELECT ID_Produto FROM Carregamento WHERE ID_Carregamento = ? AND ID_Carregamento_Evento = ?"
+    item_data = db_connection.execute_query(conn, sql_item, (id_carregamento_item, id_evento), fetch_results=True)
     if not item_data:
-        print("Item de carregamento não encontrado.")
+        print("Item não encontrado neste carregamento.")
         return
     
-    placa, prod_id, data_carr = item_data[0]
-    confirm = input(f"Tem certeza que deseja remover o produto ID {prod_id} do carregamento do veículo {placa} de {data_carr.strftime('%d/%m/%Y %H:%M')} (Item ID: {id_carregamento_item})? (s/n): ").lower()
+    prod_id = item_data[0][0]
+    confirm = input(f"Tem certeza que deseja remover o produto ID {prod_id} do carregamento ID {id_evento} (Item ID: {id_carregamento_item})? (s/n): ").lower()
     if confirm != 's':
         print("Remoção cancelada.")
         return
     
-    if db_connection.execute_query(conn, "DELETE FROM Carregamento WHERE ID_Carregamento = ?", (id_carregamento_item,)):
+    # Os totais do cabeçalho são atualizados pelo trigger de Carregamento.
+    if db_connection.execute_query(conn, "DELETE FROM Carregamento WHERE ID_Carregamento = ? AND ID_Carregamento_Evento = ?", (id_carregamento_item, id_evento)):
         print("Produto removido do carregamento com sucesso.")
         # Opcional: Atualizar status do produto se necessário
     else:
@@ -1767,30 +2028,29 @@ def remove_product_from_shipment_terminal(conn):
 
 def delete_shipment_terminal(conn):
     print("\n--- Deletar Carregamento Completo (Todos os Produtos) ---")
-    placa = get_valid_input("Placa do Veículo do carregamento a ser deletado: ", str.upper)
-    data_carreg_str = get_valid_input("Data do Carregamento (AAAA-MM-DD HH:MM) a ser deletado: ")
-    try:
-        data_carreg = datetime.strptime(data_carreg_str, '%Y-%m-%d %H:%M')
-    except ValueError:
-        print("Formato de data/hora inválido.")
-        return
-
-    # Verificar se existem itens para este carregamento
-    items = db_connection.execute_query(conn, "SELECT ID_Carregamento FROM Carregamento WHERE Placa_Veiculo = ? AND Data_Carregamento = ?", (placa, data_carreg), fetch_results=True)
-    if not items:
-        print("Nenhum carregamento encontrado para este veículo e data para deletar.")
+    id_evento = get_valid_input("ID do Carregamento a ser deletado: ", int)
+    header = get_shipment_header(conn, id_evento)
+    if not header:
+        print("Carregamento não encontrado.")
         return
+    placa, data_carreg, quantidade, _ = header
 
-    confirm = input(f"Tem certeza que deseja deletar TODOS os {len(items)} produtos do carregamento do veículo {placa} de {data_carreg.strftime('%d/%m/%Y %H:%M')}? (s/n): ").lower()
+    confirm = input(f"Tem certeza que deseja deletar o carregamento ID {id_evento} ({quantidade} produto(s), veículo {placa}, {data_carreg.strftime('%d/%m/%Y %H:%M')})? (s/n): ").lower()
     if confirm != 's':
         print("Exclusão cancelada.")
         return
     
-    if db_connection.execute_query(conn, "DELETE FROM Carregamento WHERE Placa_Veiculo = ? AND Data_Carregamento = ?", (placa, data_carreg)):
-        print(f"Carregamento de {data_carreg.strftime('%d/%m/%Y %H:%M')} para o veículo {placa} deletado com sucesso.")
+    try:
+        # Itens (inclusive os já arquivados), cabeçalho e cópia analítica são removidos na mesma transação.
+        with db_connection.transaction(conn) as tx:
+            tx.execute("DELETE FROM Fato_Carregamento WHERE ID_Carregamento_Evento = ?", (id_evento,))
+            tx.execute("DELETE FROM Carregamento WHERE ID_Carregamento_Evento = ?", (id_evento,))
+            tx.execute("DELETE FROM Carregamento_Arquivo WHERE ID_Carregamento_Evento = ?", (id_evento,))
+            tx.execute("DELETE FROM Carregamento_Evento WHERE ID_Carregamento_Evento = ?", (id_evento,))
+        print(f"Carregamento ID {id_evento} deletado com sucesso.")
         # Opcional: Atualizar status dos produtos e do veículo se necessário
-    else:
-        print("Erro ao deletar o carregamento.")
+    except Exception as e:
+        print(f"Erro ao deletar o carregamento. Nenhuma alteração foi gravada. ({e})")
 
 
 # ------------------- SELF-SERVICE CLIENTE ----------------------
@@ -1848,50 +2108,22 @@ def cadastro_cliente_self_service(conn):
         print("As senhas não coincidem. Cadastro cancelado.")
         return
 
+    sql_endereco = "INSERT INTO Endereco (CEP, Estado, Cidade, Bairro, Rua, Numero, Complemento) VALUES (?, ?, ?, ?, ?, ?, ?)"
+    sql_pessoa = "INSERT INTO Pessoa (Nome, RG, Telefone, Email, ID_Endereco) VALUES (?, ?, ?, ?, ?)"
+    sql_cliente = "INSERT INTO Cliente (Codigo_Pessoa, Tipo_Cliente, CPF, Data_Nascimento, CNPJ, Nome_Empresa) VALUES (?, ?, ?, ?, ?, ?)"
+    sql_usuario = "INSERT INTO Usuario (Login, Senha_Hash, Codigo_Pessoa, Tipo_Usuario) VALUES (?, ?, ?, ?)"
+    hashed_senha = hash_password(senha)
     try:
-        # Iniciar transação (conceitualmente, pyodbc não tem begin explicito fácil, commit/rollback no final)
-        
-        # Inserir Endereço
-        sql_endereco = "INSERT INTO Endereco (CEP, Estado, Cidade, Bairro, Rua, Numero, Complemento) VALUES (?, ?, ?, ?, ?, ?, ?)"
-        endereco_id = db_connection.execute_insert_and_get_last_id(conn, sql_endereco, (cep, estado, cidade, bairro, rua, numero, complemento))
-        if not endereco_id:
-            print("Erro crítico ao salvar endereço. Cadastro cancelado.")
-            conn.rollback() # Garantir rollback se algo deu errado
-            return
-
-        # Inserir Pessoa
-        sql_pessoa = "INSERT INTO Pessoa (Nome, RG, Telefone, Email, ID_Endereco) VALUES (?, ?, ?, ?, ?)"
-        pessoa_id = db_connection.execute_insert_and_get_last_id(conn, sql_pessoa, (nome, rg, telefone, email, endereco_id))
-        if not pessoa_id:
-            print("Erro crítico ao salvar dados pessoais. Cadastro cancelado.")
-            conn.rollback()
-            return
-            
-        # Inserir Cliente
-        sql_cliente = "INSERT INTO Cliente (Codigo_Pessoa, Tipo_Cliente, CPF, Data_Nascimento, CNPJ, Nome_Empresa) VALUES (?, ?, ?, ?, ?, ?)"
-        if not db_connection.execute_query(conn, sql_cliente, (pessoa_id, tipo_cliente, cpf, data_nasc_obj, cnpj, nome_empresa)):
-            print("Erro crítico ao salvar dados de cliente. Verifique os campos e tente novamente. Cadastro cancelado.")
-            conn.rollback()
-            return
-
-        # Inserir Usuário
-        hashed_senha = hash_password(senha)
-        sql_usuario = "INSERT INTO Usuario (Login, Senha_Hash, Codigo_Pessoa, Tipo_Usuario) VALUES (?, ?, ?, ?)"
-        if not db_connection.execute_query(conn, sql_usuario, (login, hashed_senha, pessoa_id, 'Cliente')):
-            print("Erro crítico ao criar seu usuário de acesso. Cadastro cancelado.")
-            conn.rollback()
-            return
-
-        # conn.commit() # Se tudo deu certo até aqui. execute_query e execute_insert_and_get_last_id já fazem commit individual.
-        # Para uma transação real, o commit seria único no final.
+        # Endereço, Pessoa, Cliente e Usuário em uma única transação: qualquer falha desfaz tudo.
+        with db_connection.transaction(conn) as tx:
+            endereco_id = tx.insert_and_get_id(sql_endereco, (cep, estado, cidade, bairro, rua, numero, complemento))
+            pessoa_id = tx.insert_and_get_id(sql_pessoa, (nome, rg, telefone, email, endereco_id))
+            tx.execute(sql_cliente, (pessoa_id, tipo_cliente, cpf, data_nasc_obj, cnpj, nome_empresa))
+            tx.execute(sql_usuario, (login, hashed_senha, pessoa_id, TipoUsuario.CLIENTE))
         print("\nCadastro realizado com sucesso! Você já pode fazer login com seu novo usuário e senha.")
 
     except Exception as e:
-        print(f"Ocorreu um erro inesperado durante o cadastro: {e}")
-        try:
-            conn.rollback() # Tenta reverter em caso de erro inesperado
-        except Exception as rb_e:
-            print(f"Erro adicional ao tentar reverter transação: {rb_e}")
+        print(f"Erro ao salvar o cadastro. Verifique os campos e tente novamente. Cadastro cancelado. ({e})")
 
 
 # ------------------- MENUS DE USUÁRIOS ----------------------
@@ -1917,7 +2149,8 @@ def menu_cliente(conn, user_login, person_code):
                        FORMAT(P.Data_Chegada_CD, 'dd/MM/yyyy') AS Chegada_CD, 
                        FORMAT(P.Data_Prevista_Entrega, 'dd/MM/yyyy') AS Prev_Entrega,
                        REM.Nome AS Remetente, DR.Nome_Destinatario AS Destinatario,
-                       MOT.Nome AS Motorista, V.Placa_Veiculo, V.Tipo AS Tipo_Veiculo
+                       MOT.Nome AS Motorista, V.Placa_Veiculo, V.Tipo AS Tipo_Veiculo,
+                       FORMAT(P.Data_Ultimo_Status, 'dd/MM/yyyy HH:mm') AS Desde
                 FROM Produto_A_Ser_Entregue P
                 JOIN Dados_Rastreamento DR ON P.ID_Rastreamento = DR.ID_Rastreamento
                 JOIN Pessoa REM ON P.ID_Remetente = REM.Codigo_Pessoa
@@ -1932,21 +2165,60 @@ def menu_cliente(conn, user_login, person_code):
                 cpf_cliente_logado_data = db_connection.execute_query(conn, "SELECT CPF FROM Cliente WHERE Codigo_Pessoa = ?", (person_code,), fetch_results=True)
                 cpf_cliente_logado = cpf_cliente_logado_data[0][0] if cpf_cliente_logado_data and cpf_cliente_logado_data[0][0] else None
 
-                pedido = db_connection.execute_query(conn, sql_rastreio, (cod_rastreio, person_code, person_code, person_code if cpf_cliente_logado else -1 ), fetch_results=True) # -1 se não tiver CPF para não dar match errado
-                
+                params_rastreio = (cod_rastreio, person_code, person_code, person_code if cpf_cliente_logado else -1) # -1 se não tiver CPF para não dar match errado
+                pedido = db_connection.execute_query(conn, sql_rastreio, params_rastreio, fetch_results=True)
+                arquivado = False
+                if not pedido:
+                    # Pedidos finalizados há muito tempo foram movidos para o arquivo (arquivamento.py).
+                    # Pessoa/Funcionario podem ter sido removidos depois do arquivamento: LEFT JOIN.
+                    sql_rastreio_arquivo = """
+                    SELECT P.ID_Produto, P.Status_Entrega, P.Tipo_Produto,
+                           FORMAT(P.Data_Chegada_CD, 'dd/MM/yyyy') AS Chegada_CD,
+                           FORMAT(P.Data_Prevista_Entrega, 'dd/MM/yyyy') AS Prev_Entrega,
+                           COALESCE(REM.Nome, 'N/A') AS Remetente, DR.Nome_Destinatario AS Destinatario,
+                           MOT.Nome AS Motorista, V.Placa_Veiculo, V.Tipo AS Tipo_Veiculo,
+                           FORMAT(P.Data_Ultimo_Status, 'dd/MM/yyyy HH:mm') AS Desde
+                    FROM Produto_A_Ser_Entregue_Arquivo P
+                    JOIN Dados_Rastreamento_Arquivo DR ON P.ID_Rastreamento = DR.ID_Rastreamento
+                    LEFT JOIN Pessoa REM ON P.ID_Remetente = REM.Codigo_Pessoa
+                    LEFT JOIN Funcionario FMOT ON P.Codigo_Funcionario_Motorista = FMOT.Codigo_Funcionario
+                    LEFT JOIN Pessoa MOT ON FMOT.Codigo_Funcionario = MOT.Codigo_Pessoa
+                    LEFT JOIN Veiculo V ON FMOT.Placa_Veiculo = V.Placa_Veiculo
+                    WHERE DR.Codigo_Rastreamento = ?
+                      AND (P.ID_Remetente = ? OR P.ID_Destinatario = ? OR DR.CPF_Destinatario = (SELECT CPF FROM Cliente WHERE Codigo_Pessoa = ?));
+                    """
+                    pedido = db_connection.execute_query(conn, sql_rastreio_arquivo, params_rastreio, fetch_results=True)
+                    arquivado = bool(pedido)
+
                 if pedido:
                     p_data = pedido[0]
                     print("\n--- Detalhes do Pedido ---")
                     print(f"Produto ID: {p_data[0]}")
-                    print(f"Status Atual: {p_data[1]}")
-                    print(f"Tipo: {p_data[2]}")
+                    print(f"Status Atual: {StatusEntrega(p_data[1])} (desde {p_data[10]})")
+                    print(f"Tipo: {TipoProduto(p_data[2])}")
                     print(f"Chegada no CD: {p_data[3] or 'N/A'}")
                     print(f"Previsão de Entrega: {p_data[4] or 'N/A'}")
                     print(f"Remetente: {p_data[5]}")
                     print(f"Destinatário (Rastreio): {p_data[6]}")
                     if p_data[7]: # Se tiver motorista
-                        print(f"Motorista: {p_data[7]} (Veículo: {p_data[8] or 'N/A'} - {p_data[9] or 'N/A'})")
-                    # Aqui poderia adicionar um histórico de status se a tabela existisse
+                        tipo_veiculo = TipoVeiculo(p_data[9]) if p_data[9] is not None else 'N/A'
+                        print(f"Motorista: {p_data[7]} (Veículo: {p_data[8] or 'N/A'} - {tipo_veiculo})")
+                    # Linha do tempo: um único seek no índice clusterizado (ID_Produto, ID_Evento) do histórico
+                    if arquivado:
+                        sql_historico = """
+                        SELECT FORMAT(Data_Evento, 'dd/MM/yyyy HH:mm') AS Data, Status_Entrega
+                        FROM Historico_Status_Arquivo WHERE ID_Produto = ? ORDER BY ID_Evento;
+                        """
+                    else:
+                        sql_historico = """
+                        SELECT FORMAT(Data_Evento, 'dd/MM/yyyy HH:mm') AS Data, Status_Entrega
+                        FROM Historico_Status WHERE ID_Produto = ? ORDER BY ID_Evento;
+                        """
+                    historico = db_connection.execute_query(conn, sql_historico, (p_data[0],), fetch_results=True)
+                    if historico:
+                        print("\n--- Histórico de Status ---")
+                        for data_evento, status_evento in historico:
+                            print(f"{data_evento:<18}{StatusEntrega(status_evento)}")
                 else:
                     print("Pedido não encontrado ou você não tem permissão para visualizá-lo.")
             press_enter_to_continue()
@@ -2017,7 +2289,8 @@ def menu_admin(conn, user_login, person_code):
     admin_options = [
         "Gerenciar Usuários", "Gerenciar Pessoas", "Gerenciar Clientes", "Gerenciar Funcionários",
         "Gerenciar Veículos", "Gerenciar Sedes", "Gerenciar Produtos a Entregar",
-        "Gerenciar Dados de Rastreamento", "Gerenciar Carregamentos"
+        "Gerenciar Dados de Rastreamento", "Gerenciar Carregamentos",
+        "Ver Métricas de Consultas SQL"
     ]
     while True:
         clear_screen()
@@ -2032,20 +2305,59 @@ def menu_admin(conn, user_login, person_code):
         elif choice == 7: manage_products_terminal(conn)
         elif choice == 8: manage_tracking_terminal(conn)
         elif choice == 9: manage_shipments_terminal(conn)
+        elif choice == 10:
+            db_connection.imprimir_metricas(top_n=10)
+            press_enter_to_continue()
         elif choice == 0:
             break # Sai do menu do admin, volta para a tela de login/inicial
 
-# Placeholder para outros menus de funcionários
+def reports_terminal(conn):
+    """Relatórios gerenciais, lidos das tabelas de fatos (analitico.py), não das tabelas operacionais."""
+    options = [titulo for titulo, _, _, _ in analitico.RELATORIOS] + ["Atualizar Dados dos Relatórios Agora"]
+    while True:
+        clear_screen()
+        ate = analitico.dados_ate(conn)
+        print(f"\nDados dos relatórios atualizados até: {ate.strftime('%d/%m/%Y %H:%M') if ate else 'nunca (use a última opção)'}")
+        choice = display_menu("Menu de Relatórios", options)
+        if choice == 0: break
+        if choice == len(options):
+            print("Atualizando os dados dos relatórios...")
+            print("Dados atualizados." if analitico.atualizar(conn) else "Erro: Falha ao atualizar parte dos dados. Veja o log.")
+            press_enter_to_continue()
+            continue
+
+        titulo, headers, col_widths, sql = analitico.RELATORIOS[choice - 1]
+        meses = get_valid_input("Período em meses (Enter para 12): ", int, optional=True) or 12
+        desde = datetime.now() - timedelta(days=meses * 31)
+        rows = db_connection.execute_query(conn, sql, (desde,), fetch_results=True)
+        print(f"\n--- {titulo} (desde {desde.strftime('%d/%m/%Y')}) ---")
+        if rows:
+            header_format = "".join([f"{{:<{w}}}" for w in col_widths])
+            print(header_format.format(*headers))
+            print("-" * sum(col_widths))
+            for r in rows:
+                # Somas e médias chegam como Decimal (SQL Server) ou float (SQLite)
+                r_formatted = [f"{x:.2f}" if isinstance(x, (Decimal, float)) else (str(x) if x is not None else "") for x in r]
+                print(header_format.format(*r_formatted))
+        else:
+            print("Nenhum dado no período.")
+        press_enter_to_continue()
+
 def menu_gerente(conn, user_login, person_code):
-    print(f"\n--- Menu do Gerente: {user_login} (Cód. Pessoa: {person_code}) ---")
-    print("Funcionalidades do Gerente a serem implementadas:")
-    print("- Visualizar/Gerenciar Funcionários da Sede")
-    print("- Visualizar/Gerenciar Veículos (da Sede ou todos)")
-    print("- Visualizar Produtos na Sede")
-    print("- Aprovar/Iniciar Carregamentos")
-    print("- Gerar Relatórios (Entregas, Desempenho, etc.)")
-    press_enter_to_continue()
+    options = ["Gerar Relatórios (Entregas, Desempenho, Ocupação dos Veículos)"]
+    while True:
+        clear_screen()
+        print(f"\n--- Menu do Gerente: {user_login} (Cód. Pessoa: {person_code}) ---")
+        print("Funcionalidades do Gerente a serem implementadas:")
+        print("- Visualizar/Gerenciar Funcionários da Sede")
+        print("- Visualizar/Gerenciar Veículos (da Sede ou todos)")
+        print("- Visualizar Produtos na Sede")
+        print("- Aprovar/Iniciar Carregamentos")
+        choice = display_menu(f"Menu do Gerente - {user_login}", options)
+        if choice == 1: reports_terminal(conn)
+        elif choice == 0: break
 
+# Placeholder para outros menus de funcionários
 def menu_atendente(conn, user_login, person_code):
     print(f"\n--- Menu do Atendente: {user_login} (Cód. Pessoa: {person_code}) ---")
     print("Funcionalidades do Atendente a serem implementadas:")
@@ -2109,7 +2421,7 @@ def login_tela(conn):
             stored_hash, retrieved_user_type, retrieve_person_code = user_data[0]
             if verify_password(stored_hash, password):
                 logged_in_user = username
-                user_type = retrieved_user_type
+                user_type = TipoUsuario(retrieved_user_type)
                 user_person_code = retrieve_person_code # Este é o Codigo_Pessoa
                 print(f"Login bem-sucedido! Bem-vindo, {logged_in_user} ({user_type}).")
                 press_enter_to_continue()
@@ -2122,17 +2434,17 @@ def login_tela(conn):
 
     # Direcionamento pós-login
     if logged_in_user:
-        if user_type == 'Admin':
+        if user_type == TipoUsuario.ADMIN:
             menu_admin(conn, logged_in_user, user_person_code)
-        elif user_type == 'Cliente':
+        elif user_type == TipoUsuario.CLIENTE:
             menu_cliente(conn, logged_in_user, user_person_code)
-        elif user_type == 'Gerente':
+        elif user_type == TipoUsuario.GERENTE:
             menu_gerente(conn, logged_in_user, user_person_code)
-        elif user_type == 'Atendente':
+        elif user_type == TipoUsuario.ATENDENTE:
             menu_atendente(conn, logged_in_user, user_person_code)
-        elif user_type == 'Motorista':
+        elif user_type == TipoUsuario.MOTORISTA:
             menu_motorista(conn, logged_in_user, user_person_code)
-        elif user_type == 'Auxiliar de Logistica': # Corrigido para corresponder ao BD
+        elif user_type == TipoUsuario.AUXILIAR_DE_LOGISTICA:
             menu_auxiliar_logistica(conn, logged_in_user, user_person_code)
         else:
             print(f"Tipo de usuário '{user_type}' não possui um menu definido. Contate o administrador.")
@@ -2156,12 +2468,18 @@ def menu_inicial_principal(): # Renomeado para evitar conflito
 
 # ------------------- RODAR APLICAÇÃO ----------------------
 def run_app_terminal():
-    conn = db_connection.conectar_banco()
+    # O pool é repassado como `conn` para todos os menus; cada consulta empresta
+    # uma conexão dele, então uma sessão do Azure SQL que caia é substituída sem derrubar a aplicação.
+    conn = db_connection.criar_pool()
     try:
         if not conn:
             print("Erro crítico: Não foi possível conectar ao banco de dados.")
             print("Verifique as configurações em db_connection.py, o driver ODBC e a acessibilidade do servidor Azure SQL.")
             return
+        # Os domínios (status, tipos, cargos) são conferidos uma vez: códigos divergentes gravariam dados errados.
+        if not dominios.validar(conn):
+            print("Erro crítico: As tabelas de domínio do banco não correspondem a dominios.py. Aplique as migrações pendentes.")
+            return
 
         while True:
             acao = menu_inicial_principal()
@@ -2183,7 +2501,7 @@ def run_app_terminal():
         traceback.print_exc() # Imprime o stack trace para depuração
     finally:
         if conn:
-            db_connection.desconectar_banco(conn)
+            db_connection.fechar_pool(conn)
             print("Conexão com o banco de dados fechada.")
 
 if __name__ == "__main__":
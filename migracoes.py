@@ -0,0 +1,276 @@
+"""
+Migrações incrementais do esquema do banco.
+
+Cada migração fica em migrations/ como NNNN_nome.up.sql (aplica) e NNNN_nome.down.sql (reverte),
+com variantes opcionais NNNN_nome.sqlite.up.sql / .sqlite.down.sql para o backend SQLite
+(sem elas, o T-SQL é traduzido automaticamente). A tabela Versao_Esquema registra as versões
+aplicadas, com o checksum do arquivo 'up' para detectar migrações alteradas depois de aplicadas.
+
+Os arquivos podem ter vários lotes separados por linhas 'GO'. Por padrão cada migração roda em
+uma única transação; com a linha '-- migrar: sem-transacao' os lotes rodam em autocommit, o que
+permite criar índices com ONLINE = ON sem segurar bloqueios até o fim da migração (esses lotes
+devem ser idempotentes, ex: IF NOT EXISTS, para poderem ser reexecutados após uma falha).
+Numa variante SQLite, a mesma linha deixa o script abrir a própria transação depois de
+'PRAGMA foreign_keys = OFF' (que não tem efeito dentro de uma transação), para recriar tabelas.
+
+Uso:
+    python migracoes.py status
+    python migracoes.py up [versao]       # aplica as pendentes (até a versão indicada)
+    python migracoes.py down <versao>     # reverte as posteriores à versão indicada (0 = todas)
+    python migracoes.py baseline <versao> # marca como aplicadas, sem executar, as versões até <versao>
+                                          # (banco já criado pelo antigo script.sql: baseline 1)
+"""
+import re
+import sys
+import hashlib
+import logging
+
+import db_connection
+
+class MigracaoError(Exception):
+    """Falha ao aplicar ou reverter uma migração (a transação da migração foi revertida)."""
+
+
+_TABELA_VERSAO = {
+    'sqlserver': """
+        IF OBJECT_ID('Versao_Esquema', 'U') IS NULL
+            CREATE TABLE Versao_Esquema (
+                Versao INT PRIMARY KEY,
+                Nome VARCHAR(200) NOT NULL,
+                Checksum VARCHAR(64) NOT NULL,
+                Aplicada_Em DATETIME NOT NULL DEFAULT GETDATE()
+            );
+    """,
+    'sqlite': """
+        CREATE TABLE IF NOT EXISTS Versao_Esquema (
+            Versao INTEGER PRIMARY KEY,
+            Nome VARCHAR(200) NOT NULL,
+            Checksum VARCHAR(64) NOT NULL,
+            Aplicada_Em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """,
+}
+
+def _ler(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return arquivo.read()
+
+def checksum(migracao):
+    """SHA-256 do arquivo 'up' da migração."""
+    return hashlib.sha256(_ler(migracao['up']).encode('utf-8')).hexdigest()
+
+def _garantir_tabela_versao(conexao, backend):
+    cursor = conexao.cursor()
+    try:
+        cursor.execute(_TABELA_VERSAO[backend.nome])
+        conexao.commit()
+    finally:
+        cursor.close()
+
+def versoes_aplicadas(conexao, backend=None):
+    """
+    Returns:
+        dict: {versao: (nome, checksum, aplicada_em)} das migrações registradas em Versao_Esquema.
+    """
+    backend = backend or db_connection.obter_backend()
+    _garantir_tabela_versao(conexao, backend)
+    cursor = conexao.cursor()
+    try:
+        cursor.execute("SELECT Versao, Nome, Checksum, Aplicada_Em FROM Versao_Esquema ORDER BY Versao")
+        return {linha[0]: (linha[1], linha[2], linha[3]) for linha in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+def _script(migracao, direcao, backend):
+    """Texto da migração na direção pedida, no dialeto do backend."""
+    if backend.nome == 'sqlite':
+        if migracao[f'sqlite_{direcao}']:
+            return _ler(migracao[f'sqlite_{direcao}'])
+        return db_connection.traduzir_script_sqlite(_ler(migracao[direcao]))
+    return _ler(migracao[direcao])
+
+def _lotes(script):
+    """Separa o script nos lotes delimitados por linhas 'GO' (como o sqlcmd/SSMS)."""
+    return [lote for lote in re.split(r'^\s*GO\s*$', script, flags=re.IGNORECASE | re.MULTILINE) if lote.strip()]
+
+def _sem_transacao(migracao, direcao, backend):
+    """A linha '-- migrar: sem-transacao' vale para o arquivo que será executado (a variante SQLite, se houver)."""
+    caminho = migracao[direcao]
+    if backend.nome == 'sqlite' and migracao[f'sqlite_{direcao}']:
+        caminho = migracao[f'sqlite_{direcao}']
+    return bool(re.search(r'^--\s*migrar:\s*sem-transacao\s*$', _ler(caminho), re.IGNORECASE | re.MULTILINE))
+
+def _registro_versao(migracao, direcao):
+    if direcao == 'up':
+        return ("INSERT INTO Versao_Esquema (Versao, Nome, Checksum) VALUES (?, ?, ?)",
+                (migracao['versao'], migracao['nome'], checksum(migracao)))
+    return "DELETE FROM Versao_Esquema WHERE Versao = ?", (migracao['versao'],)
+
+def _executar_sqlserver(conexao, migracao, direcao, sem_transacao):
+    cursor = conexao.cursor()
+    try:
+        conexao.autocommit = sem_transacao
+        for lote in _lotes(_script(migracao, direcao, db_connection.obter_backend())):
+            cursor.execute(lote)
+            while cursor.nextset(): # Erros de comandos posteriores do lote só aparecem ao avançar
+                pass
+        cursor.execute(*_registro_versao(migracao, direcao))
+        if not sem_transacao:
+            conexao.commit()
+    except db_connection.obter_backend().Error:
+        if not sem_transacao:
+            conexao.rollback()
+        raise
+    finally:
+        conexao.autocommit = False
+        cursor.close()
+
+def _executar_sqlite(conexao, migracao, direcao, sem_transacao, backend):
+    script = _script(migracao, direcao, backend)
+    sql_versao, params_versao = _registro_versao(migracao, direcao)
+    try:
+        if sem_transacao:
+            conexao.executescript(script)
+        else:
+            conexao.executescript(f"BEGIN;\n{script}\n") # executescript confirma o que estiver pendente antes
+        conexao.execute(sql_versao, params_versao)
+        conexao.commit()
+    except backend.Error:
+        conexao.rollback()
+        raise
+    finally:
+        if sem_transacao: # O script pode ter mudado estas opções da conexão para recriar tabelas
+            conexao.execute("PRAGMA legacy_alter_table = OFF")
+            conexao.execute("PRAGMA foreign_keys = ON")
+
+def _executar(conexao, migracao, direcao, backend):
+    sem_transacao = _sem_transacao(migracao, direcao, backend)
+    logging.info(f"{'Aplicando' if direcao == 'up' else 'Revertendo'} migração {migracao['versao']:04d}_{migracao['nome']}"
+                 f"{' (sem transação)' if sem_transacao else ''}...")
+    try:
+        if backend.nome == 'sqlite':
+            _executar_sqlite(conexao, migracao, direcao, sem_transacao, backend)
+        else:
+            _executar_sqlserver(conexao, migracao, direcao, sem_transacao)
+    except backend.Error as e:
+        raise MigracaoError(f"Falha na migração {migracao['versao']:04d}_{migracao['nome']} ({direcao}): {e}") from e
+
+def migrar(conexao, alvo=None, backend=None):
+    """
+    Aplica, em ordem, as migrações pendentes até a versão `alvo` (todas, se None).
+
+    Returns:
+        list: Versões aplicadas.
+
+    Raises:
+        MigracaoError: Se uma migração falhar (as anteriores permanecem aplicadas).
+    """
+    backend = backend or db_connection.obter_backend()
+    aplicadas = versoes_aplicadas(conexao, backend)
+    novas = []
+    for migracao in db_connection.listar_migracoes():
+        if migracao['versao'] in aplicadas:
+            if aplicadas[migracao['versao']][1] != checksum(migracao):
+                logging.warning(f"A migração {migracao['versao']:04d}_{migracao['nome']} foi alterada depois de aplicada.")
+            continue
+        if alvo is not None and migracao['versao'] > alvo:
+            break
+        _executar(conexao, migracao, 'up', backend)
+        novas.append(migracao['versao'])
+    if novas:
+        logging.info(f"Migrações aplicadas: {', '.join(f'{v:04d}' for v in novas)}.")
+    return novas
+
+def reverter(conexao, alvo, backend=None):
+    """
+    Reverte, da mais nova para a mais antiga, as migrações aplicadas com versão maior que `alvo`.
+
+    Returns:
+        list: Versões revertidas.
+    """
+    backend = backend or db_connection.obter_backend()
+    aplicadas = versoes_aplicadas(conexao, backend)
+    revertidas = []
+    for migracao in reversed(db_connection.listar_migracoes()):
+        if migracao['versao'] <= alvo or migracao['versao'] not in aplicadas:
+            continue
+        if not migracao['down']:
+            raise MigracaoError(f"A migração {migracao['versao']:04d}_{migracao['nome']} não tem arquivo .down.sql.")
+        _executar(conexao, migracao, 'down', backend)
+        revertidas.append(migracao['versao'])
+    return revertidas
+
+def baseline(conexao, versao, backend=None):
+    """Registra como aplicadas, sem executá-las, as migrações até `versao` (para bancos já existentes)."""
+    backend = backend or db_connection.obter_backend()
+    aplicadas = versoes_aplicadas(conexao, backend)
+    cursor = conexao.cursor()
+    try:
+        for migracao in db_connection.listar_migracoes():
+            if migracao['versao'] <= versao and migracao['versao'] not in aplicadas:
+                cursor.execute(*_registro_versao(migracao, 'up'))
+                logging.info(f"Migração {migracao['versao']:04d}_{migracao['nome']} marcada como aplicada (baseline).")
+        conexao.commit()
+    finally:
+        cursor.close()
+
+def status(conexao, backend=None):
+    """
+    Returns:
+        list: Tuplas (versao, nome, situacao, aplicada_em), com situação 'aplicada', 'pendente' ou 'alterada'.
+    """
+    aplicadas = versoes_aplicadas(conexao, backend)
+    situacoes = []
+    for migracao in db_connection.listar_migracoes():
+        registro = aplicadas.get(migracao['versao'])
+        if registro is None:
+            situacoes.append((migracao['versao'], migracao['nome'], 'pendente', None))
+        else:
+            situacao = 'aplicada' if registro[1] == checksum(migracao) else 'alterada'
+            situacoes.append((migracao['versao'], migracao['nome'], situacao, registro[2]))
+    return situacoes
+
+def imprimir_status(conexao):
+    print("\n--- Migrações do Esquema ---")
+    print(f"{'Versão':<8}{'Nome':<35}{'Situação':<12}Aplicada em")
+    print("-" * 75)
+    for versao, nome, situacao, aplicada_em in status(conexao):
+        print(f"{versao:<8}{nome:<35}{situacao:<12}{aplicada_em or ''}")
+
+def main(argumentos):
+    if not argumentos or argumentos[0] not in ('status', 'up', 'down', 'baseline'):
+        print(__doc__)
+        return 1
+    comando = argumentos[0]
+    versao = int(argumentos[1]) if len(argumentos) > 1 and argumentos[1].isdigit() else None
+    if comando in ('down', 'baseline') and versao is None:
+        print(f"Informe a versão: python migracoes.py {comando} <versao>")
+        return 1
+
+    if db_connection.obter_backend().nome == 'sqlite':
+        db_connection.configurar_backend('sqlite', auto_migrar=False) # Quem migra aqui é este comando
+    conexao = db_connection.conectar_banco()
+    if not conexao:
+        return 1
+    try:
+        if comando == 'up':
+            migrar(conexao, versao)
+        elif comando == 'down':
+            confirm = input(f"Reverter as migrações posteriores à versão {versao}? Isso pode apagar dados. (s/n): ").lower()
+            if confirm != 's':
+                print("Operação cancelada.")
+                return 0
+            reverter(conexao, versao)
+        elif comando == 'baseline':
+            baseline(conexao, versao)
+        imprimir_status(conexao)
+        return 0
+    except MigracaoError as e:
+        logging.error(e)
+        imprimir_status(conexao)
+        return 1
+    finally:
+        db_connection.desconectar_banco(conexao)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,12 @@
+-- Reverte a migração 0001: remove todas as tabelas (TODOS OS DADOS SERÃO APAGADOS!).
+-- Ordem inversa à de criação, para respeitar as chaves estrangeiras.
+DROP TABLE IF EXISTS Usuario;
+DROP TABLE IF EXISTS Carregamento;
+DROP TABLE IF EXISTS Produto_A_Ser_Entregue;
+DROP TABLE IF EXISTS Dados_Rastreamento;
+DROP TABLE IF EXISTS Funcionario;
+DROP TABLE IF EXISTS Veiculo;
+DROP TABLE IF EXISTS Cliente;
+DROP TABLE IF EXISTS Pessoa;
+DROP TABLE IF EXISTS Sede;
+DROP TABLE IF EXISTS Endereco;
@@ -1,39 +1,7 @@
--- Script SQL para criar as tabelas no Azure SQL Database
--- Este script implementa as sugestões de normalização e melhorias.
--- Abordagem robusta para dropar tabelas com FKs, sem usar sp_MSforeachtable.
-
--- ***** IMPORTANTE: Certifique-se de que você está conectado ao banco de dados correto no seu cliente SQL (ex: VS Code) *****
--- USE [TrabalhoDeBD-SRL]; -- Este comando não é suportado para mudar de DB em alguns clientes como o VS Code MSSQL.
-
--- PASSO 1: Desabilitar e Dropar TODAS as chaves estrangeiras existentes
--- Isso é feito de forma dinâmica para garantir que todas as FKs sejam removidas,
--- permitindo que as tabelas sejam dropadas sem erros de dependência.
-DECLARE @sql NVARCHAR(MAX) = N'';
-
-SELECT @sql += N'ALTER TABLE '
-    + QUOTENAME(OBJECT_SCHEMA_NAME(parent_object_id)) + '.'
-    + QUOTENAME(OBJECT_NAME(parent_object_id))
-    + ' DROP CONSTRAINT ' + QUOTENAME(name) + ';' + CHAR(13) + CHAR(10)
-FROM sys.foreign_keys;
-
-EXEC sp_executesql @sql;
-PRINT 'Todas as chaves estrangeiras existentes foram removidas.';
-
--- PASSO 2: Remover tabelas existentes (todos os dados serão apagados!)
--- A ordem aqui se torna menos crítica após a remoção das FKs.
-DROP TABLE IF EXISTS Carregamento;
-DROP TABLE IF EXISTS Produto_A_Ser_Entregue;
-DROP TABLE IF EXISTS Usuario;
-DROP TABLE IF EXISTS Funcionario;
-DROP TABLE IF EXISTS Cliente;
-DROP TABLE IF EXISTS Dados_Rastreamento;
-DROP TABLE IF EXISTS Veiculo;
-DROP TABLE IF EXISTS Sede;
-DROP TABLE IF EXISTS Pessoa;
-DROP TABLE IF EXISTS Endereco;
-PRINT 'Todas as tabelas existentes foram removidas (se existiam).';
-
--- PASSO 3: Criar as tabelas com a nova estrutura (na ordem correta de dependência para criação)
+-- Migração 0001: esquema inicial (antigo script.sql, sem os DROPs).
+-- Cria as tabelas na ordem de dependência. Em um banco que já tem essas tabelas
+-- (criado pelo script.sql antigo), não rode esta migração: marque-a como aplicada com
+--     python migracoes.py baseline 1
 
 -- Tabela Endereco (primeiro, pois muitas tabelas dependem dela)
 CREATE TABLE Endereco (
@@ -172,4 +140,4 @@ CREATE TABLE Usuario (
 );
 PRINT 'Tabela Usuario criada.';
 
-PRINT 'Script de criação de tabelas concluído com sucesso.';
+PRINT 'Esquema inicial criado.';
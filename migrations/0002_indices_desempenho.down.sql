@@ -0,0 +1,13 @@
+-- migrar: sem-transacao
+-- Reverte a migração 0002: remove os índices de apoio (os dados não são afetados).
+DROP INDEX IF EXISTS IX_Produto_Remetente ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Destinatario ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Motorista ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Pendentes ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Carregamento_Placa_Data ON Carregamento;
+DROP INDEX IF EXISTS IX_Carregamento_Produto ON Carregamento;
+DROP INDEX IF EXISTS IX_Pessoa_Endereco ON Pessoa;
+DROP INDEX IF EXISTS IX_Rastreamento_Endereco ON Dados_Rastreamento;
+DROP INDEX IF EXISTS IX_Pessoa_Nome ON Pessoa;
+DROP INDEX IF EXISTS IX_Funcionario_Placa ON Funcionario;
+DROP INDEX IF EXISTS IX_Funcionario_Sede ON Funcionario;
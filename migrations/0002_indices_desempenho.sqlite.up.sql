@@ -0,0 +1,16 @@
+-- Variante SQLite da migração 0002 (sem INCLUDE nem ONLINE; filtros viram índices parciais).
+CREATE INDEX IF NOT EXISTS IX_Produto_Remetente ON Produto_A_Ser_Entregue (ID_Remetente);
+CREATE INDEX IF NOT EXISTS IX_Produto_Destinatario ON Produto_A_Ser_Entregue (ID_Destinatario);
+CREATE INDEX IF NOT EXISTS IX_Produto_Motorista ON Produto_A_Ser_Entregue (Codigo_Funcionario_Motorista)
+    WHERE Codigo_Funcionario_Motorista IS NOT NULL;
+CREATE INDEX IF NOT EXISTS IX_Produto_Pendentes ON Produto_A_Ser_Entregue (ID_Produto)
+    WHERE Status_Entrega IN ('Em Processamento', 'Aguardando Coleta');
+CREATE INDEX IF NOT EXISTS IX_Carregamento_Placa_Data ON Carregamento (Placa_Veiculo, Data_Carregamento);
+CREATE INDEX IF NOT EXISTS IX_Carregamento_Produto ON Carregamento (ID_Produto);
+CREATE INDEX IF NOT EXISTS IX_Pessoa_Endereco ON Pessoa (ID_Endereco);
+CREATE INDEX IF NOT EXISTS IX_Rastreamento_Endereco ON Dados_Rastreamento (ID_Endereco);
+CREATE INDEX IF NOT EXISTS IX_Pessoa_Nome ON Pessoa (Nome);
+CREATE INDEX IF NOT EXISTS IX_Funcionario_Placa ON Funcionario (Placa_Veiculo)
+    WHERE Placa_Veiculo IS NOT NULL;
+CREATE INDEX IF NOT EXISTS IX_Funcionario_Sede ON Funcionario (ID_Sede)
+    WHERE ID_Sede IS NOT NULL;
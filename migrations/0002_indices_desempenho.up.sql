@@ -0,0 +1,83 @@
+-- migrar: sem-transacao
+-- Migração 0002: índices de apoio às consultas da aplicação (antigo PASSO 4 do script.sql).
+-- Chaves estrangeiras não ganham índice automaticamente no SQL Server: sem estes índices,
+-- "Ver Meus Pedidos", as verificações de dependência dos deletes e a lista de produtos
+-- disponíveis do carregamento fazem varredura completa das tabelas.
+-- Rode relatorio_indices.py para ver quais consultas do app cada índice atende.
+--
+-- Cada índice é um lote separado (GO), criado com ONLINE = ON (a tabela continua legível e
+-- gravável durante a criação) e fora de transação, para não segurar bloqueios até o fim
+-- da migração. O IF NOT EXISTS permite rodar de novo se a migração for interrompida no meio.
+
+-- "Ver Meus Pedidos" (WHERE ID_Remetente = ? OR ID_Destinatario = ?) e verificações antes de deletar Pessoa.
+-- Os INCLUDEs cobrem as colunas listadas, evitando key lookup por linha.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Produto_Remetente' AND object_id = OBJECT_ID('Produto_A_Ser_Entregue'))
+    CREATE NONCLUSTERED INDEX IX_Produto_Remetente ON Produto_A_Ser_Entregue (ID_Remetente)
+        INCLUDE (Peso, Status_Entrega, Tipo_Produto, Data_Chegada_CD, Data_Prevista_Entrega, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Produto_Destinatario' AND object_id = OBJECT_ID('Produto_A_Ser_Entregue'))
+    CREATE NONCLUSTERED INDEX IX_Produto_Destinatario ON Produto_A_Ser_Entregue (ID_Destinatario)
+        INCLUDE (Peso, Status_Entrega, Tipo_Produto, Data_Chegada_CD, Data_Prevista_Entrega, ID_Remetente, Codigo_Funcionario_Motorista, ID_Rastreamento)
+    WITH (ONLINE = ON);
+GO
+
+-- Verificação antes de deletar Funcionario (motorista); a maioria dos produtos não tem motorista
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Produto_Motorista' AND object_id = OBJECT_ID('Produto_A_Ser_Entregue'))
+    CREATE NONCLUSTERED INDEX IX_Produto_Motorista ON Produto_A_Ser_Entregue (Codigo_Funcionario_Motorista)
+        WHERE Codigo_Funcionario_Motorista IS NOT NULL
+    WITH (ONLINE = ON);
+GO
+
+-- Produtos disponíveis para carregamento: só as linhas pendentes, já na ordem de ID_Produto
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Produto_Pendentes' AND object_id = OBJECT_ID('Produto_A_Ser_Entregue'))
+    CREATE NONCLUSTERED INDEX IX_Produto_Pendentes ON Produto_A_Ser_Entregue (ID_Produto)
+        INCLUDE (Peso, Status_Entrega, Tipo_Produto, ID_Rastreamento)
+        WHERE Status_Entrega IN ('Em Processamento', 'Aguardando Coleta')
+    WITH (ONLINE = ON);
+GO
+
+-- Itens de um carregamento (Placa_Veiculo = ? AND Data_Carregamento = ?), exclusão do carregamento
+-- e verificação antes de deletar Veiculo
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Carregamento_Placa_Data' AND object_id = OBJECT_ID('Carregamento'))
+    CREATE NONCLUSTERED INDEX IX_Carregamento_Placa_Data ON Carregamento (Placa_Veiculo, Data_Carregamento)
+        INCLUDE (ID_Produto)
+    WITH (ONLINE = ON);
+GO
+
+-- Verificação antes de deletar/atualizar Produto_A_Ser_Entregue
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Carregamento_Produto' AND object_id = OBJECT_ID('Carregamento'))
+    CREATE NONCLUSTERED INDEX IX_Carregamento_Produto ON Carregamento (ID_Produto)
+    WITH (ONLINE = ON);
+GO
+
+-- Endereço compartilhado (WHERE ID_Endereco = ?) e checagem de FK ao deletar Endereco
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Pessoa_Endereco' AND object_id = OBJECT_ID('Pessoa'))
+    CREATE NONCLUSTERED INDEX IX_Pessoa_Endereco ON Pessoa (ID_Endereco)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Rastreamento_Endereco' AND object_id = OBJECT_ID('Dados_Rastreamento'))
+    CREATE NONCLUSTERED INDEX IX_Rastreamento_Endereco ON Dados_Rastreamento (ID_Endereco)
+    WITH (ONLINE = ON);
+GO
+
+-- Listagens ordenadas por nome (ORDER BY P.Nome) e busca por nome
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Pessoa_Nome' AND object_id = OBJECT_ID('Pessoa'))
+    CREATE NONCLUSTERED INDEX IX_Pessoa_Nome ON Pessoa (Nome)
+    WITH (ONLINE = ON);
+GO
+
+-- Verificações antes de deletar Veiculo e Sede (só motoristas têm placa; só funcionários de sede têm ID_Sede)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Funcionario_Placa' AND object_id = OBJECT_ID('Funcionario'))
+    CREATE NONCLUSTERED INDEX IX_Funcionario_Placa ON Funcionario (Placa_Veiculo)
+        WHERE Placa_Veiculo IS NOT NULL
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Funcionario_Sede' AND object_id = OBJECT_ID('Funcionario'))
+    CREATE NONCLUSTERED INDEX IX_Funcionario_Sede ON Funcionario (ID_Sede)
+        WHERE ID_Sede IS NOT NULL
+    WITH (ONLINE = ON);
+GO
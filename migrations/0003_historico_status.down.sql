@@ -0,0 +1,4 @@
+-- Reverte a migração 0003: remove o histórico de status (os eventos são perdidos).
+DROP TABLE IF EXISTS Historico_Status;
+ALTER TABLE Produto_A_Ser_Entregue DROP CONSTRAINT DF_Produto_Data_Ultimo_Status;
+ALTER TABLE Produto_A_Ser_Entregue DROP COLUMN Data_Ultimo_Status;
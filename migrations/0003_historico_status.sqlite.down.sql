@@ -0,0 +1,3 @@
+-- Variante SQLite da reversão 0003 (sem a DEFAULT constraint nomeada do SQL Server).
+DROP TABLE IF EXISTS Historico_Status;
+ALTER TABLE Produto_A_Ser_Entregue DROP COLUMN Data_Ultimo_Status;
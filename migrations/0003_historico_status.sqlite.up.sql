@@ -0,0 +1,16 @@
+-- Variante SQLite da migração 0003. A PK INTEGER é o rowid (autoincremento); o índice
+-- (ID_Produto, ID_Evento) faz o papel do índice clusterizado do SQL Server. O SQLite não aceita
+-- ADD COLUMN NOT NULL com DEFAULT não constante, então a coluna fica anulável e é preenchida aqui.
+CREATE TABLE Historico_Status (
+    ID_Evento INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Produto INT NOT NULL,
+    Status_Entrega VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Data_Evento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ID_Produto) REFERENCES Produto_A_Ser_Entregue(ID_Produto)
+);
+CREATE UNIQUE INDEX CIX_Historico_Status_Produto ON Historico_Status (ID_Produto, ID_Evento);
+
+ALTER TABLE Produto_A_Ser_Entregue ADD COLUMN Data_Ultimo_Status DATETIME;
+UPDATE Produto_A_Ser_Entregue SET Data_Ultimo_Status = Data_Chegada_CD || ' 00:00:00';
+INSERT INTO Historico_Status (ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Produto, Status_Entrega, Data_Ultimo_Status FROM Produto_A_Ser_Entregue;
@@ -0,0 +1,29 @@
+-- Migração 0003: histórico de status de entrega (somente inserção).
+-- Cada mudança de Status_Entrega grava um evento em Historico_Status, na mesma transação que
+-- altera o produto. O status atual continua na linha do produto (Status_Entrega), agora com
+-- Data_Ultimo_Status, para o rastreamento ler o estado atual sem consultar o histórico.
+--
+-- O índice clusterizado é (ID_Produto, ID_Evento): a linha do tempo de um produto fica em
+-- páginas contíguas e é lida com um único seek, em ordem, por maior que o histórico fique.
+-- A PK em ID_Evento é não clusterizada e serve só para identificar o evento.
+
+CREATE TABLE Historico_Status (
+    ID_Evento BIGINT IDENTITY(1,1) NOT NULL,
+    ID_Produto INT NOT NULL, -- FK para Produto_A_Ser_Entregue
+    Status_Entrega VARCHAR(50) NOT NULL, -- Status assumido pelo produto neste evento
+    Data_Evento DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_Historico_Status PRIMARY KEY NONCLUSTERED (ID_Evento),
+    CONSTRAINT FK_Historico_Status_Produto FOREIGN KEY (ID_Produto) REFERENCES Produto_A_Ser_Entregue(ID_Produto)
+);
+CREATE UNIQUE CLUSTERED INDEX CIX_Historico_Status_Produto ON Historico_Status (ID_Produto, ID_Evento);
+
+-- Adicionar coluna NOT NULL com DEFAULT constante é só alteração de metadados (não reescreve a tabela).
+ALTER TABLE Produto_A_Ser_Entregue ADD Data_Ultimo_Status DATETIME NOT NULL
+    CONSTRAINT DF_Produto_Data_Ultimo_Status DEFAULT GETDATE();
+GO
+
+-- Produtos existentes: o status atual vira o primeiro evento, datado da chegada ao CD.
+UPDATE Produto_A_Ser_Entregue SET Data_Ultimo_Status = Data_Chegada_CD;
+INSERT INTO Historico_Status (ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Produto, Status_Entrega, Data_Ultimo_Status FROM Produto_A_Ser_Entregue;
+PRINT 'Tabela Historico_Status criada.';
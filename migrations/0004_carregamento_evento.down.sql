@@ -0,0 +1,20 @@
+-- Reverte a migração 0004: devolve Placa_Veiculo e Data_Carregamento aos itens e remove os cabeçalhos.
+ALTER TABLE Carregamento ADD Placa_Veiculo VARCHAR(10) NULL, Data_Carregamento DATETIME NULL;
+GO
+
+UPDATE C SET Placa_Veiculo = E.Placa_Veiculo, Data_Carregamento = E.Data_Carregamento
+FROM Carregamento C
+JOIN Carregamento_Evento E ON E.ID_Carregamento_Evento = C.ID_Carregamento_Evento;
+
+ALTER TABLE Carregamento DROP CONSTRAINT UQ_Carregamento_Item;
+ALTER TABLE Carregamento DROP CONSTRAINT FK_Carregamento_Evento;
+ALTER TABLE Carregamento DROP COLUMN ID_Carregamento_Evento;
+ALTER TABLE Carregamento ALTER COLUMN Placa_Veiculo VARCHAR(10) NOT NULL;
+ALTER TABLE Carregamento ALTER COLUMN Data_Carregamento DATETIME NOT NULL;
+ALTER TABLE Carregamento ADD
+    DEFAULT GETDATE() FOR Data_Carregamento,
+    FOREIGN KEY (Placa_Veiculo) REFERENCES Veiculo(Placa_Veiculo),
+    CONSTRAINT UQ_Carregamento UNIQUE (Placa_Veiculo, ID_Produto, Data_Carregamento);
+CREATE NONCLUSTERED INDEX IX_Carregamento_Placa_Data ON Carregamento (Placa_Veiculo, Data_Carregamento) INCLUDE (ID_Produto);
+
+DROP TABLE Carregamento_Evento;
@@ -0,0 +1,19 @@
+-- Variante SQLite da reversão 0004 (recria Carregamento no formato do esquema inicial).
+CREATE TABLE Carregamento_Antigo (
+    ID_Carregamento INTEGER PRIMARY KEY AUTOINCREMENT,
+    Placa_Veiculo VARCHAR(10) COLLATE NOCASE NOT NULL,
+    ID_Produto INT NOT NULL,
+    Data_Carregamento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (Placa_Veiculo) REFERENCES Veiculo(Placa_Veiculo),
+    FOREIGN KEY (ID_Produto) REFERENCES Produto_A_Ser_Entregue(ID_Produto),
+    CONSTRAINT UQ_Carregamento UNIQUE (Placa_Veiculo, ID_Produto, Data_Carregamento)
+);
+INSERT INTO Carregamento_Antigo (ID_Carregamento, Placa_Veiculo, ID_Produto, Data_Carregamento)
+SELECT C.ID_Carregamento, E.Placa_Veiculo, C.ID_Produto, E.Data_Carregamento
+FROM Carregamento C
+JOIN Carregamento_Evento E ON E.ID_Carregamento_Evento = C.ID_Carregamento_Evento;
+DROP TABLE Carregamento;
+ALTER TABLE Carregamento_Antigo RENAME TO Carregamento;
+DROP TABLE Carregamento_Evento;
+CREATE INDEX IX_Carregamento_Placa_Data ON Carregamento (Placa_Veiculo, Data_Carregamento);
+CREATE INDEX IX_Carregamento_Produto ON Carregamento (ID_Produto);
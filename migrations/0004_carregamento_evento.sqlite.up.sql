@@ -0,0 +1,35 @@
+-- Variante SQLite da migração 0004. O SQLite não remove colunas com FK/UNIQUE/índice:
+-- a tabela Carregamento é recriada (nenhuma outra tabela a referencia).
+CREATE TABLE Carregamento_Evento (
+    ID_Carregamento_Evento INTEGER PRIMARY KEY AUTOINCREMENT,
+    Placa_Veiculo VARCHAR(10) COLLATE NOCASE NOT NULL,
+    Data_Carregamento DATETIME NOT NULL,
+    Data_Criacao DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Data_Atualizacao DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Peso_Total DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    Quantidade_Itens INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (Placa_Veiculo) REFERENCES Veiculo(Placa_Veiculo),
+    CONSTRAINT UQ_Carregamento_Evento UNIQUE (Placa_Veiculo, Data_Carregamento)
+);
+
+INSERT INTO Carregamento_Evento (Placa_Veiculo, Data_Carregamento, Peso_Total, Quantidade_Itens)
+SELECT C.Placa_Veiculo, C.Data_Carregamento, SUM(P.Peso), COUNT(*)
+FROM Carregamento C
+JOIN Produto_A_Ser_Entregue P ON C.ID_Produto = P.ID_Produto
+GROUP BY C.Placa_Veiculo, C.Data_Carregamento;
+
+CREATE TABLE Carregamento_Novo (
+    ID_Carregamento INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Carregamento_Evento INT NOT NULL,
+    ID_Produto INT NOT NULL,
+    FOREIGN KEY (ID_Carregamento_Evento) REFERENCES Carregamento_Evento(ID_Carregamento_Evento),
+    FOREIGN KEY (ID_Produto) REFERENCES Produto_A_Ser_Entregue(ID_Produto),
+    CONSTRAINT UQ_Carregamento_Item UNIQUE (ID_Carregamento_Evento, ID_Produto)
+);
+INSERT INTO Carregamento_Novo (ID_Carregamento, ID_Carregamento_Evento, ID_Produto)
+SELECT C.ID_Carregamento, E.ID_Carregamento_Evento, C.ID_Produto
+FROM Carregamento C
+JOIN Carregamento_Evento E ON E.Placa_Veiculo = C.Placa_Veiculo AND E.Data_Carregamento = C.Data_Carregamento;
+DROP TABLE Carregamento;
+ALTER TABLE Carregamento_Novo RENAME TO Carregamento;
+CREATE INDEX IX_Carregamento_Produto ON Carregamento (ID_Produto);
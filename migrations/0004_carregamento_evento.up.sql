@@ -0,0 +1,53 @@
+-- Migração 0004: cabeçalho de carregamento (Carregamento_Evento).
+-- Antes, um carregamento era só o conjunto de linhas de Carregamento com a mesma Placa_Veiculo e
+-- exatamente a mesma Data_Carregamento. Agora ele tem ID próprio, veículo, datas e totais
+-- (peso e quantidade de itens) mantidos a cada alteração, e cada item referencia o cabeçalho.
+-- Placa_Veiculo e Data_Carregamento saem dos itens (ficam só no cabeçalho).
+
+CREATE TABLE Carregamento_Evento (
+    ID_Carregamento_Evento INT IDENTITY(1,1) PRIMARY KEY,
+    Placa_Veiculo VARCHAR(10) NOT NULL, -- FK para Veiculo
+    Data_Carregamento DATETIME NOT NULL,
+    Data_Criacao DATETIME NOT NULL DEFAULT GETDATE(),
+    Data_Atualizacao DATETIME NOT NULL DEFAULT GETDATE(), -- Última inclusão/remoção de item
+    Peso_Total DECIMAL(12, 2) NOT NULL DEFAULT 0, -- em kg, soma do peso dos itens
+    Quantidade_Itens INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (Placa_Veiculo) REFERENCES Veiculo(Placa_Veiculo),
+    CONSTRAINT UQ_Carregamento_Evento UNIQUE (Placa_Veiculo, Data_Carregamento) -- Também atende a verificação antes de deletar Veiculo
+);
+ALTER TABLE Carregamento ADD ID_Carregamento_Evento INT NULL;
+GO
+
+-- Um cabeçalho para cada (Placa_Veiculo, Data_Carregamento) existente, com os totais atuais.
+INSERT INTO Carregamento_Evento (Placa_Veiculo, Data_Carregamento, Peso_Total, Quantidade_Itens)
+SELECT C.Placa_Veiculo, C.Data_Carregamento, SUM(P.Peso), COUNT(*)
+FROM Carregamento C
+JOIN Produto_A_Ser_Entregue P ON C.ID_Produto = P.ID_Produto
+GROUP BY C.Placa_Veiculo, C.Data_Carregamento;
+
+UPDATE C SET ID_Carregamento_Evento = E.ID_Carregamento_Evento
+FROM Carregamento C
+JOIN Carregamento_Evento E ON E.Placa_Veiculo = C.Placa_Veiculo AND E.Data_Carregamento = C.Data_Carregamento;
+
+-- Remove o que depende das colunas que saem dos itens. A FK de Placa_Veiculo e o DEFAULT de
+-- Data_Carregamento foram criados sem nome no esquema inicial: o nome é buscado no catálogo.
+DROP INDEX IF EXISTS IX_Carregamento_Placa_Data ON Carregamento;
+ALTER TABLE Carregamento DROP CONSTRAINT UQ_Carregamento;
+DECLARE @sql NVARCHAR(MAX) = N'';
+SELECT @sql += N'ALTER TABLE Carregamento DROP CONSTRAINT ' + QUOTENAME(FK.name) + N';'
+FROM sys.foreign_keys FK
+JOIN sys.foreign_key_columns FKC ON FKC.constraint_object_id = FK.object_id
+WHERE FK.parent_object_id = OBJECT_ID('Carregamento')
+  AND COL_NAME(FKC.parent_object_id, FKC.parent_column_id) = 'Placa_Veiculo';
+SELECT @sql += N'ALTER TABLE Carregamento DROP CONSTRAINT ' + QUOTENAME(DC.name) + N';'
+FROM sys.default_constraints DC
+WHERE DC.parent_object_id = OBJECT_ID('Carregamento')
+  AND COL_NAME(DC.parent_object_id, DC.parent_column_id) = 'Data_Carregamento';
+EXEC sp_executesql @sql;
+ALTER TABLE Carregamento DROP COLUMN Placa_Veiculo, Data_Carregamento;
+
+ALTER TABLE Carregamento ALTER COLUMN ID_Carregamento_Evento INT NOT NULL;
+ALTER TABLE Carregamento ADD
+    CONSTRAINT FK_Carregamento_Evento FOREIGN KEY (ID_Carregamento_Evento) REFERENCES Carregamento_Evento(ID_Carregamento_Evento),
+    CONSTRAINT UQ_Carregamento_Item UNIQUE (ID_Carregamento_Evento, ID_Produto); -- Itens do carregamento em um único seek
+PRINT 'Tabela Carregamento_Evento criada.';
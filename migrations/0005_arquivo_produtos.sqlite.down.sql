@@ -0,0 +1,15 @@
+-- Variante SQLite da reversão 0005 (o SQLite aceita valores explícitos na PK sem IDENTITY_INSERT).
+INSERT INTO Dados_Rastreamento (ID_Rastreamento, Codigo_Rastreamento, Nome_Destinatario, CPF_Destinatario, ID_Endereco, Cidade, Estado, Telefone_Destinatario)
+SELECT ID_Rastreamento, Codigo_Rastreamento, Nome_Destinatario, CPF_Destinatario, ID_Endereco, Cidade, Estado, Telefone_Destinatario
+FROM Dados_Rastreamento_Arquivo;
+INSERT INTO Produto_A_Ser_Entregue (ID_Produto, Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Data_Ultimo_Status)
+SELECT ID_Produto, Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Data_Ultimo_Status
+FROM Produto_A_Ser_Entregue_Arquivo;
+INSERT INTO Historico_Status (ID_Evento, ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Evento, ID_Produto, Status_Entrega, Data_Evento FROM Historico_Status_Arquivo;
+INSERT INTO Carregamento (ID_Carregamento, ID_Carregamento_Evento, ID_Produto)
+SELECT ID_Carregamento, ID_Carregamento_Evento, ID_Produto FROM Carregamento_Arquivo;
+DROP TABLE Carregamento_Arquivo;
+DROP TABLE Historico_Status_Arquivo;
+DROP TABLE Produto_A_Ser_Entregue_Arquivo;
+DROP TABLE Dados_Rastreamento_Arquivo;
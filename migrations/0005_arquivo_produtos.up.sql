@@ -0,0 +1,52 @@
+-- Migração 0005: tabelas de arquivo (dados frios) para produtos finalizados.
+-- O job arquivamento.py move para cá, em lotes, os produtos 'Entregue'/'Cancelado' sem mudança de
+-- status há mais de N dias, junto com o rastreamento, o histórico de status e os itens de carregamento.
+-- Assim as tabelas quentes ficam só com o que ainda está em andamento.
+--
+-- As tabelas de arquivo não têm FKs: guardam o registro como estava ao ser arquivado e não impedem
+-- exclusões nas tabelas quentes (Pessoa, Funcionario, Endereco). Consultas devem usar LEFT JOIN.
+-- DATA_COMPRESSION = PAGE reduz o espaço (e o I/O) de dados que quase só são lidos.
+
+CREATE TABLE Dados_Rastreamento_Arquivo (
+    ID_Rastreamento INT PRIMARY KEY,
+    Codigo_Rastreamento VARCHAR(50) UNIQUE NOT NULL, -- Rastreamento de pedidos arquivados
+    Nome_Destinatario VARCHAR(255) NOT NULL,
+    CPF_Destinatario VARCHAR(14),
+    ID_Endereco INT NOT NULL,
+    Cidade VARCHAR(100) NOT NULL,
+    Estado VARCHAR(50) NOT NULL,
+    Telefone_Destinatario VARCHAR(20)
+) WITH (DATA_COMPRESSION = PAGE);
+
+CREATE TABLE Produto_A_Ser_Entregue_Arquivo (
+    ID_Produto INT PRIMARY KEY,
+    Peso DECIMAL(10, 2) NOT NULL,
+    Status_Entrega VARCHAR(50) NOT NULL,
+    Data_Chegada_CD DATE NOT NULL,
+    Data_Prevista_Entrega DATE,
+    Tipo_Produto VARCHAR(50) NOT NULL,
+    ID_Remetente INT NOT NULL,
+    ID_Destinatario INT NOT NULL,
+    Codigo_Funcionario_Motorista INT,
+    ID_Rastreamento INT UNIQUE NOT NULL,
+    Data_Ultimo_Status DATETIME NOT NULL,
+    Data_Arquivamento DATETIME NOT NULL DEFAULT GETDATE()
+) WITH (DATA_COMPRESSION = PAGE);
+
+CREATE TABLE Historico_Status_Arquivo (
+    ID_Evento BIGINT NOT NULL,
+    ID_Produto INT NOT NULL,
+    Status_Entrega VARCHAR(50) NOT NULL,
+    Data_Evento DATETIME NOT NULL,
+    CONSTRAINT PK_Historico_Status_Arquivo PRIMARY KEY NONCLUSTERED (ID_Evento)
+) WITH (DATA_COMPRESSION = PAGE);
+CREATE UNIQUE CLUSTERED INDEX CIX_Historico_Status_Arquivo_Produto ON Historico_Status_Arquivo (ID_Produto, ID_Evento)
+    WITH (DATA_COMPRESSION = PAGE);
+
+CREATE TABLE Carregamento_Arquivo (
+    ID_Carregamento INT PRIMARY KEY,
+    ID_Carregamento_Evento INT NOT NULL, -- O cabeçalho continua em Carregamento_Evento
+    ID_Produto INT NOT NULL,
+    CONSTRAINT UQ_Carregamento_Arquivo_Item UNIQUE (ID_Carregamento_Evento, ID_Produto)
+) WITH (DATA_COMPRESSION = PAGE);
+PRINT 'Tabelas de arquivo criadas.';
@@ -0,0 +1,3 @@
+-- migrar: sem-transacao
+-- Reverte a migração 0006.
+DROP INDEX IF EXISTS IX_Produto_Finalizados ON Produto_A_Ser_Entregue;
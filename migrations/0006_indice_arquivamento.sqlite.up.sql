@@ -0,0 +1,3 @@
+-- Variante SQLite da migração 0006 (índice parcial, sem INCLUDE nem ONLINE).
+CREATE INDEX IF NOT EXISTS IX_Produto_Finalizados ON Produto_A_Ser_Entregue (Data_Ultimo_Status)
+    WHERE Status_Entrega IN ('Entregue', 'Cancelado');
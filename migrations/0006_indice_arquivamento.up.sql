@@ -0,0 +1,9 @@
+-- migrar: sem-transacao
+-- Migração 0006: índice usado pelo job de arquivamento para achar, sem varrer a tabela, os produtos
+-- finalizados mais antigos. Filtrado: só contém as linhas 'Entregue'/'Cancelado'.
+-- Criado online e fora de transação, como os índices da migração 0002.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Produto_Finalizados' AND object_id = OBJECT_ID('Produto_A_Ser_Entregue'))
+    CREATE NONCLUSTERED INDEX IX_Produto_Finalizados ON Produto_A_Ser_Entregue (Data_Ultimo_Status)
+        INCLUDE (ID_Rastreamento)
+        WHERE Status_Entrega IN ('Entregue', 'Cancelado')
+    WITH (ONLINE = ON);
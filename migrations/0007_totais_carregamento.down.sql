@@ -0,0 +1,4 @@
+-- Reverte a migração 0007: os totais voltam a ser mantidos só pela aplicação.
+DROP TRIGGER IF EXISTS TR_Carregamento_Arquivo_Totais;
+DROP TRIGGER IF EXISTS TR_Produto_Peso_Carregamento;
+DROP TRIGGER IF EXISTS TR_Carregamento_Totais;
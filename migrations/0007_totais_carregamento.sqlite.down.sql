@@ -0,0 +1,6 @@
+-- Variante SQLite da reversão 0007.
+DROP TRIGGER IF EXISTS TR_Carregamento_Arquivo_Totais_Remocao;
+DROP TRIGGER IF EXISTS TR_Carregamento_Arquivo_Totais_Inclusao;
+DROP TRIGGER IF EXISTS TR_Produto_Peso_Carregamento;
+DROP TRIGGER IF EXISTS TR_Carregamento_Totais_Remocao;
+DROP TRIGGER IF EXISTS TR_Carregamento_Totais_Inclusao;
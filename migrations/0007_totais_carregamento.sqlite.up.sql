@@ -0,0 +1,63 @@
+-- Variante SQLite da migração 0007. O SQLite só tem triggers por linha (FOR EACH ROW) e recusa a
+-- operação com RAISE(ABORT). ROUND evita o acúmulo de erro de ponto flutuante nos totais.
+CREATE TRIGGER TR_Carregamento_Totais_Inclusao AFTER INSERT ON Carregamento
+BEGIN
+    UPDATE Carregamento_Evento
+    SET Peso_Total = ROUND(Peso_Total + (SELECT Peso FROM Produto_A_Ser_Entregue WHERE ID_Produto = NEW.ID_Produto), 2),
+        Quantidade_Itens = Quantidade_Itens + 1, Data_Atualizacao = CURRENT_TIMESTAMP
+    WHERE ID_Carregamento_Evento = NEW.ID_Carregamento_Evento;
+    SELECT RAISE(ABORT, 'Carga do veículo excedida: o peso total do carregamento passaria da Carga_Suportada.')
+    WHERE EXISTS (
+        SELECT 1 FROM Carregamento_Evento E JOIN Veiculo V ON V.Placa_Veiculo = E.Placa_Veiculo
+        WHERE E.ID_Carregamento_Evento = NEW.ID_Carregamento_Evento AND E.Peso_Total > V.Carga_Suportada
+    );
+END;
+
+CREATE TRIGGER TR_Carregamento_Totais_Remocao AFTER DELETE ON Carregamento
+BEGIN
+    UPDATE Carregamento_Evento
+    SET Peso_Total = ROUND(Peso_Total - (SELECT Peso FROM Produto_A_Ser_Entregue WHERE ID_Produto = OLD.ID_Produto), 2),
+        Quantidade_Itens = Quantidade_Itens - 1, Data_Atualizacao = CURRENT_TIMESTAMP
+    WHERE ID_Carregamento_Evento = OLD.ID_Carregamento_Evento;
+END;
+
+CREATE TRIGGER TR_Produto_Peso_Carregamento AFTER UPDATE OF Peso ON Produto_A_Ser_Entregue
+WHEN NEW.Peso <> OLD.Peso
+BEGIN
+    UPDATE Carregamento_Evento
+    SET Peso_Total = ROUND(Peso_Total + NEW.Peso - OLD.Peso, 2), Data_Atualizacao = CURRENT_TIMESTAMP
+    WHERE ID_Carregamento_Evento IN (SELECT ID_Carregamento_Evento FROM Carregamento WHERE ID_Produto = NEW.ID_Produto);
+    SELECT RAISE(ABORT, 'Carga do veículo excedida: o novo peso do produto faria o carregamento passar da Carga_Suportada.')
+    WHERE EXISTS (
+        SELECT 1 FROM Carregamento_Evento E
+        JOIN Veiculo V ON V.Placa_Veiculo = E.Placa_Veiculo
+        JOIN Carregamento C ON C.ID_Carregamento_Evento = E.ID_Carregamento_Evento
+        WHERE C.ID_Produto = NEW.ID_Produto AND E.Peso_Total > V.Carga_Suportada
+    );
+END;
+
+CREATE TRIGGER TR_Carregamento_Arquivo_Totais_Inclusao AFTER INSERT ON Carregamento_Arquivo
+BEGIN
+    UPDATE Carregamento_Evento
+    SET Peso_Total = ROUND(Peso_Total + (SELECT Peso FROM Produto_A_Ser_Entregue_Arquivo WHERE ID_Produto = NEW.ID_Produto), 2),
+        Quantidade_Itens = Quantidade_Itens + 1, Data_Atualizacao = CURRENT_TIMESTAMP
+    WHERE ID_Carregamento_Evento = NEW.ID_Carregamento_Evento;
+END;
+
+CREATE TRIGGER TR_Carregamento_Arquivo_Totais_Remocao AFTER DELETE ON Carregamento_Arquivo
+BEGIN
+    UPDATE Carregamento_Evento
+    SET Peso_Total = ROUND(Peso_Total - (SELECT Peso FROM Produto_A_Ser_Entregue_Arquivo WHERE ID_Produto = OLD.ID_Produto), 2),
+        Quantidade_Itens = Quantidade_Itens - 1, Data_Atualizacao = CURRENT_TIMESTAMP
+    WHERE ID_Carregamento_Evento = OLD.ID_Carregamento_Evento;
+END;
+
+UPDATE Carregamento_Evento
+SET Peso_Total = ROUND(
+        COALESCE((SELECT SUM(P.Peso) FROM Carregamento C JOIN Produto_A_Ser_Entregue P ON P.ID_Produto = C.ID_Produto
+                  WHERE C.ID_Carregamento_Evento = Carregamento_Evento.ID_Carregamento_Evento), 0)
+      + COALESCE((SELECT SUM(P.Peso) FROM Carregamento_Arquivo C JOIN Produto_A_Ser_Entregue_Arquivo P ON P.ID_Produto = C.ID_Produto
+                  WHERE C.ID_Carregamento_Evento = Carregamento_Evento.ID_Carregamento_Evento), 0), 2),
+    Quantidade_Itens =
+        (SELECT COUNT(*) FROM Carregamento C WHERE C.ID_Carregamento_Evento = Carregamento_Evento.ID_Carregamento_Evento)
+      + (SELECT COUNT(*) FROM Carregamento_Arquivo C WHERE C.ID_Carregamento_Evento = Carregamento_Evento.ID_Carregamento_Evento);
@@ -0,0 +1,113 @@
+-- Migração 0007: totais do carregamento mantidos pelo banco.
+-- Triggers atualizam Peso_Total e Quantidade_Itens de Carregamento_Evento a cada item incluído ou
+-- removido (e quando o peso de um produto carregado muda), e recusam a operação se o peso total
+-- passar da Carga_Suportada do veículo. A verificação de capacidade vale para qualquer sessão:
+-- o UPDATE do cabeçalho serializa as inclusões concorrentes no mesmo carregamento.
+--
+-- Itens arquivados (arquivamento.py) continuam contando no total: a inclusão em Carregamento_Arquivo
+-- soma o que a remoção de Carregamento subtrai.
+
+CREATE TRIGGER TR_Carregamento_Totais ON Carregamento
+AFTER INSERT, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    WITH Variacao AS (
+        SELECT ID_Carregamento_Evento, SUM(Peso) AS Peso, SUM(Quantidade) AS Quantidade
+        FROM (
+            SELECT I.ID_Carregamento_Evento, P.Peso, 1 AS Quantidade
+            FROM inserted I JOIN Produto_A_Ser_Entregue P ON P.ID_Produto = I.ID_Produto
+            UNION ALL
+            SELECT D.ID_Carregamento_Evento, -P.Peso, -1
+            FROM deleted D JOIN Produto_A_Ser_Entregue P ON P.ID_Produto = D.ID_Produto
+        ) Itens
+        GROUP BY ID_Carregamento_Evento
+    )
+    UPDATE E
+    SET Peso_Total = E.Peso_Total + V.Peso, Quantidade_Itens = E.Quantidade_Itens + V.Quantidade, Data_Atualizacao = GETDATE()
+    FROM Carregamento_Evento E
+    JOIN Variacao V ON V.ID_Carregamento_Evento = E.ID_Carregamento_Evento;
+
+    IF EXISTS (
+        SELECT 1
+        FROM Carregamento_Evento E
+        JOIN Veiculo V ON V.Placa_Veiculo = E.Placa_Veiculo
+        WHERE E.ID_Carregamento_Evento IN (SELECT ID_Carregamento_Evento FROM inserted)
+          AND E.Peso_Total > V.Carga_Suportada
+    )
+        THROW 50001, 'Carga do veículo excedida: o peso total do carregamento passaria da Carga_Suportada.', 1;
+END;
+GO
+
+CREATE TRIGGER TR_Produto_Peso_Carregamento ON Produto_A_Ser_Entregue
+AFTER UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    IF NOT UPDATE(Peso)
+        RETURN;
+    WITH Variacao AS (
+        SELECT C.ID_Carregamento_Evento, SUM(I.Peso - D.Peso) AS Peso
+        FROM inserted I
+        JOIN deleted D ON D.ID_Produto = I.ID_Produto
+        JOIN Carregamento C ON C.ID_Produto = I.ID_Produto
+        WHERE I.Peso <> D.Peso
+        GROUP BY C.ID_Carregamento_Evento
+    )
+    UPDATE E
+    SET Peso_Total = E.Peso_Total + V.Peso, Data_Atualizacao = GETDATE()
+    FROM Carregamento_Evento E
+    JOIN Variacao V ON V.ID_Carregamento_Evento = E.ID_Carregamento_Evento;
+
+    IF EXISTS (
+        SELECT 1
+        FROM Carregamento_Evento E
+        JOIN Veiculo V ON V.Placa_Veiculo = E.Placa_Veiculo
+        JOIN Carregamento C ON C.ID_Carregamento_Evento = E.ID_Carregamento_Evento
+        JOIN inserted I ON I.ID_Produto = C.ID_Produto
+        WHERE E.Peso_Total > V.Carga_Suportada
+    )
+        THROW 50001, 'Carga do veículo excedida: o novo peso do produto faria o carregamento passar da Carga_Suportada.', 1;
+END;
+GO
+
+-- Sem verificação de capacidade: durante o arquivamento o item é incluído aqui antes de sair de Carregamento.
+CREATE TRIGGER TR_Carregamento_Arquivo_Totais ON Carregamento_Arquivo
+AFTER INSERT, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    WITH Variacao AS (
+        SELECT ID_Carregamento_Evento, SUM(Peso) AS Peso, SUM(Quantidade) AS Quantidade
+        FROM (
+            SELECT I.ID_Carregamento_Evento, P.Peso, 1 AS Quantidade
+            FROM inserted I JOIN Produto_A_Ser_Entregue_Arquivo P ON P.ID_Produto = I.ID_Produto
+            UNION ALL
+            SELECT D.ID_Carregamento_Evento, -P.Peso, -1
+            FROM deleted D JOIN Produto_A_Ser_Entregue_Arquivo P ON P.ID_Produto = D.ID_Produto
+        ) Itens
+        GROUP BY ID_Carregamento_Evento
+    )
+    UPDATE E
+    SET Peso_Total = E.Peso_Total + V.Peso, Quantidade_Itens = E.Quantidade_Itens + V.Quantidade, Data_Atualizacao = GETDATE()
+    FROM Carregamento_Evento E
+    JOIN Variacao V ON V.ID_Carregamento_Evento = E.ID_Carregamento_Evento;
+END;
+GO
+
+-- Recalcula os totais atuais a partir dos itens (quentes e arquivados), como ponto de partida dos triggers.
+UPDATE E
+SET Peso_Total = ISNULL(Q.Peso, 0) + ISNULL(A.Peso, 0),
+    Quantidade_Itens = ISNULL(Q.Quantidade, 0) + ISNULL(A.Quantidade, 0)
+FROM Carregamento_Evento E
+LEFT JOIN (
+    SELECT C.ID_Carregamento_Evento, SUM(P.Peso) AS Peso, COUNT(*) AS Quantidade
+    FROM Carregamento C JOIN Produto_A_Ser_Entregue P ON P.ID_Produto = C.ID_Produto
+    GROUP BY C.ID_Carregamento_Evento
+) Q ON Q.ID_Carregamento_Evento = E.ID_Carregamento_Evento
+LEFT JOIN (
+    SELECT C.ID_Carregamento_Evento, SUM(P.Peso) AS Peso, COUNT(*) AS Quantidade
+    FROM Carregamento_Arquivo C JOIN Produto_A_Ser_Entregue_Arquivo P ON P.ID_Produto = C.ID_Produto
+    GROUP BY C.ID_Carregamento_Evento
+) A ON A.ID_Carregamento_Evento = E.ID_Carregamento_Evento;
+PRINT 'Triggers de totais do carregamento criados.';
@@ -0,0 +1,7 @@
+-- Reverte a migração 0008: remove a camada analítica (os fatos podem ser recarregados das tabelas quentes e de arquivo).
+DROP TABLE IF EXISTS Carga_Analitica;
+DROP TABLE IF EXISTS Fato_Carregamento;
+DROP TABLE IF EXISTS Fato_Status;
+DROP TABLE IF EXISTS Fato_Produto;
+ALTER TABLE Produto_A_Ser_Entregue DROP CONSTRAINT DF_Produto_Data_Atualizacao;
+ALTER TABLE Produto_A_Ser_Entregue DROP COLUMN Data_Atualizacao;
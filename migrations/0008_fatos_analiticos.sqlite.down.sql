@@ -0,0 +1,6 @@
+-- Variante SQLite da reversão 0008 (sem a DEFAULT constraint nomeada do SQL Server).
+DROP TABLE IF EXISTS Carga_Analitica;
+DROP TABLE IF EXISTS Fato_Carregamento;
+DROP TABLE IF EXISTS Fato_Status;
+DROP TABLE IF EXISTS Fato_Produto;
+ALTER TABLE Produto_A_Ser_Entregue DROP COLUMN Data_Atualizacao;
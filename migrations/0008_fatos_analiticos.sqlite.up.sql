@@ -0,0 +1,45 @@
+-- Variante SQLite da migração 0008. Sem índice columnstore: os fatos são tabelas comuns, com
+-- índice na chave. Data_Atualizacao fica anulável (ADD COLUMN não aceita DEFAULT não constante)
+-- e é preenchida aqui; o app a grava em cada INSERT/UPDATE do produto.
+ALTER TABLE Produto_A_Ser_Entregue ADD COLUMN Data_Atualizacao DATETIME;
+UPDATE Produto_A_Ser_Entregue SET Data_Atualizacao = CURRENT_TIMESTAMP;
+
+CREATE TABLE Fato_Produto (
+    ID_Produto INT NOT NULL,
+    Peso DECIMAL(10, 2) NOT NULL,
+    Status_Entrega VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Tipo_Produto VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Data_Chegada_CD DATE NOT NULL,
+    Data_Prevista_Entrega DATE,
+    Data_Ultimo_Status DATETIME NOT NULL,
+    ID_Remetente INT NOT NULL,
+    ID_Destinatario INT NOT NULL,
+    Codigo_Funcionario_Motorista INT,
+    Arquivado BIT NOT NULL
+);
+CREATE INDEX IX_Fato_Produto_ID ON Fato_Produto (ID_Produto);
+
+CREATE TABLE Fato_Status (
+    ID_Evento BIGINT NOT NULL,
+    ID_Produto INT NOT NULL,
+    Status_Entrega VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Data_Evento DATETIME NOT NULL
+);
+CREATE INDEX IX_Fato_Status_Produto ON Fato_Status (ID_Produto);
+
+CREATE TABLE Fato_Carregamento (
+    ID_Carregamento_Evento INT NOT NULL,
+    Placa_Veiculo VARCHAR(10) COLLATE NOCASE NOT NULL,
+    Tipo_Veiculo VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Carga_Suportada DECIMAL(10, 2) NOT NULL,
+    Data_Carregamento DATETIME NOT NULL,
+    Peso_Total DECIMAL(12, 2) NOT NULL,
+    Quantidade_Itens INT NOT NULL
+);
+CREATE INDEX IX_Fato_Carregamento_ID ON Fato_Carregamento (ID_Carregamento_Evento);
+
+CREATE TABLE Carga_Analitica (
+    Fato VARCHAR(50) COLLATE NOCASE PRIMARY KEY,
+    Ultima_Carga DATETIME
+);
+INSERT INTO Carga_Analitica (Fato) VALUES ('Fato_Produto'), ('Fato_Status'), ('Fato_Carregamento');
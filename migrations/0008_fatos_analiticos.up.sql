@@ -0,0 +1,63 @@
+-- Migração 0008: camada analítica (tabelas de fatos) para os relatórios gerenciais.
+-- Os relatórios agregam milhões de linhas; em vez de varrer as tabelas quentes (e disputar
+-- bloqueios com os operadores), leem cópias em formato colunar, atualizadas incrementalmente
+-- pelo job analitico.py:
+--   Fato_Produto      - uma linha por produto (quente ou arquivado), com o status atual
+--   Fato_Status       - um evento de Historico_Status por linha
+--   Fato_Carregamento - um carregamento (cabeçalho) por linha, com a capacidade do veículo
+-- O índice columnstore clusterizado comprime cada coluna e lê só as colunas da consulta; o índice
+-- não clusterizado na chave serve às remoções pontuais da atualização incremental.
+--
+-- Carga_Analitica guarda, por fato, até quando os dados já foram copiados (marca d'água).
+-- Produto_A_Ser_Entregue ganha Data_Atualizacao, gravada pelo app a cada alteração do produto,
+-- para o job saber quais produtos mudaram desde a última carga.
+
+ALTER TABLE Produto_A_Ser_Entregue ADD Data_Atualizacao DATETIME NOT NULL
+    CONSTRAINT DF_Produto_Data_Atualizacao DEFAULT GETDATE();
+GO
+
+CREATE TABLE Fato_Produto (
+    ID_Produto INT NOT NULL,
+    Peso DECIMAL(10, 2) NOT NULL,
+    Status_Entrega VARCHAR(50) NOT NULL,
+    Tipo_Produto VARCHAR(50) NOT NULL,
+    Data_Chegada_CD DATE NOT NULL,
+    Data_Prevista_Entrega DATE,
+    Data_Ultimo_Status DATETIME NOT NULL, -- Data da entrega, para os produtos 'Entregue'
+    ID_Remetente INT NOT NULL,
+    ID_Destinatario INT NOT NULL,
+    Codigo_Funcionario_Motorista INT,
+    Arquivado BIT NOT NULL
+);
+CREATE CLUSTERED COLUMNSTORE INDEX CCI_Fato_Produto ON Fato_Produto;
+CREATE NONCLUSTERED INDEX IX_Fato_Produto_ID ON Fato_Produto (ID_Produto);
+
+CREATE TABLE Fato_Status (
+    ID_Evento BIGINT NOT NULL,
+    ID_Produto INT NOT NULL,
+    Status_Entrega VARCHAR(50) NOT NULL,
+    Data_Evento DATETIME NOT NULL
+);
+CREATE CLUSTERED COLUMNSTORE INDEX CCI_Fato_Status ON Fato_Status;
+CREATE NONCLUSTERED INDEX IX_Fato_Status_Produto ON Fato_Status (ID_Produto);
+
+CREATE TABLE Fato_Carregamento (
+    ID_Carregamento_Evento INT NOT NULL,
+    Placa_Veiculo VARCHAR(10) NOT NULL,
+    Tipo_Veiculo VARCHAR(50) NOT NULL,
+    Carga_Suportada DECIMAL(10, 2) NOT NULL, -- Capacidade do veículo na data da carga
+    Data_Carregamento DATETIME NOT NULL,
+    Peso_Total DECIMAL(12, 2) NOT NULL,
+    Quantidade_Itens INT NOT NULL
+);
+CREATE CLUSTERED COLUMNSTORE INDEX CCI_Fato_Carregamento ON Fato_Carregamento;
+CREATE NONCLUSTERED INDEX IX_Fato_Carregamento_ID ON Fato_Carregamento (ID_Carregamento_Evento);
+
+CREATE TABLE Carga_Analitica (
+    Fato VARCHAR(50) PRIMARY KEY,
+    Ultima_Carga DATETIME -- NULL: nunca carregado (a próxima carga é completa)
+);
+INSERT INTO Carga_Analitica (Fato) VALUES ('Fato_Produto');
+INSERT INTO Carga_Analitica (Fato) VALUES ('Fato_Status');
+INSERT INTO Carga_Analitica (Fato) VALUES ('Fato_Carregamento');
+PRINT 'Tabelas de fatos criadas.';
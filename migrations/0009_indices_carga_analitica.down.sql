@@ -0,0 +1,7 @@
+-- migrar: sem-transacao
+-- Reverte a migração 0009.
+DROP INDEX IF EXISTS IX_Produto_Data_Atualizacao ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Arquivo_Arquivamento ON Produto_A_Ser_Entregue_Arquivo;
+DROP INDEX IF EXISTS IX_Historico_Status_Data ON Historico_Status;
+DROP INDEX IF EXISTS IX_Historico_Status_Arquivo_Data ON Historico_Status_Arquivo;
+DROP INDEX IF EXISTS IX_Carregamento_Evento_Atualizacao ON Carregamento_Evento;
@@ -0,0 +1,6 @@
+-- Variante SQLite da migração 0009 (sem ONLINE).
+CREATE INDEX IF NOT EXISTS IX_Produto_Data_Atualizacao ON Produto_A_Ser_Entregue (Data_Atualizacao);
+CREATE INDEX IF NOT EXISTS IX_Produto_Arquivo_Arquivamento ON Produto_A_Ser_Entregue_Arquivo (Data_Arquivamento);
+CREATE INDEX IF NOT EXISTS IX_Historico_Status_Data ON Historico_Status (Data_Evento);
+CREATE INDEX IF NOT EXISTS IX_Historico_Status_Arquivo_Data ON Historico_Status_Arquivo (Data_Evento);
+CREATE INDEX IF NOT EXISTS IX_Carregamento_Evento_Atualizacao ON Carregamento_Evento (Data_Atualizacao);
@@ -0,0 +1,33 @@
+-- migrar: sem-transacao
+-- Migração 0009: índices das marcas d'água da carga analítica (migração 0008). Sem eles, cada
+-- atualização incremental do analitico.py varreria as tabelas inteiras para achar o que mudou.
+-- Criados online e fora de transação, como os índices da migração 0002.
+
+-- Produtos alterados desde a última carga de Fato_Produto.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Produto_Data_Atualizacao' AND object_id = OBJECT_ID('Produto_A_Ser_Entregue'))
+    CREATE NONCLUSTERED INDEX IX_Produto_Data_Atualizacao ON Produto_A_Ser_Entregue (Data_Atualizacao)
+    WITH (ONLINE = ON);
+GO
+
+-- Produtos arquivados desde a última carga (passam a Arquivado = 1).
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Produto_Arquivo_Arquivamento' AND object_id = OBJECT_ID('Produto_A_Ser_Entregue_Arquivo'))
+    CREATE NONCLUSTERED INDEX IX_Produto_Arquivo_Arquivamento ON Produto_A_Ser_Entregue_Arquivo (Data_Arquivamento)
+    WITH (ONLINE = ON);
+GO
+
+-- Eventos de status gravados desde a última carga de Fato_Status.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Historico_Status_Data' AND object_id = OBJECT_ID('Historico_Status'))
+    CREATE NONCLUSTERED INDEX IX_Historico_Status_Data ON Historico_Status (Data_Evento)
+    WITH (ONLINE = ON);
+GO
+
+-- Eventos arquivados antes de chegarem a Fato_Status (carga completa ou job parado por meses).
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Historico_Status_Arquivo_Data' AND object_id = OBJECT_ID('Historico_Status_Arquivo'))
+    CREATE NONCLUSTERED INDEX IX_Historico_Status_Arquivo_Data ON Historico_Status_Arquivo (Data_Evento)
+    WITH (ONLINE = ON);
+GO
+
+-- Carregamentos criados ou alterados desde a última carga (Data_Atualizacao é mantida pelos triggers da 0007).
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Carregamento_Evento_Atualizacao' AND object_id = OBJECT_ID('Carregamento_Evento'))
+    CREATE NONCLUSTERED INDEX IX_Carregamento_Evento_Atualizacao ON Carregamento_Evento (Data_Atualizacao)
+    WITH (ONLINE = ON);
@@ -0,0 +1,87 @@
+-- Reverte a migração 0010: as colunas voltam a VARCHAR(50) com o nome do domínio e CHECK
+-- (agora com nome). Os fatos são esvaziados e recarregados na próxima execução de analitico.py.
+DROP INDEX IF EXISTS IX_Produto_Remetente ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Destinatario ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Pendentes ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Finalizados ON Produto_A_Ser_Entregue;
+DROP INDEX CCI_Fato_Produto ON Fato_Produto;
+DROP INDEX CCI_Fato_Status ON Fato_Status;
+DROP INDEX CCI_Fato_Carregamento ON Fato_Carregamento;
+ALTER TABLE Produto_A_Ser_Entregue DROP CONSTRAINT FK_Produto_Status_Entrega, FK_Produto_Tipo_Produto;
+ALTER TABLE Historico_Status DROP CONSTRAINT FK_Historico_Status_Status_Entrega;
+ALTER TABLE Veiculo DROP CONSTRAINT FK_Veiculo_Tipo, FK_Veiculo_Status;
+ALTER TABLE Funcionario DROP CONSTRAINT FK_Funcionario_Cargo, CHK_Funcionario_Cargo;
+ALTER TABLE Usuario DROP CONSTRAINT FK_Usuario_Tipo_Usuario;
+TRUNCATE TABLE Fato_Produto;
+TRUNCATE TABLE Fato_Status;
+TRUNCATE TABLE Fato_Carregamento;
+UPDATE Carga_Analitica SET Ultima_Carga = NULL;
+
+ALTER TABLE Produto_A_Ser_Entregue ALTER COLUMN Status_Entrega VARCHAR(50) NOT NULL;
+ALTER TABLE Produto_A_Ser_Entregue ALTER COLUMN Tipo_Produto VARCHAR(50) NOT NULL;
+ALTER TABLE Produto_A_Ser_Entregue_Arquivo ALTER COLUMN Status_Entrega VARCHAR(50) NOT NULL;
+ALTER TABLE Produto_A_Ser_Entregue_Arquivo ALTER COLUMN Tipo_Produto VARCHAR(50) NOT NULL;
+ALTER TABLE Historico_Status ALTER COLUMN Status_Entrega VARCHAR(50) NOT NULL;
+ALTER TABLE Historico_Status_Arquivo ALTER COLUMN Status_Entrega VARCHAR(50) NOT NULL;
+ALTER TABLE Veiculo ALTER COLUMN Tipo VARCHAR(50) NOT NULL;
+ALTER TABLE Veiculo ALTER COLUMN Status VARCHAR(20) NOT NULL;
+ALTER TABLE Funcionario ALTER COLUMN Cargo VARCHAR(50) NOT NULL;
+ALTER TABLE Usuario ALTER COLUMN Tipo_Usuario VARCHAR(50) NOT NULL;
+ALTER TABLE Fato_Produto ALTER COLUMN Status_Entrega VARCHAR(50) NOT NULL;
+ALTER TABLE Fato_Produto ALTER COLUMN Tipo_Produto VARCHAR(50) NOT NULL;
+ALTER TABLE Fato_Status ALTER COLUMN Status_Entrega VARCHAR(50) NOT NULL;
+ALTER TABLE Fato_Carregamento ALTER COLUMN Tipo_Veiculo VARCHAR(50) NOT NULL;
+GO
+
+UPDATE P SET Status_Entrega = S.Nome, Tipo_Produto = T.Nome
+FROM Produto_A_Ser_Entregue P
+JOIN Dominio_Status_Entrega S ON CAST(S.Codigo AS VARCHAR(50)) = P.Status_Entrega
+JOIN Dominio_Tipo_Produto T ON CAST(T.Codigo AS VARCHAR(50)) = P.Tipo_Produto;
+UPDATE P SET Status_Entrega = S.Nome, Tipo_Produto = T.Nome
+FROM Produto_A_Ser_Entregue_Arquivo P
+JOIN Dominio_Status_Entrega S ON CAST(S.Codigo AS VARCHAR(50)) = P.Status_Entrega
+JOIN Dominio_Tipo_Produto T ON CAST(T.Codigo AS VARCHAR(50)) = P.Tipo_Produto;
+UPDATE H SET Status_Entrega = S.Nome FROM Historico_Status H JOIN Dominio_Status_Entrega S ON CAST(S.Codigo AS VARCHAR(50)) = H.Status_Entrega;
+UPDATE H SET Status_Entrega = S.Nome FROM Historico_Status_Arquivo H JOIN Dominio_Status_Entrega S ON CAST(S.Codigo AS VARCHAR(50)) = H.Status_Entrega;
+UPDATE V SET Tipo = T.Nome, Status = S.Nome
+FROM Veiculo V
+JOIN Dominio_Tipo_Veiculo T ON CAST(T.Codigo AS VARCHAR(50)) = V.Tipo
+JOIN Dominio_Status_Veiculo S ON CAST(S.Codigo AS VARCHAR(50)) = V.Status;
+UPDATE F SET Cargo = C.Nome FROM Funcionario F JOIN Dominio_Cargo C ON CAST(C.Codigo AS VARCHAR(50)) = F.Cargo;
+UPDATE U SET Tipo_Usuario = T.Nome FROM Usuario U JOIN Dominio_Tipo_Usuario T ON CAST(T.Codigo AS VARCHAR(50)) = U.Tipo_Usuario;
+
+ALTER TABLE Produto_A_Ser_Entregue ADD CONSTRAINT CHK_Produto_Tipo_Produto CHECK (Tipo_Produto IN ('Fragil', 'Perecivel', 'Comum'));
+ALTER TABLE Veiculo ADD
+    CONSTRAINT CHK_Veiculo_Tipo CHECK (Tipo IN ('Carro', 'Moto', 'Van', 'Caminhão')),
+    CONSTRAINT CHK_Veiculo_Status CHECK (Status IN ('Disponivel', 'Indisponivel'));
+ALTER TABLE Funcionario ADD
+    CONSTRAINT CHK_Funcionario_Cargo_Valido CHECK (Cargo IN ('Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin')),
+    CONSTRAINT CHK_Funcionario_Cargo CHECK (
+        (Cargo = 'Motorista' AND Placa_Veiculo IS NOT NULL AND ID_Sede IS NULL) OR
+        (Cargo IN ('Auxiliar de Logistica', 'Atendente', 'Gerente') AND ID_Sede IS NOT NULL AND Placa_Veiculo IS NULL) OR
+        (Cargo = 'Admin' AND Placa_Veiculo IS NULL) OR
+        (Cargo NOT IN ('Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin') AND Placa_Veiculo IS NULL AND ID_Sede IS NULL)
+    );
+ALTER TABLE Usuario ADD CONSTRAINT CHK_Usuario_Tipo_Usuario
+    CHECK (Tipo_Usuario IN ('Cliente', 'Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin'));
+
+CREATE NONCLUSTERED INDEX IX_Produto_Remetente ON Produto_A_Ser_Entregue (ID_Remetente)
+    INCLUDE (Peso, Status_Entrega, Tipo_Produto, Data_Chegada_CD, Data_Prevista_Entrega, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento);
+CREATE NONCLUSTERED INDEX IX_Produto_Destinatario ON Produto_A_Ser_Entregue (ID_Destinatario)
+    INCLUDE (Peso, Status_Entrega, Tipo_Produto, Data_Chegada_CD, Data_Prevista_Entrega, ID_Remetente, Codigo_Funcionario_Motorista, ID_Rastreamento);
+CREATE NONCLUSTERED INDEX IX_Produto_Pendentes ON Produto_A_Ser_Entregue (ID_Produto)
+    INCLUDE (Peso, Status_Entrega, Tipo_Produto, ID_Rastreamento)
+    WHERE Status_Entrega IN ('Em Processamento', 'Aguardando Coleta');
+CREATE NONCLUSTERED INDEX IX_Produto_Finalizados ON Produto_A_Ser_Entregue (Data_Ultimo_Status)
+    INCLUDE (ID_Rastreamento)
+    WHERE Status_Entrega IN ('Entregue', 'Cancelado');
+CREATE CLUSTERED COLUMNSTORE INDEX CCI_Fato_Produto ON Fato_Produto;
+CREATE CLUSTERED COLUMNSTORE INDEX CCI_Fato_Status ON Fato_Status;
+CREATE CLUSTERED COLUMNSTORE INDEX CCI_Fato_Carregamento ON Fato_Carregamento;
+
+DROP TABLE Dominio_Tipo_Usuario;
+DROP TABLE Dominio_Cargo;
+DROP TABLE Dominio_Status_Veiculo;
+DROP TABLE Dominio_Tipo_Veiculo;
+DROP TABLE Dominio_Tipo_Produto;
+DROP TABLE Dominio_Status_Entrega;
@@ -0,0 +1,213 @@
+-- migrar: sem-transacao
+-- Reverte a variante SQLite da migração 0010: recria as tabelas com as colunas em texto e os
+-- CHECKs originais, trocando cada código pelo nome da tabela de domínio.
+PRAGMA foreign_keys = OFF;
+PRAGMA legacy_alter_table = ON;
+BEGIN;
+
+CREATE TABLE Veiculo_Nova (
+    Placa_Veiculo VARCHAR(10) COLLATE NOCASE PRIMARY KEY,
+    Carga_Suportada DECIMAL(10, 2) NOT NULL,
+    Tipo VARCHAR(50) COLLATE NOCASE NOT NULL CHECK (Tipo IN ('Carro', 'Moto', 'Van', 'Caminhão')),
+    Status VARCHAR(20) COLLATE NOCASE NOT NULL CHECK (Status IN ('Disponivel', 'Indisponivel'))
+);
+INSERT INTO Veiculo_Nova (Placa_Veiculo, Carga_Suportada, Tipo, Status)
+SELECT Placa_Veiculo, Carga_Suportada,
+       (SELECT Nome FROM Dominio_Tipo_Veiculo WHERE Codigo = V.Tipo),
+       (SELECT Nome FROM Dominio_Status_Veiculo WHERE Codigo = V.Status)
+FROM Veiculo V;
+DROP TABLE Veiculo;
+ALTER TABLE Veiculo_Nova RENAME TO Veiculo;
+
+CREATE TABLE Funcionario_Nova (
+    Codigo_Funcionario INT PRIMARY KEY,
+    CPF VARCHAR(14) COLLATE NOCASE UNIQUE NOT NULL,
+    Departamento VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Cargo VARCHAR(50) COLLATE NOCASE NOT NULL CHECK (Cargo IN ('Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin')),
+    Placa_Veiculo VARCHAR(10) COLLATE NOCASE,
+    ID_Sede INT,
+    FOREIGN KEY (Codigo_Funcionario) REFERENCES Pessoa(Codigo_Pessoa),
+    FOREIGN KEY (Placa_Veiculo) REFERENCES Veiculo(Placa_Veiculo),
+    FOREIGN KEY (ID_Sede) REFERENCES Sede(ID_Sede),
+    CONSTRAINT CHK_Funcionario_Cargo CHECK (
+        (Cargo = 'Motorista' AND Placa_Veiculo IS NOT NULL AND ID_Sede IS NULL) OR
+        (Cargo IN ('Auxiliar de Logistica', 'Atendente', 'Gerente') AND ID_Sede IS NOT NULL AND Placa_Veiculo IS NULL) OR
+        (Cargo = 'Admin' AND Placa_Veiculo IS NULL) OR
+        (Cargo NOT IN ('Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin') AND Placa_Veiculo IS NULL AND ID_Sede IS NULL)
+    )
+);
+INSERT INTO Funcionario_Nova (Codigo_Funcionario, CPF, Departamento, Cargo, Placa_Veiculo, ID_Sede)
+SELECT Codigo_Funcionario, CPF, Departamento, (SELECT Nome FROM Dominio_Cargo WHERE Codigo = F.Cargo), Placa_Veiculo, ID_Sede
+FROM Funcionario F;
+DROP TABLE Funcionario;
+ALTER TABLE Funcionario_Nova RENAME TO Funcionario;
+CREATE INDEX IX_Funcionario_Placa ON Funcionario (Placa_Veiculo)
+    WHERE Placa_Veiculo IS NOT NULL;
+CREATE INDEX IX_Funcionario_Sede ON Funcionario (ID_Sede)
+    WHERE ID_Sede IS NOT NULL;
+
+CREATE TABLE Usuario_Nova (
+    Login VARCHAR(100) COLLATE NOCASE PRIMARY KEY,
+    Senha_Hash VARCHAR(255) COLLATE NOCASE NOT NULL,
+    Codigo_Pessoa INT UNIQUE NOT NULL,
+    Tipo_Usuario VARCHAR(50) COLLATE NOCASE NOT NULL CHECK (Tipo_Usuario IN ('Cliente', 'Motorista', 'Auxiliar de Logistica', 'Atendente', 'Gerente', 'Admin')),
+    FOREIGN KEY (Codigo_Pessoa) REFERENCES Pessoa(Codigo_Pessoa)
+);
+INSERT INTO Usuario_Nova (Login, Senha_Hash, Codigo_Pessoa, Tipo_Usuario)
+SELECT Login, Senha_Hash, Codigo_Pessoa, (SELECT Nome FROM Dominio_Tipo_Usuario WHERE Codigo = U.Tipo_Usuario)
+FROM Usuario U;
+DROP TABLE Usuario;
+ALTER TABLE Usuario_Nova RENAME TO Usuario;
+
+CREATE TABLE Produto_A_Ser_Entregue_Nova (
+    ID_Produto INTEGER PRIMARY KEY AUTOINCREMENT,
+    Peso DECIMAL(10, 2) NOT NULL,
+    Status_Entrega VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Data_Chegada_CD DATE NOT NULL,
+    Data_Prevista_Entrega DATE,
+    Tipo_Produto VARCHAR(50) COLLATE NOCASE NOT NULL CHECK (Tipo_Produto IN ('Fragil', 'Perecivel', 'Comum')),
+    ID_Remetente INT NOT NULL,
+    ID_Destinatario INT NOT NULL,
+    Codigo_Funcionario_Motorista INT,
+    ID_Rastreamento INT UNIQUE NOT NULL,
+    Data_Ultimo_Status DATETIME,
+    Data_Atualizacao DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ID_Remetente) REFERENCES Pessoa(Codigo_Pessoa),
+    FOREIGN KEY (ID_Destinatario) REFERENCES Pessoa(Codigo_Pessoa),
+    FOREIGN KEY (Codigo_Funcionario_Motorista) REFERENCES Funcionario(Codigo_Funcionario),
+    FOREIGN KEY (ID_Rastreamento) REFERENCES Dados_Rastreamento(ID_Rastreamento)
+);
+INSERT INTO Produto_A_Ser_Entregue_Nova (ID_Produto, Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Data_Ultimo_Status, Data_Atualizacao)
+SELECT ID_Produto, Peso, (SELECT Nome FROM Dominio_Status_Entrega WHERE Codigo = P.Status_Entrega), Data_Chegada_CD, Data_Prevista_Entrega,
+       (SELECT Nome FROM Dominio_Tipo_Produto WHERE Codigo = P.Tipo_Produto), ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista,
+       ID_Rastreamento, Data_Ultimo_Status, Data_Atualizacao
+FROM Produto_A_Ser_Entregue P;
+UPDATE sqlite_sequence SET seq = MAX(seq, (SELECT seq FROM sqlite_sequence WHERE name = 'Produto_A_Ser_Entregue'))
+WHERE name = 'Produto_A_Ser_Entregue_Nova';
+DROP TABLE Produto_A_Ser_Entregue;
+ALTER TABLE Produto_A_Ser_Entregue_Nova RENAME TO Produto_A_Ser_Entregue;
+CREATE INDEX IX_Produto_Remetente ON Produto_A_Ser_Entregue (ID_Remetente);
+CREATE INDEX IX_Produto_Destinatario ON Produto_A_Ser_Entregue (ID_Destinatario);
+CREATE INDEX IX_Produto_Motorista ON Produto_A_Ser_Entregue (Codigo_Funcionario_Motorista)
+    WHERE Codigo_Funcionario_Motorista IS NOT NULL;
+CREATE INDEX IX_Produto_Pendentes ON Produto_A_Ser_Entregue (ID_Produto)
+    WHERE Status_Entrega IN ('Em Processamento', 'Aguardando Coleta');
+CREATE INDEX IX_Produto_Finalizados ON Produto_A_Ser_Entregue (Data_Ultimo_Status)
+    WHERE Status_Entrega IN ('Entregue', 'Cancelado');
+CREATE INDEX IX_Produto_Data_Atualizacao ON Produto_A_Ser_Entregue (Data_Atualizacao);
+CREATE TRIGGER TR_Produto_Peso_Carregamento AFTER UPDATE OF Peso ON Produto_A_Ser_Entregue
+WHEN NEW.Peso <> OLD.Peso
+BEGIN
+    UPDATE Carregamento_Evento
+    SET Peso_Total = ROUND(Peso_Total + NEW.Peso - OLD.Peso, 2), Data_Atualizacao = CURRENT_TIMESTAMP
+    WHERE ID_Carregamento_Evento IN (SELECT ID_Carregamento_Evento FROM Carregamento WHERE ID_Produto = NEW.ID_Produto);
+    SELECT RAISE(ABORT, 'Carga do veículo excedida: o novo peso do produto faria o carregamento passar da Carga_Suportada.')
+    WHERE EXISTS (
+        SELECT 1 FROM Carregamento_Evento E
+        JOIN Veiculo V ON V.Placa_Veiculo = E.Placa_Veiculo
+        JOIN Carregamento C ON C.ID_Carregamento_Evento = E.ID_Carregamento_Evento
+        WHERE C.ID_Produto = NEW.ID_Produto AND E.Peso_Total > V.Carga_Suportada
+    );
+END;
+
+CREATE TABLE Historico_Status_Nova (
+    ID_Evento INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Produto INT NOT NULL,
+    Status_Entrega VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Data_Evento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ID_Produto) REFERENCES Produto_A_Ser_Entregue(ID_Produto)
+);
+INSERT INTO Historico_Status_Nova (ID_Evento, ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Evento, ID_Produto, (SELECT Nome FROM Dominio_Status_Entrega WHERE Codigo = H.Status_Entrega), Data_Evento
+FROM Historico_Status H;
+UPDATE sqlite_sequence SET seq = MAX(seq, (SELECT seq FROM sqlite_sequence WHERE name = 'Historico_Status'))
+WHERE name = 'Historico_Status_Nova';
+DROP TABLE Historico_Status;
+ALTER TABLE Historico_Status_Nova RENAME TO Historico_Status;
+CREATE UNIQUE INDEX CIX_Historico_Status_Produto ON Historico_Status (ID_Produto, ID_Evento);
+CREATE INDEX IX_Historico_Status_Data ON Historico_Status (Data_Evento);
+
+CREATE TABLE Produto_A_Ser_Entregue_Arquivo_Nova (
+    ID_Produto INT PRIMARY KEY,
+    Peso DECIMAL(10, 2) NOT NULL,
+    Status_Entrega VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Data_Chegada_CD DATE NOT NULL,
+    Data_Prevista_Entrega DATE,
+    Tipo_Produto VARCHAR(50) COLLATE NOCASE NOT NULL,
+    ID_Remetente INT NOT NULL,
+    ID_Destinatario INT NOT NULL,
+    Codigo_Funcionario_Motorista INT,
+    ID_Rastreamento INT UNIQUE NOT NULL,
+    Data_Ultimo_Status DATETIME NOT NULL,
+    Data_Arquivamento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO Produto_A_Ser_Entregue_Arquivo_Nova (ID_Produto, Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Data_Ultimo_Status, Data_Arquivamento)
+SELECT ID_Produto, Peso, (SELECT Nome FROM Dominio_Status_Entrega WHERE Codigo = P.Status_Entrega), Data_Chegada_CD, Data_Prevista_Entrega,
+       (SELECT Nome FROM Dominio_Tipo_Produto WHERE Codigo = P.Tipo_Produto), ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista,
+       ID_Rastreamento, Data_Ultimo_Status, Data_Arquivamento
+FROM Produto_A_Ser_Entregue_Arquivo P;
+DROP TABLE Produto_A_Ser_Entregue_Arquivo;
+ALTER TABLE Produto_A_Ser_Entregue_Arquivo_Nova RENAME TO Produto_A_Ser_Entregue_Arquivo;
+CREATE INDEX IX_Produto_Arquivo_Arquivamento ON Produto_A_Ser_Entregue_Arquivo (Data_Arquivamento);
+
+CREATE TABLE Historico_Status_Arquivo_Nova (
+    ID_Evento BIGINT NOT NULL,
+    ID_Produto INT NOT NULL,
+    Status_Entrega VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Data_Evento DATETIME NOT NULL,
+    CONSTRAINT PK_Historico_Status_Arquivo PRIMARY KEY (ID_Evento)
+);
+INSERT INTO Historico_Status_Arquivo_Nova (ID_Evento, ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Evento, ID_Produto, (SELECT Nome FROM Dominio_Status_Entrega WHERE Codigo = H.Status_Entrega), Data_Evento
+FROM Historico_Status_Arquivo H;
+DROP TABLE Historico_Status_Arquivo;
+ALTER TABLE Historico_Status_Arquivo_Nova RENAME TO Historico_Status_Arquivo;
+CREATE UNIQUE INDEX CIX_Historico_Status_Arquivo_Produto ON Historico_Status_Arquivo (ID_Produto, ID_Evento);
+CREATE INDEX IX_Historico_Status_Arquivo_Data ON Historico_Status_Arquivo (Data_Evento);
+
+DROP TABLE Fato_Produto;
+CREATE TABLE Fato_Produto (
+    ID_Produto INT NOT NULL,
+    Peso DECIMAL(10, 2) NOT NULL,
+    Status_Entrega VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Tipo_Produto VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Data_Chegada_CD DATE NOT NULL,
+    Data_Prevista_Entrega DATE,
+    Data_Ultimo_Status DATETIME NOT NULL,
+    ID_Remetente INT NOT NULL,
+    ID_Destinatario INT NOT NULL,
+    Codigo_Funcionario_Motorista INT,
+    Arquivado BIT NOT NULL
+);
+CREATE INDEX IX_Fato_Produto_ID ON Fato_Produto (ID_Produto);
+DROP TABLE Fato_Status;
+CREATE TABLE Fato_Status (
+    ID_Evento BIGINT NOT NULL,
+    ID_Produto INT NOT NULL,
+    Status_Entrega VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Data_Evento DATETIME NOT NULL
+);
+CREATE INDEX IX_Fato_Status_Produto ON Fato_Status (ID_Produto);
+DROP TABLE Fato_Carregamento;
+CREATE TABLE Fato_Carregamento (
+    ID_Carregamento_Evento INT NOT NULL,
+    Placa_Veiculo VARCHAR(10) COLLATE NOCASE NOT NULL,
+    Tipo_Veiculo VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Carga_Suportada DECIMAL(10, 2) NOT NULL,
+    Data_Carregamento DATETIME NOT NULL,
+    Peso_Total DECIMAL(12, 2) NOT NULL,
+    Quantidade_Itens INT NOT NULL
+);
+CREATE INDEX IX_Fato_Carregamento_ID ON Fato_Carregamento (ID_Carregamento_Evento);
+UPDATE Carga_Analitica SET Ultima_Carga = NULL;
+
+DROP TABLE Dominio_Tipo_Usuario;
+DROP TABLE Dominio_Cargo;
+DROP TABLE Dominio_Status_Veiculo;
+DROP TABLE Dominio_Tipo_Veiculo;
+DROP TABLE Dominio_Tipo_Produto;
+DROP TABLE Dominio_Status_Entrega;
+
+COMMIT;
+PRAGMA legacy_alter_table = OFF;
+PRAGMA foreign_keys = ON;
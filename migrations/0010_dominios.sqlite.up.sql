@@ -0,0 +1,255 @@
+-- migrar: sem-transacao
+-- Variante SQLite da migração 0010. O SQLite não altera tipo nem CHECK de coluna: as tabelas
+-- convertidas são recriadas (nova tabela, cópia com o código no lugar do nome, troca de nome),
+-- com as chaves estrangeiras desligadas, o que só é possível fora de transação. A cópia em si
+-- roda numa transação explícita. Um nome fora do domínio vira NULL na cópia e a coluna NOT NULL
+-- cancela a migração. Os índices e o trigger das tabelas recriadas são recriados em seguida.
+-- legacy_alter_table evita que a troca de nome revalide os triggers que citam as tabelas recriadas.
+PRAGMA foreign_keys = OFF;
+PRAGMA legacy_alter_table = ON;
+BEGIN;
+
+CREATE TABLE Dominio_Status_Entrega (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) COLLATE NOCASE NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Tipo_Produto (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) COLLATE NOCASE NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Tipo_Veiculo (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) COLLATE NOCASE NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Status_Veiculo (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) COLLATE NOCASE NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Cargo (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) COLLATE NOCASE NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Tipo_Usuario (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) COLLATE NOCASE NOT NULL UNIQUE
+);
+
+INSERT INTO Dominio_Status_Entrega (Codigo, Nome) VALUES
+    (1, 'Em Processamento'), (2, 'Aguardando Coleta'), (3, 'Em Transito'), (4, 'Entregue'), (5, 'Cancelado'), (6, 'Falha na Entrega');
+INSERT INTO Dominio_Tipo_Produto (Codigo, Nome) VALUES (1, 'Fragil'), (2, 'Perecivel'), (3, 'Comum');
+INSERT INTO Dominio_Tipo_Veiculo (Codigo, Nome) VALUES (1, 'Carro'), (2, 'Moto'), (3, 'Van'), (4, 'Caminhão');
+INSERT INTO Dominio_Status_Veiculo (Codigo, Nome) VALUES (1, 'Disponivel'), (2, 'Indisponivel');
+INSERT INTO Dominio_Cargo (Codigo, Nome) VALUES (1, 'Motorista'), (2, 'Auxiliar de Logistica'), (3, 'Atendente'), (4, 'Gerente'), (5, 'Admin');
+INSERT INTO Dominio_Tipo_Usuario (Codigo, Nome) VALUES
+    (1, 'Cliente'), (2, 'Motorista'), (3, 'Auxiliar de Logistica'), (4, 'Atendente'), (5, 'Gerente'), (6, 'Admin');
+
+CREATE TABLE Veiculo_Nova (
+    Placa_Veiculo VARCHAR(10) COLLATE NOCASE PRIMARY KEY,
+    Carga_Suportada DECIMAL(10, 2) NOT NULL,
+    Tipo TINYINT NOT NULL,
+    Status TINYINT NOT NULL,
+    FOREIGN KEY (Tipo) REFERENCES Dominio_Tipo_Veiculo(Codigo),
+    FOREIGN KEY (Status) REFERENCES Dominio_Status_Veiculo(Codigo)
+);
+INSERT INTO Veiculo_Nova (Placa_Veiculo, Carga_Suportada, Tipo, Status)
+SELECT Placa_Veiculo, Carga_Suportada,
+       (SELECT Codigo FROM Dominio_Tipo_Veiculo WHERE Nome = V.Tipo),
+       (SELECT Codigo FROM Dominio_Status_Veiculo WHERE Nome = V.Status)
+FROM Veiculo V;
+DROP TABLE Veiculo;
+ALTER TABLE Veiculo_Nova RENAME TO Veiculo;
+
+-- 1 = Motorista; 2, 3, 4 = Auxiliar de Logistica, Atendente, Gerente; 5 = Admin
+CREATE TABLE Funcionario_Nova (
+    Codigo_Funcionario INT PRIMARY KEY,
+    CPF VARCHAR(14) COLLATE NOCASE UNIQUE NOT NULL,
+    Departamento VARCHAR(50) COLLATE NOCASE NOT NULL,
+    Cargo TINYINT NOT NULL,
+    Placa_Veiculo VARCHAR(10) COLLATE NOCASE,
+    ID_Sede INT,
+    FOREIGN KEY (Codigo_Funcionario) REFERENCES Pessoa(Codigo_Pessoa),
+    FOREIGN KEY (Placa_Veiculo) REFERENCES Veiculo(Placa_Veiculo),
+    FOREIGN KEY (ID_Sede) REFERENCES Sede(ID_Sede),
+    FOREIGN KEY (Cargo) REFERENCES Dominio_Cargo(Codigo),
+    CONSTRAINT CHK_Funcionario_Cargo CHECK (
+        (Cargo = 1 AND Placa_Veiculo IS NOT NULL AND ID_Sede IS NULL) OR
+        (Cargo IN (2, 3, 4) AND ID_Sede IS NOT NULL AND Placa_Veiculo IS NULL) OR
+        (Cargo = 5 AND Placa_Veiculo IS NULL)
+    )
+);
+INSERT INTO Funcionario_Nova (Codigo_Funcionario, CPF, Departamento, Cargo, Placa_Veiculo, ID_Sede)
+SELECT Codigo_Funcionario, CPF, Departamento, (SELECT Codigo FROM Dominio_Cargo WHERE Nome = F.Cargo), Placa_Veiculo, ID_Sede
+FROM Funcionario F;
+DROP TABLE Funcionario;
+ALTER TABLE Funcionario_Nova RENAME TO Funcionario;
+CREATE INDEX IX_Funcionario_Placa ON Funcionario (Placa_Veiculo)
+    WHERE Placa_Veiculo IS NOT NULL;
+CREATE INDEX IX_Funcionario_Sede ON Funcionario (ID_Sede)
+    WHERE ID_Sede IS NOT NULL;
+
+CREATE TABLE Usuario_Nova (
+    Login VARCHAR(100) COLLATE NOCASE PRIMARY KEY,
+    Senha_Hash VARCHAR(255) COLLATE NOCASE NOT NULL,
+    Codigo_Pessoa INT UNIQUE NOT NULL,
+    Tipo_Usuario TINYINT NOT NULL,
+    FOREIGN KEY (Codigo_Pessoa) REFERENCES Pessoa(Codigo_Pessoa),
+    FOREIGN KEY (Tipo_Usuario) REFERENCES Dominio_Tipo_Usuario(Codigo)
+);
+INSERT INTO Usuario_Nova (Login, Senha_Hash, Codigo_Pessoa, Tipo_Usuario)
+SELECT Login, Senha_Hash, Codigo_Pessoa, (SELECT Codigo FROM Dominio_Tipo_Usuario WHERE Nome = U.Tipo_Usuario)
+FROM Usuario U;
+DROP TABLE Usuario;
+ALTER TABLE Usuario_Nova RENAME TO Usuario;
+
+-- Na reconstrução, Data_Atualizacao ganha o DEFAULT que o ADD COLUMN da 0008 não aceitava: um INSERT
+-- que não a informe não deixa o produto fora da carga analítica.
+CREATE TABLE Produto_A_Ser_Entregue_Nova (
+    ID_Produto INTEGER PRIMARY KEY AUTOINCREMENT,
+    Peso DECIMAL(10, 2) NOT NULL,
+    Status_Entrega TINYINT NOT NULL,
+    Data_Chegada_CD DATE NOT NULL,
+    Data_Prevista_Entrega DATE,
+    Tipo_Produto TINYINT NOT NULL,
+    ID_Remetente INT NOT NULL,
+    ID_Destinatario INT NOT NULL,
+    Codigo_Funcionario_Motorista INT,
+    ID_Rastreamento INT UNIQUE NOT NULL,
+    Data_Ultimo_Status DATETIME,
+    Data_Atualizacao DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ID_Remetente) REFERENCES Pessoa(Codigo_Pessoa),
+    FOREIGN KEY (ID_Destinatario) REFERENCES Pessoa(Codigo_Pessoa),
+    FOREIGN KEY (Codigo_Funcionario_Motorista) REFERENCES Funcionario(Codigo_Funcionario),
+    FOREIGN KEY (ID_Rastreamento) REFERENCES Dados_Rastreamento(ID_Rastreamento),
+    FOREIGN KEY (Status_Entrega) REFERENCES Dominio_Status_Entrega(Codigo),
+    FOREIGN KEY (Tipo_Produto) REFERENCES Dominio_Tipo_Produto(Codigo)
+);
+INSERT INTO Produto_A_Ser_Entregue_Nova (ID_Produto, Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Data_Ultimo_Status, Data_Atualizacao)
+SELECT ID_Produto, Peso, (SELECT Codigo FROM Dominio_Status_Entrega WHERE Nome = P.Status_Entrega), Data_Chegada_CD, Data_Prevista_Entrega,
+       (SELECT Codigo FROM Dominio_Tipo_Produto WHERE Nome = P.Tipo_Produto), ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista,
+       ID_Rastreamento, Data_Ultimo_Status, Data_Atualizacao
+FROM Produto_A_Ser_Entregue P;
+-- Preserva o contador do AUTOINCREMENT (IDs de produtos já apagados não são reutilizados)
+UPDATE sqlite_sequence SET seq = MAX(seq, (SELECT seq FROM sqlite_sequence WHERE name = 'Produto_A_Ser_Entregue'))
+WHERE name = 'Produto_A_Ser_Entregue_Nova';
+DROP TABLE Produto_A_Ser_Entregue;
+ALTER TABLE Produto_A_Ser_Entregue_Nova RENAME TO Produto_A_Ser_Entregue;
+CREATE INDEX IX_Produto_Remetente ON Produto_A_Ser_Entregue (ID_Remetente);
+CREATE INDEX IX_Produto_Destinatario ON Produto_A_Ser_Entregue (ID_Destinatario);
+CREATE INDEX IX_Produto_Motorista ON Produto_A_Ser_Entregue (Codigo_Funcionario_Motorista)
+    WHERE Codigo_Funcionario_Motorista IS NOT NULL;
+CREATE INDEX IX_Produto_Pendentes ON Produto_A_Ser_Entregue (ID_Produto)
+    WHERE Status_Entrega IN (1, 2); -- Em Processamento, Aguardando Coleta
+CREATE INDEX IX_Produto_Finalizados ON Produto_A_Ser_Entregue (Data_Ultimo_Status)
+    WHERE Status_Entrega IN (4, 5); -- Entregue, Cancelado
+CREATE INDEX IX_Produto_Data_Atualizacao ON Produto_A_Ser_Entregue (Data_Atualizacao);
+CREATE TRIGGER TR_Produto_Peso_Carregamento AFTER UPDATE OF Peso ON Produto_A_Ser_Entregue
+WHEN NEW.Peso <> OLD.Peso
+BEGIN
+    UPDATE Carregamento_Evento
+    SET Peso_Total = ROUND(Peso_Total + NEW.Peso - OLD.Peso, 2), Data_Atualizacao = CURRENT_TIMESTAMP
+    WHERE ID_Carregamento_Evento IN (SELECT ID_Carregamento_Evento FROM Carregamento WHERE ID_Produto = NEW.ID_Produto);
+    SELECT RAISE(ABORT, 'Carga do veículo excedida: o novo peso do produto faria o carregamento passar da Carga_Suportada.')
+    WHERE EXISTS (
+        SELECT 1 FROM Carregamento_Evento E
+        JOIN Veiculo V ON V.Placa_Veiculo = E.Placa_Veiculo
+        JOIN Carregamento C ON C.ID_Carregamento_Evento = E.ID_Carregamento_Evento
+        WHERE C.ID_Produto = NEW.ID_Produto AND E.Peso_Total > V.Carga_Suportada
+    );
+END;
+
+CREATE TABLE Historico_Status_Nova (
+    ID_Evento INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Produto INT NOT NULL,
+    Status_Entrega TINYINT NOT NULL,
+    Data_Evento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ID_Produto) REFERENCES Produto_A_Ser_Entregue(ID_Produto),
+    FOREIGN KEY (Status_Entrega) REFERENCES Dominio_Status_Entrega(Codigo)
+);
+INSERT INTO Historico_Status_Nova (ID_Evento, ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Evento, ID_Produto, (SELECT Codigo FROM Dominio_Status_Entrega WHERE Nome = H.Status_Entrega), Data_Evento
+FROM Historico_Status H;
+UPDATE sqlite_sequence SET seq = MAX(seq, (SELECT seq FROM sqlite_sequence WHERE name = 'Historico_Status'))
+WHERE name = 'Historico_Status_Nova';
+DROP TABLE Historico_Status;
+ALTER TABLE Historico_Status_Nova RENAME TO Historico_Status;
+CREATE UNIQUE INDEX CIX_Historico_Status_Produto ON Historico_Status (ID_Produto, ID_Evento);
+CREATE INDEX IX_Historico_Status_Data ON Historico_Status (Data_Evento);
+
+CREATE TABLE Produto_A_Ser_Entregue_Arquivo_Nova (
+    ID_Produto INT PRIMARY KEY,
+    Peso DECIMAL(10, 2) NOT NULL,
+    Status_Entrega TINYINT NOT NULL,
+    Data_Chegada_CD DATE NOT NULL,
+    Data_Prevista_Entrega DATE,
+    Tipo_Produto TINYINT NOT NULL,
+    ID_Remetente INT NOT NULL,
+    ID_Destinatario INT NOT NULL,
+    Codigo_Funcionario_Motorista INT,
+    ID_Rastreamento INT UNIQUE NOT NULL,
+    Data_Ultimo_Status DATETIME NOT NULL,
+    Data_Arquivamento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO Produto_A_Ser_Entregue_Arquivo_Nova (ID_Produto, Peso, Status_Entrega, Data_Chegada_CD, Data_Prevista_Entrega, Tipo_Produto, ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento, Data_Ultimo_Status, Data_Arquivamento)
+SELECT ID_Produto, Peso, (SELECT Codigo FROM Dominio_Status_Entrega WHERE Nome = P.Status_Entrega), Data_Chegada_CD, Data_Prevista_Entrega,
+       (SELECT Codigo FROM Dominio_Tipo_Produto WHERE Nome = P.Tipo_Produto), ID_Remetente, ID_Destinatario, Codigo_Funcionario_Motorista,
+       ID_Rastreamento, Data_Ultimo_Status, Data_Arquivamento
+FROM Produto_A_Ser_Entregue_Arquivo P;
+DROP TABLE Produto_A_Ser_Entregue_Arquivo;
+ALTER TABLE Produto_A_Ser_Entregue_Arquivo_Nova RENAME TO Produto_A_Ser_Entregue_Arquivo;
+CREATE INDEX IX_Produto_Arquivo_Arquivamento ON Produto_A_Ser_Entregue_Arquivo (Data_Arquivamento);
+
+CREATE TABLE Historico_Status_Arquivo_Nova (
+    ID_Evento BIGINT NOT NULL,
+    ID_Produto INT NOT NULL,
+    Status_Entrega TINYINT NOT NULL,
+    Data_Evento DATETIME NOT NULL,
+    CONSTRAINT PK_Historico_Status_Arquivo PRIMARY KEY (ID_Evento)
+);
+INSERT INTO Historico_Status_Arquivo_Nova (ID_Evento, ID_Produto, Status_Entrega, Data_Evento)
+SELECT ID_Evento, ID_Produto, (SELECT Codigo FROM Dominio_Status_Entrega WHERE Nome = H.Status_Entrega), Data_Evento
+FROM Historico_Status_Arquivo H;
+DROP TABLE Historico_Status_Arquivo;
+ALTER TABLE Historico_Status_Arquivo_Nova RENAME TO Historico_Status_Arquivo;
+CREATE UNIQUE INDEX CIX_Historico_Status_Arquivo_Produto ON Historico_Status_Arquivo (ID_Produto, ID_Evento);
+CREATE INDEX IX_Historico_Status_Arquivo_Data ON Historico_Status_Arquivo (Data_Evento);
+
+-- Fatos: recriados vazios e recarregados por inteiro na próxima execução de analitico.py.
+DROP TABLE Fato_Produto;
+CREATE TABLE Fato_Produto (
+    ID_Produto INT NOT NULL,
+    Peso DECIMAL(10, 2) NOT NULL,
+    Status_Entrega TINYINT NOT NULL,
+    Tipo_Produto TINYINT NOT NULL,
+    Data_Chegada_CD DATE NOT NULL,
+    Data_Prevista_Entrega DATE,
+    Data_Ultimo_Status DATETIME NOT NULL,
+    ID_Remetente INT NOT NULL,
+    ID_Destinatario INT NOT NULL,
+    Codigo_Funcionario_Motorista INT,
+    Arquivado BIT NOT NULL
+);
+CREATE INDEX IX_Fato_Produto_ID ON Fato_Produto (ID_Produto);
+DROP TABLE Fato_Status;
+CREATE TABLE Fato_Status (
+    ID_Evento BIGINT NOT NULL,
+    ID_Produto INT NOT NULL,
+    Status_Entrega TINYINT NOT NULL,
+    Data_Evento DATETIME NOT NULL
+);
+CREATE INDEX IX_Fato_Status_Produto ON Fato_Status (ID_Produto);
+DROP TABLE Fato_Carregamento;
+CREATE TABLE Fato_Carregamento (
+    ID_Carregamento_Evento INT NOT NULL,
+    Placa_Veiculo VARCHAR(10) COLLATE NOCASE NOT NULL,
+    Tipo_Veiculo TINYINT NOT NULL,
+    Carga_Suportada DECIMAL(10, 2) NOT NULL,
+    Data_Carregamento DATETIME NOT NULL,
+    Peso_Total DECIMAL(12, 2) NOT NULL,
+    Quantidade_Itens INT NOT NULL
+);
+CREATE INDEX IX_Fato_Carregamento_ID ON Fato_Carregamento (ID_Carregamento_Evento);
+UPDATE Carga_Analitica SET Ultima_Carga = NULL;
+
+COMMIT;
+PRAGMA legacy_alter_table = OFF;
+PRAGMA foreign_keys = ON;
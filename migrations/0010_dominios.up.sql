@@ -0,0 +1,145 @@
+-- Migração 0010: domínios codificados (TINYINT) no lugar dos textos com CHECK.
+-- Status_Entrega, Tipo_Produto, Veiculo.Tipo, Veiculo.Status, Funcionario.Cargo e Usuario.Tipo_Usuario
+-- passam a guardar o código (1 byte em vez de até 50), com FK para as tabelas Dominio_*.
+-- As tabelas de domínio têm os mesmos códigos e nomes dos enums de dominios.py, que o app confere
+-- ao iniciar. As colunas mantêm o nome; as tabelas de arquivo e de fatos também passam a códigos
+-- (sem FK, como o resto delas).
+--
+-- Reescreve as tabelas convertidas e recria os índices que dependem das colunas: rode em janela
+-- de manutenção. Se algum produto tiver status fora do domínio, a migração é cancelada.
+
+CREATE TABLE Dominio_Status_Entrega (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Tipo_Produto (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Tipo_Veiculo (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Status_Veiculo (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Cargo (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) NOT NULL UNIQUE
+);
+CREATE TABLE Dominio_Tipo_Usuario (
+    Codigo TINYINT PRIMARY KEY,
+    Nome VARCHAR(50) NOT NULL UNIQUE
+);
+
+INSERT INTO Dominio_Status_Entrega (Codigo, Nome) VALUES
+    (1, 'Em Processamento'), (2, 'Aguardando Coleta'), (3, 'Em Transito'), (4, 'Entregue'), (5, 'Cancelado'), (6, 'Falha na Entrega');
+INSERT INTO Dominio_Tipo_Produto (Codigo, Nome) VALUES (1, 'Fragil'), (2, 'Perecivel'), (3, 'Comum');
+INSERT INTO Dominio_Tipo_Veiculo (Codigo, Nome) VALUES (1, 'Carro'), (2, 'Moto'), (3, 'Van'), (4, 'Caminhão');
+INSERT INTO Dominio_Status_Veiculo (Codigo, Nome) VALUES (1, 'Disponivel'), (2, 'Indisponivel');
+INSERT INTO Dominio_Cargo (Codigo, Nome) VALUES (1, 'Motorista'), (2, 'Auxiliar de Logistica'), (3, 'Atendente'), (4, 'Gerente'), (5, 'Admin');
+INSERT INTO Dominio_Tipo_Usuario (Codigo, Nome) VALUES
+    (1, 'Cliente'), (2, 'Motorista'), (3, 'Auxiliar de Logistica'), (4, 'Atendente'), (5, 'Gerente'), (6, 'Admin');
+
+-- Status_Entrega nunca teve CHECK: um valor fora do domínio cancela a migração (os outros têm CHECK).
+IF EXISTS (
+    SELECT Status_Entrega FROM Produto_A_Ser_Entregue
+    UNION SELECT Status_Entrega FROM Historico_Status
+    UNION SELECT Status_Entrega FROM Produto_A_Ser_Entregue_Arquivo
+    UNION SELECT Status_Entrega FROM Historico_Status_Arquivo
+    EXCEPT SELECT Nome FROM Dominio_Status_Entrega
+)
+    THROW 50002, 'Há Status_Entrega fora de Dominio_Status_Entrega. Corrija os produtos ou inclua o status nesta migração e em dominios.py.', 1;
+
+-- Remove o que depende das colunas convertidas: índices com Status_Entrega/Tipo_Produto (chave,
+-- INCLUDE ou filtro), o columnstore dos fatos e os CHECKs (os de coluna foram criados sem nome).
+DROP INDEX IF EXISTS IX_Produto_Remetente ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Destinatario ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Pendentes ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Finalizados ON Produto_A_Ser_Entregue;
+DROP INDEX CCI_Fato_Produto ON Fato_Produto;
+DROP INDEX CCI_Fato_Status ON Fato_Status;
+DROP INDEX CCI_Fato_Carregamento ON Fato_Carregamento;
+DECLARE @sql NVARCHAR(MAX) = N'';
+SELECT @sql += N'ALTER TABLE ' + QUOTENAME(OBJECT_NAME(CC.parent_object_id)) + N' DROP CONSTRAINT ' + QUOTENAME(CC.name) + N';'
+FROM sys.check_constraints CC
+WHERE (CC.parent_object_id = OBJECT_ID('Produto_A_Ser_Entregue') AND COL_NAME(CC.parent_object_id, CC.parent_column_id) = 'Tipo_Produto')
+   OR (CC.parent_object_id = OBJECT_ID('Veiculo') AND COL_NAME(CC.parent_object_id, CC.parent_column_id) IN ('Tipo', 'Status'))
+   OR (CC.parent_object_id = OBJECT_ID('Funcionario') AND (COL_NAME(CC.parent_object_id, CC.parent_column_id) = 'Cargo' OR CC.name = 'CHK_Funcionario_Cargo'))
+   OR (CC.parent_object_id = OBJECT_ID('Usuario') AND COL_NAME(CC.parent_object_id, CC.parent_column_id) = 'Tipo_Usuario');
+EXEC sp_executesql @sql;
+
+-- Troca o texto pelo código (ainda na coluna VARCHAR) e depois muda o tipo da coluna.
+-- Os fatos são esvaziados e recarregados por inteiro na próxima execução de analitico.py.
+UPDATE P SET Status_Entrega = S.Codigo, Tipo_Produto = T.Codigo
+FROM Produto_A_Ser_Entregue P
+JOIN Dominio_Status_Entrega S ON S.Nome = P.Status_Entrega
+JOIN Dominio_Tipo_Produto T ON T.Nome = P.Tipo_Produto;
+UPDATE P SET Status_Entrega = S.Codigo, Tipo_Produto = T.Codigo
+FROM Produto_A_Ser_Entregue_Arquivo P
+JOIN Dominio_Status_Entrega S ON S.Nome = P.Status_Entrega
+JOIN Dominio_Tipo_Produto T ON T.Nome = P.Tipo_Produto;
+UPDATE H SET Status_Entrega = S.Codigo FROM Historico_Status H JOIN Dominio_Status_Entrega S ON S.Nome = H.Status_Entrega;
+UPDATE H SET Status_Entrega = S.Codigo FROM Historico_Status_Arquivo H JOIN Dominio_Status_Entrega S ON S.Nome = H.Status_Entrega;
+UPDATE V SET Tipo = T.Codigo, Status = S.Codigo
+FROM Veiculo V
+JOIN Dominio_Tipo_Veiculo T ON T.Nome = V.Tipo
+JOIN Dominio_Status_Veiculo S ON S.Nome = V.Status;
+UPDATE F SET Cargo = C.Codigo FROM Funcionario F JOIN Dominio_Cargo C ON C.Nome = F.Cargo;
+UPDATE U SET Tipo_Usuario = T.Codigo FROM Usuario U JOIN Dominio_Tipo_Usuario T ON T.Nome = U.Tipo_Usuario;
+TRUNCATE TABLE Fato_Produto;
+TRUNCATE TABLE Fato_Status;
+TRUNCATE TABLE Fato_Carregamento;
+UPDATE Carga_Analitica SET Ultima_Carga = NULL;
+
+ALTER TABLE Produto_A_Ser_Entregue ALTER COLUMN Status_Entrega TINYINT NOT NULL;
+ALTER TABLE Produto_A_Ser_Entregue ALTER COLUMN Tipo_Produto TINYINT NOT NULL;
+ALTER TABLE Produto_A_Ser_Entregue_Arquivo ALTER COLUMN Status_Entrega TINYINT NOT NULL;
+ALTER TABLE Produto_A_Ser_Entregue_Arquivo ALTER COLUMN Tipo_Produto TINYINT NOT NULL;
+ALTER TABLE Historico_Status ALTER COLUMN Status_Entrega TINYINT NOT NULL;
+ALTER TABLE Historico_Status_Arquivo ALTER COLUMN Status_Entrega TINYINT NOT NULL;
+ALTER TABLE Veiculo ALTER COLUMN Tipo TINYINT NOT NULL;
+ALTER TABLE Veiculo ALTER COLUMN Status TINYINT NOT NULL;
+ALTER TABLE Funcionario ALTER COLUMN Cargo TINYINT NOT NULL;
+ALTER TABLE Usuario ALTER COLUMN Tipo_Usuario TINYINT NOT NULL;
+ALTER TABLE Fato_Produto ALTER COLUMN Status_Entrega TINYINT NOT NULL;
+ALTER TABLE Fato_Produto ALTER COLUMN Tipo_Produto TINYINT NOT NULL;
+ALTER TABLE Fato_Status ALTER COLUMN Status_Entrega TINYINT NOT NULL;
+ALTER TABLE Fato_Carregamento ALTER COLUMN Tipo_Veiculo TINYINT NOT NULL;
+GO
+
+ALTER TABLE Produto_A_Ser_Entregue ADD
+    CONSTRAINT FK_Produto_Status_Entrega FOREIGN KEY (Status_Entrega) REFERENCES Dominio_Status_Entrega(Codigo),
+    CONSTRAINT FK_Produto_Tipo_Produto FOREIGN KEY (Tipo_Produto) REFERENCES Dominio_Tipo_Produto(Codigo);
+ALTER TABLE Historico_Status ADD
+    CONSTRAINT FK_Historico_Status_Status_Entrega FOREIGN KEY (Status_Entrega) REFERENCES Dominio_Status_Entrega(Codigo);
+ALTER TABLE Veiculo ADD
+    CONSTRAINT FK_Veiculo_Tipo FOREIGN KEY (Tipo) REFERENCES Dominio_Tipo_Veiculo(Codigo),
+    CONSTRAINT FK_Veiculo_Status FOREIGN KEY (Status) REFERENCES Dominio_Status_Veiculo(Codigo);
+-- 1 = Motorista; 2, 3, 4 = Auxiliar de Logistica, Atendente, Gerente; 5 = Admin
+ALTER TABLE Funcionario ADD
+    CONSTRAINT FK_Funcionario_Cargo FOREIGN KEY (Cargo) REFERENCES Dominio_Cargo(Codigo),
+    CONSTRAINT CHK_Funcionario_Cargo CHECK (
+        (Cargo = 1 AND Placa_Veiculo IS NOT NULL AND ID_Sede IS NULL) OR
+        (Cargo IN (2, 3, 4) AND ID_Sede IS NOT NULL AND Placa_Veiculo IS NULL) OR
+        (Cargo = 5 AND Placa_Veiculo IS NULL)
+    );
+ALTER TABLE Usuario ADD
+    CONSTRAINT FK_Usuario_Tipo_Usuario FOREIGN KEY (Tipo_Usuario) REFERENCES Dominio_Tipo_Usuario(Codigo);
+
+-- Índices removidos acima, com as mesmas colunas; os filtros passam a usar os códigos.
+CREATE NONCLUSTERED INDEX IX_Produto_Remetente ON Produto_A_Ser_Entregue (ID_Remetente)
+    INCLUDE (Peso, Status_Entrega, Tipo_Produto, Data_Chegada_CD, Data_Prevista_Entrega, ID_Destinatario, Codigo_Funcionario_Motorista, ID_Rastreamento);
+CREATE NONCLUSTERED INDEX IX_Produto_Destinatario ON Produto_A_Ser_Entregue (ID_Destinatario)
+    INCLUDE (Peso, Status_Entrega, Tipo_Produto, Data_Chegada_CD, Data_Prevista_Entrega, ID_Remetente, Codigo_Funcionario_Motorista, ID_Rastreamento);
+CREATE NONCLUSTERED INDEX IX_Produto_Pendentes ON Produto_A_Ser_Entregue (ID_Produto)
+    INCLUDE (Peso, Status_Entrega, Tipo_Produto, ID_Rastreamento)
+    WHERE Status_Entrega IN (1, 2); -- Em Processamento, Aguardando Coleta
+CREATE NONCLUSTERED INDEX IX_Produto_Finalizados ON Produto_A_Ser_Entregue (Data_Ultimo_Status)
+    INCLUDE (ID_Rastreamento)
+    WHERE Status_Entrega IN (4, 5); -- Entregue, Cancelado
+CREATE CLUSTERED COLUMNSTORE INDEX CCI_Fato_Produto ON Fato_Produto;
+CREATE CLUSTERED COLUMNSTORE INDEX CCI_Fato_Status ON Fato_Status;
+CREATE CLUSTERED COLUMNSTORE INDEX CCI_Fato_Carregamento ON Fato_Carregamento;
+PRINT 'Domínios codificados criados.';
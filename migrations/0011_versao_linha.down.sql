@@ -0,0 +1,10 @@
+-- Reverte a migração 0011.
+ALTER TABLE Endereco DROP COLUMN Versao_Linha;
+ALTER TABLE Pessoa DROP COLUMN Versao_Linha;
+ALTER TABLE Cliente DROP COLUMN Versao_Linha;
+ALTER TABLE Funcionario DROP COLUMN Versao_Linha;
+ALTER TABLE Veiculo DROP COLUMN Versao_Linha;
+ALTER TABLE Sede DROP COLUMN Versao_Linha;
+ALTER TABLE Usuario DROP COLUMN Versao_Linha;
+ALTER TABLE Dados_Rastreamento DROP COLUMN Versao_Linha;
+ALTER TABLE Produto_A_Ser_Entregue DROP COLUMN Versao_Linha;
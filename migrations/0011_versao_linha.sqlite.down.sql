@@ -0,0 +1,19 @@
+-- Reverte a variante SQLite da migração 0011.
+DROP TRIGGER IF EXISTS TR_Endereco_Versao_Linha;
+ALTER TABLE Endereco DROP COLUMN Versao_Linha;
+DROP TRIGGER IF EXISTS TR_Pessoa_Versao_Linha;
+ALTER TABLE Pessoa DROP COLUMN Versao_Linha;
+DROP TRIGGER IF EXISTS TR_Cliente_Versao_Linha;
+ALTER TABLE Cliente DROP COLUMN Versao_Linha;
+DROP TRIGGER IF EXISTS TR_Funcionario_Versao_Linha;
+ALTER TABLE Funcionario DROP COLUMN Versao_Linha;
+DROP TRIGGER IF EXISTS TR_Veiculo_Versao_Linha;
+ALTER TABLE Veiculo DROP COLUMN Versao_Linha;
+DROP TRIGGER IF EXISTS TR_Sede_Versao_Linha;
+ALTER TABLE Sede DROP COLUMN Versao_Linha;
+DROP TRIGGER IF EXISTS TR_Usuario_Versao_Linha;
+ALTER TABLE Usuario DROP COLUMN Versao_Linha;
+DROP TRIGGER IF EXISTS TR_Dados_Rastreamento_Versao_Linha;
+ALTER TABLE Dados_Rastreamento DROP COLUMN Versao_Linha;
+DROP TRIGGER IF EXISTS TR_Produto_A_Ser_Entregue_Versao_Linha;
+ALTER TABLE Produto_A_Ser_Entregue DROP COLUMN Versao_Linha;
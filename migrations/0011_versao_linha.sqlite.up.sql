@@ -0,0 +1,66 @@
+-- Variante SQLite da migração 0011. Sem ROWVERSION: Versao_Linha é um contador incrementado por
+-- trigger a cada UPDATE que não a altere explicitamente. O UPDATE do trigger não dispara o próprio
+-- trigger de novo (recursive_triggers fica desligado).
+
+ALTER TABLE Endereco ADD COLUMN Versao_Linha INTEGER NOT NULL DEFAULT 1;
+CREATE TRIGGER TR_Endereco_Versao_Linha AFTER UPDATE ON Endereco
+WHEN NEW.Versao_Linha = OLD.Versao_Linha
+BEGIN
+    UPDATE Endereco SET Versao_Linha = OLD.Versao_Linha + 1 WHERE rowid = NEW.rowid;
+END;
+
+ALTER TABLE Pessoa ADD COLUMN Versao_Linha INTEGER NOT NULL DEFAULT 1;
+CREATE TRIGGER TR_Pessoa_Versao_Linha AFTER UPDATE ON Pessoa
+WHEN NEW.Versao_Linha = OLD.Versao_Linha
+BEGIN
+    UPDATE Pessoa SET Versao_Linha = OLD.Versao_Linha + 1 WHERE rowid = NEW.rowid;
+END;
+
+ALTER TABLE Cliente ADD COLUMN Versao_Linha INTEGER NOT NULL DEFAULT 1;
+CREATE TRIGGER TR_Cliente_Versao_Linha AFTER UPDATE ON Cliente
+WHEN NEW.Versao_Linha = OLD.Versao_Linha
+BEGIN
+    UPDATE Cliente SET Versao_Linha = OLD.Versao_Linha + 1 WHERE rowid = NEW.rowid;
+END;
+
+ALTER TABLE Funcionario ADD COLUMN Versao_Linha INTEGER NOT NULL DEFAULT 1;
+CREATE TRIGGER TR_Funcionario_Versao_Linha AFTER UPDATE ON Funcionario
+WHEN NEW.Versao_Linha = OLD.Versao_Linha
+BEGIN
+    UPDATE Funcionario SET Versao_Linha = OLD.Versao_Linha + 1 WHERE rowid = NEW.rowid;
+END;
+
+ALTER TABLE Veiculo ADD COLUMN Versao_Linha INTEGER NOT NULL DEFAULT 1;
+CREATE TRIGGER TR_Veiculo_Versao_Linha AFTER UPDATE ON Veiculo
+WHEN NEW.Versao_Linha = OLD.Versao_Linha
+BEGIN
+    UPDATE Veiculo SET Versao_Linha = OLD.Versao_Linha + 1 WHERE rowid = NEW.rowid;
+END;
+
+ALTER TABLE Sede ADD COLUMN Versao_Linha INTEGER NOT NULL DEFAULT 1;
+CREATE TRIGGER TR_Sede_Versao_Linha AFTER UPDATE ON Sede
+WHEN NEW.Versao_Linha = OLD.Versao_Linha
+BEGIN
+    UPDATE Sede SET Versao_Linha = OLD.Versao_Linha + 1 WHERE rowid = NEW.rowid;
+END;
+
+ALTER TABLE Usuario ADD COLUMN Versao_Linha INTEGER NOT NULL DEFAULT 1;
+CREATE TRIGGER TR_Usuario_Versao_Linha AFTER UPDATE ON Usuario
+WHEN NEW.Versao_Linha = OLD.Versao_Linha
+BEGIN
+    UPDATE Usuario SET Versao_Linha = OLD.Versao_Linha + 1 WHERE rowid = NEW.rowid;
+END;
+
+ALTER TABLE Dados_Rastreamento ADD COLUMN Versao_Linha INTEGER NOT NULL DEFAULT 1;
+CREATE TRIGGER TR_Dados_Rastreamento_Versao_Linha AFTER UPDATE ON Dados_Rastreamento
+WHEN NEW.Versao_Linha = OLD.Versao_Linha
+BEGIN
+    UPDATE Dados_Rastreamento SET Versao_Linha = OLD.Versao_Linha + 1 WHERE rowid = NEW.rowid;
+END;
+
+ALTER TABLE Produto_A_Ser_Entregue ADD COLUMN Versao_Linha INTEGER NOT NULL DEFAULT 1;
+CREATE TRIGGER TR_Produto_A_Ser_Entregue_Versao_Linha AFTER UPDATE ON Produto_A_Ser_Entregue
+WHEN NEW.Versao_Linha = OLD.Versao_Linha
+BEGIN
+    UPDATE Produto_A_Ser_Entregue SET Versao_Linha = OLD.Versao_Linha + 1 WHERE rowid = NEW.rowid;
+END;
@@ -0,0 +1,18 @@
+-- Migração 0011: versão de linha para concorrência otimista nas telas de atualização.
+-- As telas leem a linha, esperam o operador e só então gravam. Com Versao_Linha, o UPDATE só
+-- grava se a linha ainda está na versão lida (WHERE ... AND Versao_Linha = ?): se outro operador
+-- gravou antes, nenhuma linha é afetada, a tela recarrega os valores atuais e pede de novo.
+-- Nenhum bloqueio fica aberto enquanto o operador digita.
+--
+-- ROWVERSION é mantida pelo próprio SQL Server a cada UPDATE. Incluir a coluna preenche todas as
+-- linhas existentes (operação proporcional ao tamanho da tabela em Produto_A_Ser_Entregue).
+ALTER TABLE Endereco ADD Versao_Linha ROWVERSION;
+ALTER TABLE Pessoa ADD Versao_Linha ROWVERSION;
+ALTER TABLE Cliente ADD Versao_Linha ROWVERSION;
+ALTER TABLE Funcionario ADD Versao_Linha ROWVERSION;
+ALTER TABLE Veiculo ADD Versao_Linha ROWVERSION;
+ALTER TABLE Sede ADD Versao_Linha ROWVERSION;
+ALTER TABLE Usuario ADD Versao_Linha ROWVERSION;
+ALTER TABLE Dados_Rastreamento ADD Versao_Linha ROWVERSION;
+ALTER TABLE Produto_A_Ser_Entregue ADD Versao_Linha ROWVERSION;
+PRINT 'Colunas Versao_Linha criadas.';
@@ -0,0 +1,3 @@
+-- migrar: sem-transacao
+-- Reverte a migração 0012.
+DROP INDEX IF EXISTS IX_Carregamento_Evento_Data ON Carregamento_Evento;
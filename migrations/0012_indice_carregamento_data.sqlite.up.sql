@@ -0,0 +1,2 @@
+-- Variante SQLite da migração 0012 (sem ONLINE).
+CREATE INDEX IF NOT EXISTS IX_Carregamento_Evento_Data ON Carregamento_Evento (Data_Carregamento);
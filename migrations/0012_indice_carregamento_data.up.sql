@@ -0,0 +1,7 @@
+-- migrar: sem-transacao
+-- Migração 0012: índice da listagem paginada de carregamentos (mais recentes primeiro). Cada página
+-- parte da última data exibida; sem o índice, toda página ordenaria a tabela inteira.
+-- A chave clusterizada (ID_Carregamento_Evento) já vem no índice e desempata a ordenação.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Carregamento_Evento_Data' AND object_id = OBJECT_ID('Carregamento_Evento'))
+    CREATE NONCLUSTERED INDEX IX_Carregamento_Evento_Data ON Carregamento_Evento (Data_Carregamento)
+    WITH (ONLINE = ON);
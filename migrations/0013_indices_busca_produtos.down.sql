@@ -0,0 +1,5 @@
+-- migrar: sem-transacao
+-- Reverte a migração 0013.
+DROP INDEX IF EXISTS IX_Produto_Data_Chegada ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Produto_Data_Prevista ON Produto_A_Ser_Entregue;
+DROP INDEX IF EXISTS IX_Rastreamento_Cidade ON Dados_Rastreamento;
@@ -0,0 +1,4 @@
+-- Variante SQLite da migração 0013 (sem ONLINE).
+CREATE INDEX IF NOT EXISTS IX_Produto_Data_Chegada ON Produto_A_Ser_Entregue (Data_Chegada_CD);
+CREATE INDEX IF NOT EXISTS IX_Produto_Data_Prevista ON Produto_A_Ser_Entregue (Data_Prevista_Entrega);
+CREATE INDEX IF NOT EXISTS IX_Rastreamento_Cidade ON Dados_Rastreamento (Estado, Cidade);
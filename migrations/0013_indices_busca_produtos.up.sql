@@ -0,0 +1,21 @@
+-- migrar: sem-transacao
+-- Migração 0013: índices dos filtros da busca de produtos (search_products_terminal). Remetente,
+-- destinatário, motorista (0002) e o código de rastreamento (UNIQUE) já têm índice.
+-- Criados online e fora de transação, como os índices da migração 0002.
+
+-- Faixas de data de chegada no CD.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Produto_Data_Chegada' AND object_id = OBJECT_ID('Produto_A_Ser_Entregue'))
+    CREATE NONCLUSTERED INDEX IX_Produto_Data_Chegada ON Produto_A_Ser_Entregue (Data_Chegada_CD)
+    WITH (ONLINE = ON);
+GO
+
+-- Faixas de data prevista de entrega.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Produto_Data_Prevista' AND object_id = OBJECT_ID('Produto_A_Ser_Entregue'))
+    CREATE NONCLUSTERED INDEX IX_Produto_Data_Prevista ON Produto_A_Ser_Entregue (Data_Prevista_Entrega)
+    WITH (ONLINE = ON);
+GO
+
+-- UF e cidade de entrega; o produto é alcançado pelo índice único de ID_Rastreamento.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Rastreamento_Cidade' AND object_id = OBJECT_ID('Dados_Rastreamento'))
+    CREATE NONCLUSTERED INDEX IX_Rastreamento_Cidade ON Dados_Rastreamento (Estado, Cidade)
+    WITH (ONLINE = ON);
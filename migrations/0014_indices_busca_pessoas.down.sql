@@ -0,0 +1,6 @@
+-- migrar: sem-transacao
+-- Reverte a migração 0014.
+DROP INDEX IF EXISTS IX_Pessoa_RG ON Pessoa;
+DROP INDEX IF EXISTS IX_Pessoa_Telefone ON Pessoa;
+DROP INDEX IF EXISTS IX_Cliente_CPF ON Cliente;
+DROP INDEX IF EXISTS IX_Cliente_CNPJ ON Cliente;
@@ -0,0 +1,5 @@
+-- Variante SQLite da migração 0014 (sem ONLINE).
+CREATE INDEX IF NOT EXISTS IX_Pessoa_RG ON Pessoa (RG);
+CREATE INDEX IF NOT EXISTS IX_Pessoa_Telefone ON Pessoa (Telefone);
+CREATE INDEX IF NOT EXISTS IX_Cliente_CPF ON Cliente (CPF);
+CREATE INDEX IF NOT EXISTS IX_Cliente_CNPJ ON Cliente (CNPJ);
@@ -0,0 +1,24 @@
+-- migrar: sem-transacao
+-- Migração 0014: índices da busca por prefixo do seletor de pessoas (pick_person_terminal). O nome
+-- já tem IX_Pessoa_Nome (0002); documento e telefone ganham um índice cada, para que cada
+-- LIKE 'x%' da busca seja uma busca no índice.
+-- Criados online e fora de transação, como os índices da migração 0002.
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Pessoa_RG' AND object_id = OBJECT_ID('Pessoa'))
+    CREATE NONCLUSTERED INDEX IX_Pessoa_RG ON Pessoa (RG)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Pessoa_Telefone' AND object_id = OBJECT_ID('Pessoa'))
+    CREATE NONCLUSTERED INDEX IX_Pessoa_Telefone ON Pessoa (Telefone)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Cliente_CPF' AND object_id = OBJECT_ID('Cliente'))
+    CREATE NONCLUSTERED INDEX IX_Cliente_CPF ON Cliente (CPF)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Cliente_CNPJ' AND object_id = OBJECT_ID('Cliente'))
+    CREATE NONCLUSTERED INDEX IX_Cliente_CNPJ ON Cliente (CNPJ)
+    WITH (ONLINE = ON);
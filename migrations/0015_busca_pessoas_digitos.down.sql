@@ -0,0 +1,28 @@
+-- migrar: sem-transacao
+-- Reverte a migração 0015 (e recria os índices da 0014).
+DROP INDEX IF EXISTS IX_Pessoa_RG_Digitos ON Pessoa;
+DROP INDEX IF EXISTS IX_Pessoa_Telefone_Digitos ON Pessoa;
+DROP INDEX IF EXISTS IX_Cliente_CPF_Digitos ON Cliente;
+DROP INDEX IF EXISTS IX_Cliente_CNPJ_Digitos ON Cliente;
+ALTER TABLE Pessoa DROP COLUMN IF EXISTS RG_Digitos, Telefone_Digitos;
+ALTER TABLE Cliente DROP COLUMN IF EXISTS CPF_Digitos, CNPJ_Digitos;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Pessoa_RG' AND object_id = OBJECT_ID('Pessoa'))
+    CREATE NONCLUSTERED INDEX IX_Pessoa_RG ON Pessoa (RG)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Pessoa_Telefone' AND object_id = OBJECT_ID('Pessoa'))
+    CREATE NONCLUSTERED INDEX IX_Pessoa_Telefone ON Pessoa (Telefone)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Cliente_CPF' AND object_id = OBJECT_ID('Cliente'))
+    CREATE NONCLUSTERED INDEX IX_Cliente_CPF ON Cliente (CPF)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Cliente_CNPJ' AND object_id = OBJECT_ID('Cliente'))
+    CREATE NONCLUSTERED INDEX IX_Cliente_CNPJ ON Cliente (CNPJ)
+    WITH (ONLINE = ON);
@@ -0,0 +1,13 @@
+-- Reverte a variante SQLite da migração 0015.
+DROP INDEX IF EXISTS IX_Pessoa_RG_Digitos;
+DROP INDEX IF EXISTS IX_Pessoa_Telefone_Digitos;
+DROP INDEX IF EXISTS IX_Cliente_CPF_Digitos;
+DROP INDEX IF EXISTS IX_Cliente_CNPJ_Digitos;
+ALTER TABLE Pessoa DROP COLUMN RG_Digitos;
+ALTER TABLE Pessoa DROP COLUMN Telefone_Digitos;
+ALTER TABLE Cliente DROP COLUMN CPF_Digitos;
+ALTER TABLE Cliente DROP COLUMN CNPJ_Digitos;
+CREATE INDEX IF NOT EXISTS IX_Pessoa_RG ON Pessoa (RG);
+CREATE INDEX IF NOT EXISTS IX_Pessoa_Telefone ON Pessoa (Telefone);
+CREATE INDEX IF NOT EXISTS IX_Cliente_CPF ON Cliente (CPF);
+CREATE INDEX IF NOT EXISTS IX_Cliente_CNPJ ON Cliente (CNPJ);
@@ -0,0 +1,14 @@
+-- Variante SQLite da migração 0015 (colunas geradas VIRTUAL, sem ONLINE). COLLATE NOCASE, como nas
+-- demais colunas de texto, permite que o LIKE 'x%' use o índice.
+ALTER TABLE Pessoa ADD COLUMN RG_Digitos VARCHAR(20) COLLATE NOCASE GENERATED ALWAYS AS (REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(RG, '.', ''), '-', ''), '/', ''), '(', ''), ')', ''), ' ', '')) VIRTUAL;
+ALTER TABLE Pessoa ADD COLUMN Telefone_Digitos VARCHAR(20) COLLATE NOCASE GENERATED ALWAYS AS (REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(Telefone, '.', ''), '-', ''), '/', ''), '(', ''), ')', ''), ' ', '')) VIRTUAL;
+ALTER TABLE Cliente ADD COLUMN CPF_Digitos VARCHAR(14) COLLATE NOCASE GENERATED ALWAYS AS (REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(CPF, '.', ''), '-', ''), '/', ''), '(', ''), ')', ''), ' ', '')) VIRTUAL;
+ALTER TABLE Cliente ADD COLUMN CNPJ_Digitos VARCHAR(18) COLLATE NOCASE GENERATED ALWAYS AS (REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(CNPJ, '.', ''), '-', ''), '/', ''), '(', ''), ')', ''), ' ', '')) VIRTUAL;
+CREATE INDEX IF NOT EXISTS IX_Pessoa_RG_Digitos ON Pessoa (RG_Digitos);
+CREATE INDEX IF NOT EXISTS IX_Pessoa_Telefone_Digitos ON Pessoa (Telefone_Digitos);
+CREATE INDEX IF NOT EXISTS IX_Cliente_CPF_Digitos ON Cliente (CPF_Digitos);
+CREATE INDEX IF NOT EXISTS IX_Cliente_CNPJ_Digitos ON Cliente (CNPJ_Digitos);
+DROP INDEX IF EXISTS IX_Pessoa_RG;
+DROP INDEX IF EXISTS IX_Pessoa_Telefone;
+DROP INDEX IF EXISTS IX_Cliente_CPF;
+DROP INDEX IF EXISTS IX_Cliente_CNPJ;
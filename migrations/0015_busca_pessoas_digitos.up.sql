@@ -0,0 +1,49 @@
+-- migrar: sem-transacao
+-- Migração 0015: a busca por documento/telefone do seletor de pessoas (pick_person_terminal) passa a
+-- comparar só os dígitos. RG, Telefone, CPF e CNPJ são gravados como digitados, em geral com máscara
+-- ('123.456.789-00'), e quem busca costuma digitar só os números. Cada coluna ganha uma versão calculada
+-- sem a pontuação usual (. - / ( ) e espaço), indexada; a busca normaliza o termo da mesma forma.
+-- As colunas não são PERSISTED (a inclusão é só de metadados): o índice guarda os valores calculados.
+-- Os índices da 0014 sobre os valores formatados deixam de ser usados pela busca e são removidos.
+
+IF COL_LENGTH('Pessoa', 'RG_Digitos') IS NULL
+    ALTER TABLE Pessoa ADD RG_Digitos AS CAST(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(RG, '.', ''), '-', ''), '/', ''), '(', ''), ')', ''), ' ', '') AS VARCHAR(20));
+GO
+
+IF COL_LENGTH('Pessoa', 'Telefone_Digitos') IS NULL
+    ALTER TABLE Pessoa ADD Telefone_Digitos AS CAST(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(Telefone, '.', ''), '-', ''), '/', ''), '(', ''), ')', ''), ' ', '') AS VARCHAR(20));
+GO
+
+IF COL_LENGTH('Cliente', 'CPF_Digitos') IS NULL
+    ALTER TABLE Cliente ADD CPF_Digitos AS CAST(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(CPF, '.', ''), '-', ''), '/', ''), '(', ''), ')', ''), ' ', '') AS VARCHAR(14));
+GO
+
+IF COL_LENGTH('Cliente', 'CNPJ_Digitos') IS NULL
+    ALTER TABLE Cliente ADD CNPJ_Digitos AS CAST(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(CNPJ, '.', ''), '-', ''), '/', ''), '(', ''), ')', ''), ' ', '') AS VARCHAR(18));
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Pessoa_RG_Digitos' AND object_id = OBJECT_ID('Pessoa'))
+    CREATE NONCLUSTERED INDEX IX_Pessoa_RG_Digitos ON Pessoa (RG_Digitos)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Pessoa_Telefone_Digitos' AND object_id = OBJECT_ID('Pessoa'))
+    CREATE NONCLUSTERED INDEX IX_Pessoa_Telefone_Digitos ON Pessoa (Telefone_Digitos)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Cliente_CPF_Digitos' AND object_id = OBJECT_ID('Cliente'))
+    CREATE NONCLUSTERED INDEX IX_Cliente_CPF_Digitos ON Cliente (CPF_Digitos)
+    WITH (ONLINE = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Cliente_CNPJ_Digitos' AND object_id = OBJECT_ID('Cliente'))
+    CREATE NONCLUSTERED INDEX IX_Cliente_CNPJ_Digitos ON Cliente (CNPJ_Digitos)
+    WITH (ONLINE = ON);
+GO
+
+-- Substituídos pelos índices acima.
+DROP INDEX IF EXISTS IX_Pessoa_RG ON Pessoa;
+DROP INDEX IF EXISTS IX_Pessoa_Telefone ON Pessoa;
+DROP INDEX IF EXISTS IX_Cliente_CPF ON Cliente;
+DROP INDEX IF EXISTS IX_Cliente_CNPJ ON Cliente;
@@ -0,0 +1,287 @@
+"""
+Relatório de índices: mostra quais consultas do mainzao_app.py cada índice das migrações (migrations/) atende.
+
+Uso:
+    python relatorio_indices.py             # análise estática dos predicados (não precisa de banco)
+    python relatorio_indices.py --explicar  # pede também o plano de cada consulta ao banco ativo
+                                            # (SHOWPLAN_XML no SQL Server, EXPLAIN QUERY PLAN no SQLite)
+
+A análise estática considera que um índice atende uma consulta quando a primeira coluna da
+chave aparece em um predicado (WHERE/ON) ou no início do ORDER BY da tabela indexada, e, para
+índices filtrados, quando os valores do filtro aparecem na consulta.
+"""
+import ast
+import os
+import re
+import sys
+import logging
+from datetime import date, datetime
+
+import db_connection
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mainzao_app.py')
+
+_PALAVRAS_RESERVADAS = {'ON', 'WHERE', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS', 'JOIN', 'SET',
+                        'ORDER', 'GROUP', 'VALUES', 'OUTPUT', 'SELECT', 'AND', 'OR', 'UNION', 'HAVING'}
+
+def carregar_indices(esquema=None):
+    """
+    Lê os CREATE INDEX das migrações (ou do texto T-SQL em `esquema`), na ordem em que foram
+    aplicadas: índices removidos depois (DROP INDEX, DROP TABLE) não entram no resultado.
+
+    Returns:
+        list: Dicionários com nome, tabela, chaves, include e filtro (SQL do WHERE ou None).
+    """
+    texto = re.sub(r'--[^\n]*', '', esquema or db_connection.ler_esquema_sql())
+    indices = {}
+    padrao = (r'CREATE\s+(?:UNIQUE\s+)?(?:NON)?(?:CLUSTERED\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)\s*\(([^)]*)\)'
+              r'(?:\s*INCLUDE\s*\(([^)]*)\))?(?:\s*WHERE\s+(.*?))?(?:\s*WITH\s*\([^)]*\))?\s*;'
+              r'|DROP\s+INDEX\s+(?:IF\s+EXISTS\s+)?(\w+)'
+              r'|DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(\w+)')
+    for m in re.finditer(padrao, texto, re.IGNORECASE | re.DOTALL):
+        nome, tabela, chaves, include, filtro, removido, tabela_removida = m.groups()
+        if removido:
+            indices.pop(removido.lower(), None)
+        elif tabela_removida:
+            indices = {k: v for k, v in indices.items() if v['tabela'] != tabela_removida.lower()}
+        else:
+            indices[nome.lower()] = {
+                'nome': nome,
+                'tabela': tabela.lower(),
+                'tabela_nome': tabela,
+                'chaves': [c.split()[0].lower() for c in chaves.split(',')],
+                'include': [c.strip().lower() for c in include.split(',')] if include else [],
+                'filtro': ' '.join(filtro.split()) if filtro else None,
+            }
+    return list(indices.values())
+
+def carregar_chaves(esquema=None):
+    """
+    Lê as PRIMARY KEY e UNIQUE dos CREATE TABLE e ALTER TABLE ... ADD, que já têm índice próprio
+    no banco, descontando as removidas depois (DROP CONSTRAINT, DROP TABLE).
+
+    Returns:
+        list: Dicionários no mesmo formato de carregar_indices (sem filtro nem include).
+    """
+    texto = re.sub(r'--[^\n]*', '', esquema or db_connection.ler_esquema_sql())
+    chaves = {}
+    padrao = (r'CREATE\s+TABLE\s+(\w+)\s*\((.*?)\)\s*;'
+              r'|ALTER\s+TABLE\s+(\w+)\s+ADD\s+(.*?);'
+              r'|ALTER\s+TABLE\s+(\w+)\s+DROP\s+CONSTRAINT\s+(\w+)'
+              r'|DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(\w+)')
+    for m in re.finditer(padrao, texto, re.IGNORECASE | re.DOTALL):
+        criada, corpo, alterada, adicionadas, reduzida, removida, apagada = m.groups()
+        if removida:
+            chaves.pop(removida.lower(), None)
+            continue
+        if apagada:
+            chaves = {k: v for k, v in chaves.items() if v['tabela'] != apagada.lower()}
+            continue
+        tabela = criada or alterada
+        for linha in (corpo or adicionadas).split('\n'):
+            composta = re.search(r'\b(PRIMARY\s+KEY|UNIQUE)(?:\s+(?:NON)?CLUSTERED)?\s*\(([^)]*)\)', linha, re.IGNORECASE)
+            simples = re.match(r'\s*(\w+)\s+\w+.*?\b(PRIMARY\s+KEY|UNIQUE)\b', linha, re.IGNORECASE)
+            if composta:
+                colunas = [c.strip().lower() for c in composta.group(2).split(',')]
+            elif simples and simples.group(1).upper() not in ('FOREIGN', 'CONSTRAINT'):
+                colunas = [simples.group(1).lower()]
+            else:
+                continue
+            restricao = re.search(r'\bCONSTRAINT\s+(\w+)', linha, re.IGNORECASE)
+            nome = restricao.group(1) if restricao else f"{'PK' if 'PRIMARY' in linha.upper() else 'UQ'}_{tabela}_{colunas[0]}"
+            chaves[nome.lower()] = {'nome': nome, 'tabela': tabela.lower(), 'tabela_nome': tabela, 'chaves': colunas,
+                                    'include': [], 'filtro': None}
+    return list(chaves.values())
+
+def extrair_consultas(arquivo=APP):
+    """
+    Extrai os comandos SQL literais do app, com a função e a linha onde aparecem.
+    Fragmentos concatenados depois (ex: base_sql += " WHERE ...") são juntados ao SELECT
+    anterior da mesma função.
+
+    Returns:
+        list: Tuplas (funcao, linha, sql).
+    """
+    with open(arquivo, encoding='utf-8') as f:
+        arvore = ast.parse(f.read())
+    consultas = []
+    for funcao in ast.walk(arvore):
+        if not isinstance(funcao, ast.FunctionDef):
+            continue
+        anterior = None
+        for no in ast.walk(funcao):
+            if not (isinstance(no, ast.Constant) and isinstance(no.value, str)):
+                continue
+            sql = ' '.join(re.sub(r'--[^\n]*', '', no.value).split())
+            if re.match(r'(SELECT|INSERT|UPDATE|DELETE|WITH)\b', sql): # Só maiúsculas: evita textos de ajuda do menu
+                anterior = len(consultas)
+                consultas.append((funcao.name, no.lineno, sql))
+            elif anterior is not None and re.match(r'(WHERE|AND|OR)\b', sql):
+                nome, linha, base = consultas[anterior]
+                consultas.append((nome, no.lineno, f"{base} {sql}"))
+    # Funções aninhadas são visitadas mais de uma vez; mantém a primeira ocorrência
+    vistas, unicas = set(), []
+    for consulta in sorted(consultas, key=lambda c: c[1]):
+        if consulta[2] not in vistas:
+            vistas.add(consulta[2])
+            unicas.append(consulta)
+    return unicas
+
+def analisar_consulta(sql, mapa=None):
+    """
+    Descobre, por tabela, as colunas usadas em filtros (WHERE), em junções (ON) e a primeira coluna do ORDER BY.
+
+    Returns:
+        tuple: ({tabela: set(colunas do WHERE)}, {tabela: set(colunas do ON)}, {tabela: coluna_ordenacao})
+    """
+    mapa = mapa if mapa is not None else db_connection.carregar_mapa_colunas()
+    sem_literais = re.sub(r"N?'(?:[^']|'')*'", "''", sql)
+    aliases = {}
+    for tabela, alias in re.findall(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', sem_literais, re.IGNORECASE):
+        aliases[tabela.lower()] = tabela.lower()
+        if alias and alias.upper() not in _PALAVRAS_RESERVADAS:
+            aliases[alias.lower()] = tabela.lower()
+    tabelas = set(aliases.values())
+
+    def tabela_da_coluna(alias, coluna):
+        if alias:
+            return aliases.get(alias.lower())
+        donas = [t for t in tabelas if coluna in mapa.get(t, {})]
+        return donas[0] if len(donas) == 1 else None
+
+    filtros, juncoes = {}, {}
+    corpo = re.split(r'\bORDER\s+BY\b', sem_literais, flags=re.IGNORECASE)[0]
+    # A parte antes do primeiro WHERE/ON (lista do SELECT, SET do UPDATE) não tem predicados
+    partes = re.split(r'\b(WHERE|ON)\b', corpo, flags=re.IGNORECASE)[1:]
+    for clausula, parte in zip(partes[::2], partes[1::2]):
+        destino = filtros if clausula.upper() == 'WHERE' else juncoes
+        parte = re.split(r'\b(?:INNER|LEFT|RIGHT|FULL|CROSS|JOIN|GROUP)\b', parte, flags=re.IGNORECASE)[0]
+        for alias, coluna in re.findall(r'(?:(\w+)\.)?(\w+)\s*(?:=|<>|!=|<=|>=|<|>|\bNOT\s+IN\b|\bIN\b|\bLIKE\b|\bIS\b)',
+                                        parte, re.IGNORECASE):
+            tabela = tabela_da_coluna(alias, coluna.lower())
+            if tabela:
+                destino.setdefault(tabela, set()).add(coluna.lower())
+        # Lado direito das comparações entre colunas (A.x = B.y)
+        for alias, coluna in re.findall(r'(?:=|<>)\s*(\w+)\.(\w+)', parte):
+            tabela = aliases.get(alias.lower())
+            if tabela:
+                destino.setdefault(tabela, set()).add(coluna.lower())
+
+    ordenacao = {}
+    ordem = re.search(r'\bORDER\s+BY\s+(?:(\w+)\.)?(\w+)', sem_literais, re.IGNORECASE)
+    if ordem:
+        tabela = tabela_da_coluna(ordem.group(1), ordem.group(2).lower())
+        if tabela:
+            ordenacao[tabela] = ordem.group(2).lower()
+    return filtros, juncoes, ordenacao
+
+def _filtro_compativel(indice, sql, predicados):
+    """Um índice filtrado só é considerado se a consulta restringe a coluna do filtro aos mesmos valores."""
+    if not indice['filtro']:
+        return True
+    coluna = re.match(r'(\w+)', indice['filtro']).group(1).lower()
+    if coluna not in predicados.get(indice['tabela'], set()):
+        return False
+    # Textos entre aspas e números (códigos de domínio, migração 0010) do filtro têm de aparecer na consulta
+    textos = re.findall(r"'[^']*'", indice['filtro'])
+    numeros = re.findall(r"(?<![\w.'])\d+(?![\w.'])", re.sub(r"'[^']*'", "''", indice['filtro']))
+    return (all(texto in sql for texto in textos)
+            and all(re.search(rf"(?<![\w.']){numero}(?![\w.'])", sql) for numero in numeros))
+
+def indices_da_consulta(sql, indices, mapa=None):
+    """
+    Returns:
+        list: Tuplas (nome_do_indice, uso) com uso 'busca', 'filtro', 'junção' ou 'ordenação'.
+    """
+    filtros, juncoes, ordenacao = analisar_consulta(sql, mapa)
+    atendidos = []
+    for indice in indices:
+        if not _filtro_compativel(indice, sql, filtros):
+            continue
+        if indice['chaves'][0] in filtros.get(indice['tabela'], set()):
+            atendidos.append((indice['nome'], 'busca'))
+        elif indice['chaves'][0] in juncoes.get(indice['tabela'], set()):
+            atendidos.append((indice['nome'], 'junção'))
+        elif indice['filtro']:
+            atendidos.append((indice['nome'], 'filtro'))
+        elif ordenacao.get(indice['tabela']) == indice['chaves'][0]:
+            atendidos.append((indice['nome'], 'ordenação'))
+    return atendidos
+
+def _valores_exemplo(sql):
+    """Parâmetros fictícios, do tipo de cada coluna, só para o banco montar o plano."""
+    exemplos = {'INT': 0, 'DECIMAL': 0, 'DATE': date.today(), 'DATETIME': datetime.now()}
+    return [exemplos.get(tipo[0], '') if tipo else '' for tipo in db_connection.tipos_parametros(sql)]
+
+def explicar(conexao, sql):
+    """
+    Pede ao banco ativo o plano da consulta, sem executá-la.
+
+    Returns:
+        set or None: Nomes dos índices que aparecem no plano, ou None se o plano não pôde ser obtido.
+    """
+    backend = db_connection.obter_backend()
+    params = _valores_exemplo(sql)
+    cursor = conexao.cursor()
+    try:
+        if backend.nome == 'sqlite':
+            cursor.execute("EXPLAIN QUERY PLAN " + backend.translate(sql), params)
+            return set(re.findall(r'\bINDEX (\w+)', ' '.join(str(linha[-1]) for linha in cursor.fetchall())))
+        cursor.execute("SET SHOWPLAN_XML ON")
+        try:
+            cursor.execute(sql, params)
+            plano = ' '.join(str(linha[0]) for linha in cursor.fetchall())
+        finally:
+            cursor.execute("SET SHOWPLAN_XML OFF")
+        return set(re.findall(r'Index="\[(\w+)\]"', plano))
+    except backend.Error as e:
+        logging.warning(f"Não foi possível obter o plano de: {sql[:80]}... ({e})")
+        return None
+    finally:
+        cursor.close()
+
+def gerar_relatorio(com_plano=False):
+    indices = carregar_indices()
+    chaves = carregar_chaves()
+    consultas = extrair_consultas()
+    mapa = db_connection.carregar_mapa_colunas()
+    conexao = db_connection.conectar_banco() if com_plano else None
+
+    por_indice = {indice['nome']: [] for indice in indices}
+    sem_indice = []
+    for funcao, linha, sql in consultas:
+        atendidos = indices_da_consulta(sql, indices, mapa)
+        for nome, uso in atendidos:
+            por_indice[nome].append((funcao, linha, uso, sql))
+        if (re.search(r'\bWHERE\b', sql) and not any(uso in ('busca', 'filtro') for _, uso in atendidos)
+                and not any(uso == 'busca' for _, uso in indices_da_consulta(sql, chaves, mapa))):
+            sem_indice.append((funcao, linha, sql))
+
+    planos = {}
+    if conexao:
+        for funcao, linha, sql in consultas:
+            planos[linha] = explicar(conexao, sql)
+        db_connection.desconectar_banco(conexao)
+
+    print(f"\n--- Índices x Consultas ({len(indices)} índices, {len(consultas)} consultas analisadas) ---")
+    for indice in indices:
+        filtro = f" WHERE {indice['filtro']}" if indice['filtro'] else ''
+        print(f"\n{indice['nome']} ON {indice['tabela_nome']} ({', '.join(indice['chaves'])}){filtro}")
+        if not por_indice[indice['nome']]:
+            print("    (nenhuma consulta do app usa este índice)")
+        for funcao, linha, uso, sql in por_indice[indice['nome']]:
+            plano = ''
+            if conexao:
+                usados = planos.get(linha)
+                plano = ' [plano: ?]' if usados is None else (' [plano: usa]' if indice['nome'] in usados else ' [plano: não usa]')
+            print(f"    {uso:<10} {funcao} (linha {linha}){plano}: {sql[:90]}...")
+
+    print("\n--- Consultas com WHERE sem índice de busca (nem dos índices acima, nem de PK/UNIQUE) ---")
+    if not sem_indice:
+        print("    (nenhuma)")
+    for funcao, linha, sql in sem_indice:
+        print(f"    {funcao} (linha {linha}): {sql[:110]}")
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.WARNING)
+    gerar_relatorio(com_plano='--explicar' in sys.argv[1:])